@@ -0,0 +1,345 @@
+"""
+Pipeline throughput benchmark for ActionLab V14.
+
+Times every stage through the same span() instrumentation the service
+uses (app.common.metrics), on inputs that need no network or database:
+
+- pose_* cases: synthetic pose sequences → events, action, risks, basics,
+  elbow, speed, clinician + expert system
+- clip_* cases: synthetic stick-figure clips → window scan, decode + pose,
+  the pose workers above, render and encode
+- golden clips: every *.mp4 / *.mov in --clips-dir
+  (or ACTIONLAB_BENCH_CLIPS_DIR), run end to end on their real pose
+
+Reports per-stage median milliseconds, pose / render frames-per-second
+and peak RSS, and compares against a stored baseline:
+
+    python -m app.benchmarks.pipeline_bench                    # compare
+    python -m app.benchmarks.pipeline_bench --write-baseline   # refresh
+    python -m app.benchmarks.pipeline_bench --quick --json out.json
+
+Exit status 1 means a stage regressed past --tolerance (default 25%).
+Baselines are hardware-specific; refresh them on the CI box.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from app.benchmarks.synthetic import synthetic_pose_frames, write_synthetic_clip
+from app.common.logger import get_logger
+from app.common.metrics import run_timings, span
+
+logger = get_logger(__name__)
+
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_TOLERANCE = 0.25
+# Stages faster than this are too noisy to gate on.
+MIN_REGRESSION_MS = 5.0
+
+# (name, frames, fps)
+POSE_CASES = (("pose_150f_30fps", 150, 30.0), ("pose_480f_120fps", 480, 120.0))
+CLIP_CASES = (("clip_90f_360p", 90, 30.0, (640, 360)), ("clip_120f_720p", 120, 30.0, (1280, 720)))
+QUICK_POSE_CASES = POSE_CASES[:1]
+QUICK_CLIP_CASES = CLIP_CASES[:1]
+
+
+class _BenchProgress:
+    """Stand-in for JobProgress; the orchestrator only calls stage()."""
+
+    def stage(self, name: str) -> None:
+        return None
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux.
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0, 1)
+
+
+@contextmanager
+def _pose_model_override(complexity: Optional[int]) -> Iterator[None]:
+    """Run the loader's tracker at another model complexity (heavy model may be absent offline)."""
+    if complexity is None:
+        yield
+        return
+    from app.workers.pose import tracker_pool
+
+    original = dict(tracker_pool.LOADER_TRACKER_OPTIONS)
+    tracker_pool.LOADER_TRACKER_OPTIONS["model_complexity"] = int(complexity)
+    try:
+        yield
+    finally:
+        tracker_pool.LOADER_TRACKER_OPTIONS.clear()
+        tracker_pool.LOADER_TRACKER_OPTIONS.update(original)
+
+
+# ------------------------------------------------------------
+# One run of one case
+# ------------------------------------------------------------
+def _analyze(video: Dict[str, Any], pose_frames: Any, hand: str) -> Dict[str, Any]:
+    from app.orchestrator.orchestrator import _build_analysis_result, _run_pose_workers
+
+    progress = _BenchProgress()
+    stages = _run_pose_workers(
+        run_id="bench",
+        request_id="bench",
+        hand=hand,
+        platform="bench",
+        video=video,
+        pose_frames=pose_frames,
+        progress=progress,
+    )
+    return _build_analysis_result(
+        run_id="bench",
+        player_id="bench",
+        hand=hand,
+        bowler_type=None,
+        effective_age_group="SENIOR",
+        effective_season=None,
+        actor_obj={"account_id": "bench", "role": "COACH"},
+        video=video,
+        stages=stages,
+        prior_results=[],
+        progress=progress,
+    )
+
+
+def _render(video_path: str, pose_frames: Any, result: Dict[str, Any], hand: str, out_dir: str) -> Dict[str, Any]:
+    from app.workers.render.coach_video_renderer import render_skeleton_video
+
+    with span("render"):
+        return render_skeleton_video(
+            video_path=video_path,
+            pose_frames=pose_frames,
+            events=result["events"],
+            hand=hand,
+            action=result["action"],
+            elbow=result["elbow"],
+            risks=result["risks"],
+            estimated_release_speed=result["estimated_release_speed"],
+            output_path=os.path.join(out_dir, "bench_walkthrough.mp4"),
+            pause_seconds=1.0,
+            slow_motion_factor=2.0,
+            end_summary_seconds=0.5,
+        )
+
+
+def run_pose_case(frames: int, fps: float, *, hand: str = "R") -> Dict[str, Any]:
+    pose_frames = synthetic_pose_frames(frames)
+    video = {"fps": fps, "total_frames": frames, "width": 1280, "height": 720}
+    with run_timings() as timings:
+        _analyze(video, pose_frames, hand)
+    return timings.breakdown()
+
+
+def run_clip_case(
+    video_path: str,
+    *,
+    hand: str = "R",
+    synthetic_frames: Optional[int] = None,
+    render: bool = True,
+) -> Dict[str, Any]:
+    """Window scan + pose on the clip; workers on the real pose (or the synthetic one it was drawn from)."""
+    from app.io.frame_provider import close_frame_provider
+    from app.io.loader import load_video_path
+
+    with tempfile.TemporaryDirectory(prefix="actionlab_bench_") as out_dir, run_timings() as timings:
+        with span("load_video"):
+            video, pose_frames, _ = load_video_path(video_path)
+        try:
+            if synthetic_frames is not None:
+                # Stick figures are not people; analyse the pose the clip was drawn from.
+                pose_frames = synthetic_pose_frames(synthetic_frames)
+            result = _analyze(video, pose_frames, hand)
+        finally:
+            close_frame_provider(video)
+        if render:
+            _render(video_path, pose_frames, result, hand, out_dir)
+        return timings.breakdown()
+
+
+# ------------------------------------------------------------
+# Aggregation
+# ------------------------------------------------------------
+def _summarize(runs: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    stage_names = sorted({name for run in runs for name in (run.get("stages") or {})})
+    stages = {
+        name: round(statistics.median(float(run["stages"][name]["ms"]) for run in runs if name in run["stages"]), 1)
+        for name in stage_names
+    }
+    if "render" in stages and "render_encode" in stages:
+        stages["render_draw"] = round(max(0.0, stages["render"] - stages["render_encode"]), 1)
+    fps_names = sorted({name for run in runs for name in (run.get("fps") or {})})
+    fps = {
+        name: round(statistics.median(float(run["fps"][name]["fps"] or 0.0) for run in runs if name in run["fps"]), 2)
+        for name in fps_names
+    }
+    return {
+        "total_ms": round(statistics.median(float(run["total_ms"]) for run in runs), 1),
+        "stages": stages,
+        "fps": fps,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_benchmarks(
+    *,
+    repeat: int = 3,
+    quick: bool = False,
+    clips_dir: Optional[str] = None,
+    include_clips: bool = True,
+    pose_model_complexity: Optional[int] = None,
+) -> Dict[str, Any]:
+    cases: Dict[str, Any] = {}
+    repeat = max(1, int(repeat))
+    # Imports, knowledge-pack loading and engine construction are one-off costs.
+    run_pose_case(60, 30.0)
+
+    for name, frames, fps in (QUICK_POSE_CASES if quick else POSE_CASES):
+        cases[name] = _summarize([run_pose_case(frames, fps) for _ in range(repeat)])
+
+    if include_clips:
+        with _pose_model_override(pose_model_complexity), tempfile.TemporaryDirectory(prefix="actionlab_bench_clips_") as tmp:
+            for name, frames, fps, size in (QUICK_CLIP_CASES if quick else CLIP_CASES):
+                path = write_synthetic_clip(os.path.join(tmp, f"{name}.mp4"), total_frames=frames, fps=fps, size=size)
+                runs = [run_clip_case(path, synthetic_frames=frames) for _ in range(repeat)]
+                cases[name] = _summarize(runs)
+            for path in _golden_clips(clips_dir):
+                name = "golden_" + os.path.splitext(os.path.basename(path))[0]
+                cases[name] = _summarize([run_clip_case(path) for _ in range(repeat)])
+
+    return {
+        "version": 1,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "machine": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+        },
+        "repeat": repeat,
+        "pose_model_complexity": pose_model_complexity,
+        "cases": cases,
+    }
+
+
+def _golden_clips(clips_dir: Optional[str]) -> List[str]:
+    root = clips_dir or os.getenv("ACTIONLAB_BENCH_CLIPS_DIR") or ""
+    if not root or not os.path.isdir(root):
+        return []
+    return sorted(
+        os.path.join(root, name)
+        for name in os.listdir(root)
+        if name.lower().endswith((".mp4", ".mov"))
+    )
+
+
+# ------------------------------------------------------------
+# Baseline comparison
+# ------------------------------------------------------------
+def compare_to_baseline(
+    report: Dict[str, Any],
+    baseline: Dict[str, Any],
+    *,
+    tolerance: float = DEFAULT_TOLERANCE,
+    min_ms: float = MIN_REGRESSION_MS,
+) -> List[Dict[str, Any]]:
+    """Stages / fps that got slower than the baseline allows (cases missing on either side are skipped)."""
+    regressions: List[Dict[str, Any]] = []
+    for case, current in (report.get("cases") or {}).items():
+        reference = (baseline.get("cases") or {}).get(case)
+        if not reference:
+            continue
+        for stage, ms in (current.get("stages") or {}).items():
+            base_ms = (reference.get("stages") or {}).get(stage)
+            if base_ms is None:
+                continue
+            if ms > base_ms * (1.0 + tolerance) and ms - base_ms >= min_ms:
+                regressions.append(
+                    {"case": case, "metric": f"stage:{stage}", "baseline": base_ms, "current": ms,
+                     "ratio": round(ms / base_ms, 2) if base_ms else None}
+                )
+        for pipeline, fps in (current.get("fps") or {}).items():
+            base_fps = (reference.get("fps") or {}).get(pipeline)
+            if base_fps and fps < base_fps / (1.0 + tolerance):
+                regressions.append(
+                    {"case": case, "metric": f"fps:{pipeline}", "baseline": base_fps, "current": fps,
+                     "ratio": round(fps / base_fps, 2)}
+                )
+    return regressions
+
+
+def format_report(report: Dict[str, Any], regressions: Sequence[Dict[str, Any]] = ()) -> str:
+    lines: List[str] = []
+    for case, summary in (report.get("cases") or {}).items():
+        fps = " ".join(f"{name}_fps={value}" for name, value in (summary.get("fps") or {}).items())
+        lines.append(f"{case}: total_ms={summary['total_ms']} peak_rss_mb={summary['peak_rss_mb']} {fps}".rstrip())
+        for stage, ms in sorted((summary.get("stages") or {}).items(), key=lambda item: -item[1]):
+            lines.append(f"  {stage:<16} {ms:>10.1f} ms")
+    if regressions:
+        lines.append("REGRESSIONS:")
+        for item in regressions:
+            lines.append(
+                f"  {item['case']} {item['metric']} baseline={item['baseline']} current={item['current']} ratio={item['ratio']}"
+            )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Time each ActionLab pipeline stage against a stored baseline.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case; medians are reported (default: 3).")
+    parser.add_argument("--quick", action="store_true", help="One pose case and one clip case.")
+    parser.add_argument("--no-clips", action="store_true", help="Skip video cases (no decode, pose or render).")
+    parser.add_argument("--clips-dir", help="Directory of golden clips (default: ACTIONLAB_BENCH_CLIPS_DIR).")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH, help="Baseline JSON path.")
+    parser.add_argument("--write-baseline", action="store_true", help="Store this run as the new baseline.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed slowdown (default: 0.25).")
+    parser.add_argument("--json", dest="json_path", help="Also write the full report to this path.")
+    parser.add_argument(
+        "--pose-model-complexity",
+        type=int,
+        choices=(0, 1, 2),
+        help="Override the loader's MediaPipe model (the heavy model must be present locally).",
+    )
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(
+        repeat=args.repeat,
+        quick=args.quick,
+        clips_dir=args.clips_dir,
+        include_clips=not args.no_clips,
+        pose_model_complexity=args.pose_model_complexity,
+    )
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2, sort_keys=True)
+
+    if args.write_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2, sort_keys=True)
+            handle.write("\n")
+        print(format_report(report))
+        print(f"baseline written: {args.baseline}")
+        return 0
+
+    regressions: List[Dict[str, Any]] = []
+    if os.path.isfile(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as handle:
+            regressions = compare_to_baseline(report, json.load(handle), tolerance=args.tolerance)
+    else:
+        print(f"no baseline at {args.baseline}; run with --write-baseline", file=sys.stderr)
+    print(format_report(report, regressions))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
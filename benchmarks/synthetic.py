@@ -0,0 +1,133 @@
+"""
+Deterministic synthetic inputs for the pipeline benchmark.
+
+- synthetic_pose_frames(): a right-arm delivery (run-up drift, back-foot
+  then front-foot contact, arm over the top, release) stretched to any
+  length, with seeded jitter so workers see realistic noise
+- write_synthetic_clip(): a matching stick-figure video (OpenCV only, no
+  network or codecs beyond mp4v) for window scan, decode and render
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, List, Tuple
+
+import cv2
+import numpy as np
+
+from app.workers.pose.pose_sequence import NUM_LANDMARKS, PoseSequence
+
+# MediaPipe indices used by the generator.
+_NOSE = 0
+_L_SH, _R_SH, _L_EL, _R_EL, _L_WR, _R_WR = 11, 12, 13, 14, 15, 16
+_R_PINKY, _R_INDEX, _R_THUMB = 18, 20, 22
+_L_HIP, _R_HIP, _L_KNEE, _R_KNEE, _L_ANK, _R_ANK = 23, 24, 25, 26, 27, 28
+_L_HEEL, _R_HEEL, _L_TOE, _R_TOE = 29, 30, 31, 32
+
+_BONES: Tuple[Tuple[int, int], ...] = (
+    (_L_SH, _R_SH), (_L_SH, _L_EL), (_L_EL, _L_WR), (_R_SH, _R_EL), (_R_EL, _R_WR),
+    (_L_SH, _L_HIP), (_R_SH, _R_HIP), (_L_HIP, _R_HIP),
+    (_L_HIP, _L_KNEE), (_L_KNEE, _L_ANK), (_R_HIP, _R_KNEE), (_R_KNEE, _R_ANK),
+)
+
+
+def _smoothstep(value: float) -> float:
+    value = min(1.0, max(0.0, value))
+    return value * value * (3.0 - 2.0 * value)
+
+
+def _pose_at(phase: float) -> np.ndarray:
+    """[33, 4] landmarks for delivery phase 0..1 (release at ~0.62)."""
+    out = np.zeros((NUM_LANDMARKS, 4), dtype=np.float64)
+    out[:, 3] = 0.97
+    drift = 0.18 * _smoothstep(phase / 0.6)           # run-up carries the body right
+    cx = 0.38 + drift
+    hip_y = 0.62 + 0.015 * math.sin(phase * 9.0)
+
+    out[_NOSE, :2] = (cx + 0.02, 0.26)
+    out[_L_SH, :2] = (cx - 0.05, 0.36)
+    out[_R_SH, :2] = (cx + 0.05, 0.36)
+    out[_L_HIP, :2] = (cx - 0.04, hip_y)
+    out[_R_HIP, :2] = (cx + 0.04, hip_y)
+
+    # Bowling (right) arm: windmill from hip height, over the top, follow-through.
+    angle = math.pi * (0.5 + 1.6 * _smoothstep((phase - 0.35) / 0.4))
+    shoulder = out[_R_SH, :2]
+    out[_R_EL, :2] = shoulder + 0.11 * np.array([math.cos(angle), math.sin(angle)])
+    out[_R_WR, :2] = shoulder + 0.22 * np.array([math.cos(angle), math.sin(angle)])
+    for idx, offset in ((_R_PINKY, 0.012), (_R_INDEX, 0.018), (_R_THUMB, 0.008)):
+        out[idx, :2] = out[_R_WR, :2] + (offset, offset)
+
+    # Front (non-bowling) arm pulls up then down through release.
+    pull = math.sin(math.pi * min(1.0, max(0.0, (phase - 0.3) / 0.45)))
+    out[_L_EL, :2] = (cx - 0.10, 0.44 - 0.14 * pull)
+    out[_L_WR, :2] = (cx - 0.14, 0.48 - 0.22 * pull)
+
+    # Feet: back foot lands at ~0.45, front foot plants at ~0.52.
+    back_down = _smoothstep((phase - 0.38) / 0.07)
+    front_down = _smoothstep((phase - 0.45) / 0.07)
+    back_x = cx + 0.03
+    front_x = cx - 0.12 * front_down - 0.04
+    out[_R_KNEE, :2] = (back_x, 0.76)
+    out[_R_ANK, :2] = (back_x, 0.86 + 0.07 * back_down)
+    out[_L_KNEE, :2] = (front_x + 0.01, 0.77)
+    out[_L_ANK, :2] = (front_x, 0.84 + 0.09 * front_down)
+    out[_R_HEEL, :2] = out[_R_ANK, :2] + (-0.01, 0.01)
+    out[_L_HEEL, :2] = out[_L_ANK, :2] + (0.01, 0.01)
+    out[_R_TOE, :2] = out[_R_ANK, :2] + (0.03, 0.03)
+    out[_L_TOE, :2] = out[_L_ANK, :2] + (-0.03, 0.03)
+
+    # Remaining face / hand points ride on the head and wrists.
+    for idx in range(1, 11):
+        out[idx, :2] = out[_NOSE, :2] + (0.004 * (idx - 5), -0.01)
+    for idx in (17, 19, 21):
+        out[idx, :2] = out[_L_WR, :2] + (0.01, 0.01)
+    out[:, 2] = -0.05 * (out[:, 0] - cx)
+    return out
+
+
+def synthetic_pose_sequence(total_frames: int, *, seed: int = 7, jitter: float = 0.002) -> PoseSequence:
+    total = max(8, int(total_frames))
+    rng = np.random.default_rng(seed)
+    data = np.stack([_pose_at(i / float(total - 1)) for i in range(total)])
+    data[:, :, :2] += rng.normal(0.0, jitter, size=data[:, :, :2].shape)
+    data[:, :, 3] = np.clip(data[:, :, 3] - np.abs(rng.normal(0.0, 0.03, size=data.shape[:2])), 0.0, 1.0)
+    return PoseSequence(data.astype(np.float32), np.ones(total, dtype=bool))
+
+
+def synthetic_pose_frames(total_frames: int, *, seed: int = 7) -> List[Dict[str, Any]]:
+    """Legacy list-of-dicts form (what the loader's adapter yields)."""
+    return list(synthetic_pose_sequence(total_frames, seed=seed).as_pose_frames())
+
+
+def write_synthetic_clip(
+    path: str,
+    *,
+    total_frames: int,
+    fps: float = 30.0,
+    size: Tuple[int, int] = (640, 360),
+    seed: int = 7,
+) -> str:
+    width, height = size
+    pose = synthetic_pose_sequence(total_frames, seed=seed, jitter=0.0)
+    rng = np.random.default_rng(seed)
+    background = rng.integers(70, 110, size=(height, width, 3), dtype=np.uint8)
+    background = cv2.GaussianBlur(background, (0, 0), 9)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), float(fps), (width, height))
+    if not writer.isOpened():
+        raise RuntimeError(f"could not open video writer for {path}")
+    try:
+        for i in range(len(pose)):
+            frame = background.copy()
+            points = pose.data[i, :, :2] * np.array([width, height], dtype=np.float32)
+            for a, b in _BONES:
+                pa = tuple(int(v) for v in points[a])
+                pb = tuple(int(v) for v in points[b])
+                cv2.line(frame, pa, pb, (235, 235, 235), max(2, width // 120), cv2.LINE_AA)
+            head = tuple(int(v) for v in points[_NOSE])
+            cv2.circle(frame, head, max(4, width // 60), (225, 225, 225), -1, cv2.LINE_AA)
+            writer.write(frame)
+    finally:
+        writer.release()
+    return path
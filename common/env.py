@@ -0,0 +1,32 @@
+import os
+from typing import Optional
+
+from app.common.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _env_number(name: str, default, parse, minimum, maximum):
+    raw = os.getenv(name)
+    if raw is None or not str(raw).strip():
+        return parse(default)
+    try:
+        value = parse(str(raw).strip())
+    except Exception:
+        logger.warning("[env] Invalid %s=%r; using default=%s", name, raw, default)
+        return parse(default)
+    if minimum is not None:
+        value = max(minimum, value)
+    if maximum is not None:
+        value = min(maximum, value)
+    return value
+
+
+def env_int(name: str, default: int, *, minimum: Optional[int] = 0, maximum: Optional[int] = None) -> int:
+    """Integer setting from ``name``; unset or blank gives ``default``, an invalid value logs and gives ``default``."""
+    return _env_number(name, default, int, minimum, maximum)
+
+
+def env_float(name: str, default: float, *, minimum: Optional[float] = 0.0, maximum: Optional[float] = None) -> float:
+    """Float setting from ``name``, read like :func:`env_int`."""
+    return _env_number(name, default, float, minimum, maximum)
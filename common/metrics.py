@@ -0,0 +1,348 @@
+"""
+In-process metrics for ActionLab V14 (no external dependency).
+
+- span(stage): times a block; feeds the stage latency histogram, the
+  in-flight gauge, the error counter and the active run's breakdown
+- run_timings(): collects every span of one analysis run, so the
+  orchestrator can attach a per-run timing breakdown to the result
+- observe_frames(pipeline, frames, seconds): frames-per-second for the
+  pose and render loops
+- REGISTRY.render(): Prometheus text exposition (served at /metrics);
+  register_collector() adds gauges computed at scrape time (job queue,
+  tracker pool, caches)
+
+Each process keeps its own registry. Process-pool workers report their
+breakdown with the job result and the API process replays it through
+record_run_timings().
+"""
+
+from __future__ import annotations
+
+import contextvars
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+FPS_BUCKETS = (1.0, 2.0, 5.0, 10.0, 15.0, 20.0, 30.0, 45.0, 60.0, 90.0, 120.0, 240.0)
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((str(key), str(value)) for key, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in pairs
+    )
+    return "{" + body + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str) -> None:
+        self.name = name
+        self.help = help_text
+        self._lock = threading.Lock()
+
+    def samples(self) -> List[Tuple[str, LabelKey, float, Optional[Tuple[str, str]]]]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str) -> None:
+        super().__init__(name, help_text)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + float(amount)
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(_label_key(labels), 0.0)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, value, None) for key, value in self._values.items()]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str) -> None:
+        super().__init__(name, help_text)
+        self._values: Dict[LabelKey, float] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._values[_label_key(labels)] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + float(amount)
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(_label_key(labels), 0.0)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, value, None) for key, value in self._values.items()]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        super().__init__(name, help_text)
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+        # label key -> (per-bucket counts, sum, count)
+        self._series: Dict[LabelKey, List[Any]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        value = float(value)
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = [[0] * len(self.buckets), 0.0, 0]
+                self._series[key] = series
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels: Any) -> int:
+        with self._lock:
+            series = self._series.get(_label_key(labels))
+            return int(series[2]) if series else 0
+
+    def samples(self):
+        out = []
+        with self._lock:
+            for key, (counts, total, count) in self._series.items():
+                running = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    running += bucket_count
+                    out.append((f"{self.name}_bucket", key, float(running), ("le", _format_value(bound))))
+                out.append((f"{self.name}_bucket", key, float(count), ("le", "+Inf")))
+                out.append((f"{self.name}_sum", key, float(total), None))
+                out.append((f"{self.name}_count", key, float(count), None))
+        return out
+
+
+# (name, kind, help, [(labels, value), ...])
+CollectedFamily = Tuple[str, str, str, List[Tuple[Dict[str, Any], float]]]
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: Dict[str, Callable[[], Iterable[CollectedFamily]]] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, help_text: str, **kwargs: Any):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, help_text, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls):
+                raise ValueError(f"metric {name} already registered as {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self._get_or_create(Counter, name, help_text)
+
+    def gauge(self, name: str, help_text: str) -> Gauge:
+        return self._get_or_create(Gauge, name, help_text)
+
+    def histogram(self, name: str, help_text: str, buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, buckets=buckets)
+
+    def register_collector(self, name: str, collector: Callable[[], Iterable[CollectedFamily]]) -> None:
+        """Scrape-time families; re-registering a name replaces the collector."""
+        with self._lock:
+            self._collectors[name] = collector
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+            collectors = list(self._collectors.items())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for sample_name, key, value, extra in metric.samples():
+                lines.append(f"{sample_name}{_format_labels(key, extra)} {_format_value(value)}")
+        for collector_name, collector in collectors:
+            try:
+                families = list(collector())
+            except Exception as exc:
+                lines.append(f"# collector {collector_name} failed: {type(exc).__name__}")
+                continue
+            for name, kind, help_text, samples in families:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(_label_key(labels))} {_format_value(float(value))}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "actionlab_stage_duration_seconds",
+    "Wall time of one pipeline stage.",
+)
+STAGE_IN_FLIGHT = REGISTRY.gauge(
+    "actionlab_stage_in_flight",
+    "Pipeline stages currently executing.",
+)
+STAGE_ERRORS = REGISTRY.counter(
+    "actionlab_stage_errors_total",
+    "Pipeline stages that raised.",
+)
+FRAMES_TOTAL = REGISTRY.counter(
+    "actionlab_frames_processed_total",
+    "Frames processed by the pose and render loops.",
+)
+FRAMES_PER_SECOND = REGISTRY.histogram(
+    "actionlab_frames_per_second",
+    "Throughput of one pose or render pass.",
+    buckets=FPS_BUCKETS,
+)
+
+
+# ------------------------------------------------------------
+# Per-run timing breakdown
+# ------------------------------------------------------------
+class RunTimings:
+    """Spans and frame rates recorded while one analysis run is active."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, float]] = {}
+        self._fps: Dict[str, Dict[str, float]] = {}
+
+    def add(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            entry = self._stages.setdefault(stage, {"ms": 0.0, "count": 0})
+            entry["ms"] += seconds * 1000.0
+            entry["count"] += 1
+
+    def add_frames(self, pipeline: str, frames: int, seconds: float) -> None:
+        with self._lock:
+            entry = self._fps.setdefault(pipeline, {"frames": 0, "seconds": 0.0})
+            entry["frames"] += int(frames)
+            entry["seconds"] += float(seconds)
+
+    def breakdown(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = {
+                name: {"ms": round(entry["ms"], 1), "count": int(entry["count"])}
+                for name, entry in self._stages.items()
+            }
+            fps = {
+                name: {
+                    "frames": int(entry["frames"]),
+                    "fps": round(entry["frames"] / entry["seconds"], 2) if entry["seconds"] > 0 else None,
+                }
+                for name, entry in self._fps.items()
+            }
+        return {
+            "total_ms": round((time.perf_counter() - self.started) * 1000.0, 1),
+            "stages": stages,
+            "fps": fps,
+        }
+
+
+_current_run: "contextvars.ContextVar[Optional[RunTimings]]" = contextvars.ContextVar(
+    "actionlab_run_timings",
+    default=None,
+)
+
+
+@contextmanager
+def run_timings() -> Iterator[RunTimings]:
+    timings = RunTimings()
+    token = _current_run.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_run.reset(token)
+
+
+def current_run_timings() -> Optional[RunTimings]:
+    return _current_run.get()
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    STAGE_IN_FLIGHT.inc(stage=stage)
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        STAGE_ERRORS.inc(stage=stage)
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_IN_FLIGHT.dec(stage=stage)
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        timings = _current_run.get()
+        if timings is not None:
+            timings.add(stage, elapsed)
+
+
+def observe_frames(pipeline: str, frames: int, seconds: float) -> None:
+    if frames <= 0 or seconds <= 0:
+        return
+    FRAMES_TOTAL.inc(frames, pipeline=pipeline)
+    FRAMES_PER_SECOND.observe(frames / seconds, pipeline=pipeline)
+    timings = _current_run.get()
+    if timings is not None:
+        timings.add_frames(pipeline, frames, seconds)
+
+
+def record_run_timings(breakdown: Optional[Dict[str, Any]]) -> None:
+    """Replay a breakdown produced in another process into this registry."""
+    for stage, entry in ((breakdown or {}).get("stages") or {}).items():
+        count = max(1, int(entry.get("count") or 1))
+        per_call = float(entry.get("ms") or 0.0) / 1000.0 / count
+        for _ in range(count):
+            STAGE_SECONDS.observe(per_call, stage=stage)
+    for pipeline, entry in ((breakdown or {}).get("fps") or {}).items():
+        frames = int(entry.get("frames") or 0)
+        fps = entry.get("fps")
+        if frames > 0 and fps:
+            FRAMES_TOTAL.inc(frames, pipeline=pipeline)
+            FRAMES_PER_SECOND.observe(float(fps), pipeline=pipeline)
@@ -0,0 +1,156 @@
+"""
+Decode/convert prefetch stage for pose extraction.
+
+A background thread pulls frames from the shared FrameProvider, converts
+them BGR -> RGB and hands them over through a bounded queue, so decode and
+colour conversion (both release the GIL) overlap with MediaPipe inference.
+
+- Queue depth: ACTIONLAB_DECODE_QUEUE_DEPTH (default 4; 0 = no thread)
+- stats() reports per-stage milliseconds for the producer and the
+  consumer's wait time
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from app.common.env import env_int
+from app.common.logger import get_logger
+from app.io.frame_provider import FrameProvider
+
+logger = get_logger(__name__)
+
+DEFAULT_DECODE_QUEUE_DEPTH = 4
+_DONE = object()
+
+
+def decode_queue_depth() -> int:
+    return env_int("ACTIONLAB_DECODE_QUEUE_DEPTH", DEFAULT_DECODE_QUEUE_DEPTH)
+
+
+class RgbFramePrefetcher:
+    """
+    Iterate ``(frame_idx, bgr, rgb)`` for ``start <= frame_idx < stop``.
+
+    Use as a context manager so the producer thread is always stopped.
+    """
+
+    def __init__(
+        self,
+        provider: FrameProvider,
+        start: int,
+        stop: int,
+        *,
+        depth: Optional[int] = None,
+    ) -> None:
+        self._provider = provider
+        self._start = max(0, int(start))
+        self._stop = int(stop)
+        self.depth = decode_queue_depth() if depth is None else max(0, int(depth))
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, self.depth))
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {
+            "frames": 0,
+            "decode_ms": 0.0,
+            "convert_ms": 0.0,
+            "producer_blocked_ms": 0.0,
+            "consumer_wait_ms": 0.0,
+        }
+
+    def __enter__(self) -> "RgbFramePrefetcher":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.close()
+        return False
+
+    # -----------------------------
+    # Producer
+    # -----------------------------
+    def _load(self, frame_idx: int) -> Optional[Tuple[int, np.ndarray, np.ndarray]]:
+        started = time.perf_counter()
+        bgr = self._provider.read(frame_idx)
+        decoded = time.perf_counter()
+        if bgr is None:
+            return None
+        rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+        self._stats["decode_ms"] += (decoded - started) * 1000.0
+        self._stats["convert_ms"] += (time.perf_counter() - decoded) * 1000.0
+        return frame_idx, bgr, rgb
+
+    def _put(self, item: Any) -> bool:
+        started = time.perf_counter()
+        while not self._stop_event.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                self._stats["producer_blocked_ms"] += (time.perf_counter() - started) * 1000.0
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self) -> None:
+        try:
+            for frame_idx in range(self._start, self._stop):
+                if self._stop_event.is_set():
+                    return
+                item = self._load(frame_idx)
+                if item is None:
+                    break
+                if not self._put(item):
+                    return
+            self._put(_DONE)
+        except BaseException as exc:  # surfaced to the consumer
+            self._put(exc)
+
+    # -----------------------------
+    # Consumer
+    # -----------------------------
+    def __iter__(self) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+        if self.depth <= 0:
+            for frame_idx in range(self._start, self._stop):
+                item = self._load(frame_idx)
+                if item is None:
+                    return
+                self._stats["frames"] += 1
+                yield item
+            return
+
+        self._thread = threading.Thread(target=self._produce, name="frame-prefetch", daemon=True)
+        self._thread.start()
+        while True:
+            started = time.perf_counter()
+            item = self._queue.get()
+            self._stats["consumer_wait_ms"] += (time.perf_counter() - started) * 1000.0
+            if item is _DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            self._stats["frames"] += 1
+            yield item
+
+    def close(self) -> None:
+        self._stop_event.set()
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        # Unblock a producer waiting on a full queue.
+        while thread.is_alive():
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            thread.join(timeout=0.05)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "depth": self.depth,
+            **{key: round(value, 1) if isinstance(value, float) else value for key, value in self._stats.items()},
+        }
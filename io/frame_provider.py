@@ -0,0 +1,325 @@
+"""
+Shared frame decode session for one analysis run.
+
+Responsibilities:
+- Own the single cv2.VideoCapture for an uploaded clip
+- Serve frames to every stage (window scan, pose, screening, render, visuals)
+- Keep a byte-bounded LRU cache of decoded BGR frames
+- Keep downscaled grayscale copies used by the coarse motion scan
+- Prefer decoding forward over random seeks (flaky on mobile MP4s)
+
+Cached frames are returned read-only. Callers that draw on a frame must
+take their own copy first.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+import cv2
+import numpy as np
+
+from app.common.env import env_int
+from app.common.logger import get_logger
+
+logger = get_logger(__name__)
+
+FRAME_CACHE_MB_ENV = "ACTIONLAB_FRAME_CACHE_MB"
+DEFAULT_FRAME_CACHE_MB = 512
+SMALL_FRAME_SIZE: Tuple[int, int] = (96, 54)
+MAX_SMALL_FRAMES = 4096
+# Decoding forward is cheaper and more reliable than seeking for short gaps.
+MAX_FORWARD_DECODE_FRAMES = 48
+
+
+def frame_cache_bytes() -> int:
+    return env_int(FRAME_CACHE_MB_ENV, DEFAULT_FRAME_CACHE_MB) * 1024 * 1024
+
+
+def _small_gray(frame: np.ndarray) -> np.ndarray:
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    return cv2.resize(gray, SMALL_FRAME_SIZE)
+
+
+class FrameProvider:
+    """
+    Decode-once frame source for a single video.
+
+    The provider is safe to share between threads; decode calls are
+    serialized on an internal lock.
+    """
+
+    def __init__(
+        self,
+        video_path: str,
+        *,
+        capture: Any = None,
+        cache_bytes: Optional[int] = None,
+    ) -> None:
+        self.video_path = str(video_path or "")
+        self._cap = capture
+        self._owns_capture = capture is None
+        self._next_idx = 0
+        self._cache_limit = frame_cache_bytes() if cache_bytes is None else max(0, int(cache_bytes))
+        self._cache_bytes = 0
+        self._frames: "OrderedDict[int, np.ndarray]" = OrderedDict()
+        self._pinned: Dict[int, np.ndarray] = {}
+        self._retained: Set[int] = set()
+        self._small: "OrderedDict[int, np.ndarray]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._closed = False
+        self._metadata: Optional[Dict[str, Any]] = None
+        self._stats = {"decoded": 0, "hits": 0, "misses": 0, "seeks": 0}
+
+    # -----------------------------
+    # Lifecycle
+    # -----------------------------
+    def __enter__(self) -> "FrameProvider":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.close()
+        return False
+
+    def _capture(self) -> Any:
+        if self._closed:
+            return None
+        if self._cap is None:
+            if not self.video_path:
+                return None
+            self._cap = cv2.VideoCapture(self.video_path)
+            self._owns_capture = True
+            self._next_idx = 0
+        if not self._cap.isOpened():
+            return None
+        return self._cap
+
+    def is_opened(self) -> bool:
+        with self._lock:
+            return self._capture() is not None
+
+    def metadata(self) -> Dict[str, Any]:
+        with self._lock:
+            if self._metadata is None:
+                cap = self._capture()
+                if cap is None:
+                    return {"path": self.video_path, "fps": 0.0, "total_frames": 0, "width": 0, "height": 0}
+                self._metadata = {
+                    "path": self.video_path,
+                    "fps": float(cap.get(cv2.CAP_PROP_FPS) or 0.0),
+                    "total_frames": int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0),
+                    "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH) or 0),
+                    "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT) or 0),
+                }
+            return dict(self._metadata)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                **self._stats,
+                "cached_frames": len(self._frames) + len(self._pinned),
+                "cached_bytes": self._cache_bytes,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._cap is not None:
+                try:
+                    self._cap.release()
+                except Exception:
+                    pass
+            self._cap = None
+            self._frames.clear()
+            self._pinned.clear()
+            self._small.clear()
+            self._cache_bytes = 0
+        logger.info(
+            "[frame_provider] closed path=%s decoded=%s hits=%s misses=%s seeks=%s",
+            self.video_path,
+            self._stats["decoded"],
+            self._stats["hits"],
+            self._stats["misses"],
+            self._stats["seeks"],
+        )
+
+    # -----------------------------
+    # Cache
+    # -----------------------------
+    def retain(self, frame_indices: Iterable[int]) -> None:
+        """Keep these frames outside LRU eviction once they are decoded."""
+        with self._lock:
+            for idx in frame_indices:
+                try:
+                    self._retained.add(int(idx))
+                except Exception:
+                    continue
+
+    def _cached(self, frame_idx: int) -> Optional[np.ndarray]:
+        pinned = self._pinned.get(frame_idx)
+        if pinned is not None:
+            return pinned
+        cached = self._frames.get(frame_idx)
+        if cached is not None:
+            self._frames.move_to_end(frame_idx)
+        return cached
+
+    def _store(self, frame_idx: int, frame: np.ndarray) -> np.ndarray:
+        frame.setflags(write=False)
+        self._stats["decoded"] += 1
+        if frame_idx not in self._small:
+            self._small[frame_idx] = _small_gray(frame)
+            while len(self._small) > MAX_SMALL_FRAMES:
+                self._small.popitem(last=False)
+        if frame_idx in self._retained:
+            self._pinned[frame_idx] = frame
+            return frame
+        if self._cache_limit <= 0 or frame.nbytes > self._cache_limit:
+            return frame
+        previous = self._frames.pop(frame_idx, None)
+        if previous is not None:
+            self._cache_bytes -= previous.nbytes
+        self._frames[frame_idx] = frame
+        self._cache_bytes += frame.nbytes
+        while self._cache_bytes > self._cache_limit and self._frames:
+            _, evicted = self._frames.popitem(last=False)
+            self._cache_bytes -= evicted.nbytes
+        return frame
+
+    # -----------------------------
+    # Decode
+    # -----------------------------
+    def _advance(self, cap: Any, keep: bool) -> Optional[np.ndarray]:
+        idx = self._next_idx
+        if keep or not hasattr(cap, "grab"):
+            ok, frame = cap.read()
+        else:
+            ok, frame = cap.grab(), None
+        if not ok:
+            return None
+        self._next_idx += 1
+        if frame is None:
+            return None
+        return self._store(idx, frame)
+
+    def _seek(self, cap: Any, frame_idx: int) -> bool:
+        self._stats["seeks"] += 1
+        try:
+            ok = cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+        except Exception:
+            ok = False
+        if ok is False:
+            return False
+        self._next_idx = int(frame_idx)
+        return True
+
+    def _restart(self) -> Any:
+        # Some mobile MP4s decode the wrong frame after a seek; start over.
+        if self._cap is not None and self._owns_capture:
+            try:
+                self._cap.release()
+            except Exception:
+                pass
+            self._cap = None
+        elif self._cap is not None:
+            if not self._seek(self._cap, 0):
+                return None
+            return self._cap
+        return self._capture()
+
+    def _decode(self, frame_idx: int) -> Optional[np.ndarray]:
+        cap = self._capture()
+        if cap is None:
+            return None
+        gap = frame_idx - self._next_idx
+        if gap < 0 or gap > MAX_FORWARD_DECODE_FRAMES:
+            if self._seek(cap, frame_idx):
+                frame = self._advance(cap, keep=True)
+                if frame is not None:
+                    return frame
+            cap = self._restart()
+            if cap is None:
+                return None
+        while self._next_idx < frame_idx:
+            keep = self._next_idx in self._retained
+            before = self._next_idx
+            self._advance(cap, keep=keep)
+            if self._next_idx == before:
+                return None
+        return self._advance(cap, keep=True)
+
+    def read(self, frame_idx: int) -> Optional[np.ndarray]:
+        """Return the BGR frame at ``frame_idx`` (read-only) or None."""
+        try:
+            idx = int(frame_idx)
+        except Exception:
+            return None
+        if idx < 0:
+            return None
+        with self._lock:
+            cached = self._cached(idx)
+            if cached is not None:
+                self._stats["hits"] += 1
+                return cached
+            self._stats["misses"] += 1
+            return self._decode(idx)
+
+    def iter_range(self, start: int, stop: int) -> Iterator[Tuple[int, np.ndarray]]:
+        """Yield ``(frame_idx, frame)`` for ``start <= frame_idx < stop`` until decode ends."""
+        for idx in range(max(0, int(start)), int(stop)):
+            frame = self.read(idx)
+            if frame is None:
+                return
+            yield idx, frame
+
+    def small_gray(self, frame_idx: int) -> Optional[np.ndarray]:
+        with self._lock:
+            small = self._small.get(int(frame_idx))
+        if small is not None:
+            return small
+        frame = self.read(frame_idx)
+        if frame is None:
+            return None
+        with self._lock:
+            return self._small.get(int(frame_idx))
+
+    def scan_small_gray(self, step: int) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Sequential full-clip scan yielding downscaled grayscale copies of
+        every ``step``-th frame. Skipped frames are grabbed, not converted.
+        """
+        step = max(1, int(step))
+        frame_idx = 0
+        while True:
+            with self._lock:
+                small = self._small.get(frame_idx)
+                if small is None:
+                    cap = self._capture()
+                    if cap is None:
+                        return
+                    if self._next_idx != frame_idx and not self._seek(cap, frame_idx):
+                        return
+                    wanted = frame_idx % step == 0 or frame_idx in self._retained
+                    before = self._next_idx
+                    self._advance(cap, keep=wanted)
+                    if self._next_idx == before:
+                        return
+                    small = self._small.get(frame_idx) if wanted else None
+            if frame_idx % step == 0 and small is not None:
+                yield frame_idx, small
+            frame_idx += 1
+
+
+def frame_provider_for(video: Optional[Dict[str, Any]]) -> Optional[FrameProvider]:
+    provider = (video or {}).get("frame_provider")
+    return provider if isinstance(provider, FrameProvider) else None
+
+
+def close_frame_provider(video: Optional[Dict[str, Any]]) -> None:
+    provider = frame_provider_for(video)
+    if provider is not None:
+        provider.close()
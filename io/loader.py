@@ -2,31 +2,40 @@
 Video + Pose loader for ActionLab V14.
 
 Responsibilities:
-- Save uploaded video to temp path (stream-safe)
-- Decode video frames with OpenCV
-- Run MediaPipe Pose (single pass, no frame drop)
+- Save uploaded video to temp path (stream-safe, content-hashed during the
+  copy); analysis jobs stage it in the request and load it later with
+  load_video_path
+- Open one shared FrameProvider decode session for the whole run
+- Decode video frames with OpenCV on a prefetch thread (bounded queue)
+- Run MediaPipe Pose (single pass, no frame drop) on a warm pooled tracker,
+  cropped to the bowler ROI and remapped to full-frame coordinates
 - Return:
-    - video metadata
-    - pose_frames (per-frame landmarks)
+    - video metadata (video["frame_provider"] is shared with later stages)
+    - pose_frames (per-frame landmarks; list-of-dicts view over a PoseSequence)
     - empty events dict (to be filled later)
 """
 
 import cv2
+import hashlib
 import os
 import tempfile
 import shutil
 import time
-from typing import List, Dict, Any, Tuple
+from typing import Dict, Any, Tuple
 
-import mediapipe as mp
 from app.common.logger import get_logger
+from app.common.metrics import observe_frames, span
+from app.io.frame_pipeline import RgbFramePrefetcher
+from app.io.frame_provider import FrameProvider
+from app.workers.pose.pose_roi import PoseRoi
+from app.workers.pose.pose_sequence import PoseSequence
+from app.workers.pose.tracker_pool import pose_tracker_pool
+from app.workers.screening.video_screen import primary_subject_sample_indices
 from app.workers.windowing.delivery_window import detect_delivery_window
 
 
 logger = get_logger(__name__)
 
-_mp_pose = mp.solutions.pose
-
 MIN_WINDOW_CONFIDENCE = 0.30
 MIN_WINDOW_SECONDS = 1.6
 LATE_FALLBACK_MIN_SECONDS = 2.6
@@ -34,6 +43,7 @@ LATE_FALLBACK_CLIP_RATIO = 0.38
 TEMP_UPLOAD_ROOT_PREFIX = "actionlab_upload_"
 TEMP_UPLOAD_PREFIX = f"{TEMP_UPLOAD_ROOT_PREFIX}{os.getpid()}_"
 STALE_TEMP_UPLOAD_MAX_AGE_SECONDS = 24 * 60 * 60
+UPLOAD_CHUNK_BYTES = 1024 * 1024
 
 
 def _conservative_late_window(video: Dict[str, Any], delivery_window: Dict[str, Any]) -> Dict[str, Any]:
@@ -79,24 +89,27 @@ def _conservative_late_window(video: Dict[str, Any], delivery_window: Dict[str,
 
 
 def _create_pose_tracker():
-    return _mp_pose.Pose(
-        static_image_mode=False,
-        model_complexity=2,
-        smooth_landmarks=False,     # IMPORTANT: no smoothing at loader level
-        enable_segmentation=False,
-        min_detection_confidence=0.5,
-        min_tracking_confidence=0.5,
-    )
+    """Lease a warm tracker (LOADER_TRACKER_OPTIONS) for one clip; use as a context manager."""
+    return pose_tracker_pool().lease()
 
 
-def _save_upload_to_temp_path(upload_file) -> str:
+def _save_upload_to_temp_path(upload_file, hasher=None) -> str:
+    """Stream the upload to disk; feeds every chunk to ``hasher`` when given."""
     tmp = tempfile.NamedTemporaryFile(
         delete=False,
         prefix=TEMP_UPLOAD_PREFIX,
         suffix=".mp4",
     )
     with tmp as f:
-        shutil.copyfileobj(upload_file.file, f)
+        if hasher is None:
+            shutil.copyfileobj(upload_file.file, f, UPLOAD_CHUNK_BYTES)
+        else:
+            while True:
+                chunk = upload_file.file.read(UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                hasher.update(chunk)
+                f.write(chunk)
     return tmp.name
 
 
@@ -130,6 +143,57 @@ def cleanup_stale_temp_uploads(*, max_age_seconds: int = STALE_TEMP_UPLOAD_MAX_A
     return {"scanned": scanned, "removed": removed}
 
 
+def _upload_owner_alive(name: str) -> bool:
+    """Whether the API process whose pid is in a temp upload's name is still running."""
+    pid_text = name[len(TEMP_UPLOAD_ROOT_PREFIX):].partition("_")[0]
+    try:
+        pid = int(pid_text)
+    except ValueError:
+        return True  # not ours to judge; the stale sweep handles it
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except Exception:
+        return True
+    return True
+
+
+def cleanup_orphaned_temp_uploads() -> Dict[str, int]:
+    """
+    Remove temp uploads whose owning API process has exited. A queued render
+    keeps its upload until it runs, and in-memory job queues die with the
+    process, so these would otherwise wait for the stale-age sweep.
+    """
+    scanned = 0
+    removed = 0
+    temp_dir = tempfile.gettempdir()
+    try:
+        names = os.listdir(temp_dir)
+    except Exception as exc:
+        logger.warning("[loader] orphaned_temp_cleanup_failed dir=%s error=%s", temp_dir, exc)
+        return {"scanned": 0, "removed": 0}
+
+    for name in names:
+        if not name.startswith(TEMP_UPLOAD_ROOT_PREFIX):
+            continue
+        scanned += 1
+        if _upload_owner_alive(name):
+            continue
+        path = os.path.join(temp_dir, name)
+        try:
+            os.remove(path)
+            removed += 1
+        except FileNotFoundError:
+            continue
+        except Exception as exc:
+            logger.warning("[loader] orphaned_temp_cleanup_failed path=%s error=%s", path, exc)
+
+    return {"scanned": scanned, "removed": removed}
+
+
 def _read_video_metadata(video_path: str) -> Tuple[cv2.VideoCapture, Dict[str, Any]]:
     cap = cv2.VideoCapture(video_path)
     if not cap.isOpened():
@@ -145,10 +209,6 @@ def _read_video_metadata(video_path: str) -> Tuple[cv2.VideoCapture, Dict[str, A
     return cap, video
 
 
-def _placeholder_pose_frames(total_frames: int) -> List[Dict[str, Any]]:
-    return [{"frame": idx, "landmarks": None} for idx in range(max(0, int(total_frames or 0)))]
-
-
 def _resolve_pose_window(video: Dict[str, Any], delivery_window: Dict[str, Any]) -> Dict[str, Any]:
     total_frames = int(video.get("total_frames") or 0)
     fps = float(video.get("fps") or 0.0)
@@ -187,13 +247,24 @@ def _resolve_pose_window(video: Dict[str, Any], delivery_window: Dict[str, Any])
     }
 
 
+def save_upload(upload_file) -> Tuple[str, str]:
+    """
+    Stage an uploaded file on local disk so it can outlive the request.
+
+    Returns (path, sha256 hex of the bytes), hashed during the copy.
+    """
+    hasher = hashlib.sha256()
+    path = _save_upload_to_temp_path(upload_file, hasher)
+    return path, hasher.hexdigest()
+
+
 def load_video(upload_file):
     """
     Load video, extract pose frames.
 
     Returns:
-        video: dict
-        pose_frames: list[dict]
+        video: dict (caller closes video["frame_provider"] when the run ends)
+        pose_frames: PoseFramesView (list-of-dicts compatible; .sequence is the tensor)
         events: dict (empty for now)
     """
 
@@ -202,73 +273,107 @@ def load_video(upload_file):
     # Save uploaded file (STREAM SAFE)
     # -----------------------------
     video_path = _save_upload_to_temp_path(upload_file)
+    return load_video_path(video_path)
+
 
+def load_video_path(video_path: str):
+    """Same as load_video for a clip already staged on disk (see save_upload)."""
 
     # -----------------------------
     # Open video
     # -----------------------------
     cap, video = _read_video_metadata(video_path)
-    fps = float(video.get("fps") or 0.0)
-    total_frames = int(video.get("total_frames") or 0)
-    delivery_window = detect_delivery_window(video)
-    pose_window = _resolve_pose_window(video, delivery_window)
-    video["coarse_delivery_window"] = delivery_window
-    video["pose_window"] = pose_window
-    pose_frames = _placeholder_pose_frames(total_frames)
-    pose_start = int(pose_window.get("start") or 0)
-    pose_end = int(pose_window.get("end") or max(0, total_frames - 1))
-
-    logger.info(
-        "[loader] pose_window source=%s start=%s end=%s total_frames=%s confidence=%s reason=%s",
-        pose_window.get("source"),
-        pose_start,
-        pose_end,
-        total_frames,
-        pose_window.get("confidence", "-"),
-        pose_window.get("reason", "-"),
-    )
+    provider = FrameProvider(video_path, capture=cap)
+    video["frame_provider"] = provider
+    try:
+        fps = float(video.get("fps") or 0.0)
+        total_frames = int(video.get("total_frames") or 0)
+        # Screening samples are spread across the clip; keep them from the scan.
+        provider.retain(primary_subject_sample_indices(total_frames))
+        with span("delivery_window"):
+            delivery_window = detect_delivery_window(video)
+        pose_window = _resolve_pose_window(video, delivery_window)
+        video["coarse_delivery_window"] = delivery_window
+        video["pose_window"] = pose_window
+        pose_sequence = PoseSequence.empty(total_frames)
+        pose_start = int(pose_window.get("start") or 0)
+        pose_end = int(pose_window.get("end") or max(0, total_frames - 1))
+
+        logger.info(
+            "[loader] pose_window source=%s start=%s end=%s total_frames=%s confidence=%s reason=%s",
+            pose_window.get("source"),
+            pose_start,
+            pose_end,
+            total_frames,
+            pose_window.get("confidence", "-"),
+            pose_window.get("reason", "-"),
+        )
 
-    # -----------------------------
-    # Frame-by-frame pose extraction
-    # -----------------------------
-    with _create_pose_tracker() as pose_tracker:
-        if pose_start > 0:
-            cap.set(cv2.CAP_PROP_POS_FRAMES, pose_start)
-
-        frame_idx = pose_start
-        while frame_idx <= pose_end:
-            ret, frame = cap.read()
-            if not ret:
-                break
-
-            # OpenCV BGR → RGB
-            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = pose_tracker.process(rgb)
-
-            if results.pose_landmarks:
-                landmarks = [
-                    {
-                        "x": lm.x,
-                        "y": lm.y,
-                        "z": lm.z,
-                        "visibility": lm.visibility,
-                    }
-                    for lm in results.pose_landmarks.landmark
-                ]
-            else:
-                landmarks = None  # Explicitly mark missing pose
-
-            pose_frames[frame_idx] = {
-                "frame": frame_idx,
-                "landmarks": landmarks,
-            }
-
-            if frame_idx % 100 == 0:
-                logger.info(f"Processed pose frame {frame_idx}/{total_frames}")
-
-            frame_idx += 1
-
-    cap.release()
+        # -----------------------------
+        # Frame-by-frame pose extraction
+        # -----------------------------
+        roi = PoseRoi.for_video(delivery_window)
+        stage_ms = {"roi_ms": 0.0, "inference_ms": 0.0, "store_ms": 0.0}
+        pose_started = time.perf_counter()
+        with span("pose"), _create_pose_tracker() as pose_tracker, RgbFramePrefetcher(
+            provider,
+            pose_start,
+            pose_end + 1,
+        ) as frames:
+            # Decode + BGR → RGB run ahead on the prefetch thread.
+            for frame_idx, frame, rgb in frames:
+                t0 = time.perf_counter()
+                image, crop = roi.prepare(rgb, frame_idx)
+                t1 = time.perf_counter()
+                results = pose_tracker.process(image)
+                t2 = time.perf_counter()
+
+                pose_sequence.set_frame_array(
+                    frame_idx,
+                    roi.observe(
+                        results.pose_landmarks.landmark if results.pose_landmarks else None,
+                        crop,
+                        frame.shape[1],
+                        frame.shape[0],
+                    ),
+                )
+                stage_ms["roi_ms"] += (t1 - t0) * 1000.0
+                stage_ms["inference_ms"] += (t2 - t1) * 1000.0
+                stage_ms["store_ms"] += (time.perf_counter() - t2) * 1000.0
+
+                if frame_idx % 100 == 0:
+                    logger.info(f"Processed pose frame {frame_idx}/{total_frames}")
+        pose_seconds = time.perf_counter() - pose_started
+        pose_timing = {
+            **frames.stats(),
+            **{key: round(value, 1) for key, value in stage_ms.items()},
+            "wall_ms": round(pose_seconds * 1000.0, 1),
+        }
+        observe_frames("pose", pose_timing["frames"], pose_seconds)
+        video["pose_timing"] = pose_timing
+        logger.info(
+            "[loader] pose_timing frames=%s depth=%s decode_ms=%s convert_ms=%s consumer_wait_ms=%s "
+            "producer_blocked_ms=%s roi_ms=%s inference_ms=%s store_ms=%s",
+            pose_timing["frames"],
+            pose_timing["depth"],
+            pose_timing["decode_ms"],
+            pose_timing["convert_ms"],
+            pose_timing["consumer_wait_ms"],
+            pose_timing["producer_blocked_ms"],
+            pose_timing["roi_ms"],
+            pose_timing["inference_ms"],
+            pose_timing["store_ms"],
+        )
+        logger.info(
+            "[loader] pose_roi frames=%s cropped=%s downscaled=%s full_frame=%s",
+            roi.stats["frames"],
+            roi.stats["cropped"],
+            roi.stats["downscaled"],
+            roi.stats["full_frame"],
+        )
+    except Exception:
+        provider.close()
+        raise
 
 
     # -----------------------------
@@ -276,4 +381,4 @@ def load_video(upload_file):
     # -----------------------------
     events = {}  # UAH / Release to be computed later
 
-    return video, pose_frames, events
+    return video, pose_sequence.as_pose_frames(), events
@@ -0,0 +1,263 @@
+"""
+Content-addressed analysis cache for ActionLab V14.
+
+Mobile retries and coach re-submissions upload byte-identical clips. The
+upload is hashed while it is staged (see app.io.loader.save_upload); the
+player-independent stage outputs of the first run are kept on disk under
+
+    sha256(clip) + ANALYSIS_PIPELINE_VERSION + pose config + hand
+
+so a duplicate skips decode, MediaPipe, screening and the pose workers.
+Player-specific layers (history-aware expert, render, persistence) always
+run again.
+
+- Entry: {key}/pose.npz (pose_store encoding) + {key}/stages.json
+- Directory: ACTIONLAB_ANALYSIS_CACHE_DIR (default storage/analysis_cache)
+- Size bound: ACTIONLAB_ANALYSIS_CACHE_MAX_MB (default 1024, 0 disables);
+  least recently used entries are evicted after each store
+- Bump ANALYSIS_PIPELINE_VERSION whenever a pose worker's output changes
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from app.common.env import env_int
+from app.common.logger import get_logger
+from app.common.metrics import REGISTRY
+from app.workers.pose.pose_roi import pose_max_side, pose_roi_enabled
+from app.workers.pose.pose_sequence import PoseSequence
+from app.workers.pose.pose_store import POSE_ARTIFACT_VERSION, read_pose_npz, write_pose_npz
+
+logger = get_logger(__name__)
+
+ANALYSIS_PIPELINE_VERSION = "v14.2"
+
+# Player-independent outputs of the pose workers (see orchestrator._run_pose_workers).
+CACHED_STAGE_KEYS = (
+    "events",
+    "action",
+    "risks",
+    "basics",
+    "interpretation",
+    "elbow",
+    "estimated_release_speed",
+)
+_VIDEO_KEYS = ("fps", "total_frames", "width", "height", "pose_window")
+
+DEFAULT_ANALYSIS_CACHE_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "storage", "analysis_cache")
+)
+FALLBACK_ANALYSIS_CACHE_DIR = "/tmp/actionlab_analysis_cache"
+
+_POSE_FILE = "pose.npz"
+_STAGES_FILE = "stages.json"
+
+
+class CachedAnalysis(NamedTuple):
+    video: Dict[str, Any]
+    pose: PoseSequence
+    stages: Dict[str, Any]
+
+
+def analysis_cache_dir() -> str:
+    configured = os.getenv("ACTIONLAB_ANALYSIS_CACHE_DIR", DEFAULT_ANALYSIS_CACHE_DIR)
+    try:
+        os.makedirs(configured, exist_ok=True)
+        return configured
+    except OSError:
+        os.makedirs(FALLBACK_ANALYSIS_CACHE_DIR, exist_ok=True)
+        return FALLBACK_ANALYSIS_CACHE_DIR
+
+
+def analysis_cache_max_bytes() -> int:
+    return env_int("ACTIONLAB_ANALYSIS_CACHE_MAX_MB", 1024) * 1024 * 1024
+
+
+def analysis_cache_enabled() -> bool:
+    return analysis_cache_max_bytes() > 0
+
+
+def _pose_config_tag() -> str:
+    # Loader settings that change the pose tensor for the same bytes.
+    return f"p{POSE_ARTIFACT_VERSION}r{int(pose_roi_enabled())}m{pose_max_side()}"
+
+
+def analysis_cache_key(content_hash: Optional[str], hand: Optional[str]) -> Optional[str]:
+    digest = str(content_hash or "").strip().lower()
+    if not analysis_cache_enabled() or len(digest) != 64 or not all(c in "0123456789abcdef" for c in digest):
+        return None
+    hand_tag = str(hand or "").strip().upper() or "NA"
+    return f"{digest}-{ANALYSIS_PIPELINE_VERSION}-{_pose_config_tag()}-{hand_tag}"
+
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+
+def _count(name: str, amount: int = 1) -> None:
+    with _stats_lock:
+        _stats[name] += amount
+
+
+def analysis_cache_stats() -> Dict[str, int]:
+    with _stats_lock:
+        return dict(_stats)
+
+
+REGISTRY.register_collector(
+    "analysis_cache",
+    lambda: [
+        (
+            "actionlab_analysis_cache_events_total",
+            "counter",
+            "Analysis cache lookups and maintenance by event.",
+            [({"event": name}, value) for name, value in analysis_cache_stats().items()],
+        )
+    ],
+)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    return str(value)
+
+
+# ------------------------------------------------------------
+# Read / write
+# ------------------------------------------------------------
+def load_cached_analysis(key: Optional[str]) -> Optional[CachedAnalysis]:
+    if not key:
+        return None
+    entry_dir = os.path.join(analysis_cache_dir(), os.path.basename(key))
+    try:
+        with open(os.path.join(entry_dir, _STAGES_FILE), "r", encoding="utf-8") as handle:
+            payload = json.load(handle)
+        with open(os.path.join(entry_dir, _POSE_FILE), "rb") as handle:
+            raw_pose = handle.read()
+    except FileNotFoundError:
+        _count("misses")
+        return None
+    except Exception as exc:
+        logger.warning("[analysis_cache] unreadable key=%s error=%s", key, exc)
+        _count("misses")
+        return None
+
+    loaded = read_pose_npz(raw_pose, label=key)
+    stages = payload.get("stages") or {}
+    if loaded is None or any(name not in stages for name in CACHED_STAGE_KEYS):
+        _count("misses")
+        return None
+    try:
+        os.utime(entry_dir, None)  # LRU recency
+    except OSError:
+        pass
+    _count("hits")
+    pose, _ = loaded
+    return CachedAnalysis(video=dict(payload.get("video") or {}), pose=pose, stages=stages)
+
+
+def store_cached_analysis(
+    key: Optional[str],
+    *,
+    video: Dict[str, Any],
+    pose_frames: Any,
+    stages: Dict[str, Any],
+) -> bool:
+    """Best-effort write of one entry; never raises."""
+    if not key:
+        return False
+    root = analysis_cache_dir()
+    entry_dir = os.path.join(root, os.path.basename(key))
+    staging_dir = os.path.join(root, f".staging-{os.getpid()}-{uuid.uuid4().hex}")
+    try:
+        os.makedirs(staging_dir)
+        write_pose_npz(os.path.join(staging_dir, _POSE_FILE), pose_frames, video)
+        payload = {
+            "key": key,
+            "created_at": time.time(),
+            "video": {name: (video or {}).get(name) for name in _VIDEO_KEYS},
+            "stages": {name: stages.get(name) for name in CACHED_STAGE_KEYS},
+        }
+        with open(os.path.join(staging_dir, _STAGES_FILE), "w", encoding="utf-8") as handle:
+            json.dump(payload, handle, default=_json_default)
+        try:
+            os.rename(staging_dir, entry_dir)
+        except OSError:
+            # A concurrent duplicate got there first; its entry is equivalent.
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            return False
+    except Exception as exc:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        logger.warning("[analysis_cache] store_failed key=%s error=%s", key, exc)
+        return False
+
+    _count("stores")
+    evict_analysis_cache()
+    return True
+
+
+# ------------------------------------------------------------
+# Eviction
+# ------------------------------------------------------------
+def _entry_size(path: str) -> int:
+    total = 0
+    for name in os.listdir(path):
+        try:
+            total += os.path.getsize(os.path.join(path, name))
+        except OSError:
+            continue
+    return total
+
+
+def _entries(root: str) -> List[Tuple[float, int, str]]:
+    entries: List[Tuple[float, int, str]] = []
+    for name in os.listdir(root):
+        if name.startswith("."):
+            continue
+        path = os.path.join(root, name)
+        try:
+            if os.path.isdir(path):
+                entries.append((os.stat(path).st_mtime, _entry_size(path), path))
+        except OSError:
+            continue
+    return entries
+
+
+_evict_lock = threading.Lock()
+
+
+def evict_analysis_cache(max_bytes: Optional[int] = None) -> Dict[str, int]:
+    """Drop least recently used entries until the cache fits ``max_bytes``."""
+    limit = analysis_cache_max_bytes() if max_bytes is None else max(0, int(max_bytes))
+    with _evict_lock:
+        try:
+            entries = sorted(_entries(analysis_cache_dir()))
+        except OSError as exc:
+            logger.warning("[analysis_cache] evict_failed error=%s", exc)
+            return {"entries": 0, "bytes": 0, "evicted": 0}
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, path in entries:
+            if total <= limit:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            evicted += 1
+    if evicted:
+        _count("evictions", evicted)
+        logger.info("[analysis_cache] evicted entries=%s remaining_bytes=%s", evicted, total)
+    return {"entries": len(entries) - evicted, "bytes": total, "evicted": evicted}
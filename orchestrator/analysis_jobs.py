@@ -0,0 +1,585 @@
+"""
+Analysis job queue for ActionLab V14.
+
+POST /analyze stages the upload and submits a job; a bounded worker pool
+runs the pipeline and GET /analysis-jobs/{run_id} reports stage progress.
+
+Backends (ACTIONLAB_ANALYSIS_QUEUE_BACKEND):
+- inprocess (default): thread pool inside the API process (local runs, tests)
+- process: pool of worker processes; job records live in a multiprocessing
+  manager so the API process can report progress
+
+Other backends (Cloud Tasks, Redis, ...) plug in via register_job_backend().
+
+Queues are named and sized independently on the same backend:
+- analysis: ACTIONLAB_ANALYSIS_WORKERS / ACTIONLAB_ANALYSIS_QUEUE_LIMIT
+- render: ACTIONLAB_RENDER_WORKERS / ACTIONLAB_RENDER_QUEUE_LIMIT, so
+  walkthrough encodes never hold an analysis slot
+
+Runners are plain functions ``runner(payload, progress) -> result``. They
+report stages with ``progress.stage(name)``, signal expected failures
+(bad video, screening rejection) by raising AnalysisJobError, and may
+chain work onto another queue with ``progress.follow_up(queue, runner,
+payload, on_failure=...)``; follow-ups are submitted from the API process
+once the job has succeeded. ``on_failure(payload, error)`` runs in the API
+process when a follow-up cannot be submitted or its job fails (including
+a lost worker), so the caller can settle any state that waits on it.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from app.common.env import env_int
+from app.common.logger import get_logger
+from app.common.metrics import REGISTRY, record_run_timings
+
+logger = get_logger(__name__)
+
+QUEUE_BACKEND_ENV = "ACTIONLAB_ANALYSIS_QUEUE_BACKEND"
+DEFAULT_QUEUE_BACKEND = "inprocess"
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_SUCCEEDED = "succeeded"
+STATUS_FAILED = "failed"
+ACTIVE_STATUSES = {STATUS_QUEUED, STATUS_RUNNING}
+
+ANALYSIS_QUEUE = "analysis"
+RENDER_QUEUE = "render"
+
+ANALYSIS_STAGES = (
+    "queued",
+    "load_video",  # re-analysis jobs report "load_pose" instead
+    "screening",
+    "events",
+    "action",
+    "risks",
+    "basics",
+    "elbow",
+    "speed",
+    "clinician",
+    "render",  # inline renders only; queued renders run on the render queue
+    "persist",
+    "complete",
+)
+RENDER_STAGES = ("queued", "load_pose", "render", "persist", "complete")
+_STAGE_PLANS = {ANALYSIS_QUEUE: ANALYSIS_STAGES, RENDER_QUEUE: RENDER_STAGES}
+
+
+def analysis_worker_count() -> int:
+    return env_int("ACTIONLAB_ANALYSIS_WORKERS", 2, minimum=1)
+
+
+def analysis_queue_limit() -> int:
+    return env_int("ACTIONLAB_ANALYSIS_QUEUE_LIMIT", 16, minimum=1)
+
+
+def render_worker_count() -> int:
+    return env_int("ACTIONLAB_RENDER_WORKERS", 1, minimum=1)
+
+
+def render_queue_limit() -> int:
+    return env_int("ACTIONLAB_RENDER_QUEUE_LIMIT", 32, minimum=1)
+
+
+def _queue_sizing(queue_name: str) -> Dict[str, int]:
+    if queue_name == RENDER_QUEUE:
+        return {"max_workers": render_worker_count(), "queue_limit": render_queue_limit()}
+    return {"max_workers": analysis_worker_count(), "queue_limit": analysis_queue_limit()}
+
+
+def analysis_job_ttl_seconds() -> int:
+    return env_int("ACTIONLAB_ANALYSIS_JOB_TTL_SECONDS", 3600, minimum=60)
+
+
+class AnalysisJobError(Exception):
+    """Expected pipeline failure surfaced to the client as a job error."""
+
+    def __init__(self, code: str, message: str, *, status_code: int = 400) -> None:
+        super().__init__(message)
+        self.code = str(code or "analysis_failed")
+        self.message = str(message or "")
+        self.status_code = int(status_code)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"code": self.code, "message": self.message, "status_code": self.status_code}
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+# ------------------------------------------------------------
+# Job records
+# ------------------------------------------------------------
+class _JobStore:
+    """Job records keyed by run_id. Records are replaced, never mutated in place."""
+
+    def __init__(self, records: Any, lock: Any) -> None:
+        self._records = records
+        self._lock = lock
+
+    def put(self, run_id: str, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self._records[run_id] = record
+
+    def get(self, run_id: str) -> Optional[Dict[str, Any]]:
+        record = self._records.get(run_id)
+        return dict(record) if record is not None else None
+
+    def update(self, run_id: str, **fields: Any) -> None:
+        with self._lock:
+            record = self._records.get(run_id)
+            if record is None:
+                return
+            self._records[run_id] = {**record, **fields}
+
+    def active_count(self) -> int:
+        return sum(1 for record in list(self._records.values()) if record.get("status") in ACTIVE_STATUSES)
+
+    def queued_count(self) -> int:
+        return sum(1 for record in list(self._records.values()) if record.get("status") == STATUS_QUEUED)
+
+    def prune(self, *, older_than: float) -> int:
+        removed = 0
+        with self._lock:
+            for run_id, record in list(self._records.items()):
+                finished_at = record.get("finished_at")
+                if finished_at is not None and finished_at < older_than:
+                    self._records.pop(run_id, None)
+                    removed += 1
+        return removed
+
+
+class JobProgress:
+    """Stage reporter handed to runners; picklable for process workers."""
+
+    def __init__(self, store: _JobStore, run_id: str, stages: tuple = ANALYSIS_STAGES) -> None:
+        self._store = store
+        self.run_id = run_id
+        self._stages = stages
+        self._completed: List[str] = []
+        self._current: Optional[str] = None
+        self._follow_ups: List[Dict[str, Any]] = []
+
+    def completed(self) -> List[str]:
+        """Stages finished so far, counting the current one (used on success)."""
+        done = list(self._completed)
+        if self._current is not None and self._current not in done:
+            done.append(self._current)
+        return done
+
+    def stage(self, name: str) -> None:
+        if self._current is not None and self._current not in self._completed:
+            self._completed.append(self._current)
+        self._current = str(name)
+        self._store.update(
+            self.run_id,
+            stage=self._current,
+            stages_completed=list(self._completed),
+            progress=_progress_fraction(self._completed, self._stages),
+            updated_at=time.time(),
+        )
+
+    def follow_up(
+        self,
+        queue: str,
+        runner: Callable[[Dict[str, Any], "JobProgress"], Dict[str, Any]],
+        payload: Dict[str, Any],
+        *,
+        on_failure: Optional[Callable[[Dict[str, Any], Dict[str, Any]], None]] = None,
+    ) -> None:
+        """Queue ``runner`` on ``queue`` under the same run_id once this job succeeds."""
+        self._follow_ups.append({"queue": str(queue), "runner": runner, "payload": payload, "on_failure": on_failure})
+
+    def follow_ups(self) -> List[Dict[str, Any]]:
+        return list(self._follow_ups)
+
+    def backlog(self) -> int:
+        """Jobs still waiting for a worker on this job's queue."""
+        return self._store.queued_count()
+
+
+def _progress_fraction(completed: List[str], stages: tuple = ANALYSIS_STAGES) -> float:
+    return round(min(1.0, len(completed) / float(len(stages) - 1)), 3)
+
+
+def _execute_job(
+    store: _JobStore,
+    runner: Callable,
+    run_id: str,
+    payload: Dict[str, Any],
+    stages: tuple = ANALYSIS_STAGES,
+) -> None:
+    started = time.time()
+    store.update(run_id, status=STATUS_RUNNING, started_at=started, updated_at=started)
+    progress = JobProgress(store, run_id, stages)
+    try:
+        result = runner(payload, progress)
+    except AnalysisJobError as exc:
+        error = exc.as_dict()
+        logger.warning("[analysis_jobs] failed run_id=%s code=%s", run_id, exc.code)
+    except Exception as exc:
+        error = {
+            "code": "analysis_failed",
+            "message": "Analysis failed. Please retry or contact support if this keeps happening.",
+            "status_code": 500,
+        }
+        logger.exception("[analysis_jobs] crashed run_id=%s error=%s", run_id, exc)
+    else:
+        finished = time.time()
+        store.update(
+            run_id,
+            status=STATUS_SUCCEEDED,
+            stage="complete",
+            stages_completed=progress.completed(),
+            progress=1.0,
+            result=result,
+            follow_ups=progress.follow_ups(),
+            finished_at=finished,
+            updated_at=finished,
+        )
+        logger.info(
+            "[analysis_jobs] succeeded run_id=%s duration_ms=%.1f",
+            run_id,
+            (finished - started) * 1000.0,
+        )
+        return
+
+    finished = time.time()
+    store.update(run_id, status=STATUS_FAILED, error=error, finished_at=finished, updated_at=finished)
+
+
+# ------------------------------------------------------------
+# Metrics
+# ------------------------------------------------------------
+JOBS_TOTAL = REGISTRY.counter("actionlab_analysis_jobs_total", "Finished analysis jobs by status.")
+JOB_SECONDS = REGISTRY.histogram("actionlab_analysis_job_duration_seconds", "Run time of one analysis job.")
+JOB_QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "actionlab_analysis_job_queue_wait_seconds",
+    "Time a job waited before a worker picked it up.",
+)
+
+
+def _observe_finished_job(record: Dict[str, Any], *, queue_name: str, replay_timings: bool) -> None:
+    """Runs in the API process for every backend (future callbacks do)."""
+    status = str(record.get("status") or "unknown")
+    JOBS_TOTAL.inc(status=status, queue=queue_name)
+    submitted = record.get("submitted_at")
+    started = record.get("started_at")
+    finished = record.get("finished_at")
+    if submitted and started:
+        JOB_QUEUE_WAIT_SECONDS.observe(max(0.0, started - submitted), queue=queue_name)
+    if started and finished:
+        JOB_SECONDS.observe(max(0.0, finished - started), status=status, queue=queue_name)
+    if replay_timings and status == STATUS_SUCCEEDED:
+        record_run_timings((record.get("result") or {}).get("timings_v1"))
+
+
+def _queue_metrics():
+    families: Dict[str, Any] = {}
+    for queue_name, queue in sorted(_queues.items()):
+        stats = queue.stats()
+        labels = {"backend": stats.get("backend") or queue.name, "queue": queue_name}
+        for key, name, help_text in (
+            ("active", "actionlab_analysis_jobs_active", "Queued plus running jobs."),
+            ("workers", "actionlab_analysis_workers", "Worker slots."),
+            ("queue_limit", "actionlab_analysis_queue_limit", "Pending jobs accepted before 503."),
+        ):
+            if stats.get(key) is not None:
+                families.setdefault(name, (name, "gauge", help_text, []))[3].append((labels, stats[key]))
+    return list(families.values())
+
+
+REGISTRY.register_collector("analysis_jobs", _queue_metrics)
+
+
+# ------------------------------------------------------------
+# Backends
+# ------------------------------------------------------------
+class AnalysisJobBackend:
+    """Interface every queue backend implements."""
+
+    name = "base"
+    # True when jobs run inside the API process (shares its warm resources).
+    in_process = False
+    # False when queued jobs die with the API process (the built-in backends).
+    durable = False
+    queue_name = ANALYSIS_QUEUE
+
+    def submit(
+        self,
+        run_id: str,
+        runner: Callable[[Dict[str, Any], JobProgress], Dict[str, Any]],
+        payload: Dict[str, Any],
+        *,
+        owner_id: Optional[str] = None,
+        enforce_limit: bool = True,
+        on_failure: Optional[Callable[[Dict[str, Any], Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Queue a job; ``enforce_limit=False`` admits follow-ups of accepted work.
+        ``on_failure(payload, error)`` runs in the API process if the job fails.
+        """
+        raise NotImplementedError
+
+    def get(self, run_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name}
+
+    def shutdown(self, wait: bool = False) -> None:
+        return None
+
+
+class _PoolJobBackend(AnalysisJobBackend):
+    def __init__(
+        self,
+        *,
+        store: _JobStore,
+        executor: Executor,
+        max_workers: int,
+        queue_limit: int,
+        queue_name: str = ANALYSIS_QUEUE,
+    ) -> None:
+        self._store = store
+        self._executor = executor
+        self.max_workers = max_workers
+        self.queue_limit = queue_limit
+        self.queue_name = queue_name
+        # Failure hooks stay in the API process; only the runner goes to the worker.
+        self._failure_hooks: Dict[str, tuple] = {}
+        self._failure_hooks_lock = threading.Lock()
+
+    def submit(self, run_id, runner, payload, *, owner_id=None, enforce_limit=True, on_failure=None):
+        self._store.prune(older_than=time.time() - analysis_job_ttl_seconds())
+        if enforce_limit and self._store.active_count() >= self.queue_limit + self.max_workers:
+            raise JobQueueFull(f"{self.queue_name} queue is full ({self.queue_limit} pending)")
+        now = time.time()
+        record = {
+            "run_id": run_id,
+            "owner_id": owner_id,
+            "status": STATUS_QUEUED,
+            "stage": "queued",
+            "stages_completed": [],
+            "progress": 0.0,
+            "submitted_at": now,
+            "started_at": None,
+            "finished_at": None,
+            "updated_at": now,
+            "error": None,
+            "result": None,
+        }
+        self._store.put(run_id, record)
+        if on_failure is not None:
+            with self._failure_hooks_lock:
+                self._failure_hooks[run_id] = (on_failure, payload)
+        stages = _STAGE_PLANS.get(self.queue_name, ANALYSIS_STAGES)
+        try:
+            future = self._executor.submit(_execute_job, self._store, runner, run_id, payload, stages)
+        except Exception:
+            with self._failure_hooks_lock:
+                self._failure_hooks.pop(run_id, None)
+            raise
+        future.add_done_callback(lambda f: self._on_done(run_id, f))
+        logger.info(
+            "[analysis_jobs] submitted run_id=%s backend=%s queue=%s active=%s",
+            run_id,
+            self.name,
+            self.queue_name,
+            self._store.active_count(),
+        )
+        return dict(record)
+
+    def _on_done(self, run_id: str, future) -> None:
+        exc = future.exception()
+        if exc is not None:
+            # The worker itself died (e.g. a crashed process); the record never finished.
+            logger.error("[analysis_jobs] worker_lost run_id=%s error=%s", run_id, exc)
+            finished = time.time()
+            self._store.update(
+                run_id,
+                status=STATUS_FAILED,
+                error={"code": "analysis_worker_lost", "message": "Analysis worker stopped unexpectedly.", "status_code": 500},
+                finished_at=finished,
+                updated_at=finished,
+            )
+        with self._failure_hooks_lock:
+            failure_hook = self._failure_hooks.pop(run_id, None)
+        record = self._store.get(run_id)
+        if record is not None:
+            _observe_finished_job(record, queue_name=self.queue_name, replay_timings=not self.in_process)
+            if record.get("status") == STATUS_FAILED and failure_hook is not None:
+                on_failure, payload = failure_hook
+                _call_failure_hook(run_id, on_failure, payload, record.get("error") or {})
+            if record.get("follow_ups"):
+                self._store.update(run_id, follow_ups=[])
+                if record.get("status") == STATUS_SUCCEEDED:
+                    _submit_follow_ups(run_id, record)
+
+    def get(self, run_id):
+        return self._store.get(run_id)
+
+    def stats(self):
+        return {
+            "backend": self.name,
+            "queue": self.queue_name,
+            "workers": self.max_workers,
+            "queue_limit": self.queue_limit,
+            "active": self._store.active_count(),
+        }
+
+    def shutdown(self, wait=False):
+        self._executor.shutdown(wait=wait)
+
+
+class InProcessJobBackend(_PoolJobBackend):
+    name = "inprocess"
+    in_process = True
+
+    def __init__(
+        self,
+        *,
+        max_workers: Optional[int] = None,
+        queue_limit: Optional[int] = None,
+        queue_name: str = ANALYSIS_QUEUE,
+    ) -> None:
+        sizing = _queue_sizing(queue_name)
+        workers = max_workers or sizing["max_workers"]
+        super().__init__(
+            store=_JobStore({}, threading.RLock()),
+            executor=ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{queue_name}-job"),
+            max_workers=workers,
+            queue_limit=queue_limit or sizing["queue_limit"],
+            queue_name=queue_name,
+        )
+
+
+class ProcessJobBackend(_PoolJobBackend):
+    name = "process"
+
+    def __init__(
+        self,
+        *,
+        max_workers: Optional[int] = None,
+        queue_limit: Optional[int] = None,
+        queue_name: str = ANALYSIS_QUEUE,
+    ) -> None:
+        sizing = _queue_sizing(queue_name)
+        workers = max_workers or sizing["max_workers"]
+        self._manager = multiprocessing.Manager()
+        # Render workers never run MediaPipe; only analysis workers warm a tracker.
+        initializer = _init_worker_process if queue_name == ANALYSIS_QUEUE else None
+        super().__init__(
+            store=_JobStore(self._manager.dict(), self._manager.RLock()),
+            executor=ProcessPoolExecutor(max_workers=workers, initializer=initializer),
+            max_workers=workers,
+            queue_limit=queue_limit or sizing["queue_limit"],
+            queue_name=queue_name,
+        )
+
+    def shutdown(self, wait=False):
+        super().shutdown(wait=wait)
+        self._manager.shutdown()
+
+
+def _init_worker_process() -> None:
+    # Each worker process runs one job at a time; one warm tracker is enough.
+    from app.workers.pose.tracker_pool import warm_pose_tracker_pool
+
+    try:
+        warm_pose_tracker_pool(1)
+    except Exception as exc:
+        logger.warning("[analysis_jobs] worker_warmup_failed error=%s", exc)
+
+
+# Factories are called as factory(queue_name=...) and size themselves from it.
+_BACKEND_FACTORIES: Dict[str, Callable[..., AnalysisJobBackend]] = {
+    InProcessJobBackend.name: InProcessJobBackend,
+    ProcessJobBackend.name: ProcessJobBackend,
+}
+_queues: Dict[str, AnalysisJobBackend] = {}
+_queue_lock = threading.Lock()
+
+
+def register_job_backend(name: str, factory: Callable[..., AnalysisJobBackend]) -> None:
+    _BACKEND_FACTORIES[str(name).strip().lower()] = factory
+
+
+def analysis_queue_backend_name() -> str:
+    return (os.getenv(QUEUE_BACKEND_ENV) or DEFAULT_QUEUE_BACKEND).strip().lower()
+
+
+def get_job_queue(queue_name: str = ANALYSIS_QUEUE) -> AnalysisJobBackend:
+    with _queue_lock:
+        queue = _queues.get(queue_name)
+        if queue is None:
+            name = analysis_queue_backend_name()
+            factory = _BACKEND_FACTORIES.get(name)
+            if factory is None:
+                logger.warning("[analysis_jobs] unknown_backend=%s using=%s", name, DEFAULT_QUEUE_BACKEND)
+                factory = _BACKEND_FACTORIES[DEFAULT_QUEUE_BACKEND]
+            queue = factory(queue_name=queue_name)
+            _queues[queue_name] = queue
+            logger.info("[analysis_jobs] backend=%s queue=%s", queue.name, queue_name)
+        return queue
+
+
+def get_analysis_job_queue() -> AnalysisJobBackend:
+    return get_job_queue(ANALYSIS_QUEUE)
+
+
+def get_render_job_queue() -> AnalysisJobBackend:
+    return get_job_queue(RENDER_QUEUE)
+
+
+def _call_failure_hook(run_id: str, on_failure: Callable, payload: Dict[str, Any], error: Dict[str, Any]) -> None:
+    try:
+        on_failure(payload, error)
+    except Exception as exc:
+        logger.exception("[analysis_jobs] failure_hook_failed run_id=%s error=%s", run_id, exc)
+
+
+def _submit_follow_ups(run_id: str, record: Dict[str, Any]) -> None:
+    for follow_up in record.get("follow_ups") or []:
+        queue_name = follow_up.get("queue") or ANALYSIS_QUEUE
+        payload = follow_up.get("payload") or {}
+        on_failure = follow_up.get("on_failure")
+        try:
+            get_job_queue(queue_name).submit(
+                run_id,
+                follow_up["runner"],
+                payload,
+                owner_id=record.get("owner_id"),
+                enforce_limit=False,
+                on_failure=on_failure,
+            )
+        except Exception as exc:
+            logger.exception("[analysis_jobs] follow_up_failed run_id=%s queue=%s error=%s", run_id, queue_name, exc)
+            if on_failure is not None:
+                error = {"code": "follow_up_submit_failed", "message": str(exc), "status_code": 500}
+                _call_failure_hook(run_id, on_failure, payload, error)
+
+
+def shutdown_analysis_job_queue(wait: bool = False) -> None:
+    """Shut down every named queue (analysis and render)."""
+    with _queue_lock:
+        queues = list(_queues.values())
+        _queues.clear()
+    for queue in queues:
+        queue.shutdown(wait=wait)
+
+
+def public_job_view(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Client-facing job status (owner id and follow-ups stay server-side)."""
+    view = {key: value for key, value in record.items() if key not in ("owner_id", "follow_ups")}
+    if view.get("status") != STATUS_SUCCEEDED:
+        view.pop("result", None)
+    return view
@@ -1,5 +1,5 @@
-from fastapi import FastAPI, UploadFile, File, Form, Request, HTTPException, Depends, BackgroundTasks
-from fastapi.responses import FileResponse, Response
+from fastapi import FastAPI, UploadFile, File, Form, Request, HTTPException, Depends
+from fastapi.responses import Response
 from fastapi.staticfiles import StaticFiles
 from datetime import datetime
 import os
@@ -9,14 +9,50 @@ from typing import Any, Dict, List, Optional, Tuple
 
 from app.common.logger import get_logger
 from app.common.auth import get_current_account
-from app.io.loader import cleanup_stale_temp_uploads, load_video
+from app.common.metrics import REGISTRY, current_run_timings, run_timings, span
+from app.orchestrator.analysis_cache import (
+    analysis_cache_key,
+    load_cached_analysis,
+    store_cached_analysis,
+)
+from app.orchestrator.analysis_jobs import (
+    RENDER_QUEUE,
+    STATUS_FAILED,
+    STATUS_RUNNING,
+    STATUS_SUCCEEDED,
+    AnalysisJobError,
+    JobProgress,
+    JobQueueFull,
+    get_analysis_job_queue,
+    get_render_job_queue,
+    public_job_view,
+    shutdown_analysis_job_queue,
+)
+from app.orchestrator.render_delivery import render_artifact_response
+from app.io.frame_provider import close_frame_provider, frame_provider_for
+from app.io.loader import cleanup_orphaned_temp_uploads, cleanup_stale_temp_uploads, load_video_path, save_upload
+from app.workers.pose.pose_store import load_pose_artifact, save_pose_artifact
+from app.workers.pose.tracker_pool import warm_pose_tracker_pool
 from app.workers.screening.video_screen import run_preanalysis_screen
 from app.workers.speed.release_speed import estimate_release_speed
 from app.workers.render.coach_video_renderer import render_skeleton_video, RENDER_DIR
+from app.workers.render.render_profiles import (
+    RENDER_PROFILE_NAMES,
+    RenderProfile,
+    effective_render_profile,
+    normalize_render_profile,
+    requested_render_profile,
+)
+from app.workers.render.render_cache import (
+    load_cached_render,
+    render_cache_artifact_name,
+    render_cache_key,
+    store_cached_render,
+)
 from app.workers.render.render_storage import (
     cleanup_old_renders,
-    download_render_artifact,
     normalize_render_filename,
+    open_render_artifact,
     render_retention_days,
     upload_render_artifact,
 )
@@ -34,7 +70,7 @@ from app.workers.elbow.elbow_legality import evaluate_elbow_legality
 from app.workers.action.action_classifier import classify_action
 
 # Risk
-from app.workers.risk.risk_worker import run_risk_worker
+from app.workers.risk.risk_worker import run_risk_worker_outcomes
 
 # Interpretation
 from app.interpretation.interpret_risks import interpret_risks
@@ -55,6 +91,7 @@ from app.persistence.learning_cases import (
 )
 from app.persistence.notifications import (
     persist_analysis_completed_notification_best_effort,
+    persist_walkthrough_ready_notification_best_effort,
 )
 from app.persistence.prescription_followups import sync_prescription_followups_for_run
 from app.persistence.writer import write_analysis
@@ -125,6 +162,25 @@ def _startup_housekeeping() -> None:
         temp_cleanup.get("scanned", 0),
         temp_cleanup.get("removed", 0),
     )
+    orphan_cleanup = cleanup_orphaned_temp_uploads()
+    logger.info(
+        "[loader] orphaned_upload_cleanup_scanned=%s removed=%s",
+        orphan_cleanup.get("scanned", 0),
+        orphan_cleanup.get("removed", 0),
+    )
+    job_queue = get_analysis_job_queue()
+    if not job_queue.durable:
+        logger.info("[render:lost_pending_swept] count=%s", _fail_lost_pending_walkthroughs())
+    if job_queue.in_process:
+        try:
+            warm_pose_tracker_pool()
+        except Exception as exc:
+            logger.warning("[pose_pool] warmup_failed error=%s", exc)
+
+
+@app.on_event("shutdown")
+def _shutdown_analysis_jobs() -> None:
+    shutdown_analysis_job_queue(wait=False)
 
 
 def _compact_header(value: str, limit: int = 120) -> str:
@@ -574,6 +630,110 @@ def _deterministic_render_story_context(
     }
 
 
+def walkthrough_render_mode() -> str:
+    """"queued" (default): render on the render queue after the result is stored; "inline": in the analysis job."""
+    mode = (os.getenv("ACTIONLAB_RENDER_MODE") or "queued").strip().lower()
+    return mode if mode in {"queued", "inline"} else "queued"
+
+
+def _walkthrough_render_inputs(result: Dict[str, Any], *, hand: str) -> Dict[str, Any]:
+    deterministic_expert = result.get("deterministic_expert_v1") or {}
+    return {
+        "events": result["events"],
+        "hand": hand,
+        "action": result["action"],
+        "elbow": result["elbow"],
+        "risks": result["risks"],
+        "estimated_release_speed": result["estimated_release_speed"],
+        "kinetic_chain": deterministic_expert.get("kinetic_chain_v1"),
+        "report_story": _deterministic_render_story_context(deterministic_expert),
+        "root_cause": ((deterministic_expert.get("coach_diagnosis_v1") or {}).get("root_cause")),
+    }
+
+
+def _pending_walkthrough(run_id: str) -> Dict[str, Any]:
+    return {
+        "available": False,
+        "status": "pending",
+        "status_url": f"/analysis-runs/{run_id}/walkthrough",
+    }
+
+
+def _with_walkthrough_status(walkthrough: Dict[str, Any]) -> Dict[str, Any]:
+    return {**walkthrough, "status": "ready" if walkthrough.get("available") else "failed"}
+
+
+def _walkthrough_render_cache_key(
+    *,
+    video: dict,
+    pose_frames: Any,
+    render_inputs: Dict[str, Any],
+    start_frame: int,
+    end_frame: Optional[int],
+    profile: RenderProfile,
+) -> Optional[str]:
+    return render_cache_key(
+        content_hash=video.get("content_hash"),
+        pose_frames=pose_frames,
+        render_inputs=render_inputs,
+        render_settings={
+            "renderer_version": WALKTHROUGH_RENDERER_VERSION,
+            "profile": profile.name,
+            "max_short_side": profile.max_short_side,
+            "preset": profile.encode_settings.preset,
+            "crf": profile.encode_settings.crf,
+            "window": [start_frame, end_frame],
+            "fps": video.get("fps"),
+            "pause_seconds": WALKTHROUGH_PAUSE_SECONDS,
+            "slow_motion_factor": WALKTHROUGH_SLOW_MOTION_FACTOR,
+            "end_summary_seconds": WALKTHROUGH_END_SUMMARY_SECONDS,
+        },
+    )
+
+
+def _cached_walkthrough(run_id: str, cache_key: Optional[str]) -> Optional[Dict[str, Any]]:
+    cached = load_cached_render(cache_key, RENDERS_DIR)
+    if cached is None:
+        return None
+    artifact_name = render_cache_artifact_name(cache_key)
+    logger.info(
+        "[analyze:walkthrough_cache_hit] run_id=%s key=%s source=%s",
+        run_id,
+        cache_key,
+        cached.get("cache_source"),
+    )
+    return {
+        **cached,
+        "cache_hit": True,
+        "relative_url": f"/renders/{artifact_name}",
+        "url": _public_asset_url(f"/renders/{artifact_name}"),
+    }
+
+
+def _cached_walkthrough_for_reanalysis(
+    *,
+    run_id: str,
+    video: dict,
+    pose_frames: Any,
+    render_inputs: Dict[str, Any],
+    render_profile: RenderProfile,
+) -> Optional[Dict[str, Any]]:
+    """The source run's walkthrough when the visual story is unchanged (no video to re-render)."""
+    start_frame, end_frame = _walkthrough_render_window(
+        events=render_inputs["events"],
+        total_frames=int(video.get("total_frames") or len(pose_frames) or 0),
+    )
+    cache_key = _walkthrough_render_cache_key(
+        video=video,
+        pose_frames=pose_frames,
+        render_inputs=render_inputs,
+        start_frame=start_frame,
+        end_frame=end_frame,
+        profile=render_profile,
+    )
+    return _cached_walkthrough(run_id, cache_key)
+
+
 def _build_walkthrough_render(
     *,
     run_id: str,
@@ -588,17 +748,43 @@ def _build_walkthrough_render(
     kinetic_chain: Optional[dict] = None,
     report_story: Optional[dict],
     root_cause: Optional[dict],
+    render_profile: Optional[RenderProfile] = None,
 ) -> dict:
-    video_path = video.get("path")
-    if not video_path or not os.path.exists(video_path):
-        return {"available": False, "reason": "missing_video_path"}
-
     total_frames = int(video.get("total_frames") or len(pose_frames) or 0)
     start_frame, end_frame = _walkthrough_render_window(
         events=events,
         total_frames=total_frames,
     )
-    output_path = os.path.join(RENDERS_DIR, f"{run_id}_walkthrough.mp4")
+    profile = render_profile or effective_render_profile(None)
+    cache_key = _walkthrough_render_cache_key(
+        video=video,
+        pose_frames=pose_frames,
+        render_inputs={
+            "events": events,
+            "hand": hand,
+            "action": action,
+            "elbow": elbow,
+            "risks": risks,
+            "estimated_release_speed": estimated_release_speed,
+            "kinetic_chain": kinetic_chain,
+            "report_story": report_story,
+            "root_cause": root_cause,
+        },
+        start_frame=start_frame,
+        end_frame=end_frame,
+        profile=profile,
+    )
+    cached = _cached_walkthrough(run_id, cache_key)
+    if cached is not None:
+        return cached
+
+    video_path = video.get("path")
+    if not video_path or not os.path.exists(video_path):
+        return {"available": False, "reason": "missing_video_path"}
+
+    # Content-addressed clips render straight to their cache artifact.
+    artifact_file = render_cache_artifact_name(cache_key) if cache_key else f"{run_id}_walkthrough.mp4"
+    output_path = os.path.join(RENDERS_DIR, artifact_file)
 
     try:
         render_result = render_skeleton_video(
@@ -619,6 +805,9 @@ def _build_walkthrough_render(
             pause_seconds=WALKTHROUGH_PAUSE_SECONDS,
             slow_motion_factor=WALKTHROUGH_SLOW_MOTION_FACTOR,
             end_summary_seconds=WALKTHROUGH_END_SUMMARY_SECONDS,
+            frame_provider=frame_provider_for(video),
+            encode_settings=profile.encode_settings,
+            max_short_side=profile.max_short_side,
         )
     except Exception as exc:
         logger.warning(
@@ -656,8 +845,9 @@ def _build_walkthrough_render(
         upload_result.get("reason") or "-",
     )
 
-    return {
+    walkthrough = {
         **render_result,
+        "render_profile": profile.name,
         "renderer_version": WALKTHROUGH_RENDERER_VERSION,
         "artifact_type": "walkthrough_mp4",
         "storage_backend": upload_result.get("storage_backend") or "local",
@@ -667,6 +857,9 @@ def _build_walkthrough_render(
         "relative_url": f"/renders/{artifact_name}",
         "url": _public_asset_url(f"/renders/{artifact_name}"),
     }
+    if cache_key and artifact_name == artifact_file:
+        store_cached_render(cache_key, walkthrough, RENDERS_DIR)
+    return walkthrough
 
 
 # ------------------------------------------------------------
@@ -681,51 +874,49 @@ else:
 
 
 @app.get("/renders/{filename}")
-def get_walkthrough_render(filename: str):
+def get_walkthrough_render(filename: str, request: Request):
     safe_name = normalize_render_filename(filename)
     if not safe_name or safe_name != filename:
         raise HTTPException(status_code=404, detail="Render not found")
 
-    remote_bytes = download_render_artifact(safe_name)
-    if remote_bytes is not None:
-        logger.info(
-            "[renders:get] filename=%s source=gcs bytes=%s",
-            safe_name,
-            len(remote_bytes),
-        )
-        return Response(content=remote_bytes, media_type="video/mp4")
-
-    local_path = os.path.join(RENDERS_DIR, safe_name)
-    if os.path.exists(local_path):
-        logger.info(
-            "[renders:get] filename=%s source=local path=%s",
-            safe_name,
-            local_path,
-        )
-        return FileResponse(local_path, media_type="video/mp4")
+    artifact = open_render_artifact(safe_name, local_dir=RENDERS_DIR)
+    if artifact is None:
+        logger.warning("[renders:get] filename=%s source=missing", safe_name)
+        raise HTTPException(status_code=404, detail="Render not found")
 
-    logger.warning("[renders:get] filename=%s source=missing", safe_name)
-    raise HTTPException(status_code=404, detail="Render not found")
+    response = render_artifact_response(artifact, request.headers)
+    logger.info(
+        "[renders:get] filename=%s source=%s bytes=%s status=%s range=%s",
+        safe_name,
+        artifact.source,
+        artifact.size,
+        response.status_code,
+        request.headers.get("range") or "-",
+    )
+    return response
 
 
 # ------------------------------------------------------------
 # Analyze Endpoint (Protected + Account Scoped)
 # ------------------------------------------------------------
-@app.post("/analyze")
+@app.post("/analyze", status_code=202)
 def analyze(
     request: Request,
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     player_id: str = Form(...),
     bowler_type: str = Form(None),
     age_group: str = Form(None),
     season: int = Form(None),
     actor: str = Form(None),  # legacy compatibility field; auth identity is authoritative
+    render_profile: str = Form(None),
     current_account=Depends(get_current_account),
 ):
     """
-    ActionLab V14 – Full Pipeline
+    ActionLab V14 – Submit a clip for analysis
     Auth Protected + Player Scoped
+
+    Validates the request, stages the upload and queues the pipeline;
+    poll GET /analysis-jobs/{run_id} for progress and the result.
     """
 
     run_id = str(uuid.uuid4())
@@ -753,6 +944,15 @@ def analyze(
         )
         raise HTTPException(status_code=415, detail="Unsupported media type")
 
+    if render_profile is not None and render_profile.strip() and normalize_render_profile(render_profile) is None:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "code": "invalid_render_profile",
+                "message": f"render_profile must be one of: {', '.join(RENDER_PROFILE_NAMES)}",
+            },
+        )
+
     # ------------------------------------------------------------
     # Secure Actor Injection
     # ------------------------------------------------------------
@@ -765,7 +965,6 @@ def analyze(
     # Enforce Player Ownership
     # ------------------------------------------------------------
     db = SessionLocal()
-    prior_results: List[Dict[str, Any]] = []
     try:
         # Step 1: Check link (ownership)
         link = (
@@ -831,85 +1030,100 @@ def analyze(
                 )
             effective_season = season
 
-        prior_results = _load_recent_expert_history(
-            db=db,
-            player_id=player_id,
-            limit=_get_deterministic_expert_engine().history_window_runs,
-        )
-
     finally:
         db.close()
 
-    video_temp_path = None
-    cleanup_scheduled = False
-
+    # The upload stream closes with the request; stage it before queueing.
+    video_temp_path, content_hash = save_upload(file)
+    payload = {
+        "run_id": run_id,
+        "request_id": request_id,
+        "player_id": player_id,
+        "hand": hand,
+        "bowler_type": bowler_type,
+        "age_group": effective_age_group,
+        "season": effective_season,
+        "actor": actor_obj,
+        "platform": _platform_hint(request),
+        "render_profile": requested_render_profile(render_profile, platform=_platform_hint(request)),
+        "video_path": video_temp_path,
+        "content_hash": content_hash,
+    }
     try:
-        # ------------------------------------------------------------
-        # Load Video
-        # ------------------------------------------------------------
-        try:
-            video, pose_frames, _ = load_video(file)
-        except RuntimeError:
-            raise HTTPException(
-                status_code=400,
-                detail={
-                    "code": "invalid_video",
-                    "message": (
-                        "Could not read uploaded video. Please upload a playable "
-                        "video file."
-                    ),
-                },
-            )
+        job = get_analysis_job_queue().submit(
+            run_id,
+            _run_analysis_job,
+            payload,
+            owner_id=actor_obj["account_id"],
+        )
+    except JobQueueFull:
+        _delete_temp_video_safely(video_temp_path)
+        logger.warning(
+            f"[analyze:rejected] request_id={request_id} run_id={run_id} "
+            f"reason=analysis_queue_full"
+        )
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "code": "analysis_queue_full",
+                "message": "ActionLab is busy right now. Please retry in a minute.",
+            },
+        )
 
-        video_temp_path = video.get("path")
-        temp_file_size = None
-        if video_temp_path and os.path.exists(video_temp_path):
-            try:
-                temp_file_size = os.path.getsize(video_temp_path)
-            except Exception:
-                temp_file_size = None
+    logger.info(
+        f"[analyze:queued] request_id={request_id} run_id={run_id} "
+        f"player_id={player_id}"
+    )
+    return {
+        "run_id": run_id,
+        "status": job.get("status"),
+        "stage": job.get("stage"),
+        "status_url": f"/analysis-jobs/{run_id}",
+    }
 
-        try:
-            fps_val = float(video.get("fps") or 0.0)
-        except Exception:
-            fps_val = 0.0
 
-        logger.info(
-            f"[analyze:video] request_id={request_id} run_id={run_id} "
-            f"platform={_platform_hint(request)} "
-            f"fps={fps_val:.3f} width={video.get('width')} height={video.get('height')} "
-            f"frames={video.get('total_frames')} "
-            f"file_size_bytes={temp_file_size if temp_file_size is not None else '-'}"
-        )
+def _run_pose_workers(
+    *,
+    run_id: str,
+    request_id: str,
+    hand: str,
+    platform: str,
+    video: Dict[str, Any],
+    pose_frames: Any,
+    progress: JobProgress,
+) -> Dict[str, Any]:
+    """
+    Events → action → risks → basics → elbow → speed, from pose alone.
 
-        screening = run_preanalysis_screen(
-            video=video,
-            pose_frames=pose_frames,
-            hand=hand,
-        )
-        if not screening.get("passed"):
-            _reject_for_screening_failure(
-                request_id=request_id,
-                run_id=run_id,
-                screening=screening,
-            )
+    Outputs depend only on the clip and the bowling hand (never on the
+    player's history), which is what lets the analysis cache reuse them.
+    "risk_timeouts" lists risk modules that overran their budget and were
+    reported at their floor; such a run is not cached.
+    """
+    try:
+        fps_val = float(video.get("fps") or 0.0)
+    except Exception:
+        fps_val = 0.0
 
-        # ------------------------------------------------------------
-        # Events
-        # ------------------------------------------------------------
+    # ------------------------------------------------------------
+    # Events
+    # ------------------------------------------------------------
+    progress.stage("events")
+    with span("release_uah"):
         events = detect_release_uah(
             pose_frames=pose_frames,
             hand=hand,
             fps=fps_val,
         )
 
-        # ------------------------------------------------------------
-        # FFC / BFC
-        # ------------------------------------------------------------
-        release_frame = (events.get("release") or {}).get("frame")
-        delivery_window = events.get("delivery_window")
+    # ------------------------------------------------------------
+    # FFC / BFC
+    # ------------------------------------------------------------
+    release_frame = (events.get("release") or {}).get("frame")
+    delivery_window = events.get("delivery_window")
 
-        if release_frame is not None and delivery_window is not None:
+    if release_frame is not None and delivery_window is not None:
+        with span("ffc_bfc"):
             foot_events = detect_ffc_bfc(
                 pose_frames=pose_frames,
                 hand=hand,
@@ -917,30 +1131,32 @@ def analyze(
                 delivery_window=tuple(delivery_window),
                 fps=fps_val,
             )
-            if foot_events:
-                events.update(foot_events)
-
-        bfc_frame = (events.get("bfc") or {}).get("frame")
-        ffc_frame = (events.get("ffc") or {}).get("frame")
-        uah_frame = (events.get("uah") or {}).get("frame")
-        release_confidence = float((events.get("release") or {}).get("confidence") or 0.0)
-        uah_confidence = float((events.get("uah") or {}).get("confidence") or 0.0)
-        ffc_confidence = float((events.get("ffc") or {}).get("confidence") or 0.0)
-        bfc_confidence = float((events.get("bfc") or {}).get("confidence") or 0.0)
-        events["event_chain"] = chain_quality(
-            bfc_frame=bfc_frame,
-            ffc_frame=ffc_frame,
-            uah_frame=uah_frame,
-            release_frame=release_frame,
-            bfc_confidence=bfc_confidence,
-            ffc_confidence=ffc_confidence,
-            uah_confidence=uah_confidence,
-            release_confidence=release_confidence,
-        )
+        if foot_events:
+            events.update(foot_events)
 
-        # ------------------------------------------------------------
-        # Action Classification
-        # ------------------------------------------------------------
+    bfc_frame = (events.get("bfc") or {}).get("frame")
+    ffc_frame = (events.get("ffc") or {}).get("frame")
+    uah_frame = (events.get("uah") or {}).get("frame")
+    release_confidence = float((events.get("release") or {}).get("confidence") or 0.0)
+    uah_confidence = float((events.get("uah") or {}).get("confidence") or 0.0)
+    ffc_confidence = float((events.get("ffc") or {}).get("confidence") or 0.0)
+    bfc_confidence = float((events.get("bfc") or {}).get("confidence") or 0.0)
+    events["event_chain"] = chain_quality(
+        bfc_frame=bfc_frame,
+        ffc_frame=ffc_frame,
+        uah_frame=uah_frame,
+        release_frame=release_frame,
+        bfc_confidence=bfc_confidence,
+        ffc_confidence=ffc_confidence,
+        uah_confidence=uah_confidence,
+        release_confidence=release_confidence,
+    )
+
+    # ------------------------------------------------------------
+    # Action Classification
+    # ------------------------------------------------------------
+    progress.stage("action")
+    with span("action"):
         action = classify_action(
             pose_frames=pose_frames,
             hand=hand,
@@ -948,10 +1164,12 @@ def analyze(
             ffc_frame=ffc_frame,
         )
 
-        # ------------------------------------------------------------
-        # Risk Worker
-        # ------------------------------------------------------------
-        risks = run_risk_worker(
+    # ------------------------------------------------------------
+    # Risk Worker
+    # ------------------------------------------------------------
+    progress.stage("risks")
+    with span("risks"):
+        risks, risk_outcomes = run_risk_worker_outcomes(
             pose_frames=pose_frames,
             video=video,
             events=events,
@@ -959,9 +1177,11 @@ def analyze(
             run_id=run_id,
         )
 
-        # ------------------------------------------------------------
-        # Basics
-        # ------------------------------------------------------------
+    # ------------------------------------------------------------
+    # Basics
+    # ------------------------------------------------------------
+    progress.stage("basics")
+    with span("basics"):
         basics = analyze_basics(
             pose_frames=pose_frames,
             hand=hand,
@@ -969,14 +1189,16 @@ def analyze(
             action=action,
         )
 
-        # ------------------------------------------------------------
-        # Interpretation
-        # ------------------------------------------------------------
-        interpretation = interpret_risks(risks)
+    # ------------------------------------------------------------
+    # Interpretation
+    # ------------------------------------------------------------
+    interpretation = interpret_risks(risks)
 
-        # ------------------------------------------------------------
-        # Elbow
-        # ------------------------------------------------------------
+    # ------------------------------------------------------------
+    # Elbow
+    # ------------------------------------------------------------
+    progress.stage("elbow")
+    with span("elbow"):
         elbow_signal = compute_elbow_signal(
             pose_frames=pose_frames,
             hand=hand,
@@ -990,49 +1212,114 @@ def analyze(
             hand=hand,
         )
 
-        # ------------------------------------------------------------
-        # Estimated Release Speed (Research)
-        # ------------------------------------------------------------
+    # ------------------------------------------------------------
+    # Estimated Release Speed (Research)
+    # ------------------------------------------------------------
+    progress.stage("speed")
+    with span("speed"):
         estimated_release_speed = estimate_release_speed(
             pose_frames=pose_frames,
             events=events,
             video=video,
             hand=hand,
         )
-        estimated_release_speed = _gate_speed_estimate(
-            estimated_release_speed=estimated_release_speed,
-            event_chain=events.get("event_chain") or {},
-            events=events,
-        )
-        speed_debug = estimated_release_speed.get("debug") or {}
-        logger.info(
-            f"[analyze:speed] request_id={request_id} run_id={run_id} "
-            f"platform={_platform_hint(request)} "
-            f"release_frame={(events.get('release') or {}).get('frame')} "
-            f"peak_frame={(events.get('peak') or {}).get('frame')} "
-            f"uah_frame={(events.get('uah') or {}).get('frame')} "
-            f"display={estimated_release_speed.get('display') or '-'} "
-            f"value_kph={estimated_release_speed.get('value_kph') if estimated_release_speed.get('available') else '-'} "
-            f"confidence={estimated_release_speed.get('confidence')} "
-            f"method={estimated_release_speed.get('method')} "
-            f"reason={estimated_release_speed.get('reason') or '-'} "
-            f"wrist_arm_ratio={speed_debug.get('wrist_arm_ratio', '-')} "
-            f"shoulder_body_ratio={speed_debug.get('shoulder_body_ratio', '-')} "
-            f"pelvis_body_ratio={speed_debug.get('pelvis_body_ratio', '-')} "
-            f"elbow_extension_velocity={speed_debug.get('elbow_extension_velocity_deg_per_sec', '-')} "
-            f"arm_length_cv={speed_debug.get('arm_length_cv', '-')} "
-            f"wrist_window_cv={speed_debug.get('wrist_window_cv', '-')}"
+    estimated_release_speed = _gate_speed_estimate(
+        estimated_release_speed=estimated_release_speed,
+        event_chain=events.get("event_chain") or {},
+        events=events,
+    )
+    speed_debug = estimated_release_speed.get("debug") or {}
+    logger.info(
+        f"[analyze:speed] request_id={request_id} run_id={run_id} "
+        f"platform={platform} "
+        f"release_frame={(events.get('release') or {}).get('frame')} "
+        f"peak_frame={(events.get('peak') or {}).get('frame')} "
+        f"uah_frame={(events.get('uah') or {}).get('frame')} "
+        f"display={estimated_release_speed.get('display') or '-'} "
+        f"value_kph={estimated_release_speed.get('value_kph') if estimated_release_speed.get('available') else '-'} "
+        f"confidence={estimated_release_speed.get('confidence')} "
+        f"method={estimated_release_speed.get('method')} "
+        f"reason={estimated_release_speed.get('reason') or '-'} "
+        f"wrist_arm_ratio={speed_debug.get('wrist_arm_ratio', '-')} "
+        f"shoulder_body_ratio={speed_debug.get('shoulder_body_ratio', '-')} "
+        f"pelvis_body_ratio={speed_debug.get('pelvis_body_ratio', '-')} "
+        f"elbow_extension_velocity={speed_debug.get('elbow_extension_velocity_deg_per_sec', '-')} "
+        f"arm_length_cv={speed_debug.get('arm_length_cv', '-')} "
+        f"wrist_window_cv={speed_debug.get('wrist_window_cv', '-')}"
+    )
+
+    return {
+        "events": events,
+        "action": action,
+        "risks": risks,
+        "basics": basics,
+        "interpretation": interpretation,
+        "elbow": elbow,
+        "estimated_release_speed": estimated_release_speed,
+        "risk_timeouts": [o.risk_id for o in risk_outcomes if o.status == "timeout"],
+    }
+
+
+def _store_analysis_cache_best_effort(
+    *,
+    request_id: str,
+    run_id: str,
+    cache_key: Optional[str],
+    video: Dict[str, Any],
+    pose_frames: Any,
+    stages: Dict[str, Any],
+) -> bool:
+    """Cache the pose-worker outputs unless a risk module timed out (its floor is not the real result)."""
+    risk_timeouts = stages.get("risk_timeouts") or []
+    if risk_timeouts:
+        logger.warning(
+            f"[analyze:cache_skip] request_id={request_id} run_id={run_id} "
+            f"key={cache_key} reason=risk_timeout risks={','.join(risk_timeouts)}"
         )
+        return False
+    return store_cached_analysis(
+        cache_key,
+        video=video,
+        pose_frames=pose_frames,
+        stages=stages,
+    )
 
-        # ------------------------------------------------------------
-        # Clinician Layer
-        # ------------------------------------------------------------
+
+def _build_analysis_result(
+    *,
+    run_id: str,
+    player_id: str,
+    hand: str,
+    bowler_type: Optional[str],
+    effective_age_group: Optional[str],
+    effective_season: Optional[int],
+    actor_obj: Dict[str, Any],
+    video: Dict[str, Any],
+    stages: Dict[str, Any],
+    prior_results: List[Dict[str, Any]],
+    progress: JobProgress,
+) -> Dict[str, Any]:
+    """Clinician + history-aware expert layers and the response payload."""
+    events = stages["events"]
+    action = stages["action"]
+    risks = stages["risks"]
+    basics = stages["basics"]
+    interpretation = stages["interpretation"]
+    elbow = stages["elbow"]
+    estimated_release_speed = stages["estimated_release_speed"]
+
+    # ------------------------------------------------------------
+    # Clinician Layer
+    # ------------------------------------------------------------
+    progress.stage("clinician")
+    with span("clinician"):
         clinician = _get_clinician_engine().build(
             elbow=elbow,
             risks=risks,
             interpretation=interpretation,
             action=action,
         )
+    with span("expert"):
         deterministic_expert = _get_deterministic_expert_engine().build(
             events=events,
             action=action,
@@ -1041,64 +1328,378 @@ def analyze(
             interpretation=interpretation,
             estimated_release_speed=estimated_release_speed,
             prior_results=prior_results,
-            account_role=getattr(current_account, "role", None),
+            account_role=actor_obj["role"],
+        )
+
+    # ------------------------------------------------------------
+    # Build Response
+    # ------------------------------------------------------------
+    result = {
+        "run_id": run_id,
+        "schema": "actionlab.v14",
+        "input": {
+            "player_id": player_id,
+            "hand": hand,
+            "bowler_type": bowler_type,
+            "age_group": effective_age_group,
+            "season": effective_season,
+        },
+        "video": {
+            "fps": video.get("fps"),
+            "total_frames": video.get("total_frames"),
+        },
+        "events": events,
+        "elbow": elbow,
+        "estimated_release_speed": estimated_release_speed,
+        "action": action,
+        "risks": risks,
+        "basics": basics,
+        "interpretation": interpretation,
+        "clinician": clinician,
+        "deterministic_expert_v1": deterministic_expert,
+        "capture_quality_v1": deterministic_expert.get("capture_quality_v1"),
+        "mechanics_evidence_v1": deterministic_expert.get("mechanics_evidence_v1"),
+        "kinetic_chain_v1": deterministic_expert.get("kinetic_chain_v1"),
+        "render_reasoning_v1": deterministic_expert.get("render_reasoning_v1"),
+        "mechanism_explanation_v1": deterministic_expert.get("mechanism_explanation_v1"),
+        "prescription_plan_v1": deterministic_expert.get("prescription_plan_v1"),
+        "history_plan_v1": deterministic_expert.get("history_plan_v1"),
+        "coach_diagnosis_v1": deterministic_expert.get("coach_diagnosis_v1"),
+        "presentation_payload_v1": deterministic_expert.get("presentation_payload_v1"),
+        "frontend_surface_v1": deterministic_expert.get("frontend_surface_v1"),
+    }
+    return result
+
+
+def _analyze_pose_frames(
+    *,
+    run_id: str,
+    request_id: str,
+    player_id: str,
+    hand: str,
+    bowler_type: Optional[str],
+    effective_age_group: Optional[str],
+    effective_season: Optional[int],
+    actor_obj: Dict[str, Any],
+    platform: str,
+    video: Dict[str, Any],
+    pose_frames: Any,
+    prior_results: List[Dict[str, Any]],
+    progress: JobProgress,
+) -> Dict[str, Any]:
+    """
+    Pose workers + clinician layers for one clip.
+
+    Shared by fresh uploads and by re-analysis of a stored pose artifact.
+    """
+    stages = _run_pose_workers(
+        run_id=run_id,
+        request_id=request_id,
+        hand=hand,
+        platform=platform,
+        video=video,
+        pose_frames=pose_frames,
+        progress=progress,
+    )
+    return _build_analysis_result(
+        run_id=run_id,
+        player_id=player_id,
+        hand=hand,
+        bowler_type=bowler_type,
+        effective_age_group=effective_age_group,
+        effective_season=effective_season,
+        actor_obj=actor_obj,
+        video=video,
+        stages=stages,
+        prior_results=prior_results,
+        progress=progress,
+    )
+
+
+def _persist_and_follow_up(
+    *,
+    request_id: str,
+    run_id: str,
+    result: Dict[str, Any],
+    video: Dict[str, Any],
+    bowler_type: Optional[str],
+    actor_obj: Dict[str, Any],
+    effective_age_group: Optional[str],
+    effective_season: Optional[int],
+) -> None:
+    with span("persist"):
+        persistence_status = _persist_analysis_result(
+            request_id=request_id,
+            run_id=run_id,
+            result=result,
+            video=video,
+            bowler_type=bowler_type,
+            actor_obj=actor_obj,
+            effective_age_group=effective_age_group,
+            effective_season=effective_season,
+        )
+    if isinstance(persistence_status, dict) and persistence_status.get("persisted"):
+        _persist_learning_case_best_effort(
+            request_id=request_id,
+            run_id=run_id,
+            result=result,
+            account_id=actor_obj["account_id"],
+        )
+        _sync_prescription_followups_best_effort(
+            request_id=request_id,
+            run_id=run_id,
+        )
+        persist_analysis_completed_notification_best_effort(
+            account_id=actor_obj["account_id"],
+            result=result,
         )
 
+
+def _load_prior_results(player_id: str) -> List[Dict[str, Any]]:
+    db = SessionLocal()
+    try:
+        with span("history"):
+            return _load_recent_expert_history(
+                db=db,
+                player_id=player_id,
+                limit=_get_deterministic_expert_engine().history_window_runs,
+            )
+    finally:
+        db.close()
+
+
+def _save_pose_artifact_best_effort(
+    *,
+    request_id: str,
+    run_id: str,
+    pose_frames: Any,
+    video: Dict[str, Any],
+) -> Dict[str, Any]:
+    try:
+        return save_pose_artifact(run_id, pose_frames, video)
+    except Exception as exc:
+        logger.warning(
+            "[analyze:pose_artifact_failed] request_id=%s run_id=%s error=%s",
+            request_id,
+            run_id,
+            exc,
+        )
+        return {"available": False, "reason": "pose_artifact_write_failed"}
+
+
+def _run_timing_breakdown(video: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Per-run stage timings so far (stored with the result)."""
+    timings = current_run_timings()
+    breakdown = timings.breakdown() if timings is not None else {"stages": {}, "fps": {}}
+    pose_timing = (video or {}).get("pose_timing")
+    if pose_timing:
+        breakdown["pose_loop"] = dict(pose_timing)
+    return breakdown
+
+
+def _finish_run_timings(result: Dict[str, Any]) -> Dict[str, Any]:
+    # The persisted copy was taken before "persist"; the job result gets the full picture.
+    previous = result.get("timings_v1") or {}
+    timings = current_run_timings()
+    if timings is not None:
+        result["timings_v1"] = {**previous, **timings.breakdown()}
+    stages = (result.get("timings_v1") or {}).get("stages") or {}
+    logger.info(
+        "[analyze:timings] run_id=%s total_ms=%s %s",
+        result.get("run_id"),
+        (result.get("timings_v1") or {}).get("total_ms"),
+        " ".join(f"{name}={entry.get('ms')}" for name, entry in stages.items()),
+    )
+    return result
+
+
+def _job_error_from_http(exc: HTTPException) -> AnalysisJobError:
+    detail = exc.detail if isinstance(exc.detail, dict) else {}
+    return AnalysisJobError(
+        detail.get("code") or "analysis_rejected",
+        detail.get("message") or str(exc.detail),
+        status_code=exc.status_code,
+    )
+
+
+def _run_analysis_job(payload: Dict[str, Any], progress: JobProgress) -> Dict[str, Any]:
+    """
+    Analysis worker entry point for one /analyze submission.
+
+    Rejections keep the code/message the endpoint used to return inline;
+    they are reported on the job instead of as an HTTP error.
+    """
+    with run_timings():
+        try:
+            return _finish_run_timings(_run_analysis_pipeline(payload, progress))
+        except HTTPException as exc:
+            raise _job_error_from_http(exc)
+
+
+def _run_reanalysis_job(payload: Dict[str, Any], progress: JobProgress) -> Dict[str, Any]:
+    """Analysis worker entry point for POST /analysis-runs/{run_id}/reanalyze."""
+    with run_timings():
+        try:
+            return _finish_run_timings(_run_reanalysis_pipeline(payload, progress))
+        except HTTPException as exc:
+            raise _job_error_from_http(exc)
+
+
+def _run_analysis_pipeline(payload: Dict[str, Any], progress: JobProgress) -> Dict[str, Any]:
+    """
+    ActionLab V14 – Full Pipeline (runs on an analysis worker)
+    """
+    run_id = payload["run_id"]
+    request_id = payload.get("request_id") or "-"
+    player_id = payload["player_id"]
+    hand = payload["hand"]
+    bowler_type = payload.get("bowler_type")
+    effective_age_group = payload.get("age_group")
+    effective_season = payload.get("season")
+    actor_obj = payload["actor"]
+    platform = payload.get("platform") or "unknown"
+    render_profile = payload.get("render_profile") or requested_render_profile(None, platform=platform)
+    video_temp_path = payload["video_path"]
+    cache_key = analysis_cache_key(payload.get("content_hash"), hand)
+
+    video = None
+    keep_video = False
+
+    try:
         # ------------------------------------------------------------
-        # Build Response
+        # Load Video
         # ------------------------------------------------------------
-        result = {
-            "run_id": run_id,
-            "schema": "actionlab.v14",
-            "input": {
-                "player_id": player_id,
-                "hand": hand,
-                "age_group": effective_age_group,
-                "season": effective_season,
-            },
-            "video": {
-                "fps": video.get("fps"),
-                "total_frames": video.get("total_frames"),
-            },
-            "events": events,
-            "elbow": elbow,
-            "estimated_release_speed": estimated_release_speed,
-            "action": action,
-            "risks": risks,
-            "basics": basics,
-            "interpretation": interpretation,
-            "clinician": clinician,
-            "deterministic_expert_v1": deterministic_expert,
-            "capture_quality_v1": deterministic_expert.get("capture_quality_v1"),
-            "mechanics_evidence_v1": deterministic_expert.get("mechanics_evidence_v1"),
-            "kinetic_chain_v1": deterministic_expert.get("kinetic_chain_v1"),
-            "render_reasoning_v1": deterministic_expert.get("render_reasoning_v1"),
-            "mechanism_explanation_v1": deterministic_expert.get("mechanism_explanation_v1"),
-            "prescription_plan_v1": deterministic_expert.get("prescription_plan_v1"),
-            "history_plan_v1": deterministic_expert.get("history_plan_v1"),
-            "coach_diagnosis_v1": deterministic_expert.get("coach_diagnosis_v1"),
-            "presentation_payload_v1": deterministic_expert.get("presentation_payload_v1"),
-            "frontend_surface_v1": deterministic_expert.get("frontend_surface_v1"),
-        }
-        result["visual_walkthrough"] = _build_walkthrough_render(
+        progress.stage("load_video")
+        prior_results = _load_prior_results(player_id)
+
+        with span("analysis_cache"):
+            cached = load_cached_analysis(cache_key)
+        if cached is not None:
+            # Byte-identical resubmission: reuse pose + pose-worker outputs.
+            video = {**cached.video, "path": video_temp_path}
+            pose_frames = cached.pose.as_pose_frames()
+            stages = cached.stages
+            logger.info(
+                f"[analyze:cache_hit] request_id={request_id} run_id={run_id} "
+                f"platform={platform} key={cache_key}"
+            )
+        else:
+            try:
+                with span("load_video"):
+                    video, pose_frames, _ = load_video_path(video_temp_path)
+            except RuntimeError:
+                raise HTTPException(
+                    status_code=400,
+                    detail={
+                        "code": "invalid_video",
+                        "message": (
+                            "Could not read uploaded video. Please upload a playable "
+                            "video file."
+                        ),
+                    },
+                )
+
+            temp_file_size = None
+            if video_temp_path and os.path.exists(video_temp_path):
+                try:
+                    temp_file_size = os.path.getsize(video_temp_path)
+                except Exception:
+                    temp_file_size = None
+
+            try:
+                fps_val = float(video.get("fps") or 0.0)
+            except Exception:
+                fps_val = 0.0
+
+            logger.info(
+                f"[analyze:video] request_id={request_id} run_id={run_id} "
+                f"platform={platform} "
+                f"fps={fps_val:.3f} width={video.get('width')} height={video.get('height')} "
+                f"frames={video.get('total_frames')} "
+                f"file_size_bytes={temp_file_size if temp_file_size is not None else '-'}"
+            )
+
+            progress.stage("screening")
+            with span("screening"):
+                screening = run_preanalysis_screen(
+                    video=video,
+                    pose_frames=pose_frames,
+                    hand=hand,
+                )
+            if not screening.get("passed"):
+                _reject_for_screening_failure(
+                    request_id=request_id,
+                    run_id=run_id,
+                    screening=screening,
+                )
+
+            stages = _run_pose_workers(
+                run_id=run_id,
+                request_id=request_id,
+                hand=hand,
+                platform=platform,
+                video=video,
+                pose_frames=pose_frames,
+                progress=progress,
+            )
+            with span("analysis_cache"):
+                _store_analysis_cache_best_effort(
+                    request_id=request_id,
+                    run_id=run_id,
+                    cache_key=cache_key,
+                    video=video,
+                    pose_frames=pose_frames,
+                    stages=stages,
+                )
+
+        # Carried into the pose artifact so later renders and re-analyses can hit the render cache.
+        video["content_hash"] = payload.get("content_hash")
+        with span("pose_artifact"):
+            pose_artifact = _save_pose_artifact_best_effort(
+                request_id=request_id,
+                run_id=run_id,
+                pose_frames=pose_frames,
+                video=video,
+            )
+
+        result = _build_analysis_result(
             run_id=run_id,
-            video=video,
-            pose_frames=pose_frames,
-            events=events,
+            player_id=player_id,
             hand=hand,
-            action=action,
-            elbow=elbow,
-            risks=risks,
-            estimated_release_speed=estimated_release_speed,
-            kinetic_chain=deterministic_expert.get("kinetic_chain_v1"),
-            report_story=_deterministic_render_story_context(deterministic_expert),
-            root_cause=((deterministic_expert.get("coach_diagnosis_v1") or {}).get("root_cause")),
+            bowler_type=bowler_type,
+            effective_age_group=effective_age_group,
+            effective_season=effective_season,
+            actor_obj=actor_obj,
+            video=video,
+            stages=stages,
+            prior_results=prior_results,
+            progress=progress,
         )
+        result["pose_artifact"] = pose_artifact
+        render_inputs = _walkthrough_render_inputs(result, hand=hand)
+        # The render worker rebuilds the pose from the artifact, so without one render inline.
+        queue_render = walkthrough_render_mode() == "queued" and bool(pose_artifact.get("available"))
+        if queue_render:
+            result["visual_walkthrough"] = _pending_walkthrough(run_id)
+        else:
+            progress.stage("render")
+            with span("render"):
+                result["visual_walkthrough"] = _with_walkthrough_status(
+                    _build_walkthrough_render(
+                        run_id=run_id,
+                        video=video,
+                        pose_frames=pose_frames,
+                        **render_inputs,
+                        render_profile=effective_render_profile(render_profile, backlog=progress.backlog()),
+                    )
+                )
+        result["timings_v1"] = _run_timing_breakdown(video)
 
         # ------------------------------------------------------------
         # Persist
         # ------------------------------------------------------------
-        persistence_status = _persist_analysis_result(
+        progress.stage("persist")
+        _persist_and_follow_up(
             request_id=request_id,
             run_id=run_id,
             result=result,
@@ -1108,40 +1709,500 @@ def analyze(
             effective_age_group=effective_age_group,
             effective_season=effective_season,
         )
-        if isinstance(persistence_status, dict) and persistence_status.get("persisted"):
-            background_tasks.add_task(
-                _persist_learning_case_best_effort,
-                request_id=request_id,
-                run_id=run_id,
-                result=result,
-                account_id=str(current_account.account_id),
-            )
-            background_tasks.add_task(
-                _sync_prescription_followups_best_effort,
-                request_id=request_id,
-                run_id=run_id,
-            )
-            background_tasks.add_task(
-                persist_analysis_completed_notification_best_effort,
-                account_id=str(current_account.account_id),
-                result=result,
+
+        if queue_render:
+            # The render job owns the temp video from here on and deletes it.
+            progress.follow_up(
+                RENDER_QUEUE,
+                _run_render_job,
+                {
+                    "run_id": run_id,
+                    "request_id": request_id,
+                    "account_id": actor_obj["account_id"],
+                    "video_path": video_temp_path,
+                    "pose_artifact": pose_artifact,
+                    "render_inputs": render_inputs,
+                    "render_profile": render_profile,
+                },
+                on_failure=_on_render_job_failed,
             )
+            keep_video = True
 
         logger.info(
             f"[analyze:success] request_id={request_id} run_id={run_id} "
-            f"player_id={player_id} risks={len(risks)}"
+            f"player_id={player_id} risks={len(result['risks'])} "
+            f"walkthrough={result['visual_walkthrough'].get('status')}"
         )
 
-        if video_temp_path:
-            background_tasks.add_task(_delete_temp_video_safely, video_temp_path)
-            cleanup_scheduled = True
-
         return result
     finally:
-        if video_temp_path and not cleanup_scheduled:
+        close_frame_provider(video)
+        if not keep_video:
             _delete_temp_video_safely(video_temp_path)
 
 
+
+
+def _run_reanalysis_pipeline(payload: Dict[str, Any], progress: JobProgress) -> Dict[str, Any]:
+    """
+    Re-run events, metrics, risks and the expert layers on a stored pose
+    artifact. No video is decoded and MediaPipe is not invoked, so the
+    walkthrough is only attached when the render cache already holds one
+    for the unchanged visual story.
+    """
+    run_id = payload["run_id"]
+    request_id = payload.get("request_id") or "-"
+    source_run_id = payload["source_run_id"]
+    player_id = payload["player_id"]
+    hand = payload["hand"]
+    bowler_type = payload.get("bowler_type")
+    effective_age_group = payload.get("age_group")
+    effective_season = payload.get("season")
+    actor_obj = payload["actor"]
+    pose_artifact = payload["pose_artifact"]
+
+    progress.stage("load_pose")
+    prior_results = _load_prior_results(player_id)
+    with span("load_pose"):
+        loaded = load_pose_artifact(pose_artifact.get("name") or "")
+    if loaded is None:
+        raise HTTPException(
+            status_code=409,
+            detail={
+                "code": "pose_artifact_missing",
+                "message": "Stored pose data for this run is no longer available. Please upload the clip again.",
+            },
+        )
+    pose, meta = loaded
+    video = {
+        "path": None,
+        "fps": meta.get("fps"),
+        "total_frames": meta.get("total_frames") or len(pose),
+        "width": meta.get("width"),
+        "height": meta.get("height"),
+        "pose_window": meta.get("pose_window"),
+        "content_hash": meta.get("content_hash"),
+    }
+    logger.info(
+        f"[reanalyze:pose] request_id={request_id} run_id={run_id} "
+        f"source_run_id={source_run_id} frames={len(pose)} fps={video.get('fps')}"
+    )
+
+    result = _analyze_pose_frames(
+        run_id=run_id,
+        request_id=request_id,
+        player_id=player_id,
+        hand=hand,
+        bowler_type=bowler_type,
+        effective_age_group=effective_age_group,
+        effective_season=effective_season,
+        actor_obj=actor_obj,
+        platform=payload.get("platform") or "unknown",
+        video=video,
+        pose_frames=pose.as_pose_frames(),
+        prior_results=prior_results,
+        progress=progress,
+    )
+    result["pose_artifact"] = pose_artifact
+    result["reanalysis_of"] = {
+        "run_id": source_run_id,
+        "pose_artifact_version": meta.get("version"),
+    }
+    render_profile = effective_render_profile(
+        requested_render_profile(payload.get("render_profile"), platform=payload.get("platform"))
+    )
+    cached_walkthrough = _cached_walkthrough_for_reanalysis(
+        run_id=run_id,
+        video=video,
+        pose_frames=pose,
+        render_inputs=_walkthrough_render_inputs(result, hand=hand),
+        render_profile=render_profile,
+    )
+    result["visual_walkthrough"] = _with_walkthrough_status(cached_walkthrough) if cached_walkthrough else {
+        "available": False,
+        "reason": "reanalysis_without_video",
+    }
+    result["timings_v1"] = _run_timing_breakdown(video)
+
+    progress.stage("persist")
+    _persist_and_follow_up(
+        request_id=request_id,
+        run_id=run_id,
+        result=result,
+        video=video,
+        bowler_type=bowler_type,
+        actor_obj=actor_obj,
+        effective_age_group=effective_age_group,
+        effective_season=effective_season,
+    )
+
+    logger.info(
+        f"[reanalyze:success] request_id={request_id} run_id={run_id} "
+        f"source_run_id={source_run_id} risks={len(result['risks'])}"
+    )
+    return result
+
+
+def _store_walkthrough_result(run_id: str, walkthrough: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Swap the stored result's pending walkthrough for the rendered one; returns the stored result."""
+    db = SessionLocal()
+    try:
+        raw = (
+            db.query(AnalysisResultRaw)
+            .filter(AnalysisResultRaw.run_id == uuid.UUID(str(run_id)))
+            .first()
+        )
+        if raw is None:
+            logger.warning("[render:result_missing] run_id=%s", run_id)
+            return None
+        # Reassign (not mutate) so the JSONB column is flagged dirty.
+        result_json = dict(raw.result_json or {})
+        result_json["visual_walkthrough"] = walkthrough
+        raw.result_json = result_json
+        db.commit()
+        return result_json
+    except Exception as exc:
+        db.rollback()
+        logger.error("[render:result_update_failed] run_id=%s error=%s", run_id, exc)
+        return None
+    finally:
+        db.close()
+
+
+def _render_walkthrough_for_run(payload: Dict[str, Any], progress: JobProgress) -> Dict[str, Any]:
+    run_id = payload["run_id"]
+    progress.stage("load_pose")
+    with span("load_pose"):
+        loaded = load_pose_artifact((payload.get("pose_artifact") or {}).get("name") or "")
+    if loaded is None:
+        logger.warning("[render:pose_artifact_missing] run_id=%s", run_id)
+        return {"available": False, "status": "failed", "reason": "pose_artifact_missing"}
+
+    pose, meta = loaded
+    video = {**meta, "path": payload.get("video_path")}
+    progress.stage("render")
+    try:
+        with span("render"):
+            return _with_walkthrough_status(
+                _build_walkthrough_render(
+                    run_id=run_id,
+                    video=video,
+                    pose_frames=pose,
+                    **payload["render_inputs"],
+                    # Checked when the job starts: a backed-up queue renders cheaper.
+                    render_profile=effective_render_profile(payload.get("render_profile"), backlog=progress.backlog()),
+                )
+            )
+    finally:
+        close_frame_provider(video)
+
+
+def _failed_walkthrough(reason: str) -> Dict[str, Any]:
+    return {"available": False, "status": "failed", "reason": reason}
+
+
+def _on_render_job_failed(payload: Dict[str, Any], error: Dict[str, Any]) -> None:
+    """
+    Render follow-up that was never submitted, crashed or lost its worker:
+    settle the stored walkthrough (it would otherwise stay pending) and drop
+    the temp upload the analysis job kept for it.
+    """
+    run_id = payload["run_id"]
+    reason = str((error or {}).get("code") or "render_failed")
+    _delete_temp_video_safely(payload.get("video_path"))
+    _store_walkthrough_result(run_id, _failed_walkthrough(reason))
+    logger.warning(
+        "[render:failed] request_id=%s run_id=%s reason=%s",
+        payload.get("request_id") or "-",
+        run_id,
+        reason,
+    )
+
+
+def _fail_lost_pending_walkthroughs() -> int:
+    """
+    Mark walkthroughs still pending at startup as failed. Queued render jobs
+    live in memory on the built-in backends, so after a restart nothing will
+    ever finish them.
+    """
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(AnalysisResultRaw)
+            .filter(AnalysisResultRaw.result_json[("visual_walkthrough", "status")].astext == "pending")
+            .all()
+        )
+        for raw in rows:
+            # Reassign (not mutate) so the JSONB column is flagged dirty.
+            result_json = dict(raw.result_json or {})
+            result_json["visual_walkthrough"] = _failed_walkthrough("render_job_lost")
+            raw.result_json = result_json
+        db.commit()
+        return len(rows)
+    except Exception as exc:
+        db.rollback()
+        logger.warning("[render:lost_pending_sweep_failed] error=%s", exc)
+        return 0
+    finally:
+        db.close()
+
+
+def _run_render_job(payload: Dict[str, Any], progress: JobProgress) -> Dict[str, Any]:
+    """
+    Render worker entry point: walkthrough for an analysis that has already
+    been returned and stored. Updates the stored result and notifies the
+    account when the video is ready.
+    """
+    run_id = payload["run_id"]
+    with run_timings() as timings:
+        try:
+            walkthrough = _render_walkthrough_for_run(payload, progress)
+        finally:
+            _delete_temp_video_safely(payload.get("video_path"))
+
+        progress.stage("persist")
+        with span("persist"):
+            stored = _store_walkthrough_result(run_id, walkthrough)
+        if walkthrough.get("available") and stored is not None:
+            persist_walkthrough_ready_notification_best_effort(
+                account_id=payload["account_id"],
+                result=stored,
+                walkthrough=walkthrough,
+            )
+        breakdown = timings.breakdown()
+
+    logger.info(
+        "[render:done] request_id=%s run_id=%s status=%s reason=%s total_ms=%s",
+        payload.get("request_id") or "-",
+        run_id,
+        walkthrough.get("status"),
+        walkthrough.get("reason") or "-",
+        breakdown.get("total_ms"),
+    )
+    return {"run_id": run_id, "visual_walkthrough": walkthrough, "timings_v1": breakdown}
+
+
+@app.post("/analysis-runs/{run_id}/reanalyze", status_code=202)
+def reanalyze_run(
+    run_id: str,
+    request: Request,
+    current_account=Depends(get_current_account),
+):
+    """
+    ActionLab V14 – Re-run analysis on a stored pose artifact
+
+    Queues a new run (new run_id) built from the source run's pose data;
+    poll GET /analysis-jobs/{run_id} as for /analyze.
+    """
+    request_id = getattr(request.state, "request_id", "-")
+    not_found = HTTPException(
+        status_code=404,
+        detail={
+            "code": "analysis_run_not_found",
+            "message": "Analysis run not found",
+        },
+    )
+    try:
+        source_uuid = uuid.UUID(str(run_id))
+    except ValueError:
+        raise not_found
+
+    db = SessionLocal()
+    try:
+        run = db.query(AnalysisRun).filter(AnalysisRun.run_id == source_uuid).first()
+        if run is None:
+            raise not_found
+        link = (
+            db.query(AccountPlayerLink)
+            .filter(
+                AccountPlayerLink.account_id == current_account.account_id,
+                AccountPlayerLink.player_id == run.player_id,
+            )
+            .first()
+        )
+        if not link:
+            raise HTTPException(
+                status_code=403,
+                detail="You do not have access to this player",
+            )
+        raw = db.query(AnalysisResultRaw).filter(AnalysisResultRaw.run_id == source_uuid).first()
+        source_result = dict(raw.result_json or {}) if raw is not None else {}
+        source_input = source_result.get("input") or {}
+        pose_artifact = source_result.get("pose_artifact") or {}
+        source_render_profile = (source_result.get("visual_walkthrough") or {}).get("render_profile")
+        hand = (run.handedness or source_input.get("hand") or "").upper()
+        bowler_type = source_input.get("bowler_type")
+        player_id = str(run.player_id)
+        effective_age_group = run.age_group
+        effective_season = run.season
+    finally:
+        db.close()
+
+    if not pose_artifact.get("available") or not pose_artifact.get("name"):
+        raise HTTPException(
+            status_code=409,
+            detail={
+                "code": "pose_artifact_missing",
+                "message": "This run has no stored pose data. Please upload the clip again.",
+            },
+        )
+
+    new_run_id = str(uuid.uuid4())
+    actor_obj = {
+        "account_id": str(current_account.account_id),
+        "role": current_account.role,
+    }
+    payload = {
+        "run_id": new_run_id,
+        "request_id": request_id,
+        "source_run_id": str(source_uuid),
+        "player_id": player_id,
+        "hand": hand,
+        "bowler_type": bowler_type,
+        "age_group": effective_age_group,
+        "season": effective_season,
+        "actor": actor_obj,
+        "platform": _platform_hint(request),
+        "pose_artifact": pose_artifact,
+        # The source run's walkthrough profile, so an unchanged story hits its render.
+        "render_profile": source_render_profile,
+    }
+    try:
+        job = get_analysis_job_queue().submit(
+            new_run_id,
+            _run_reanalysis_job,
+            payload,
+            owner_id=actor_obj["account_id"],
+        )
+    except JobQueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "code": "analysis_queue_full",
+                "message": "ActionLab is busy right now. Please retry in a minute.",
+            },
+        )
+
+    logger.info(
+        f"[reanalyze:queued] request_id={request_id} run_id={new_run_id} "
+        f"source_run_id={source_uuid} player_id={player_id}"
+    )
+    return {
+        "run_id": new_run_id,
+        "source_run_id": str(source_uuid),
+        "status": job.get("status"),
+        "stage": job.get("stage"),
+        "status_url": f"/analysis-jobs/{new_run_id}",
+    }
+
+
+@app.get("/metrics")
+def get_metrics(request: Request):
+    """
+    Prometheus text exposition: stage latency histograms, in-flight stages,
+    pose/render frames per second, job queue, tracker pool and cache gauges.
+    Set ACTIONLAB_METRICS_TOKEN to require "Authorization: Bearer <token>".
+    """
+    token = (os.getenv("ACTIONLAB_METRICS_TOKEN") or "").strip()
+    if token and _request_header(request, "authorization") != f"Bearer {token}":
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return Response(content=REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def _render_job_walkthrough(run_id: str, account_id: str) -> Optional[Dict[str, Any]]:
+    """Walkthrough state from the render queue, or None if it holds no job for this account."""
+    job = get_render_job_queue().get(run_id)
+    if job is None or str(job.get("owner_id")) != str(account_id):
+        return None
+    status = job.get("status")
+    if status == STATUS_SUCCEEDED:
+        return (job.get("result") or {}).get("visual_walkthrough")
+    if status == STATUS_FAILED:
+        return {"available": False, "status": "failed", "reason": "render_worker_failed"}
+    return {
+        **_pending_walkthrough(run_id),
+        "status": "rendering" if status == STATUS_RUNNING else "pending",
+    }
+
+
+@app.get("/analysis-jobs/{run_id}")
+def get_analysis_job(
+    run_id: str,
+    current_account=Depends(get_current_account),
+):
+    job = get_analysis_job_queue().get(run_id)
+    if job is None or str(job.get("owner_id")) != str(current_account.account_id):
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "code": "analysis_job_not_found",
+                "message": "Analysis job not found",
+            },
+        )
+    view = public_job_view(job)
+    result = view.get("result")
+    if isinstance(result, dict) and (result.get("visual_walkthrough") or {}).get("status") == "pending":
+        walkthrough = _render_job_walkthrough(run_id, current_account.account_id)
+        if walkthrough is not None:
+            view["result"] = {**result, "visual_walkthrough": walkthrough}
+    return view
+
+
+@app.get("/analysis-runs/{run_id}/walkthrough")
+def get_run_walkthrough(
+    run_id: str,
+    current_account=Depends(get_current_account),
+):
+    """
+    Walkthrough video state for a run: pending, rendering, ready or failed.
+    Poll after /analyze returns a result whose walkthrough is still pending;
+    a "walkthrough_ready" notification is also queued when it finishes.
+    """
+    walkthrough = _render_job_walkthrough(run_id, current_account.account_id)
+    if walkthrough is None:
+        walkthrough = _stored_walkthrough(run_id, current_account.account_id)
+    return {
+        "run_id": run_id,
+        "status": walkthrough.get("status") or ("ready" if walkthrough.get("available") else "failed"),
+        "visual_walkthrough": walkthrough,
+    }
+
+
+def _stored_walkthrough(run_id: str, account_id: str) -> Dict[str, Any]:
+    not_found = HTTPException(
+        status_code=404,
+        detail={
+            "code": "analysis_run_not_found",
+            "message": "Analysis run not found",
+        },
+    )
+    try:
+        run_uuid = uuid.UUID(str(run_id))
+    except ValueError:
+        raise not_found
+
+    db = SessionLocal()
+    try:
+        run = db.query(AnalysisRun).filter(AnalysisRun.run_id == run_uuid).first()
+        if run is None:
+            raise not_found
+        link = (
+            db.query(AccountPlayerLink)
+            .filter(
+                AccountPlayerLink.account_id == account_id,
+                AccountPlayerLink.player_id == run.player_id,
+            )
+            .first()
+        )
+        if not link:
+            raise not_found
+        raw = db.query(AnalysisResultRaw).filter(AnalysisResultRaw.run_id == run_uuid).first()
+        walkthrough = ((raw.result_json or {}) if raw is not None else {}).get("visual_walkthrough")
+    finally:
+        db.close()
+    return dict(walkthrough or {"available": False, "reason": "walkthrough_not_recorded"})
+
+
 # ------------------------------------------------------------
 # Routers
 # ------------------------------------------------------------
@@ -0,0 +1,88 @@
+"""
+Walkthrough MP4 delivery for GET /renders/{filename}.
+
+Renders are streamed in ACTIONLAB_RENDER_STREAM_CHUNK_KB pieces from the
+render bucket (ranged reads) or the local render dir, so each viewer holds
+one chunk of API memory instead of the whole file.
+
+- Range: a single "bytes=" range gets 206 + Content-Range (iOS players
+  scrub this way); an unsatisfiable one gets 416; multi-range requests get
+  the full body
+- ETag / If-None-Match: 304 when the client already holds this artifact
+- ACTIONLAB_RENDER_SIGNED_URL_TTL_SECONDS > 0: bucket renders redirect (307)
+  to a V4 signed URL instead of streaming through the API
+"""
+
+from __future__ import annotations
+
+from typing import Any, Mapping, Optional, Tuple
+
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
+
+from app.workers.render.render_storage import RenderArtifact, iter_render_artifact, signed_render_url
+
+RENDER_MEDIA_TYPE = "video/mp4"
+
+
+class _Unsatisfiable(Exception):
+    pass
+
+
+def parse_byte_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Inclusive (start, end) for a single-range header, None for the full body.
+
+    Raises _Unsatisfiable when the range lies outside the artifact.
+    """
+    value = (header or "").strip()
+    if not value.lower().startswith("bytes=") or "," in value:
+        return None
+    first, sep, last = value[6:].strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if not first.strip():
+            suffix = int(last)
+            if suffix <= 0 or size <= 0:
+                raise _Unsatisfiable(value)
+            return max(0, size - suffix), size - 1
+        start = int(first)
+        end = int(last) if last.strip() else size - 1
+    except ValueError:
+        return None
+    if start >= size:
+        raise _Unsatisfiable(value)
+    if start < 0 or end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    tags = [tag.strip() for tag in (header or "").split(",") if tag.strip()]
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+def render_artifact_response(artifact: RenderArtifact, headers: Mapping[str, Any]) -> Response:
+    signed_url = signed_render_url(artifact)
+    if signed_url:
+        return RedirectResponse(signed_url, status_code=307)
+
+    base_headers = {"Accept-Ranges": "bytes", "ETag": artifact.etag}
+    if _etag_matches(headers.get("if-none-match"), artifact.etag):
+        return Response(status_code=304, headers=base_headers)
+    try:
+        byte_range = parse_byte_range(headers.get("range"), artifact.size)
+    except _Unsatisfiable:
+        return Response(status_code=416, headers={**base_headers, "Content-Range": f"bytes */{artifact.size}"})
+
+    if byte_range is None:
+        start, end, status = 0, artifact.size - 1, 200
+    else:
+        (start, end), status = byte_range, 206
+        base_headers["Content-Range"] = f"bytes {start}-{end}/{artifact.size}"
+    base_headers["Content-Length"] = str(max(0, end - start + 1))
+    return StreamingResponse(
+        iter_render_artifact(artifact, start, end),
+        status_code=status,
+        media_type=RENDER_MEDIA_TYPE,
+        headers=base_headers,
+    )
@@ -0,0 +1,9 @@
+ALTER TABLE notification_event
+    DROP CONSTRAINT IF EXISTS ck_notification_event_type;
+
+ALTER TABLE notification_event
+    DROP CONSTRAINT IF EXISTS notification_event_event_type_check;
+
+ALTER TABLE notification_event
+    ADD CONSTRAINT ck_notification_event_type
+    CHECK (event_type IN ('analysis_completed','analysis_failed','profile_country_required','walkthrough_ready'));
@@ -980,7 +980,7 @@ class NotificationEvent(Base):
 
     __table_args__ = (
         CheckConstraint(
-            "event_type IN ('analysis_completed','analysis_failed','profile_country_required')",
+            "event_type IN ('analysis_completed','analysis_failed','profile_country_required','walkthrough_ready')",
             name="ck_notification_event_type",
         ),
         CheckConstraint(
@@ -99,6 +99,43 @@ def create_analysis_completed_notification(
         result=result,
         db=db,
     )
+    return _create_notification_event(
+        account_id=account_id,
+        event_type="analysis_completed",
+        payload=payload,
+        db=db,
+    )
+
+
+def create_walkthrough_ready_notification(
+    *,
+    account_id: str,
+    result: Dict[str, Any],
+    walkthrough: Dict[str, Any],
+    db: Session,
+) -> NotificationEvent:
+    payload = build_analysis_completed_payload(
+        account_id=account_id,
+        result=result,
+        db=db,
+    )
+    payload["type"] = "walkthrough_ready"
+    payload["walkthrough_url"] = _clean_text(walkthrough.get("relative_url"))
+    return _create_notification_event(
+        account_id=account_id,
+        event_type="walkthrough_ready",
+        payload=payload,
+        db=db,
+    )
+
+
+def _create_notification_event(
+    *,
+    account_id: str,
+    event_type: str,
+    payload: Dict[str, Any],
+    db: Session,
+) -> NotificationEvent:
     active_device_count = (
         db.query(DeviceRegistration)
         .filter(
@@ -111,7 +148,7 @@ def create_analysis_completed_notification(
     event = NotificationEvent(
         notification_event_id=uuid.uuid4(),
         account_id=uuid.UUID(str(account_id)),
-        event_type="analysis_completed",
+        event_type=event_type,
         status="PENDING" if active_device_count > 0 else "SKIPPED_NO_DEVICE",
         active_device_count=active_device_count,
         payload_json=payload,
@@ -149,6 +186,32 @@ def persist_analysis_completed_notification_best_effort(
         db.close()
 
 
+def persist_walkthrough_ready_notification_best_effort(
+    *,
+    account_id: str,
+    result: Dict[str, Any],
+    walkthrough: Dict[str, Any],
+) -> None:
+    db = SessionLocal()
+    try:
+        create_walkthrough_ready_notification(
+            account_id=account_id,
+            result=result,
+            walkthrough=walkthrough,
+            db=db,
+        )
+        db.commit()
+    except Exception as exc:
+        db.rollback()
+        logger.error(
+            "[notification] account_id=%s event_type=walkthrough_ready persisted=false error=%s",
+            account_id,
+            exc,
+        )
+    finally:
+        db.close()
+
+
 def build_analysis_completed_payload(
     *,
     account_id: str,
@@ -2,6 +2,7 @@ import os
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
+from app.common.env import env_int
 from app.common.logger import get_logger
 
 DEFAULT_LOCAL_DB_URL = "postgresql+psycopg2://actionlab@localhost/actionlab"
@@ -24,17 +25,6 @@ DATABASE_URL = (
 )
 
 
-def _env_int(name: str, default: int) -> int:
-    raw = os.getenv(name)
-    if raw is None or not str(raw).strip():
-        return int(default)
-    try:
-        value = int(str(raw).strip())
-    except Exception:
-        logger.warning("[db] Invalid %s=%r; using default=%s", name, raw, default)
-        return int(default)
-    return max(0, value)
-
 if not _EXPLICIT_DATABASE_URL:
     logger.warning(
         "[db] No explicit ACTIONLAB_LOCAL_DB_URL/ACTIONLAB_DB_URL set; using local fallback %s",
@@ -45,10 +35,10 @@ engine = create_engine(
     DATABASE_URL,
     echo=False,
     pool_pre_ping=True,
-    pool_size=_env_int("ACTIONLAB_DB_POOL_SIZE", 10),
-    max_overflow=_env_int("ACTIONLAB_DB_MAX_OVERFLOW", 20),
-    pool_timeout=_env_int("ACTIONLAB_DB_POOL_TIMEOUT_SECONDS", 30),
-    pool_recycle=_env_int("ACTIONLAB_DB_POOL_RECYCLE_SECONDS", 1800),
+    pool_size=env_int("ACTIONLAB_DB_POOL_SIZE", 10),
+    max_overflow=env_int("ACTIONLAB_DB_MAX_OVERFLOW", 20),
+    pool_timeout=env_int("ACTIONLAB_DB_POOL_TIMEOUT_SECONDS", 30),
+    pool_recycle=env_int("ACTIONLAB_DB_POOL_RECYCLE_SECONDS", 1800),
 )
 
 SessionLocal = sessionmaker(
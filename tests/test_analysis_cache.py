@@ -0,0 +1,117 @@
+import hashlib
+import os
+import tempfile
+import unittest
+from io import BytesIO
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+
+from app.io.loader import save_upload
+from app.orchestrator import analysis_cache
+from app.workers.pose.pose_sequence import NUM_LANDMARKS, PoseSequence
+
+
+def _pose(total: int = 12) -> PoseSequence:
+    data = np.linspace(0.0, 1.0, total * NUM_LANDMARKS * 4, dtype=np.float32).reshape(total, NUM_LANDMARKS, 4)
+    return PoseSequence(data, np.ones(total, dtype=bool))
+
+
+def _stages():
+    return {
+        "events": {"release": {"frame": np.int64(9), "confidence": np.float64(0.8)}, "delivery_window": (2, 11)},
+        "action": {"action": "semi_open"},
+        "risks": [{"risk_id": "knee_brace_failure", "signal_strength": 0.4}],
+        "basics": {},
+        "interpretation": {},
+        "elbow": {"verdict": "legal"},
+        "estimated_release_speed": {"available": False},
+    }
+
+
+class AnalysisCacheTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._env = patch.dict(
+            os.environ,
+            {"ACTIONLAB_ANALYSIS_CACHE_DIR": self._tmp.name, "ACTIONLAB_ANALYSIS_CACHE_MAX_MB": "64"},
+        )
+        self._env.start()
+
+    def tearDown(self):
+        self._env.stop()
+        self._tmp.cleanup()
+
+    def test_save_upload_hashes_while_copying(self):
+        body = os.urandom(3 * 1024 * 1024 + 17)
+        path, digest = save_upload(SimpleNamespace(file=BytesIO(body)))
+        try:
+            with open(path, "rb") as handle:
+                self.assertEqual(handle.read(), body)
+            self.assertEqual(digest, hashlib.sha256(body).hexdigest())
+        finally:
+            os.remove(path)
+
+    def test_key_covers_hand_and_pipeline_version(self):
+        digest = "ab" * 32
+
+        self.assertNotEqual(
+            analysis_cache.analysis_cache_key(digest, "R"),
+            analysis_cache.analysis_cache_key(digest, "L"),
+        )
+        self.assertIn(analysis_cache.ANALYSIS_PIPELINE_VERSION, analysis_cache.analysis_cache_key(digest, "r"))
+        self.assertIsNone(analysis_cache.analysis_cache_key("../etc", "R"))
+        with patch.dict(os.environ, {"ACTIONLAB_ANALYSIS_CACHE_MAX_MB": "0"}):
+            self.assertIsNone(analysis_cache.analysis_cache_key(digest, "R"))
+
+    def test_store_then_hit_returns_stage_outputs(self):
+        key = analysis_cache.analysis_cache_key("cd" * 32, "R")
+        video = {"fps": 30.0, "total_frames": 12, "width": 640, "height": 360, "path": "/tmp/a.mp4"}
+
+        self.assertIsNone(analysis_cache.load_cached_analysis(key))
+        self.assertTrue(
+            analysis_cache.store_cached_analysis(key, video=video, pose_frames=_pose().as_pose_frames(), stages=_stages())
+        )
+        cached = analysis_cache.load_cached_analysis(key)
+
+        self.assertIsNotNone(cached)
+        self.assertNotIn("path", cached.video)
+        self.assertEqual(cached.video["fps"], 30.0)
+        self.assertEqual(cached.stages["events"]["release"]["frame"], 9)
+        self.assertEqual(cached.stages["risks"][0]["risk_id"], "knee_brace_failure")
+        np.testing.assert_allclose(cached.pose.data, _pose().data, atol=1e-3)
+
+    def test_run_with_a_timed_out_risk_is_not_cached(self):
+        from app.orchestrator import orchestrator
+
+        key = analysis_cache.analysis_cache_key("ef" * 32, "R")
+        store = dict(request_id="req-1", run_id="run-1", cache_key=key, video={"fps": 30.0}, pose_frames=_pose())
+
+        degraded = {**_stages(), "risk_timeouts": ["knee_brace_failure"]}
+        self.assertFalse(orchestrator._store_analysis_cache_best_effort(stages=degraded, **store))
+        self.assertIsNone(analysis_cache.load_cached_analysis(key))
+
+        self.assertTrue(orchestrator._store_analysis_cache_best_effort(stages={**_stages(), "risk_timeouts": []}, **store))
+        self.assertIsNotNone(analysis_cache.load_cached_analysis(key))
+
+    def test_eviction_drops_least_recently_used_entries(self):
+        keys = [analysis_cache.analysis_cache_key(f"{i:02d}" * 32, "R") for i in range(3)]
+        for offset, key in enumerate(keys):
+            analysis_cache.store_cached_analysis(key, video={"fps": 30.0}, pose_frames=_pose(), stages=_stages())
+            entry = os.path.join(self._tmp.name, key)
+            os.utime(entry, (1_000_000 + offset, 1_000_000 + offset))
+        # Touch the oldest entry so the middle one becomes least recently used.
+        analysis_cache.load_cached_analysis(keys[0])
+        sizes = [analysis_cache._entry_size(os.path.join(self._tmp.name, key)) for key in keys]
+
+        outcome = analysis_cache.evict_analysis_cache(max_bytes=sizes[0] + sizes[2])
+
+        self.assertEqual(outcome["evicted"], 1)
+        self.assertIsNone(analysis_cache.load_cached_analysis(keys[1]))
+        self.assertIsNotNone(analysis_cache.load_cached_analysis(keys[0]))
+        self.assertIsNotNone(analysis_cache.load_cached_analysis(keys[2]))
+
+
+if __name__ == "__main__":
+    unittest.main()
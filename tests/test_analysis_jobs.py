@@ -0,0 +1,263 @@
+import os
+import threading
+import unittest
+from concurrent.futures import Future
+from io import BytesIO
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from fastapi import HTTPException
+
+from app.orchestrator.analysis_jobs import (
+    RENDER_QUEUE,
+    AnalysisJobError,
+    InProcessJobBackend,
+    JobQueueFull,
+    public_job_view,
+)
+
+os.environ.setdefault("ACTIONLAB_AUTO_CREATE_SCHEMA", "false")
+
+
+def _query_chain(first_return=None):
+    query = MagicMock()
+    query.filter.return_value = query
+    query.first.return_value = first_return
+    return query
+
+
+class InProcessJobBackendTests(unittest.TestCase):
+    def setUp(self):
+        self.backend = InProcessJobBackend(max_workers=1, queue_limit=1)
+
+    def tearDown(self):
+        self.backend.shutdown(wait=True)
+
+    def test_job_reports_stages_and_result(self):
+        seen = []
+
+        def runner(payload, progress):
+            progress.stage("load_video")
+            progress.stage("events")
+            seen.append(self.backend.get("run-1"))
+            return {"run_id": payload["run_id"], "ok": True}
+
+        queued = self.backend.submit("run-1", runner, {"run_id": "run-1"}, owner_id="acc-1")
+        self.backend.shutdown(wait=True)
+        job = self.backend.get("run-1")
+
+        self.assertEqual(queued["status"], "queued")
+        self.assertEqual(seen[0]["status"], "running")
+        self.assertEqual(seen[0]["stage"], "events")
+        self.assertEqual(seen[0]["stages_completed"], ["load_video"])
+        self.assertEqual(job["status"], "succeeded")
+        self.assertEqual(job["progress"], 1.0)
+        self.assertEqual(public_job_view(job)["result"], {"run_id": "run-1", "ok": True})
+        self.assertNotIn("owner_id", public_job_view(job))
+
+    def test_expected_failure_is_recorded_on_the_job(self):
+        def runner(payload, progress):
+            raise AnalysisJobError("invalid_video", "Could not read uploaded video.")
+
+        self.backend.submit("run-2", runner, {}, owner_id="acc-1")
+        self.backend.shutdown(wait=True)
+        job = self.backend.get("run-2")
+
+        self.assertEqual(job["status"], "failed")
+        self.assertEqual(job["error"]["code"], "invalid_video")
+        self.assertNotIn("result", public_job_view(job))
+
+    def test_submit_rejects_when_pool_and_queue_are_full(self):
+        release = threading.Event()
+
+        def runner(payload, progress):
+            release.wait(5)
+            return {}
+
+        self.backend.submit("run-a", runner, {})
+        self.backend.submit("run-b", runner, {})
+        with self.assertRaises(JobQueueFull):
+            self.backend.submit("run-c", runner, {})
+        release.set()
+
+
+class FollowUpJobTests(unittest.TestCase):
+    def setUp(self):
+        self.analysis = InProcessJobBackend(max_workers=1, queue_limit=1)
+        self.render = InProcessJobBackend(max_workers=1, queue_limit=1, queue_name=RENDER_QUEUE)
+
+    def tearDown(self):
+        self.analysis.shutdown(wait=True)
+        self.render.shutdown(wait=True)
+
+    def test_follow_up_runs_on_named_queue_after_success(self):
+        def render_runner(payload, progress):
+            progress.stage("render")
+            return {"rendered": payload["clip"]}
+
+        def runner(payload, progress):
+            progress.follow_up(RENDER_QUEUE, render_runner, {"clip": "a.mp4"})
+            return {"ok": True}
+
+        with patch("app.orchestrator.analysis_jobs.get_job_queue", return_value=self.render):
+            self.analysis.submit("run-f", runner, {}, owner_id="acc-1")
+            self.analysis.shutdown(wait=True)
+        self.render.shutdown(wait=True)
+
+        job = self.analysis.get("run-f")
+        render_job = self.render.get("run-f")
+        self.assertNotIn("follow_ups", public_job_view(job))
+        self.assertEqual(render_job["status"], "succeeded")
+        self.assertEqual(render_job["owner_id"], "acc-1")
+        self.assertEqual(render_job["result"], {"rendered": "a.mp4"})
+        self.assertEqual(self.render.stats()["queue"], RENDER_QUEUE)
+
+    def test_follow_up_is_dropped_when_job_fails(self):
+        def runner(payload, progress):
+            progress.follow_up(RENDER_QUEUE, lambda p, g: {}, {})
+            raise AnalysisJobError("invalid_video", "Could not read uploaded video.")
+
+        with patch("app.orchestrator.analysis_jobs.get_job_queue", return_value=self.render):
+            self.analysis.submit("run-g", runner, {})
+            self.analysis.shutdown(wait=True)
+
+        self.assertIsNone(self.render.get("run-g"))
+
+    def test_failed_follow_up_job_runs_its_failure_hook(self):
+        failures = []
+
+        def render_runner(payload, progress):
+            raise RuntimeError("encoder crashed")
+
+        def runner(payload, progress):
+            progress.follow_up(
+                RENDER_QUEUE,
+                render_runner,
+                {"clip": "a.mp4"},
+                on_failure=lambda p, error: failures.append((p, error["code"])),
+            )
+            return {"ok": True}
+
+        with patch("app.orchestrator.analysis_jobs.get_job_queue", return_value=self.render):
+            self.analysis.submit("run-h", runner, {})
+            self.analysis.shutdown(wait=True)
+        self.render.shutdown(wait=True)
+
+        self.assertEqual(self.render.get("run-h")["status"], "failed")
+        self.assertEqual(failures, [({"clip": "a.mp4"}, "analysis_failed")])
+
+    def test_follow_up_that_cannot_be_submitted_runs_its_failure_hook(self):
+        failures = []
+        broken = MagicMock()
+        broken.submit.side_effect = RuntimeError("render queue gone")
+
+        def runner(payload, progress):
+            progress.follow_up(RENDER_QUEUE, lambda p, g: {}, {"clip": "b.mp4"}, on_failure=lambda p, e: failures.append(e))
+            return {"ok": True}
+
+        with patch("app.orchestrator.analysis_jobs.get_job_queue", return_value=broken):
+            self.analysis.submit("run-i", runner, {})
+            self.analysis.shutdown(wait=True)
+
+        self.assertEqual([error["code"] for error in failures], ["follow_up_submit_failed"])
+
+    def test_lost_worker_runs_the_failure_hook(self):
+        failures = []
+        release = threading.Event()
+        self.render.submit("run-j", lambda p, g: release.wait(5) and {}, {"clip": "c.mp4"}, on_failure=lambda p, e: failures.append(e))
+        lost = Future()
+        lost.set_exception(RuntimeError("worker process died"))
+
+        self.render._on_done("run-j", lost)
+        release.set()
+
+        self.assertEqual(self.render.get("run-j")["status"], "failed")
+        self.assertEqual([error["code"] for error in failures], ["analysis_worker_lost"])
+
+    def test_follow_up_bypasses_the_queue_limit(self):
+        release = threading.Event()
+
+        def runner(payload, progress):
+            release.wait(5)
+            return {}
+
+        self.render.submit("run-x", runner, {})
+        self.render.submit("run-y", runner, {})
+        self.render.submit("run-z", runner, {}, enforce_limit=False)
+        release.set()
+        self.render.shutdown(wait=True)
+
+        self.assertEqual(self.render.get("run-z")["status"], "succeeded")
+
+
+class AnalyzeSubmitTests(unittest.TestCase):
+    def test_analyze_queues_job_and_returns_run_id(self):
+        from app.orchestrator.orchestrator import analyze, get_analysis_job
+
+        request = SimpleNamespace(state=SimpleNamespace(request_id="req-1"), headers={})
+        upload = SimpleNamespace(content_type="video/mp4", file=BytesIO(b"fake-video"))
+        account = SimpleNamespace(account_id="acc-1", role="COACH")
+        db = MagicMock()
+        db.query.side_effect = [
+            _query_chain(first_return=SimpleNamespace()),
+            _query_chain(first_return=SimpleNamespace(handedness="R", age_group="U16", season=2026)),
+        ]
+        queue = MagicMock()
+        queue.submit.return_value = {"status": "queued", "stage": "queued"}
+
+        with patch("app.orchestrator.orchestrator.SessionLocal", return_value=db), patch(
+            "app.orchestrator.orchestrator.save_upload",
+            return_value=("/tmp/staged.mp4", "ab" * 32),
+        ), patch("app.orchestrator.orchestrator.get_analysis_job_queue", return_value=queue):
+            response = analyze(
+                request=request,
+                file=upload,
+                player_id="player-1",
+                bowler_type="pace",
+                age_group=None,
+                season=None,
+                actor=None,
+                render_profile=None,
+                current_account=account,
+            )
+            queue.get.return_value = {"run_id": response["run_id"], "owner_id": "acc-2", "status": "queued"}
+            with self.assertRaises(HTTPException) as context:
+                get_analysis_job(response["run_id"], current_account=account)
+
+        run_id, _, payload = queue.submit.call_args.args
+        self.assertEqual(response["status"], "queued")
+        self.assertEqual(response["status_url"], f"/analysis-jobs/{run_id}")
+        self.assertEqual(payload["video_path"], "/tmp/staged.mp4")
+        self.assertEqual(payload["content_hash"], "ab" * 32)
+        self.assertEqual(payload["hand"], "R")
+        self.assertEqual(payload["render_profile"], "full")
+        self.assertEqual(queue.submit.call_args.kwargs["owner_id"], "acc-1")
+        self.assertEqual(context.exception.status_code, 404)
+
+    def test_analyze_rejects_unknown_render_profile(self):
+        from app.orchestrator.orchestrator import analyze
+
+        request = SimpleNamespace(state=SimpleNamespace(request_id="req-2"), headers={})
+        upload = SimpleNamespace(content_type="video/mp4", file=BytesIO(b"fake-video"))
+        account = SimpleNamespace(account_id="acc-1", role="COACH")
+
+        with patch("app.orchestrator.orchestrator.SessionLocal") as session, self.assertRaises(HTTPException) as context:
+            analyze(
+                request=request,
+                file=upload,
+                player_id="player-1",
+                bowler_type=None,
+                age_group=None,
+                season=None,
+                actor=None,
+                render_profile="8k",
+                current_account=account,
+            )
+
+        self.assertEqual(context.exception.status_code, 400)
+        self.assertEqual(context.exception.detail["code"], "invalid_render_profile")
+        session.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,6 @@
+import json
 import os
+import sys
 import tempfile
 import unittest
 from unittest import mock
@@ -9,6 +11,8 @@ from PIL import Image, ImageDraw
 
 from app.workers.render import coach_video_renderer
 from app.workers.render.coach_video_renderer import (
+    X264Settings,
+    default_x264_settings,
     _draw_phase_anchor_panel,
     _draw_phase_overlay,
     _draw_body_pay_phase,
@@ -33,7 +37,9 @@ from app.workers.render.coach_video_renderer import (
 )
 from app.workers.render.coach_video_renderer_parts.drawing_base import (
     _draw_skeleton_legend,
+    _edge_layers,
 )
+from app.workers.render.coach_video_renderer_parts.shared import SKELETON_COLOR, SKELETON_SHADOW
 from app.workers.render.coach_video_renderer_parts.bubble_base import (
     _story_card_layout,
 )
@@ -49,6 +55,9 @@ from app.workers.render.coach_video_renderer_parts.themed_story import (
 from app.workers.render.coach_video_renderer_parts.render_pause_sequence import (
     _write_stage_frames,
 )
+from app.workers.render.coach_video_renderer_parts import font_utils, pil_context
+from app.workers.render.coach_video_renderer_parts import tracks as render_tracks
+from app.workers.render.coach_video_renderer_parts.drawing_base import _apply_bottom_scrim, _overlay_panel
 from app.workers.render.render_load_watch import (
     _load_hotspot_regions,
     _preferred_ffc_cue_risk_id,
@@ -132,6 +141,85 @@ class CoachVideoRendererTest(unittest.TestCase):
 
         self.assertGreater(int(frame.sum()), 0)
 
+    def test_overlay_sprite_blend_matches_pil_alpha_composite(self):
+        rng = np.random.default_rng(3)
+        frame = rng.integers(0, 256, size=(90, 120, 3), dtype=np.uint8)
+        overlay = Image.new("RGBA", (120, 90), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(overlay)
+        draw.rounded_rectangle((10, 12, 70, 50), radius=6, fill=(20, 200, 90, 180), outline=(255, 255, 255, 60))
+        draw.line((5, 80, 110, 60), fill=(255, 255, 255, 150), width=3)
+        base = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)).convert("RGBA")
+        expected = cv2.cvtColor(np.array(Image.alpha_composite(base, overlay).convert("RGB")), cv2.COLOR_RGB2BGR)
+
+        sprite = pil_context._sprite_from_overlay(overlay)
+        pil_context._blend_sprite(frame, sprite)
+
+        self.assertLess(sprite.keep.size, 120 * 90)
+        self.assertLessEqual(int(np.abs(frame.astype(int) - expected.astype(int)).max()), 1)
+
+    def test_cached_layer_matches_direct_opencv_drawing(self):
+        rng = np.random.default_rng(5)
+        frame = rng.integers(0, 256, size=(120, 160, 3), dtype=np.uint8)
+        expected = frame.copy()
+
+        def paint(canvas):
+            _apply_bottom_scrim(canvas, start_y=80, max_alpha=0.55)
+            _overlay_panel(canvas, x0=20, y0=90, x1=70, y1=110, fill_color=(74, 194, 242), edge_color=(105, 222, 255), alpha=0.72)
+
+        paint(expected)
+        pil_context._clear_sprite_cache()
+        with mock.patch.object(pil_context, "_sprite_from_layer", wraps=pil_context._sprite_from_layer) as build:
+            for _ in range(3):
+                drawn = frame.copy()
+                pil_context._draw_cached_layer(drawn, ("test_layer",), paint)
+        pil_context._clear_sprite_cache()
+
+        self.assertEqual(build.call_count, 1)
+        self.assertLessEqual(int(np.abs(drawn.astype(int) - expected.astype(int)).max()), 2)
+
+    def test_sprite_cache_is_bounded_in_bytes(self):
+        def fill(canvas):
+            canvas[:] = (40, 80, 120)
+
+        pil_context._clear_sprite_cache()
+        try:
+            with mock.patch.dict(os.environ, {pil_context.SPRITE_CACHE_MB_ENV: "1"}):
+                for idx in range(3):
+                    pil_context._draw_cached_layer(np.zeros((200, 200, 3), dtype=np.uint8), ("fill", idx), fill)
+                cached = list(pil_context._sprite_cache)
+                used = pil_context._sprite_cache_used
+                pil_context._draw_cached_layer(np.zeros((400, 400, 3), dtype=np.uint8), ("too_big",), fill)
+                self.assertEqual(list(pil_context._sprite_cache), cached)
+        finally:
+            pil_context._clear_sprite_cache()
+
+        self.assertEqual([key[-1] for key in cached], [("fill", 2)])
+        self.assertEqual(used, 200 * 200 * 16)
+        self.assertEqual(pil_context._sprite_cache_used, 0)
+
+    def test_phase_rail_reuses_sprites_across_frames(self):
+        pil_context._clear_sprite_cache()
+        frames = [np.full((240, 320, 3), 90, dtype=np.uint8) for _ in range(3)]
+        with mock.patch.object(pil_context, "_sprite_from_overlay", wraps=pil_context._sprite_from_overlay) as build:
+            for idx, frame in enumerate(frames):
+                _draw_phase_overlay(frame, frame_idx=idx, start=0, stop=30, events=None)
+        pil_context._clear_sprite_cache()
+
+        self.assertEqual(build.call_count, 1)
+        self.assertTrue(np.array_equal(frames[0][:200], frames[2][:200]))
+        self.assertFalse(np.array_equal(frames[0], np.full_like(frames[0], 90)))
+
+    def test_text_metrics_are_measured_once_per_font_and_text(self):
+        font = object()
+        draw = mock.Mock(fontmode="L")
+        draw.textbbox.return_value = (0, 2, 40, 14)
+        sizes = [font_utils._pil_text_size(draw, "Front knee", font) for _ in range(3)]
+        other = font_utils._pil_text_size(draw, "Back knee", font)
+
+        self.assertEqual(sizes, [(40, 12)] * 3)
+        self.assertEqual(other, (40, 12))
+        self.assertEqual(draw.textbbox.call_count, 2)
+
     def test_pause_hold_plan_gives_hotspots_extra_read_time(self):
         normal_cue, normal_hotspot = _pause_hold_plan(
             pause_frames=10,
@@ -206,13 +294,16 @@ class CoachVideoRendererTest(unittest.TestCase):
 
         written, final_frame = _write_stage_frames(
             writer=writer,
-            stage_frames=[current.copy() for _ in range(4)],
+            stage_frames=[(current, 10)],
             previous_frame=previous,
             fps=24.0,
         )
 
-        self.assertEqual(written, 4)
+        self.assertEqual(written, 10)
         self.assertIsNotNone(final_frame)
+        # Three crossfade frames, then the rest of the stage as a single held frame.
+        self.assertEqual(writer.write.call_count, 4)
+        self.assertEqual(writer.write.call_args_list[-1].kwargs, {"repeat": 7})
         first_written = writer.write.call_args_list[0].args[0]
         self.assertGreater(int(first_written.sum()), int(previous.sum()))
         self.assertLess(int(first_written.sum()), int(current.sum()))
@@ -432,6 +523,86 @@ class CoachVideoRendererTest(unittest.TestCase):
         self.assertIn(selected, {1, 3})
         self.assertLessEqual(selected, 3)
 
+    def test_smoothed_tracks_match_per_joint_interpolation_and_smoothing(self):
+        pose_frames = [_pose_frame(i, shift=0.013 * i) for i in range(12)]
+        for frame_idx in (0, 4, 5, 11):
+            pose_frames[frame_idx]["landmarks"][25]["visibility"] = 0.0
+        for frame_idx in range(10):
+            pose_frames[frame_idx]["landmarks"][27]["visibility"] = 0.0
+        sigma = max(1.0, 24.0 * 0.03)
+
+        tracks = coach_video_renderer._build_smoothed_tracks(pose_frames, width=160, height=120, fps=24.0)
+
+        for joint_idx in (11, 25):
+            raw = [
+                coach_video_renderer._point_from_landmarks(frame["landmarks"], joint_idx, width=160, height=120)
+                for frame in pose_frames
+            ]
+            self.assertEqual(tracks[joint_idx]["raw"], raw)
+            expected_xs = coach_video_renderer._smooth_series([p[0] if p else None for p in raw], sigma=sigma)
+            expected_ys = coach_video_renderer._smooth_series([p[1] if p else None for p in raw], sigma=sigma)
+            np.testing.assert_array_equal(tracks[joint_idx]["xs"], expected_xs)
+            np.testing.assert_array_equal(tracks[joint_idx]["ys"], expected_ys)
+        # Two samples are not enough to smooth: the joint only shows where it was seen.
+        self.assertIsNone(tracks[27]["xs"])
+        self.assertIsNone(coach_video_renderer._track_point(tracks, 27, 3))
+        self.assertIsNotNone(coach_video_renderer._track_point(tracks, 27, 10))
+
+    def test_batched_skeleton_matches_per_edge_drawing_pixel_for_pixel(self):
+        pose_frames = [_pose_frame(i, shift=0.01 * i) for i in range(8)]
+        pose_frames[3]["landmarks"][25]["visibility"] = 0.0
+        for frame_idx in range(6):
+            pose_frames[frame_idx]["landmarks"][27]["visibility"] = 0.0
+        tracks = coach_video_renderer._build_smoothed_tracks(pose_frames, width=320, height=240, fps=30.0)
+        per_point = {key: value for key, value in tracks.items() if key != render_tracks.SKELETON_TRACK_KEY}
+
+        for frame_idx in range(len(pose_frames)):
+            background = np.full((240, 320, 3), 90, dtype=np.uint8)
+            batched = background.copy()
+            looked_up = background.copy()
+            coach_video_renderer._draw_skeleton(batched, tracks, frame_idx)
+            coach_video_renderer._draw_skeleton(looked_up, per_point, frame_idx)
+            np.testing.assert_array_equal(batched, looked_up)
+            self.assertFalse(np.array_equal(batched, background))
+
+    def test_edge_layers_match_edge_by_edge_drawing(self):
+        rng = np.random.default_rng(7)
+        for spread in (8.0, 30.0, 90.0) * 20:
+            segments = (rng.integers(60, 180, size=(1, 1, 2)) + rng.normal(0, spread, size=(12, 2, 2))).astype(np.int32)
+            per_edge = np.full((240, 320, 3), 90, dtype=np.uint8)
+            layered = per_edge.copy()
+            for start, end in segments.tolist():
+                cv2.line(per_edge, tuple(start), tuple(end), SKELETON_SHADOW, 5, cv2.LINE_AA)
+                cv2.line(per_edge, tuple(start), tuple(end), SKELETON_COLOR, 3, cv2.LINE_AA)
+            layers = _edge_layers(segments, clearance=4)
+            for layer in layers:
+                cv2.polylines(layered, layer, False, SKELETON_SHADOW, 5, cv2.LINE_AA)
+                cv2.polylines(layered, layer, False, SKELETON_COLOR, 3, cv2.LINE_AA)
+
+            self.assertEqual(sum(len(layer) for layer in layers), len(segments))
+            np.testing.assert_array_equal(layered, per_edge)
+
+    def test_foot_line_proof_overlay_draws_from_the_bfc_frame(self):
+        pose_frames = [_pose_frame(i, shift=0.0) for i in range(4)]
+        for pose_frame in pose_frames:
+            landmarks = pose_frame["landmarks"]
+            _set_point(landmarks, 29, 0.43, 0.90)
+            _set_point(landmarks, 31, 0.47, 0.91)
+            _set_point(landmarks, 32, 0.60, 0.91)
+        frame = np.full((240, 320, 3), 90, dtype=np.uint8)
+
+        coach_video_renderer._draw_foot_line_overlay(
+            frame,
+            pose_frames=pose_frames,
+            frame_idx=3,
+            events={"bfc": {"frame": 1}},
+            hand="R",
+            risk={"risk_id": "foot_line_deviation", "signal_strength": 0.5},
+            proof_step={"title": "Where It Starts"},
+        )
+
+        self.assertFalse(np.array_equal(frame, np.full_like(frame, 90)))
+
     def test_draw_load_watch_phase_accepts_all_hotspot_stages(self):
         pose_frames = [_pose_frame(i, shift=0.0) for i in range(5)]
         tracks = coach_video_renderer._build_smoothed_tracks(
@@ -912,15 +1083,15 @@ class CoachVideoRendererTest(unittest.TestCase):
                 captured_summary_inputs.append(frame.copy())
 
             with mock.patch.object(
-                coach_video_renderer.render_video,
+                coach_video_renderer.render_segments,
                 "_draw_skeleton",
                 side_effect=fake_draw_skeleton,
             ), mock.patch.object(
-                coach_video_renderer.render_video,
+                coach_video_renderer.render_segments,
                 "_draw_phase_overlay",
                 side_effect=fake_draw_phase_overlay,
             ), mock.patch.object(
-                coach_video_renderer.render_video,
+                coach_video_renderer.render_segments,
                 "_draw_end_summary",
                 side_effect=capture_summary,
             ):
@@ -1009,9 +1180,9 @@ class CoachVideoRendererTest(unittest.TestCase):
 
             pose_frames = [_pose_frame(i, shift=0.01 * i) for i in range(10)]
             with mock.patch.object(
-                coach_video_renderer.render_video,
+                coach_video_renderer.render_segments,
                 "_draw_skeleton",
-                wraps=coach_video_renderer.render_video._draw_skeleton,
+                wraps=coach_video_renderer.render_segments._draw_skeleton,
             ) as draw_skeleton:
                 result = render_skeleton_video(
                     video_path=video_path,
@@ -1069,6 +1240,177 @@ class CoachVideoRendererTest(unittest.TestCase):
             self.assertTrue(os.path.exists(output_path))
             self.assertGreater(os.path.getsize(output_path), 0)
 
+    def _write_input_clip(self, tmpdir, frames=5, size=(160, 120)):
+        video_path = os.path.join(tmpdir, "input.mp4")
+        writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*"mp4v"), 24.0, size)
+        self.assertTrue(writer.isOpened())
+        for _ in range(frames):
+            writer.write(np.zeros((size[1], size[0], 3), dtype=np.uint8))
+        writer.release()
+        return video_path
+
+    def _fake_ffmpeg(self, tmpdir, exit_code=0, timed_holds=True):
+        # Stand-in ffmpeg: lists setts for the capability probe, logs argv, stores the
+        # raw stdin stream as the encoded "mp4", copies it through on remux and
+        # joins the listed files on concat.
+        path = os.path.join(tmpdir, "ffmpeg")
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(
+                f"#!{sys.executable}\n"
+                "import json, shutil, sys\n"
+                "args = sys.argv[1:]\n"
+                "if '-bsfs' in args:\n"
+                f"    print('Bitstream filters:\\n' + {'setts' if timed_holds else 'null'!r})\n"
+                "    sys.exit(0)\n"
+                f"open({os.path.join(tmpdir, 'ffmpeg.args')!r}, 'a').write(json.dumps(args) + '\\n')\n"
+                "source = args[args.index('-i') + 1]\n"
+                "if 'concat' in args:\n"
+                "    parts = [line.strip()[6:-1] for line in open(source) if line.startswith('file ')]\n"
+                "    open(args[-1], 'wb').write(b''.join(open(part, 'rb').read() for part in parts))\n"
+                "elif source == '-':\n"
+                "    open(args[-1], 'wb').write(sys.stdin.buffer.read())\n"
+                "else:\n"
+                "    shutil.copyfile(source, args[-1])\n"
+                f"sys.exit({exit_code})\n"
+            )
+        os.chmod(path, 0o755)
+        return path
+
+    def _fake_ffmpeg_calls(self, tmpdir):
+        with open(os.path.join(tmpdir, "ffmpeg.args"), encoding="utf-8") as handle:
+            return [json.loads(line) for line in handle if line.strip()]
+
+    def test_render_skeleton_video_pipes_raw_frames_into_one_x264_encode(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            video_path = self._write_input_clip(tmpdir)
+            output_path = os.path.join(tmpdir, "renders", "output.mp4")
+            pose_frames = [_pose_frame(i, shift=0.01 * i) for i in range(5)]
+            with mock.patch(
+                "app.workers.render.coach_video_renderer_parts.render_output.shutil.which",
+                return_value=self._fake_ffmpeg(tmpdir),
+            ):
+                result = render_skeleton_video(
+                    video_path=video_path,
+                    pose_frames=pose_frames,
+                    events={"bfc": {"frame": 1}, "ffc": {"frame": 2}, "release": {"frame": 4}},
+                    output_path=output_path,
+                    pause_seconds=0.0,
+                    end_summary_seconds=0.0,
+                    encode_settings=X264Settings(preset="veryfast", crf=23, threads=2),
+                )
+            encode, remux = self._fake_ffmpeg_calls(tmpdir)
+
+            self.assertTrue(result["available"])
+            self.assertEqual(result["encoding"], "h264")
+            self.assertEqual(result["path"], output_path)
+            # Slow motion (FFC..release, x5) is timed at remux, not written as duplicates;
+            # the held last frame is closed with one single-frame sample.
+            self.assertEqual(result["frames_encoded"], 6)
+            self.assertEqual(result["frames_rendered"], 17)
+            self.assertEqual(os.path.getsize(output_path), 6 * 160 * 120 * 3)
+            self.assertEqual(encode[encode.index("-preset") + 1], "veryfast")
+            self.assertEqual(encode[encode.index("-crf") + 1], "23")
+            self.assertEqual(encode[encode.index("-threads") + 1], "2")
+            self.assertEqual(encode[encode.index("-i") + 1], "-")
+            self.assertEqual(remux[remux.index("-c") + 1], "copy")
+            self.assertTrue(remux[remux.index("-bsf:v") + 1].startswith("setts="))
+            self.assertEqual(os.listdir(os.path.dirname(output_path)), ["output.mp4"])
+
+    def test_segmented_render_matches_serial_render(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            video_path = self._write_input_clip(tmpdir)
+            pose_frames = [_pose_frame(i, shift=0.01 * i) for i in range(5)]
+            outputs = {}
+            fake_ffmpeg = self._fake_ffmpeg(tmpdir, timed_holds=False)
+            # On PATH rather than mocked: segment workers start from a fresh forkserver process.
+            fake_path = os.pathsep.join([os.path.dirname(fake_ffmpeg), os.environ.get("PATH", "")])
+            with mock.patch.dict(os.environ, {"PATH": fake_path}):
+                for workers in ("1", "3"):
+                    with mock.patch.dict(os.environ, {"ACTIONLAB_RENDER_SEGMENT_WORKERS": workers}):
+                        outputs[workers] = render_skeleton_video(
+                            video_path=video_path,
+                            pose_frames=pose_frames,
+                            events={"bfc": {"frame": 1}, "ffc": {"frame": 2}, "release": {"frame": 3}},
+                            output_path=os.path.join(tmpdir, "renders", f"output_{workers}.mp4"),
+                            pause_seconds=0.5,
+                            end_summary_seconds=0.5,
+                        )
+            concat = [call for call in self._fake_ffmpeg_calls(tmpdir) if "concat" in call]
+
+            serial, segmented = outputs["1"], outputs["3"]
+            self.assertTrue(segmented["available"])
+            self.assertNotIn("segments", serial)
+            self.assertGreater(segmented["segments"], 3)
+            self.assertEqual(len(concat), 1)
+            self.assertEqual(segmented["frames_rendered"], serial["frames_rendered"])
+            with open(serial["path"], "rb") as left, open(segmented["path"], "rb") as right:
+                self.assertEqual(left.read(), right.read())
+            self.assertEqual(sorted(os.listdir(os.path.join(tmpdir, "renders"))), ["output_1.mp4", "output_3.mp4"])
+
+    def test_render_profile_caps_short_side_before_drawing(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            video_path = self._write_input_clip(tmpdir, size=(320, 240))
+            output_path = os.path.join(tmpdir, "renders", "output.mp4")
+            pose_frames = [_pose_frame(i, shift=0.01 * i) for i in range(5)]
+            drawn_shapes = []
+            with mock.patch(
+                "app.workers.render.coach_video_renderer_parts.render_output.shutil.which",
+                return_value=self._fake_ffmpeg(tmpdir, timed_holds=False),
+            ), mock.patch.object(
+                coach_video_renderer.render_segments,
+                "_draw_phase_overlay",
+                side_effect=lambda frame, **kwargs: drawn_shapes.append(frame.shape),
+            ):
+                result = render_skeleton_video(
+                    video_path=video_path,
+                    pose_frames=pose_frames,
+                    events={"bfc": {"frame": 1}, "ffc": {"frame": 2}, "release": {"frame": 3}},
+                    output_path=output_path,
+                    pause_seconds=0.0,
+                    end_summary_seconds=0.0,
+                    max_short_side=120,
+                )
+            encode = self._fake_ffmpeg_calls(tmpdir)[0]
+
+            self.assertTrue(result["available"])
+            self.assertEqual((result["width"], result["height"]), (160, 120))
+            self.assertEqual((result["source_width"], result["source_height"]), (320, 240))
+            self.assertEqual(set(drawn_shapes), {(120, 160, 3)})
+            self.assertEqual(encode[encode.index("-s") + 1], "160x120")
+            self.assertEqual(os.path.getsize(output_path), result["frames_encoded"] * 160 * 120 * 3)
+
+    def test_failed_x264_encode_falls_back_to_mp4v(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            video_path = self._write_input_clip(tmpdir)
+            output_path = os.path.join(tmpdir, "renders", "output.mp4")
+            pose_frames = [_pose_frame(i, shift=0.01 * i) for i in range(5)]
+            with mock.patch(
+                "app.workers.render.coach_video_renderer_parts.render_output.shutil.which",
+                return_value=self._fake_ffmpeg(tmpdir, exit_code=1),
+            ):
+                result = render_skeleton_video(
+                    video_path=video_path,
+                    pose_frames=pose_frames,
+                    events={"bfc": {"frame": 1}, "ffc": {"frame": 2}, "release": {"frame": 4}},
+                    output_path=output_path,
+                    pause_seconds=0.0,
+                    end_summary_seconds=0.0,
+                )
+
+            self.assertTrue(result["available"])
+            self.assertEqual(result["encoding"], "mp4v")
+            self.assertEqual(result["path"], output_path)
+            self.assertEqual(result["frames_encoded"], result["frames_rendered"])
+            self.assertEqual(os.listdir(os.path.dirname(output_path)), ["output.mp4"])
+
+    def test_x264_settings_read_environment_overrides(self):
+        with mock.patch.dict(
+            os.environ,
+            {"ACTIONLAB_RENDER_X264_PRESET": "fast", "ACTIONLAB_RENDER_X264_CRF": "99", "ACTIONLAB_RENDER_X264_THREADS": "bad"},
+        ):
+            settings = default_x264_settings()
+        self.assertEqual(settings, X264Settings(preset="fast", crf=51, threads=0))
+
     def test_summary_filters_ffc_risks_when_landing_anchor_is_low_confidence(self):
         lines = _summary_issue_lines(
             {
@@ -1,11 +1,8 @@
 import os
 import unittest
-from io import BytesIO
-from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 import numpy as np
-from fastapi import HTTPException
 
 from app.workers.events.delivery_guard import detect_delivery_candidates
 
@@ -61,13 +58,6 @@ def _make_pose_frames(peaks, *, frames=150, hand="R"):
     return out
 
 
-def _query_chain(first_return=None):
-    query = MagicMock()
-    query.filter.return_value = query
-    query.first.return_value = first_return
-    return query
-
-
 class DeliveryGuardTests(unittest.TestCase):
     def test_single_delivery_clip_is_not_flagged(self):
         pose_frames = _make_pose_frames([70])
@@ -138,23 +128,28 @@ class DeliveryGuardTests(unittest.TestCase):
         self.assertEqual(result["method"], "wrist_velocity")
 
     def test_analyze_rejects_multi_delivery_video(self):
-        from app.orchestrator.orchestrator import analyze
-
-        request = SimpleNamespace(state=SimpleNamespace(request_id="req-1"))
-        background_tasks = MagicMock()
-        upload = SimpleNamespace(
-            content_type="video/mp4",
-            file=BytesIO(b"fake-video"),
-        )
-        current_account = SimpleNamespace(account_id="acc-1", role="COACH")
-        db = MagicMock()
-        db.query.side_effect = [
-            _query_chain(first_return=SimpleNamespace()),
-            _query_chain(first_return=SimpleNamespace(handedness="R", age_group="U16", season=2026)),
-        ]
-
-        with patch("app.orchestrator.orchestrator.SessionLocal", return_value=db), patch(
-            "app.orchestrator.orchestrator.load_video",
+        from app.orchestrator.analysis_jobs import AnalysisJobError
+        from app.orchestrator.orchestrator import _run_analysis_job
+
+        payload = {
+            "run_id": "run-1",
+            "request_id": "req-1",
+            "player_id": "player-1",
+            "hand": "R",
+            "bowler_type": "pace",
+            "age_group": "U16",
+            "season": 2026,
+            "actor": {"account_id": "acc-1", "role": "COACH"},
+            "platform": "android",
+            "video_path": "/tmp/fake.mp4",
+        }
+        progress = MagicMock()
+
+        with patch("app.orchestrator.orchestrator.SessionLocal", return_value=MagicMock()), patch(
+            "app.orchestrator.orchestrator._load_recent_expert_history",
+            return_value=[],
+        ), patch(
+            "app.orchestrator.orchestrator.load_video_path",
             return_value=({"path": "/tmp/fake.mp4", "fps": 30.0, "total_frames": 150}, [], {}),
         ), patch(
             "app.orchestrator.orchestrator.run_preanalysis_screen",
@@ -168,27 +163,19 @@ class DeliveryGuardTests(unittest.TestCase):
                 ],
             },
         ):
-            with self.assertRaises(HTTPException) as context:
-                analyze(
-                    request=request,
-                    background_tasks=background_tasks,
-                    file=upload,
-                    player_id="player-1",
-                    bowler_type="pace",
-                    age_group="U16",
-                    season=2026,
-                    actor=None,
-                    current_account=current_account,
-                )
+            with self.assertRaises(AnalysisJobError) as context:
+                _run_analysis_job(payload, progress)
 
         self.assertEqual(context.exception.status_code, 400)
         self.assertEqual(
-            context.exception.detail,
+            context.exception.as_dict(),
             {
                 "code": "multiple_deliveries",
                 "message": "Please upload a video with only one bowling delivery.",
+                "status_code": 400,
             },
         )
+        progress.stage.assert_any_call("screening")
 
 
 if __name__ == "__main__":
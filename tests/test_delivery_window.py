@@ -47,6 +47,8 @@ class DeliveryWindowTests(unittest.TestCase):
         self.assertEqual(result["delivery_count"], 1)
         self.assertEqual(len(result["peak_frames"]), 1)
         self.assertEqual(result["method"], "subject_local_motion_scan")
+        self.assertTrue(result["motion_track"])
+        self.assertTrue(all(0.0 <= value <= 1.0 for box in result["motion_track"] for value in box[1:]))
 
     def test_reports_multiple_motion_bursts(self):
         tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".mp4")
@@ -0,0 +1,29 @@
+import os
+import unittest
+from unittest import mock
+
+from app.common.env import env_float, env_int
+
+
+class EnvSettingTests(unittest.TestCase):
+    def test_unset_blank_or_invalid_values_fall_back_to_the_default(self):
+        for raw in (None, "", "  ", "four", "2.5"):
+            env = {} if raw is None else {"ACTIONLAB_TEST_SETTING": raw}
+            with mock.patch.dict(os.environ, env, clear=False):
+                if raw is None:
+                    os.environ.pop("ACTIONLAB_TEST_SETTING", None)
+                self.assertEqual(env_int("ACTIONLAB_TEST_SETTING", 4, minimum=1), 4)
+
+    def test_values_are_clamped_to_the_given_range(self):
+        with mock.patch.dict(os.environ, {"ACTIONLAB_TEST_SETTING": " 0 "}):
+            self.assertEqual(env_int("ACTIONLAB_TEST_SETTING", 4, minimum=1), 1)
+        with mock.patch.dict(os.environ, {"ACTIONLAB_TEST_SETTING": "99"}):
+            self.assertEqual(env_int("ACTIONLAB_TEST_SETTING", 23, maximum=51), 51)
+        with mock.patch.dict(os.environ, {"ACTIONLAB_TEST_SETTING": "-1.5"}):
+            self.assertEqual(env_float("ACTIONLAB_TEST_SETTING", 5.0), 0.0)
+        with mock.patch.dict(os.environ, {"ACTIONLAB_TEST_SETTING": "0.25"}):
+            self.assertEqual(env_float("ACTIONLAB_TEST_SETTING", 5.0), 0.25)
+
+
+if __name__ == "__main__":
+    unittest.main()
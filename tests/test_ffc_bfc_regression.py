@@ -3,6 +3,8 @@ import unittest
 import numpy as np
 
 from app.workers.events.ffc_bfc import (
+    _foot_ground_score,
+    _ground_score_table,
     _pick_bfc_backward_from_ffc,
     _pick_ffc_backward_from_release,
     _sanitize_bfc_frame,
@@ -360,5 +362,19 @@ class FfcBfcRegressionTest(unittest.TestCase):
         self.assertEqual(confidence, 0.0)
 
 
+    def test_ground_score_table_matches_per_frame_scoring(self):
+        rng = np.random.default_rng(11)
+        n = 240
+        y_ank = 0.70 + np.cumsum(rng.normal(0.0, 0.004, n))
+        y_ank[60:110] = 0.78  # planted foot: ties inside the percentile windows
+        y_toe = y_ank + 0.03 + rng.normal(0.0, 0.002, n)
+        y_toe[150] = np.nan
+
+        for hold, win0, win1, dt in ((3, 0, 200, 1.0 / 25.0), (12, 20, 238, 1.0 / 240.0)):
+            table = _ground_score_table(y_ank, y_toe, hold, win0, win1, dt)
+            expected = [_foot_ground_score(y_ank, y_toe, t, hold, win0, win1, dt) for t in range(win0, win1 + 1)]
+            self.assertEqual(table.tolist(), expected)
+            self.assertGreater(sum(1 for score in expected if score >= 2), 0)
+
 if __name__ == "__main__":
     unittest.main()
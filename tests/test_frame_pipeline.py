@@ -0,0 +1,51 @@
+import unittest
+
+import numpy as np
+
+from app.io.frame_pipeline import RgbFramePrefetcher
+
+
+class _FakeProvider:
+    def __init__(self, count, fail_at=None):
+        self.frames = [np.full((4, 6, 3), (idx, 0, 255), dtype=np.uint8) for idx in range(count)]
+        self.fail_at = fail_at
+
+    def read(self, idx):
+        if idx == self.fail_at:
+            raise RuntimeError("decode failed")
+        return self.frames[idx] if idx < len(self.frames) else None
+
+
+class RgbFramePrefetcherTests(unittest.TestCase):
+    def test_threaded_and_inline_stages_yield_same_frames(self):
+        provider = _FakeProvider(12)
+        outputs = {}
+        for depth in (0, 2):
+            with RgbFramePrefetcher(provider, 3, 20, depth=depth) as frames:
+                outputs[depth] = [(idx, bgr, rgb) for idx, bgr, rgb in frames]
+                stats = frames.stats()
+            self.assertEqual(stats["frames"], 9)
+            self.assertEqual(stats["depth"], depth)
+
+        self.assertEqual([idx for idx, _, _ in outputs[2]], list(range(3, 12)))
+        for (_, bgr_a, rgb_a), (_, bgr_b, rgb_b) in zip(outputs[0], outputs[2]):
+            self.assertIs(bgr_a, bgr_b)
+            np.testing.assert_array_equal(rgb_a, rgb_b)
+        np.testing.assert_array_equal(outputs[2][0][2][0, 0], [255, 0, 3])
+
+    def test_early_exit_stops_producer(self):
+        with RgbFramePrefetcher(_FakeProvider(50), 0, 50, depth=1) as frames:
+            for idx, _, _ in frames:
+                if idx == 2:
+                    break
+            thread = frames._thread
+        self.assertTrue(thread is None or not thread.is_alive())
+
+    def test_producer_errors_reach_the_consumer(self):
+        with self.assertRaises(RuntimeError):
+            with RgbFramePrefetcher(_FakeProvider(10, fail_at=4), 0, 10, depth=2) as frames:
+                list(frames)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+
+from app.io.frame_provider import FrameProvider
+from app.workers.windowing.delivery_window import detect_delivery_window
+
+
+def _write_clip(path: str, frame_count: int, size=(160, 120), fps: float = 30.0) -> None:
+    writer = cv2.VideoWriter(
+        path,
+        cv2.VideoWriter_fourcc(*"mp4v"),
+        fps,
+        size,
+    )
+    for idx in range(frame_count):
+        frame = np.zeros((size[1], size[0], 3), dtype=np.uint8)
+        x = 20 + (idx % 40) * 3
+        cv2.rectangle(frame, (x, 30), (x + 18, 95), (255, 255, 255), -1)
+        writer.write(frame)
+    writer.release()
+
+
+class FrameProviderTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".mp4")
+        tmp.close()
+        self.path = tmp.name
+        _write_clip(self.path, 90)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_repeat_reads_are_served_from_cache(self):
+        with FrameProvider(self.path) as provider:
+            frames = [frame for _, frame in provider.iter_range(10, 20)]
+            self.assertEqual(len(frames), 10)
+            decoded = provider.stats()["decoded"]
+
+            again = provider.read(15)
+
+            self.assertIs(again, frames[5])
+            self.assertEqual(provider.stats()["decoded"], decoded)
+            self.assertFalse(again.flags.writeable)
+
+    def test_cache_budget_evicts_oldest_frames(self):
+        frame_bytes = 160 * 120 * 3
+        with FrameProvider(self.path, cache_bytes=frame_bytes * 4) as provider:
+            list(provider.iter_range(0, 10))
+            stats = provider.stats()
+
+        self.assertEqual(stats["cached_frames"], 4)
+        self.assertLessEqual(stats["cached_bytes"], frame_bytes * 4)
+
+    def test_retained_frames_survive_scan_without_cache_budget(self):
+        with FrameProvider(self.path, cache_bytes=0) as provider:
+            provider.retain([7, 61])
+            sampled = [idx for idx, _ in provider.scan_small_gray(4)]
+            decoded = provider.stats()["decoded"]
+
+            self.assertIsNotNone(provider.read(61))
+            self.assertIsNotNone(provider.read(7))
+            self.assertEqual(provider.stats()["decoded"], decoded)
+
+        self.assertEqual(sampled, list(range(0, 90, 4)))
+
+    def test_shared_provider_matches_private_window_scan(self):
+        video = {"path": self.path, "fps": 30.0, "total_frames": 90}
+        expected = detect_delivery_window(dict(video))
+        with FrameProvider(self.path) as provider:
+            shared = detect_delivery_window({**video, "frame_provider": provider})
+
+        self.assertEqual(shared, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+import gc
+import math
+import unittest
+import weakref
+
+import numpy as np
+from scipy.ndimage import gaussian_filter1d
+
+from app.workers.elbow.compute_elbow_signal import compute_elbow_signal
+from app.workers.pose.kinematics import Centroid, Kinematics, kinematics_for
+from app.workers.pose.pose_sequence import NUM_LANDMARKS, PoseSequence
+
+
+def _landmarks(frame_idx: int):
+    return [
+        {
+            "x": 0.3 + 0.01 * j + 0.002 * frame_idx,
+            "y": 0.2 + 0.015 * j + 0.1 * math.sin(frame_idx / 5.0 + j),
+            "z": -0.01 * j,
+            "visibility": 0.2 + 0.8 * ((frame_idx + j) % 7) / 6.0,
+        }
+        for j in range(NUM_LANDMARKS)
+    ]
+
+
+def _pose_frames(total: int = 30, missing=(3, 17)):
+    return [
+        {"frame": i, "landmarks": None if i in missing else _landmarks(i)}
+        for i in range(total)
+    ]
+
+
+def _legacy_angle(a, b, c):
+    ba = [a[k] - b[k] for k in range(3)]
+    bc = [c[k] - b[k] for k in range(3)]
+    mag1 = math.sqrt(sum(v * v for v in ba))
+    mag2 = math.sqrt(sum(v * v for v in bc))
+    cosv = max(-1.0, min(1.0, sum(p * q for p, q in zip(ba, bc)) / (mag1 * mag2)))
+    return math.degrees(math.acos(cosv))
+
+
+class KinematicsTests(unittest.TestCase):
+    def test_one_instance_per_pose_sequence(self):
+        pose = PoseSequence.from_pose_frames(_pose_frames())
+        kin = kinematics_for(pose)
+
+        self.assertIs(kinematics_for(pose.as_pose_frames()), kin)
+        self.assertIs(kinematics_for(kin), kin)
+        self.assertIsNot(kinematics_for(_pose_frames()), kinematics_for(_pose_frames()))
+
+        finished = weakref.ref(pose)
+        del pose, kin
+        gc.collect()
+        self.assertIsNone(finished())  # the registry does not keep a finished run alive
+
+    def test_quantities_are_memoized_and_read_only(self):
+        kin = kinematics_for(PoseSequence.from_pose_frames(_pose_frames()))
+        pelvis = kin.midpoint(23, 24, min_visibility=0.25)
+
+        self.assertIs(kin.midpoint(23, 24, min_visibility=0.25), pelvis)
+        self.assertIsNot(kin.midpoint(23, 24), pelvis)
+        self.assertIsNot(kin.smoothed("midpoint", 23, 24, sigma=2.0), kin.smoothed("midpoint", 23, 24, sigma=3.0))
+        self.assertFalse(pelvis.flags.writeable)
+        with self.assertRaises(ValueError):
+            pelvis[0, 0] = 1.0
+
+    def test_visibility_gating_and_missing_frames(self):
+        frames = _pose_frames()
+        kin = kinematics_for(frames)
+        pelvis = kin.midpoint(23, 24, min_visibility=0.5)
+
+        for i, frame in enumerate(frames):
+            lm = frame["landmarks"]
+            if lm is None or min(lm[23]["visibility"], lm[24]["visibility"]) < 0.5:
+                self.assertTrue(np.isnan(pelvis[i]).all())
+            else:
+                self.assertEqual(pelvis[i, 1], (lm[23]["y"] + lm[24]["y"]) / 2.0)
+        self.assertEqual(kin.visibility(23)[3], 0.0)
+        self.assertEqual(kin.frame_ids.tolist(), list(range(len(frames))))
+
+    def test_missing_visibility_reads_as_the_given_default(self):
+        frames = _pose_frames()
+        for frame in frames:
+            for lm in frame["landmarks"] or []:
+                del lm["visibility"]
+        kin = kinematics_for(frames)
+
+        self.assertEqual(float(np.nanmax(kin.visibility(14))), 0.0)
+        self.assertEqual(kin.visibility(14, missing=1.0).tolist(), [0.0 if i in (3, 17) else 1.0 for i in range(len(frames))])
+        self.assertTrue(np.isnan(kin.joint_angle(12, 14, 16, min_visibility=0.5)).all())
+        angles = kin.joint_angle(12, 14, 16, min_visibility=0.5, missing_visibility=1.0)
+        self.assertEqual(np.isfinite(angles).tolist(), [i not in (3, 17) for i in range(len(frames))])
+
+    def test_elbow_signal_treats_missing_visibility_as_visible(self):
+        frames = _pose_frames()
+        for frame in frames:
+            for lm in frame["landmarks"] or []:
+                del lm["visibility"]
+
+        signal = compute_elbow_signal(frames, "R")
+
+        self.assertEqual([row["valid"] for row in signal], [i not in (3, 17) for i in range(len(frames))])
+
+    def test_centroid_angle_matches_per_frame_arithmetic(self):
+        frames = _pose_frames()
+        hand = Centroid((16, 20, 18, 22), (0.55, 0.20, 0.15, 0.10))
+        angles = kinematics_for(frames).joint_angle(12, 14, hand, dims=3, min_visibility=0.5)
+
+        for i, frame in enumerate(frames):
+            lm = frame["landmarks"]
+            if lm is None or lm[12]["visibility"] < 0.5 or lm[14]["visibility"] < 0.5:
+                self.assertTrue(np.isnan(angles[i]))
+                continue
+            pts = [(lm[j], w) for j, w in zip(hand.joints, hand.weights) if lm[j]["visibility"] >= 0.5]
+            if not pts:
+                self.assertTrue(np.isnan(angles[i]))
+                continue
+            sw = sum(w for _, w in pts)
+            distal = [sum(p[k] * w for p, w in pts) / sw for k in ("x", "y", "z")]
+            expected = _legacy_angle([lm[12][k] for k in "xyz"], [lm[14][k] for k in "xyz"], distal)
+            self.assertAlmostEqual(float(angles[i]), expected, places=9)
+
+    def test_named_landmarks_and_smoothed_velocity(self):
+        names = {"LEFT_HIP": 23, "RIGHT_HIP": 24}
+        frames = [
+            {
+                "frame": i,
+                "landmarks": {name: {"x": lm[idx]["x"], "y": lm[idx]["y"], "v": 0.9} for name, idx in names.items()},
+            }
+            for i, lm in enumerate(_landmarks(i) for i in range(20))
+        ]
+        kin = kinematics_for(frames)
+
+        self.assertEqual(kin.visibility(23).tolist(), [0.9] * 20)
+        hip_line = kin.line_angle(23, 24)
+        smoothed = kin.smoothed("line_angle", 23, 24, sigma=1.5)
+        np.testing.assert_array_equal(smoothed, gaussian_filter1d(np.asarray(hip_line), sigma=1.5))
+        np.testing.assert_array_equal(kin.velocity("line_angle", 23, 24, sigma=1.5, spacing=0.5), np.gradient(smoothed, 0.5))
+        self.assertIsNone(Kinematics(PoseSequence.empty(4)).smoothed("line_angle", 23, 24, sigma=1.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from fastapi import HTTPException
+
+from app.common import metrics
+from app.orchestrator.orchestrator import get_metrics
+
+
+class MetricsTests(unittest.TestCase):
+    def test_span_feeds_histogram_and_active_run_breakdown(self):
+        before = metrics.STAGE_SECONDS.count(stage="unit_stage")
+        with metrics.run_timings() as timings:
+            with metrics.span("unit_stage"):
+                self.assertEqual(metrics.STAGE_IN_FLIGHT.value(stage="unit_stage"), 1.0)
+            with metrics.span("unit_stage"):
+                pass
+            metrics.observe_frames("unit_pose", 90, 3.0)
+        breakdown = timings.breakdown()
+
+        self.assertEqual(metrics.STAGE_SECONDS.count(stage="unit_stage"), before + 2)
+        self.assertEqual(metrics.STAGE_IN_FLIGHT.value(stage="unit_stage"), 0.0)
+        self.assertEqual(breakdown["stages"]["unit_stage"]["count"], 2)
+        self.assertEqual(breakdown["fps"]["unit_pose"], {"frames": 90, "fps": 30.0})
+        self.assertIsNone(metrics.current_run_timings())
+
+    def test_span_counts_errors_and_still_records_latency(self):
+        errors = metrics.STAGE_ERRORS.value(stage="unit_failing")
+        with self.assertRaises(ValueError):
+            with metrics.span("unit_failing"):
+                raise ValueError("boom")
+
+        self.assertEqual(metrics.STAGE_ERRORS.value(stage="unit_failing"), errors + 1)
+        self.assertEqual(metrics.STAGE_SECONDS.count(stage="unit_failing"), 1)
+
+    def test_registry_renders_prometheus_text(self):
+        registry = metrics.MetricsRegistry()
+        latency = registry.histogram("unit_latency_seconds", "Latency.", buckets=(0.1, 1.0))
+        latency.observe(0.05, stage="a")
+        latency.observe(0.5, stage="a")
+        registry.counter("unit_total", "Total.").inc(3, kind='say "hi"')
+        registry.register_collector("unit", lambda: [("unit_gauge", "gauge", "Gauge.", [({"pool": "p"}, 2)])])
+
+        text = registry.render()
+
+        self.assertIn("# TYPE unit_latency_seconds histogram", text)
+        self.assertIn('unit_latency_seconds_bucket{stage="a",le="0.1"} 1', text)
+        self.assertIn('unit_latency_seconds_bucket{stage="a",le="+Inf"} 2', text)
+        self.assertIn('unit_latency_seconds_count{stage="a"} 2', text)
+        self.assertIn('unit_total{kind="say \\"hi\\""} 3', text)
+        self.assertIn('unit_gauge{pool="p"} 2', text)
+
+    def test_replayed_breakdown_reaches_histograms(self):
+        before = metrics.STAGE_SECONDS.count(stage="unit_remote")
+        metrics.record_run_timings({"stages": {"unit_remote": {"ms": 300.0, "count": 3}}, "fps": {}})
+
+        self.assertEqual(metrics.STAGE_SECONDS.count(stage="unit_remote"), before + 3)
+
+    def test_metrics_endpoint_honours_token(self):
+        request = SimpleNamespace(headers={"authorization": "Bearer nope"})
+        with patch.dict(os.environ, {"ACTIONLAB_METRICS_TOKEN": "secret"}):
+            with self.assertRaises(HTTPException) as context:
+                get_metrics(request)
+            response = get_metrics(SimpleNamespace(headers={"authorization": "Bearer secret"}))
+
+        self.assertEqual(context.exception.status_code, 401)
+        self.assertIn(b"actionlab_stage_duration_seconds", response.body)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import unittest
+
+from app.benchmarks.pipeline_bench import compare_to_baseline, run_pose_case
+from app.benchmarks.synthetic import synthetic_pose_frames
+from app.workers.events.release_uah import detect_release_uah
+
+
+def _report(stages, fps=None):
+    return {"cases": {"case": {"stages": stages, "fps": fps or {}}}}
+
+
+class PipelineBenchTests(unittest.TestCase):
+    def test_synthetic_delivery_produces_release_events(self):
+        events = detect_release_uah(pose_frames=synthetic_pose_frames(90), hand="R", fps=30.0)
+
+        self.assertIsNotNone((events.get("release") or {}).get("frame"))
+        self.assertIsNotNone(events.get("delivery_window"))
+
+    def test_pose_case_times_every_worker_stage(self):
+        breakdown = run_pose_case(60, 30.0)
+
+        for stage in ("release_uah", "ffc_bfc", "action", "risks", "basics", "elbow", "speed", "expert"):
+            self.assertIn(stage, breakdown["stages"])
+
+    def test_baseline_comparison_flags_only_meaningful_slowdowns(self):
+        baseline = _report({"pose": 100.0, "speed": 2.0, "risks": 40.0}, {"pose": 30.0})
+        current = _report({"pose": 140.0, "speed": 4.0, "risks": 45.0, "new": 9.0}, {"pose": 20.0})
+
+        regressions = compare_to_baseline(current, baseline, tolerance=0.25)
+
+        self.assertEqual(
+            sorted(item["metric"] for item in regressions),
+            ["fps:pose", "stage:pose"],
+        )
+        self.assertEqual(compare_to_baseline(current, {"cases": {}}), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
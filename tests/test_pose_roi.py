@@ -0,0 +1,74 @@
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.workers.pose.pose_roi import PoseRoi, remap_landmarks
+
+
+def _landmarks(points):
+    return [SimpleNamespace(x=x, y=y, z=z, visibility=v) for x, y, z, v in points]
+
+
+class PoseRoiTests(unittest.TestCase):
+    def test_remap_returns_full_frame_coordinates(self):
+        crop = (1000, 200, 1600, 1400)
+        points = np.array([[0.5, 0.25, -0.1, 0.9], [0.0, 1.0, 0.2, 0.5]], dtype=np.float32)
+
+        remapped = remap_landmarks(points, crop, 3840, 2160)
+
+        np.testing.assert_allclose(remapped[0, :2], [1300 / 3840, 500 / 2160], rtol=1e-6)
+        np.testing.assert_allclose(remapped[1, :2], [1000 / 3840, 1400 / 2160], rtol=1e-6)
+        np.testing.assert_allclose(remapped[:, 2], points[:, 2] * (600 / 3840), rtol=1e-6)
+        np.testing.assert_array_equal(remapped[:, 3], points[:, 3])
+
+    def test_motion_box_seeds_crop_and_landmarks_take_over(self):
+        frame = np.zeros((2160, 3840, 3), dtype=np.uint8)
+        roi = PoseRoi(motion_track=[[10, 0.40, 0.30, 0.46, 0.70]], max_side=640)
+
+        image, crop = roi.prepare(frame, 10)
+        self.assertIsNotNone(crop)
+        self.assertLessEqual(max(image.shape[:2]), 640)
+        x0, y0, x1, y1 = crop
+        self.assertLessEqual(x0, 0.40 * 3840)
+        self.assertGreaterEqual(x1, 0.46 * 3840)
+
+        # Pose centred in the crop maps back inside the motion box.
+        person = [(0.5, 0.2 + 0.02 * j, 0.0, 0.9) for j in range(33)]
+        full = roi.observe(_landmarks(person), crop, 3840, 2160)
+        self.assertTrue(0.40 <= float(full[0, 0]) <= 0.46)
+
+        _, next_crop = roi.prepare(frame, 11)
+        self.assertIsNotNone(next_crop)
+        self.assertLessEqual(next_crop[0], float(full[:, 0].min()) * 3840)
+        self.assertGreaterEqual(next_crop[2], float(full[:, 0].max()) * 3840)
+
+    def test_lost_subject_falls_back_to_full_frame(self):
+        frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+        roi = PoseRoi(max_side=4096)
+        person = [(0.5, 0.3 + 0.01 * j, 0.0, 0.9) for j in range(33)]
+
+        _, crop = roi.prepare(frame, 0)
+        self.assertIsNone(crop)
+        roi.observe(_landmarks(person), crop, 1920, 1080)
+        _, crop = roi.prepare(frame, 1)
+        self.assertIsNotNone(crop)
+        for idx in range(2, 6):
+            roi.observe(None, crop, 1920, 1080)
+            image, crop = roi.prepare(frame, idx)
+
+        self.assertIsNone(crop)
+        self.assertEqual(image.shape, frame.shape)
+
+    def test_disabled_crop_only_caps_resolution(self):
+        frame = np.zeros((2160, 3840, 3), dtype=np.uint8)
+        roi = PoseRoi(motion_track=[[0, 0.4, 0.3, 0.5, 0.7]], crop_enabled=False, max_side=1280)
+
+        image, crop = roi.prepare(frame, 0)
+
+        self.assertIsNone(crop)
+        self.assertEqual(image.shape[:2], (720, 1280))
+
+
+if __name__ == "__main__":
+    unittest.main()
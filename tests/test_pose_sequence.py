@@ -0,0 +1,92 @@
+import math
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.workers.elbow.compute_elbow_signal import compute_elbow_signal
+from app.workers.events import ffc_bfc
+from app.workers.pose.pose_sequence import (
+    NUM_LANDMARKS,
+    PoseFramesView,
+    PoseSequence,
+    as_pose_sequence,
+)
+
+
+def _landmarks(frame_idx: int):
+    return [
+        {
+            "x": 0.3 + 0.01 * j + 0.002 * frame_idx,
+            "y": 0.2 + 0.015 * j + 0.1 * math.sin(frame_idx / 5.0 + j),
+            "z": -0.01 * j,
+            "visibility": 0.2 + 0.8 * ((frame_idx + j) % 7) / 6.0,
+        }
+        for j in range(NUM_LANDMARKS)
+    ]
+
+
+def _pose_frames(total: int = 40, missing=(3, 4, 17)):
+    return [
+        {"frame": i, "landmarks": None if i in missing else _landmarks(i)}
+        for i in range(total)
+    ]
+
+
+class PoseSequenceTests(unittest.TestCase):
+    def test_joint_and_axis_views_share_storage(self):
+        pose = PoseSequence.empty(5)
+        pose.joint(12)[2] = (0.5, 0.25, 0.0, 0.9)
+
+        self.assertTrue(np.shares_memory(pose.axis(12, "y"), pose.data))
+        self.assertTrue(np.shares_memory(pose.xy(12), pose.data))
+        self.assertEqual(pose.data.dtype, np.float32)
+        self.assertAlmostEqual(float(pose.axis(12, "y")[2]), 0.25)
+
+    def test_set_frame_round_trips_through_adapter(self):
+        pose = PoseSequence.empty(3)
+        pose.set_frame(1, [SimpleNamespace(x=0.5, y=0.25, z=-0.125, visibility=0.75)] * NUM_LANDMARKS)
+        pose.set_frame(7, [SimpleNamespace(x=1.0, y=1.0, z=1.0, visibility=1.0)] * NUM_LANDMARKS)
+        frames = pose.as_pose_frames()
+
+        self.assertIsInstance(frames, PoseFramesView)
+        self.assertEqual(len(frames), 3)
+        self.assertIsNone(frames[0]["landmarks"])
+        self.assertEqual(frames[1], frames[-2])
+        self.assertIs(frames[1], frames[1])
+        self.assertEqual(frames[1]["landmarks"][0], {"x": 0.5, "y": 0.25, "z": -0.125, "visibility": 0.75})
+        self.assertIs(as_pose_sequence(frames), pose)
+
+    def test_legacy_frames_convert_losslessly(self):
+        frames = _pose_frames()
+        pose = as_pose_sequence(frames)
+
+        self.assertEqual(pose.data.dtype, np.float64)
+        self.assertEqual(pose.as_pose_frames()[5], frames[5])
+        self.assertFalse(pose.valid[17])
+        self.assertTrue(np.isnan(pose.series(11, "y")[17]))
+
+    def test_migrated_series_match_legacy_loops(self):
+        frames = _pose_frames()
+        pose = as_pose_sequence(frames)
+
+        for idx in (ffc_bfc.LA, ffc_bfc.RFI):
+            legacy_y = np.full(len(frames), np.nan)
+            legacy_vis = np.zeros(len(frames))
+            for i, fr in enumerate(frames):
+                lm = fr["landmarks"] or []
+                if lm:
+                    legacy_y[i] = lm[idx]["y"]
+                    legacy_vis[i] = lm[idx]["visibility"]
+            np.testing.assert_array_equal(ffc_bfc._series_y(pose, idx), ffc_bfc._interp_nans(legacy_y))
+            np.testing.assert_array_equal(ffc_bfc._series_vis(pose, idx), legacy_vis)
+
+    def test_elbow_signal_accepts_adapter(self):
+        frames = _pose_frames()
+        view = PoseSequence.from_pose_frames(frames, dtype=np.float64).as_pose_frames()
+
+        self.assertEqual(compute_elbow_signal(view, "R"), compute_elbow_signal(frames, "R"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from app.workers.pose import pose_store
+from app.workers.pose.pose_sequence import NUM_LANDMARKS, PoseSequence
+
+
+def _sequence(total: int = 30) -> PoseSequence:
+    rng = np.random.default_rng(7)
+    data = rng.uniform(0.0, 1.0, size=(total, NUM_LANDMARKS, 4)).astype(np.float32)
+    valid = np.ones(total, dtype=bool)
+    valid[[4, 11]] = False
+    data[~valid] = np.nan
+    return PoseSequence(data, valid)
+
+
+class PoseStoreTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._env = patch.dict(
+            os.environ,
+            {"ACTIONLAB_POSE_ARTIFACT_DIR": self._tmp.name, "ACTIONLAB_RENDER_BUCKET": ""},
+        )
+        self._env.start()
+
+    def tearDown(self):
+        self._env.stop()
+        self._tmp.cleanup()
+
+    def test_round_trip_preserves_pose_and_meta(self):
+        pose = _sequence()
+        video = {"fps": 30.0, "total_frames": 30, "width": 1280, "height": 720, "pose_window": [2, 28]}
+
+        ref = pose_store.save_pose_artifact("run-1", pose.as_pose_frames(), video)
+        loaded = pose_store.load_pose_artifact(ref["name"])
+
+        self.assertTrue(ref["available"])
+        self.assertEqual(ref["storage_backend"], "local")
+        self.assertEqual(ref["frames"], 30)
+        self.assertIsNotNone(loaded)
+        restored, meta = loaded
+        np.testing.assert_array_equal(restored.valid, pose.valid)
+        np.testing.assert_allclose(restored.data, pose.data, atol=1e-3, equal_nan=True)
+        self.assertEqual(meta["fps"], 30.0)
+        self.assertEqual(meta["pose_window"], [2, 28])
+
+    def test_stale_version_and_foreign_names_are_ignored(self):
+        ref = pose_store.save_pose_artifact("run-2", _sequence(), {"fps": 25.0})
+        path = os.path.join(self._tmp.name, ref["name"])
+        with np.load(path) as archive:
+            arrays = {key: archive[key] for key in archive.files}
+        meta = json.loads(arrays["meta"].tobytes().decode("utf-8"))
+        meta["version"] = pose_store.POSE_ARTIFACT_VERSION + 1
+        arrays["meta"] = np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8)
+        with open(path, "wb") as handle:
+            np.savez_compressed(handle, **arrays)
+
+        self.assertIsNone(pose_store.load_pose_artifact(ref["name"]))
+        self.assertIsNone(pose_store.load_pose_artifact("../secrets.txt"))
+        self.assertIsNone(pose_store.load_pose_artifact("missing.pose.npz"))
+
+
+if __name__ == "__main__":
+    unittest.main()
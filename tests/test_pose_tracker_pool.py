@@ -0,0 +1,76 @@
+import threading
+import unittest
+
+from app.workers.pose.tracker_pool import PoseTrackerPool
+
+
+class _FakeTracker:
+    def __init__(self):
+        self.resets = 0
+        self.closed = False
+
+    def reset(self):
+        self.resets += 1
+
+    def close(self):
+        self.closed = True
+
+
+class PoseTrackerPoolTests(unittest.TestCase):
+    def test_warm_trackers_are_reused_and_reset_between_clips(self):
+        built = []
+        pool = PoseTrackerPool(lambda: built.append(_FakeTracker()) or built[-1], size=1)
+        pool.warm()
+
+        with pool.lease() as first:
+            pass
+        with pool.lease() as second:
+            pass
+
+        self.assertEqual(len(built), 1)
+        self.assertIs(first, second)
+        self.assertEqual(first.resets, 2)
+        stats = pool.stats()
+        self.assertEqual(stats["created"], 1)
+        self.assertEqual(stats["idle"], 1)
+        self.assertEqual(stats["leases"], 2)
+        self.assertEqual(stats["waits"], 0)
+
+    def test_lease_waits_when_every_tracker_is_busy(self):
+        pool = PoseTrackerPool(_FakeTracker, size=1)
+        leased = threading.Event()
+        release = threading.Event()
+
+        def hold():
+            with pool.lease():
+                leased.set()
+                release.wait(5)
+
+        holder = threading.Thread(target=hold)
+        holder.start()
+        leased.wait(5)
+        threading.Timer(0.05, release.set).start()
+        with pool.lease():
+            stats = pool.stats()
+        holder.join(5)
+
+        self.assertEqual(stats["created"], 1)
+        self.assertEqual(stats["waits"], 1)
+        self.assertGreater(stats["wait_ms_max"], 0.0)
+
+    def test_tracker_that_fails_reset_is_discarded(self):
+        class _Broken(_FakeTracker):
+            def reset(self):
+                raise RuntimeError("graph closed")
+
+        pool = PoseTrackerPool(_Broken, size=1)
+        with pool.lease() as tracker:
+            pass
+
+        self.assertTrue(tracker.closed)
+        self.assertEqual(pool.stats()["created"], 0)
+        self.assertEqual(pool.stats()["discarded"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
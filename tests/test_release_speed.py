@@ -1,6 +1,7 @@
 import unittest
 from unittest.mock import patch
 
+from app.workers.speed import release_speed
 from app.workers.speed.release_speed import (
     _apply_low_confidence_neighbor_recovery,
     estimate_release_speed,
@@ -243,5 +244,32 @@ class ReleaseSpeedTests(unittest.TestCase):
         self.assertTrue(result["debug"]["low_confidence_neighbor_recovery"])
 
 
+    def test_neighbor_passes_reuse_one_landmark_extraction(self):
+        pose_frames = [
+            _frame(i, 0.40 + 0.045 * i - 0.0009 * i * i, 0.58 - 0.034 * i + 0.0006 * i * i)
+            for i in range(20)
+        ]
+        video = {"fps": 60.0, "width": 360, "height": 640}
+        passes = []
+        original_pass = release_speed._estimate_release_speed_pass
+
+        def counting_pass(**kwargs):
+            passes.append(kwargs["release_frame"])
+            return original_pass(**kwargs)
+
+        with patch.object(release_speed, "_estimate_release_speed_pass", side_effect=counting_pass), patch.object(
+            release_speed, "_body_height_px", wraps=release_speed._body_height_px
+        ) as body_height:
+            result = estimate_release_speed(
+                pose_frames=pose_frames,
+                events={"release": {"frame": 10, "confidence": 0.5}},
+                video=video,
+                hand="R",
+            )
+
+        self.assertTrue(result["available"])
+        self.assertEqual(passes, [10, 8, 9, 11, 12])
+        self.assertEqual(body_height.call_count, len(pose_frames))
+
 if __name__ == "__main__":
     unittest.main()
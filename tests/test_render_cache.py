@@ -0,0 +1,105 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from app.workers.pose.pose_sequence import PoseSequence
+from app.workers.render import render_cache
+
+CLIP_HASH = "ab" * 32
+
+
+def _pose(frames=6):
+    rng = np.random.default_rng(7)
+    data = rng.random((frames, 33, 4), dtype=np.float32)
+    valid = np.ones(frames, dtype=bool)
+    return PoseSequence(data, valid)
+
+
+def _key(pose=None, **overrides):
+    inputs = {"events": {"release": {"frame": 4}}, "risks": [{"risk_id": "front_knee", "band": "amber"}]}
+    inputs.update(overrides)
+    return render_cache.render_cache_key(
+        content_hash=CLIP_HASH,
+        pose_frames=pose if pose is not None else _pose(),
+        render_inputs=inputs,
+        render_settings={"renderer_version": "v1", "profile": "full"},
+    )
+
+
+class RenderCacheKeyTest(unittest.TestCase):
+    def test_key_is_stable_and_tracks_visual_inputs(self):
+        self.assertEqual(_key(), _key())
+        self.assertEqual(len(_key()), 64)
+        self.assertNotEqual(_key(), _key(risks=[{"risk_id": "front_knee", "band": "red"}]))
+        self.assertNotEqual(_key(), _key(report_story={"headline": "new"}))
+
+    def test_artifact_precision_pose_shares_the_key(self):
+        fresh = _pose()
+        reloaded = PoseSequence(fresh.data.astype(np.float16).astype(np.float32), fresh.valid.copy())
+        self.assertEqual(_key(fresh), _key(reloaded))
+
+    def test_missing_clip_hash_or_disabled_cache_has_no_key(self):
+        self.assertIsNone(
+            render_cache.render_cache_key(content_hash=None, pose_frames=_pose(), render_inputs={}, render_settings={})
+        )
+        with mock.patch.dict(os.environ, {"ACTIONLAB_RENDER_CACHE_ENABLED": "false"}):
+            self.assertIsNone(_key())
+
+
+class RenderCacheStoreTest(unittest.TestCase):
+    def test_store_then_load_reuses_local_artifact_and_refreshes_mtime(self):
+        key = _key()
+        with tempfile.TemporaryDirectory() as tmpdir, mock.patch.dict(os.environ, {"ACTIONLAB_RENDER_BUCKET": ""}):
+            artifact = os.path.join(tmpdir, render_cache.render_cache_artifact_name(key))
+            with open(artifact, "wb") as handle:
+                handle.write(b"video")
+            old = time.time() - 3 * 86400
+            os.utime(artifact, (old, old))
+
+            self.assertIsNone(render_cache.load_cached_render(key, tmpdir))
+            stored = render_cache.store_cached_render(
+                key,
+                {"available": True, "path": artifact, "url": "https://x/renders/a.mp4", "frames_rendered": 10},
+                tmpdir,
+            )
+            loaded = render_cache.load_cached_render(key, tmpdir)
+
+            self.assertTrue(stored)
+            self.assertEqual(loaded["frames_rendered"], 10)
+            self.assertEqual(loaded["path"], artifact)
+            self.assertEqual(loaded["cache_source"], "local")
+            self.assertNotIn("url", loaded)
+            self.assertGreater(os.path.getmtime(artifact), old + 86400)
+
+    def test_bucket_sidecar_expires_with_render_retention(self):
+        key = _key()
+        sidecar = {"available": True, "storage_uploaded": True, "frames_rendered": 10}
+        with tempfile.TemporaryDirectory() as tmpdir, mock.patch.dict(
+            os.environ,
+            {"ACTIONLAB_RENDER_BUCKET": "bucket", "ACTIONLAB_RENDER_RETENTION_DAYS": "2"},
+        ):
+            with mock.patch.object(
+                render_cache,
+                "download_bucket_object",
+                return_value=json.dumps({**sidecar, "stored_at": time.time()}).encode("utf-8"),
+            ):
+                fresh = render_cache.load_cached_render(key, tmpdir)
+            with mock.patch.object(
+                render_cache,
+                "download_bucket_object",
+                return_value=json.dumps({**sidecar, "stored_at": time.time() - 3 * 86400}).encode("utf-8"),
+            ):
+                stale = render_cache.load_cached_render(key, tmpdir)
+
+        self.assertEqual(fresh["cache_source"], "gcs")
+        self.assertIsNone(fresh["path"])
+        self.assertIsNone(stale)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from app.orchestrator import orchestrator
+from app.orchestrator.analysis_jobs import JobProgress, _JobStore
+from app.workers.pose.pose_sequence import PoseSequence
+
+os.environ.setdefault("ACTIONLAB_AUTO_CREATE_SCHEMA", "false")
+
+
+def _progress(run_id="run-1"):
+    store = _JobStore({}, MagicMock())
+    store.put(run_id, {"run_id": run_id})
+    return JobProgress(store, run_id)
+
+
+def _payload(video_path):
+    return {
+        "run_id": "11111111-1111-1111-1111-111111111111",
+        "request_id": "req-1",
+        "account_id": "acc-1",
+        "video_path": video_path,
+        "pose_artifact": {"available": True, "name": "run-1.pose.npz"},
+        "render_inputs": {"events": {}, "hand": "R"},
+    }
+
+
+class RenderJobTests(unittest.TestCase):
+    def setUp(self):
+        handle = tempfile.NamedTemporaryFile(suffix=".mp4", delete=False)
+        handle.close()
+        self.video_path = handle.name
+
+    def tearDown(self):
+        if os.path.exists(self.video_path):
+            os.remove(self.video_path)
+
+    def test_render_job_updates_stored_result_and_notifies(self):
+        pose = PoseSequence(np.zeros((4, 33, 4), dtype=np.float32), np.ones(4, dtype=bool))
+        rendered = {"available": True, "relative_url": "/renders/run-1_walkthrough.mp4"}
+        stored = {"run_id": "run-1", "visual_walkthrough": rendered}
+
+        with patch.object(
+            orchestrator, "load_pose_artifact", return_value=(pose, {"fps": 30.0, "total_frames": 4})
+        ), patch.object(orchestrator, "_build_walkthrough_render", return_value=rendered) as build, patch.object(
+            orchestrator, "_store_walkthrough_result", return_value=stored
+        ) as store, patch.object(
+            orchestrator, "persist_walkthrough_ready_notification_best_effort"
+        ) as notify:
+            result = orchestrator._run_render_job(_payload(self.video_path), _progress())
+
+        walkthrough = result["visual_walkthrough"]
+        self.assertEqual(walkthrough["status"], "ready")
+        self.assertEqual(build.call_args.kwargs["video"]["path"], self.video_path)
+        self.assertIs(build.call_args.kwargs["pose_frames"], pose)
+        self.assertEqual(store.call_args.args[1]["status"], "ready")
+        notify.assert_called_once()
+        self.assertIn("render", result["timings_v1"]["stages"])
+        self.assertFalse(os.path.exists(self.video_path))
+
+    def test_render_job_steps_down_profile_when_render_queue_is_backed_up(self):
+        pose = PoseSequence(np.zeros((4, 33, 4), dtype=np.float32), np.ones(4, dtype=bool))
+        progress = _progress()
+        for idx in range(5):
+            progress._store.put(f"queued-{idx}", {"run_id": f"queued-{idx}", "status": "queued"})
+        payload = {**_payload(self.video_path), "render_profile": "full"}
+
+        with patch.dict(os.environ, {"ACTIONLAB_RENDER_BACKLOG_STEP": "4"}), patch.object(
+            orchestrator, "load_pose_artifact", return_value=(pose, {"fps": 30.0, "total_frames": 4})
+        ), patch.object(
+            orchestrator, "_build_walkthrough_render", return_value={"available": False, "reason": "render_failed"}
+        ) as build, patch.object(orchestrator, "_store_walkthrough_result", return_value=None):
+            orchestrator._run_render_job(payload, progress)
+
+        profile = build.call_args.kwargs["render_profile"]
+        self.assertEqual(profile.name, "standard")
+        self.assertEqual(profile.max_short_side, 720)
+
+    def test_missing_pose_artifact_fails_the_walkthrough_without_notifying(self):
+        with patch.object(orchestrator, "load_pose_artifact", return_value=None), patch.object(
+            orchestrator, "_store_walkthrough_result", return_value={}
+        ) as store, patch.object(
+            orchestrator, "persist_walkthrough_ready_notification_best_effort"
+        ) as notify:
+            result = orchestrator._run_render_job(_payload(self.video_path), _progress())
+
+        self.assertEqual(result["visual_walkthrough"]["status"], "failed")
+        self.assertEqual(result["visual_walkthrough"]["reason"], "pose_artifact_missing")
+        store.assert_called_once()
+        notify.assert_not_called()
+        self.assertFalse(os.path.exists(self.video_path))
+
+    def test_lost_render_job_fails_the_walkthrough_and_drops_the_upload(self):
+        with patch.object(orchestrator, "_store_walkthrough_result", return_value={}) as store:
+            orchestrator._on_render_job_failed(_payload(self.video_path), {"code": "analysis_worker_lost"})
+
+        run_id, walkthrough = store.call_args.args
+        self.assertEqual(run_id, _payload(self.video_path)["run_id"])
+        self.assertEqual(walkthrough, {"available": False, "status": "failed", "reason": "analysis_worker_lost"})
+        self.assertFalse(os.path.exists(self.video_path))
+
+    def test_startup_sweep_fails_pending_walkthroughs(self):
+        raw = SimpleNamespace(result_json={"run_id": "run-1", "visual_walkthrough": {"status": "pending"}})
+        db = MagicMock()
+        db.query.return_value.filter.return_value.all.return_value = [raw]
+
+        with patch.object(orchestrator, "SessionLocal", return_value=db):
+            swept = orchestrator._fail_lost_pending_walkthroughs()
+
+        self.assertEqual(swept, 1)
+        self.assertEqual(raw.result_json["visual_walkthrough"]["status"], "failed")
+        self.assertEqual(raw.result_json["visual_walkthrough"]["reason"], "render_job_lost")
+        db.commit.assert_called_once()
+
+
+class WalkthroughStatusTests(unittest.TestCase):
+    def test_job_view_overlays_render_queue_state(self):
+        account = SimpleNamespace(account_id="acc-1")
+        analysis_queue = MagicMock()
+        analysis_queue.get.return_value = {
+            "run_id": "run-1",
+            "owner_id": "acc-1",
+            "status": "succeeded",
+            "result": {"visual_walkthrough": orchestrator._pending_walkthrough("run-1")},
+        }
+        render_queue = MagicMock()
+        render_queue.get.return_value = {"run_id": "run-1", "owner_id": "acc-1", "status": "running"}
+
+        with patch.object(orchestrator, "get_analysis_job_queue", return_value=analysis_queue), patch.object(
+            orchestrator, "get_render_job_queue", return_value=render_queue
+        ):
+            view = orchestrator.get_analysis_job("run-1", current_account=account)
+            render_queue.get.return_value = {
+                "run_id": "run-1",
+                "owner_id": "acc-1",
+                "status": "succeeded",
+                "result": {"visual_walkthrough": {"available": True, "status": "ready"}},
+            }
+            status = orchestrator.get_run_walkthrough("run-1", current_account=account)
+
+        self.assertEqual(view["result"]["visual_walkthrough"]["status"], "rendering")
+        self.assertEqual(status["status"], "ready")
+        self.assertTrue(status["visual_walkthrough"]["available"])
+
+    def test_inline_mode_is_configurable(self):
+        with patch.dict(os.environ, {"ACTIONLAB_RENDER_MODE": "inline"}):
+            self.assertEqual(orchestrator.walkthrough_render_mode(), "inline")
+        with patch.dict(os.environ, {"ACTIONLAB_RENDER_MODE": "bogus"}):
+            self.assertEqual(orchestrator.walkthrough_render_mode(), "queued")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import os
+import unittest
+from unittest.mock import patch
+
+from app.workers.render.render_profiles import (
+    effective_render_profile,
+    normalize_render_profile,
+    render_profiles,
+    requested_render_profile,
+)
+
+
+class RenderProfileTests(unittest.TestCase):
+    def test_platform_hint_picks_default_profile(self):
+        self.assertEqual(requested_render_profile(None, platform="android"), "standard")
+        self.assertEqual(requested_render_profile("", platform="ios"), "standard")
+        self.assertEqual(requested_render_profile(None, platform="unknown"), "full")
+        self.assertEqual(requested_render_profile(" Preview ", platform="ios"), "preview")
+
+    def test_unknown_profile_names_are_rejected(self):
+        self.assertIsNone(normalize_render_profile("4k"))
+        self.assertIsNone(normalize_render_profile(None))
+
+    def test_backlog_steps_down_one_profile_per_step(self):
+        with patch.dict(os.environ, {"ACTIONLAB_RENDER_BACKLOG_STEP": "3"}):
+            self.assertEqual(effective_render_profile("full", backlog=2).name, "full")
+            self.assertEqual(effective_render_profile("full", backlog=3).name, "standard")
+            self.assertEqual(effective_render_profile("full", backlog=30).name, "preview")
+        with patch.dict(os.environ, {"ACTIONLAB_RENDER_BACKLOG_STEP": "0"}):
+            self.assertEqual(effective_render_profile("full", backlog=30).name, "full")
+
+    def test_full_profile_follows_x264_environment(self):
+        with patch.dict(os.environ, {"ACTIONLAB_RENDER_X264_PRESET": "medium", "ACTIONLAB_RENDER_X264_CRF": "19"}):
+            profiles = render_profiles()
+
+        self.assertEqual(profiles["full"].encode_settings.preset, "medium")
+        self.assertEqual(profiles["full"].encode_settings.crf, 19)
+        self.assertEqual(profiles["preview"].max_short_side, 540)
+        self.assertEqual(profiles["preview"].encode_settings.preset, "veryfast")
+
+
+if __name__ == "__main__":
+    unittest.main()
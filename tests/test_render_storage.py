@@ -1,15 +1,25 @@
+import asyncio
 import importlib
 import os
 import tempfile
 import unittest
 from unittest import mock
 
+from types import SimpleNamespace
+
 from fastapi import HTTPException
-from fastapi.responses import FileResponse, Response
+from fastapi.responses import StreamingResponse
 
 from app.workers.render import render_storage
 
 
+def _drain(response):
+    async def collect():
+        return [chunk async for chunk in response.body_iterator]
+
+    return asyncio.run(collect())
+
+
 class RenderStorageHelpersTest(unittest.TestCase):
     def test_upload_render_artifact_without_bucket_keeps_local_mode(self):
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -25,6 +35,68 @@ class RenderStorageHelpersTest(unittest.TestCase):
             self.assertEqual(result["storage_backend"], "local")
             self.assertEqual(result["reason"], "render_bucket_not_configured")
 
+    def test_filesystem_bucket_round_trips_uploads(self):
+        with tempfile.TemporaryDirectory() as tmpdir, tempfile.TemporaryDirectory() as bucket_dir:
+            path = os.path.join(tmpdir, "sample.mp4")
+            with open(path, "wb") as handle:
+                handle.write(b"video")
+
+            with mock.patch.dict(os.environ, {"ACTIONLAB_RENDER_BUCKET": f"file://{bucket_dir}"}, clear=False):
+                result = render_storage.upload_render_artifact(path)
+                artifact = render_storage.open_render_artifact("sample.mp4", local_dir=tmpdir)
+                downloaded = b"".join(render_storage.iter_render_artifact(artifact, 0, artifact.size - 1))
+                tail = b"".join(render_storage.iter_render_artifact(artifact, 2, 4))
+
+            self.assertTrue(result["uploaded"])
+            self.assertEqual((artifact.source, artifact.size), ("gcs", 5))
+            self.assertEqual(downloaded, b"video")
+            self.assertEqual(tail, b"deo")
+
+    def test_storage_client_is_created_once(self):
+        storage = mock.Mock()
+        storage.Client.return_value.bucket.return_value.get_blob.return_value = None
+        with mock.patch.object(render_storage, "_google_storage", return_value=storage), mock.patch.object(
+            render_storage, "_client", None
+        ), mock.patch.dict(os.environ, {"ACTIONLAB_RENDER_BUCKET": "bucket"}, clear=False):
+            with tempfile.TemporaryDirectory() as tmpdir:
+                self.assertIsNone(render_storage.open_render_artifact("a.mp4", local_dir=tmpdir))
+            render_storage.download_bucket_object("pose-artifacts/b.pose.npz")
+
+        storage.Client.assert_called_once_with()
+
+    def test_local_etag_follows_content_not_mtime(self):
+        key = "ab" * 32
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for name in ("run_walkthrough.mp4", f"walkthrough-{key}.mp4"):
+                path = os.path.join(tmpdir, name)
+                with open(path, "wb") as handle:
+                    handle.write(b"video")
+            first = render_storage.open_render_artifact("run_walkthrough.mp4", local_dir=tmpdir)
+            cached = render_storage.open_render_artifact(f"walkthrough-{key}.mp4", local_dir=tmpdir)
+            for name in ("run_walkthrough.mp4", f"walkthrough-{key}.mp4"):
+                os.utime(os.path.join(tmpdir, name), (1.0, 1.0))  # the render cache touches hot entries
+            touched = render_storage.open_render_artifact("run_walkthrough.mp4", local_dir=tmpdir)
+            touched_cached = render_storage.open_render_artifact(f"walkthrough-{key}.mp4", local_dir=tmpdir)
+            with open(os.path.join(tmpdir, "run_walkthrough.mp4"), "wb") as handle:
+                handle.write(b"VIDEO")
+            rewritten = render_storage.open_render_artifact("run_walkthrough.mp4", local_dir=tmpdir)
+
+        self.assertEqual(touched.etag, first.etag)
+        self.assertEqual(touched_cached.etag, cached.etag)
+        self.assertEqual(cached.etag, f'"{key[:32]}-5"')
+        self.assertNotEqual(rewritten.etag, first.etag)
+
+    def test_parse_byte_range(self):
+        from app.orchestrator.render_delivery import parse_byte_range
+
+        self.assertEqual(parse_byte_range("bytes=0-1", 10), (0, 1))
+        self.assertEqual(parse_byte_range("bytes=4-", 10), (4, 9))
+        self.assertEqual(parse_byte_range("bytes=5-99", 10), (5, 9))
+        self.assertEqual(parse_byte_range("bytes=-3", 10), (7, 9))
+        self.assertIsNone(parse_byte_range(None, 10))
+        self.assertIsNone(parse_byte_range("bytes=0-1,4-5", 10))
+        self.assertIsNone(parse_byte_range("items=0-1", 10))
+
 
 class WalkthroughRenderRouteTest(unittest.TestCase):
     @classmethod
@@ -34,62 +106,103 @@ class WalkthroughRenderRouteTest(unittest.TestCase):
         module = importlib.import_module("app.orchestrator.orchestrator")
         cls.module = module
 
-    def test_get_walkthrough_render_serves_local_file(self):
+    def _get(self, filename, render_dir, *, bucket="", headers=None):
+        request = SimpleNamespace(headers=headers or {})
+        with mock.patch.object(self.module, "RENDERS_DIR", render_dir), mock.patch.dict(
+            os.environ,
+            {"ACTIONLAB_RENDER_BUCKET": bucket, "ACTIONLAB_RENDER_STREAM_CHUNK_KB": "64"},
+            clear=False,
+        ):
+            response = self.module.get_walkthrough_render(filename, request)
+            body = b"".join(_drain(response)) if isinstance(response, StreamingResponse) else response.body
+        return response, body
+
+    def test_get_walkthrough_render_streams_local_file(self):
         with tempfile.TemporaryDirectory() as tmpdir:
-            target = os.path.join(tmpdir, "local.mp4")
-            payload = b"local-video"
-            with open(target, "wb") as handle:
+            payload = os.urandom(200 * 1024)
+            with open(os.path.join(tmpdir, "local.mp4"), "wb") as handle:
                 handle.write(payload)
 
-            with mock.patch.object(self.module, "RENDERS_DIR", tmpdir), mock.patch.object(
-                self.module,
-                "download_render_artifact",
-                return_value=None,
-            ) as download_render:
-                response = self.module.get_walkthrough_render("local.mp4")
+            response, body = self._get("local.mp4", tmpdir)
 
-            self.assertIsInstance(response, FileResponse)
-            self.assertEqual(response.path, target)
+            self.assertIsInstance(response, StreamingResponse)
+            self.assertEqual(response.status_code, 200)
             self.assertEqual(response.media_type, "video/mp4")
-            download_render.assert_called_once_with("local.mp4")
+            self.assertEqual(response.headers["accept-ranges"], "bytes")
+            self.assertEqual(response.headers["content-length"], str(len(payload)))
+            self.assertEqual(body, payload)
 
-    def test_get_walkthrough_render_prefers_remote_bytes_over_local_file(self):
-        with tempfile.TemporaryDirectory() as tmpdir:
-            target = os.path.join(tmpdir, "remote.mp4")
-            with open(target, "wb") as handle:
+    def test_get_walkthrough_render_prefers_bucket_over_local_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir, tempfile.TemporaryDirectory() as bucket_dir:
+            with open(os.path.join(tmpdir, "remote.mp4"), "wb") as handle:
                 handle.write(b"stale-local-video")
+            object_path = os.path.join(bucket_dir, "walkthrough-renders", "remote.mp4")
+            os.makedirs(os.path.dirname(object_path))
+            with open(object_path, "wb") as handle:
+                handle.write(b"fresh-remote-video")
 
-            payload = b"fresh-remote-video"
-            with mock.patch.object(self.module, "RENDERS_DIR", tmpdir), mock.patch.object(
-                self.module,
-                "download_render_artifact",
-                return_value=payload,
-            ) as download_render:
-                response = self.module.get_walkthrough_render("remote.mp4")
+            response, body = self._get("remote.mp4", tmpdir, bucket=f"file://{bucket_dir}")
 
-            self.assertIsInstance(response, Response)
-            self.assertEqual(response.body, payload)
-            self.assertEqual(response.media_type, "video/mp4")
-            download_render.assert_called_once_with("remote.mp4")
+            self.assertEqual(body, b"fresh-remote-video")
 
-    def test_get_walkthrough_render_falls_back_to_remote_bytes(self):
+    def test_get_walkthrough_render_serves_ranges_from_bucket(self):
+        with tempfile.TemporaryDirectory() as tmpdir, tempfile.TemporaryDirectory() as bucket_dir:
+            payload = os.urandom(150 * 1024)
+            object_path = os.path.join(bucket_dir, "walkthrough-renders", "remote.mp4")
+            os.makedirs(os.path.dirname(object_path))
+            with open(object_path, "wb") as handle:
+                handle.write(payload)
+            bucket = f"file://{bucket_dir}"
+
+            probe, probe_body = self._get("remote.mp4", tmpdir, bucket=bucket, headers={"range": "bytes=0-1"})
+            middle, middle_body = self._get("remote.mp4", tmpdir, bucket=bucket, headers={"range": "bytes=70000-140000"})
+            tail, tail_body = self._get("remote.mp4", tmpdir, bucket=bucket, headers={"range": "bytes=-10"})
+            beyond, _ = self._get("remote.mp4", tmpdir, bucket=bucket, headers={"range": f"bytes={len(payload)}-"})
+
+            self.assertEqual(probe.status_code, 206)
+            self.assertEqual(probe.headers["content-range"], f"bytes 0-1/{len(payload)}")
+            self.assertEqual(probe_body, payload[:2])
+            self.assertEqual(middle_body, payload[70000:140001])
+            self.assertEqual(middle.headers["content-length"], str(70001))
+            self.assertEqual(tail_body, payload[-10:])
+            self.assertEqual(beyond.status_code, 416)
+            self.assertEqual(beyond.headers["content-range"], f"bytes */{len(payload)}")
+
+    def test_get_walkthrough_render_answers_matching_etag_with_not_modified(self):
         with tempfile.TemporaryDirectory() as tmpdir:
-            payload = b"remote-video"
-            with mock.patch.object(self.module, "RENDERS_DIR", tmpdir), mock.patch.object(
-                self.module,
-                "download_render_artifact",
-                return_value=payload,
-            ) as download_render:
-                response = self.module.get_walkthrough_render("remote.mp4")
+            with open(os.path.join(tmpdir, "local.mp4"), "wb") as handle:
+                handle.write(b"local-video")
+
+            first, _ = self._get("local.mp4", tmpdir)
+            os.utime(os.path.join(tmpdir, "local.mp4"), None)
+            again, body = self._get("local.mp4", tmpdir, headers={"if-none-match": first.headers["etag"]})
+
+            self.assertEqual(again.status_code, 304)
+            self.assertEqual(body, b"")
+
+    def test_get_walkthrough_render_redirects_to_signed_url_when_enabled(self):
+        blob = mock.Mock(size=5, md5_hash="abc", etag=None, generation=1)
+        blob.generate_signed_url.return_value = "https://signed.example/remote.mp4"
+        artifact = render_storage.RenderArtifact("remote.mp4", 5, '"abc"', "gcs", blob=blob)
+        with tempfile.TemporaryDirectory() as tmpdir, mock.patch.object(
+            self.module, "open_render_artifact", return_value=artifact
+        ), mock.patch.dict(os.environ, {"ACTIONLAB_RENDER_SIGNED_URL_TTL_SECONDS": "600"}, clear=False):
+            response, _ = self._get("remote.mp4", tmpdir)
+
+        self.assertEqual(response.status_code, 307)
+        self.assertEqual(response.headers["location"], "https://signed.example/remote.mp4")
+        blob.download_as_bytes.assert_not_called()
+
+    def test_get_walkthrough_render_missing_file_is_not_found(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with self.assertRaises(HTTPException) as ctx:
+                self._get("missing.mp4", tmpdir)
 
-            self.assertIsInstance(response, Response)
-            self.assertEqual(response.body, payload)
-            self.assertEqual(response.media_type, "video/mp4")
-            download_render.assert_called_once_with("remote.mp4")
+        self.assertEqual(ctx.exception.status_code, 404)
 
     def test_get_walkthrough_render_rejects_invalid_names(self):
         with self.assertRaises(HTTPException) as ctx:
-            self.module.get_walkthrough_render("../bad.mp4")
+            self.module.get_walkthrough_render("../bad.mp4", SimpleNamespace(headers={}))
 
         self.assertEqual(ctx.exception.status_code, 404)
 
@@ -220,6 +333,54 @@ class WalkthroughRenderRouteTest(unittest.TestCase):
                 artifact_name="run-1_walkthrough.mp4",
             )
 
+    def test_build_walkthrough_render_reuses_cached_render_for_same_inputs(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            video_path = os.path.join(tmpdir, "input.mp4")
+            with open(video_path, "wb") as handle:
+                handle.write(b"source-video")
+
+            def _fake_render(**kwargs):
+                with open(kwargs["output_path"], "wb") as handle:
+                    handle.write(b"rendered")
+                return {"available": True, "path": kwargs["output_path"], "frames_rendered": 10}
+
+            def _build(risks):
+                return self.module._build_walkthrough_render(
+                    run_id="run-1",
+                    video={"path": video_path, "total_frames": 20, "content_hash": "cd" * 32},
+                    pose_frames=[],
+                    events={"release": {"frame": 10}},
+                    hand="right",
+                    action={},
+                    elbow={},
+                    risks=risks,
+                    estimated_release_speed={},
+                    report_story=None,
+                    root_cause=None,
+                )
+
+            with mock.patch.object(self.module, "RENDERS_DIR", tmpdir), mock.patch.object(
+                self.module,
+                "render_skeleton_video",
+                side_effect=_fake_render,
+            ) as render, mock.patch.object(
+                self.module,
+                "upload_render_artifact",
+                return_value={"uploaded": False, "storage_backend": "local"},
+            ), mock.patch.dict(os.environ, {"ACTIONLAB_RENDER_BUCKET": ""}, clear=False):
+                first = _build([])
+                second = _build([])
+                changed = _build([{"risk_id": "front_knee", "band": "red"}])
+
+            self.assertEqual(render.call_count, 2)
+            self.assertTrue(first["relative_url"].startswith("/renders/walkthrough-"))
+            self.assertNotIn("cache_hit", first)
+            self.assertTrue(second["cache_hit"])
+            self.assertEqual(second["relative_url"], first["relative_url"])
+            self.assertEqual(second["frames_rendered"], 10)
+            self.assertNotEqual(changed["relative_url"], first["relative_url"])
+
+
 
 if __name__ == "__main__":
     unittest.main()
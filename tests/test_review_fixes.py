@@ -454,6 +454,27 @@ class TempCleanupTests(unittest.TestCase):
             if os.path.exists(stale_path):
                 os.remove(stale_path)
 
+    def test_loader_removes_uploads_of_exited_processes_only(self):
+        from app.io import loader
+
+        temp_dir = tempfile.gettempdir()
+        orphan_path = os.path.join(temp_dir, f"{loader.TEMP_UPLOAD_ROOT_PREFIX}999999999_orphan.mp4")
+        own_path = os.path.join(temp_dir, f"{loader.TEMP_UPLOAD_PREFIX}live.mp4")
+        for path in (orphan_path, own_path):
+            with open(path, "wb") as handle:
+                handle.write(b"video")
+
+        try:
+            result = loader.cleanup_orphaned_temp_uploads()
+
+            self.assertGreaterEqual(result["removed"], 1)
+            self.assertFalse(os.path.exists(orphan_path))
+            self.assertTrue(os.path.exists(own_path))
+        finally:
+            for path in (orphan_path, own_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
     def test_temp_upload_prefix_is_pid_scoped(self):
         from app.io import loader
 
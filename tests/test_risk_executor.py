@@ -0,0 +1,123 @@
+import os
+import threading
+import time
+import unittest
+from unittest import mock
+
+from app.common.metrics import run_timings
+from app.workers.risk import risk_executor, risk_worker
+from app.workers.risk.risk_executor import RiskInputs, RiskModule, run_risks
+
+
+def _inputs():
+    return RiskInputs(pose_frames=[], fps=30.0, events={}, action={}, bfc=1, ffc=2, uah=3, release=4, run_id="run-1")
+
+
+class RiskExecutorTests(unittest.TestCase):
+    def test_outcomes_follow_registration_order_and_record_spans(self):
+        modules = [
+            RiskModule("slow", lambda r: time.sleep(0.05) or {"signal_strength": 0.3}),
+            RiskModule("fast", lambda r: {"signal_strength": r.ffc / 10.0}),
+        ]
+        with run_timings() as timings:
+            outcomes = run_risks(_inputs(), modules)
+
+        self.assertEqual([o.risk_id for o in outcomes], ["slow", "fast"])
+        self.assertEqual([o.status for o in outcomes], ["ok", "ok"])
+        self.assertEqual(outcomes[1].result, {"signal_strength": 0.2})
+        self.assertGreaterEqual(outcomes[0].seconds, 0.05)
+        self.assertIn("risk.slow", timings.breakdown()["stages"])
+
+    def test_overrunning_or_failing_module_reports_no_result(self):
+        release = threading.Event()
+
+        def boom(_):
+            raise RuntimeError("noisy clip")
+
+        modules = [
+            RiskModule("stuck", lambda r: release.wait(5.0) and {"signal_strength": 0.9}),
+            RiskModule("broken", boom),
+            RiskModule("fine", lambda r: {"signal_strength": 0.4}),
+        ]
+        try:
+            with mock.patch.dict(os.environ, {"ACTIONLAB_RISK_BUDGET_SECONDS": "0.1"}):
+                started = time.perf_counter()
+                outcomes = run_risks(_inputs(), modules)
+                elapsed = time.perf_counter() - started
+        finally:
+            release.set()
+
+        self.assertLess(elapsed, 2.0)
+        self.assertEqual([o.status for o in outcomes], ["timeout", "error", "ok"])
+        self.assertEqual([o.result for o in outcomes][:2], [None, None])
+        self.assertEqual(risk_executor.RISK_FALLBACKS.value(risk="stuck", reason="timeout"), 1.0)
+
+    def test_inline_mode_matches_pooled_run(self):
+        modules = [RiskModule(f"r{i}", lambda r, i=i: {"signal_strength": 0.1 * i}) for i in range(5)]
+        pooled = run_risks(_inputs(), modules)
+        with mock.patch.dict(os.environ, {"ACTIONLAB_RISK_WORKERS": "1"}):
+            inline = run_risks(_inputs(), modules)
+        self.assertEqual([o.result for o in pooled], [o.result for o in inline])
+
+    def test_budget_starts_when_a_queued_module_starts_running(self):
+        modules = [RiskModule(f"r{i}", lambda r: time.sleep(1.35) or {"signal_strength": 0.3}) for i in range(3)]
+        env = {"ACTIONLAB_RISK_WORKERS": "2", "ACTIONLAB_RISK_BUDGET_SECONDS": "2.0"}
+        with mock.patch.dict(os.environ, env):
+            started = time.perf_counter()
+            outcomes = run_risks(_inputs(), modules)
+            elapsed = time.perf_counter() - started
+
+        # r2 waits ~1.35 s for a thread, so it only fits the budget counted from its own start.
+        self.assertGreater(elapsed, 2.0)
+        self.assertEqual([o.status for o in outcomes], ["ok", "ok", "ok"])
+        self.assertLess(outcomes[2].seconds, 2.0)
+
+    def test_runs_share_one_pool(self):
+        modules = [RiskModule(f"r{i}", lambda r: {"signal_strength": 0.1}) for i in range(2)]
+        run_risks(_inputs(), modules)
+        pool = risk_executor._POOL
+        run_risks(_inputs(), modules)
+
+        self.assertIsNotNone(pool)
+        self.assertIs(risk_executor._POOL, pool)
+
+    def test_worker_reports_timed_out_modules(self):
+        release = threading.Event()
+        saved = dict(risk_executor.RISK_MODULES)
+        try:
+            risk_executor.RISK_MODULES.clear()
+            risk_executor.register_risk("hung", lambda r: release.wait(5.0) and {"signal_strength": 0.9})
+            risk_executor.register_risk("fine", lambda r: {"signal_strength": 0.4})
+            with mock.patch.dict(os.environ, {"ACTIONLAB_RISK_BUDGET_SECONDS": "0.1"}), mock.patch.object(
+                risk_worker, "attach_deviation_and_impact", side_effect=lambda risk, **_: risk
+            ):
+                risks, outcomes = risk_worker.run_risk_worker_outcomes(pose_frames=[], video={"fps": 30}, events={})
+        finally:
+            release.set()
+            risk_executor.RISK_MODULES.clear()
+            risk_executor.RISK_MODULES.update(saved)
+
+        self.assertEqual([o.status for o in outcomes], ["timeout", "ok"])
+        self.assertEqual([r["risk_id"] for r in risks], ["hung", "fine"])
+        self.assertEqual(risks[0]["signal_strength"], 0.15)
+
+
+class RiskRegistryTests(unittest.TestCase):
+    def test_registered_module_is_emitted_at_its_floor(self):
+        saved = dict(risk_executor.RISK_MODULES)
+        try:
+            risk_executor.register_risk("wrist_snap", lambda r: {"signal_strength": 0.05, "confidence": 0.7}, floor=0.2)
+            with mock.patch.object(risk_worker, "attach_deviation_and_impact", side_effect=lambda risk, **_: risk):
+                out = risk_worker.run_risk_worker(pose_frames=[], video={"fps": 30}, events={}, action={})
+        finally:
+            risk_executor.RISK_MODULES.clear()
+            risk_executor.RISK_MODULES.update(saved)
+
+        self.assertEqual(len(out), 8)
+        self.assertEqual(out[-1]["risk_id"], "wrist_snap")
+        self.assertEqual(out[-1]["signal_strength"], 0.2)
+        self.assertEqual(out[-1]["acceptance_band"], "acceptable")
+
+
+if __name__ == "__main__":
+    unittest.main()
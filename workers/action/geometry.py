@@ -15,6 +15,8 @@ Landmark indices:
 import math
 from typing import Any, Dict, List, Optional, Tuple
 
+from app.workers.pose.pose_sequence import is_pose_frame_list
+
 LH, RH = 23, 24
 VIS_MIN = 0.5
 
@@ -91,7 +93,7 @@ def compute_batsman_axis(
     """
     if bfc_frame is None:
         return None
-    if not isinstance(pose_frames, list) or not pose_frames:
+    if not is_pose_frame_list(pose_frames) or not pose_frames:
         return None
 
     # window: mostly before BFC, a couple frames after (to stabilize)
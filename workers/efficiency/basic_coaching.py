@@ -24,7 +24,6 @@ from app.workers.action.foot_orientation import compute_foot_intent
 from app.workers.risk.knee_brace_failure import compute_front_knee_brace_profile
 
 # MediaPipe indices
-LH, RH = 23, 24
 L_ANKLE, R_ANKLE = 27, 28
 
 # -----------------------------
@@ -56,15 +55,6 @@ CFG = {
 }
 
 
-def _pelvis_y(frame: Dict[str, Any]) -> Optional[float]:
-    if not frame or "landmarks" not in frame:
-        return None
-    if not landmarks_visible(frame, [LH, RH]):
-        return None
-    lm = frame["landmarks"]
-    return 0.5 * (float(lm[LH]["y"]) + float(lm[RH]["y"]))
-
-
 def _stdev(vals: List[float]) -> float:
     if len(vals) < 2:
         return 0.0
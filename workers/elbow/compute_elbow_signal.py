@@ -15,7 +15,10 @@ We clamp impossible jumps instead of discarding data.
 """
 
 import math
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, List, Optional
+
+from app.workers.pose.kinematics import Centroid, kinematics_for
+from app.workers.pose.pose_sequence import is_pose_frame_list
 
 # MediaPipe Pose indices
 LS, LE, LW = 11, 13, 15
@@ -26,6 +29,8 @@ L_INDEX, R_INDEX = 19, 20
 L_THUMB, R_THUMB = 21, 22
 
 VISIBILITY_MIN = 0.5
+# Landmarks without a visibility value count as fully visible here (unlike the other workers).
+VISIBILITY_MISSING = 1.0
 
 # Maximum physically plausible per-frame elbow angle change (degrees)
 ANGLE_JUMP_MAX_DEG = 25.0
@@ -36,50 +41,8 @@ W_PINKY = 0.15
 W_THUMB = 0.10
 
 
-def _to_xyz(pt: Any) -> Optional[Tuple[float, float, float]]:
-    try:
-        if isinstance(pt, dict):
-            return (float(pt["x"]), float(pt["y"]), float(pt.get("z", 0.0)))
-        return (float(pt.x), float(pt.y), float(getattr(pt, "z", 0.0)))
-    except Exception:
-        return None
-
-
-def _get_vis(pt: Any) -> float:
-    try:
-        return float(pt.get("visibility", 1.0)) if isinstance(pt, dict) else float(getattr(pt, "visibility", 1.0))
-    except Exception:
-        return 1.0
-
-
-def _angle(a, b, c) -> Optional[float]:
-    bax, bay, baz = a[0]-b[0], a[1]-b[1], a[2]-b[2]
-    bcx, bcy, bcz = c[0]-b[0], c[1]-b[1], c[2]-b[2]
-
-    mag1 = math.sqrt(bax*bax + bay*bay + baz*baz)
-    mag2 = math.sqrt(bcx*bcx + bcy*bcy + bcz*bcz)
-    if mag1 < 1e-6 or mag2 < 1e-6:
-        return None
-
-    dot = bax*bcx + bay*bcy + baz*bcz
-    cosv = max(-1.0, min(1.0, dot / (mag1 * mag2)))
-    return math.degrees(math.acos(cosv))
-
-
-def _weighted_centroid(points):
-    sw = sum(w for _, w in points)
-    if sw < 1e-9:
-        return None
-    return (
-        sum(p[0]*w for p, w in points)/sw,
-        sum(p[1]*w for p, w in points)/sw,
-        sum(p[2]*w for p, w in points)/sw,
-    )
-
-
 def compute_elbow_signal(pose_frames: Any, hand: str) -> List[Dict[str, Any]]:
-    frames = pose_frames if isinstance(pose_frames, list) else []
-    signal = []
+    kin = kinematics_for(pose_frames if is_pose_frame_list(pose_frames) else [])
 
     if hand == "R":
         s_idx, e_idx, w_idx = RS, RE, RW
@@ -88,41 +51,22 @@ def compute_elbow_signal(pose_frames: Any, hand: str) -> List[Dict[str, Any]]:
         s_idx, e_idx, w_idx = LS, LE, LW
         i_idx, p_idx, t_idx = L_INDEX, L_PINKY, L_THUMB
 
-    prev_angle: Optional[float] = None
-
-    for i, item in enumerate(frames):
-        lm = item.get("landmarks") if isinstance(item, dict) else item
-        frame_idx = int(item.get("frame", i)) if isinstance(item, dict) else i
-
-        if not isinstance(lm, list) or len(lm) <= max(s_idx, e_idx, w_idx, i_idx, p_idx, t_idx):
-            signal.append({"frame": frame_idx, "angle_deg": None, "valid": False})
-            continue
-
-        s, e = lm[s_idx], lm[e_idx]
-        if _get_vis(s) < VISIBILITY_MIN or _get_vis(e) < VISIBILITY_MIN:
-            signal.append({"frame": frame_idx, "angle_deg": None, "valid": False})
-            continue
-
-        a, b = _to_xyz(s), _to_xyz(e)
-        if a is None or b is None:
-            signal.append({"frame": frame_idx, "angle_deg": None, "valid": False})
-            continue
-
-        pts = []
-        for idx, w in [(w_idx, W_WRIST), (i_idx, W_INDEX), (p_idx, W_PINKY), (t_idx, W_THUMB)]:
-            pt = lm[idx]
-            if _get_vis(pt) >= VISIBILITY_MIN:
-                xyz = _to_xyz(pt)
-                if xyz:
-                    pts.append((xyz, w))
+    # Distal point: weighted centroid of the visible hand joints (wrist, index, pinky, thumb).
+    hand_point = Centroid((w_idx, i_idx, p_idx, t_idx), (W_WRIST, W_INDEX, W_PINKY, W_THUMB))
+    angles = kin.joint_angle(
+        s_idx,
+        e_idx,
+        hand_point,
+        dims=3,
+        min_visibility=VISIBILITY_MIN,
+        missing_visibility=VISIBILITY_MISSING,
+    )
 
-        c = _weighted_centroid(pts)
-        if c is None:
-            signal.append({"frame": frame_idx, "angle_deg": None, "valid": False})
-            continue
+    signal = []
+    prev_angle: Optional[float] = None
 
-        ang = _angle(a, b, c)
-        if ang is None:
+    for frame_idx, ang in zip(kin.frame_ids.tolist(), angles.tolist()):
+        if not math.isfinite(ang):
             signal.append({"frame": frame_idx, "angle_deg": None, "valid": False})
             continue
 
@@ -9,9 +9,11 @@ Fallback rule:
   bowling-arm flow across FFC -> UAH -> release.
 """
 
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional
 import math
 
+from app.workers.pose.kinematics import Centroid, kinematics_for
+
 THRESH_LEGAL = 18.0
 THRESH_BORDERLINE = 22.0
 
@@ -67,55 +69,6 @@ def _extract_event_frame(events: Dict[str, Any], key: str) -> Optional[int]:
     return None
 
 
-def _point_vis(pt: Any) -> float:
-    try:
-        if isinstance(pt, dict):
-            return float(pt.get("visibility", 0.0))
-        return float(getattr(pt, "visibility", 0.0))
-    except Exception:
-        return 0.0
-
-
-def _point_xyz(pt: Any) -> Optional[Tuple[float, float, float]]:
-    try:
-        if isinstance(pt, dict):
-            return (
-                float(pt.get("x", 0.0)),
-                float(pt.get("y", 0.0)),
-                float(pt.get("z", 0.0)),
-            )
-        return (
-            float(getattr(pt, "x", 0.0)),
-            float(getattr(pt, "y", 0.0)),
-            float(getattr(pt, "z", 0.0)),
-        )
-    except Exception:
-        return None
-
-
-def _angle_3pt(a: Tuple[float, float, float], b: Tuple[float, float, float], c: Tuple[float, float, float]) -> Optional[float]:
-    bax, bay, baz = a[0] - b[0], a[1] - b[1], a[2] - b[2]
-    bcx, bcy, bcz = c[0] - b[0], c[1] - b[1], c[2] - b[2]
-    mag1 = math.sqrt(bax * bax + bay * bay + baz * baz)
-    mag2 = math.sqrt(bcx * bcx + bcy * bcy + bcz * bcz)
-    if mag1 < 1e-6 or mag2 < 1e-6:
-        return None
-    dot = bax * bcx + bay * bcy + baz * bcz
-    cosv = max(-1.0, min(1.0, dot / (mag1 * mag2)))
-    return math.degrees(math.acos(cosv))
-
-
-def _weighted_centroid(points: List[Tuple[Tuple[float, float, float], float]]) -> Optional[Tuple[float, float, float]]:
-    weight_sum = sum(w for _, w in points)
-    if weight_sum < 1e-9:
-        return None
-    return (
-        sum(p[0] * w for p, w in points) / weight_sum,
-        sum(p[1] * w for p, w in points) / weight_sum,
-        sum(p[2] * w for p, w in points) / weight_sum,
-    )
-
-
 def _percentile(vals: List[float], q: int) -> float:
     xs = sorted(vals)
     if len(xs) == 1:
@@ -351,58 +304,20 @@ def _compute_low_visibility_signal(
 ) -> List[Dict[str, Any]]:
     hand = (hand or "R").upper()
     if hand == "R":
-        s_idx, e_idx, w_idx = RS, RE, RW
-        extras = [(R_INDEX, 0.20), (R_PINKY, 0.15), (R_THUMB, 0.10)]
+        s_idx, e_idx = RS, RE
+        distal = Centroid((RW, R_INDEX, R_PINKY, R_THUMB), (0.55, 0.20, 0.15, 0.10))
     else:
-        s_idx, e_idx, w_idx = LS, LE, LW
-        extras = [(L_INDEX, 0.20), (L_PINKY, 0.15), (L_THUMB, 0.10)]
+        s_idx, e_idx = LS, LE
+        distal = Centroid((LW, L_INDEX, L_PINKY, L_THUMB), (0.55, 0.20, 0.15, 0.10))
+
+    kin = kinematics_for(pose_frames or [])
+    angles = kin.joint_angle(s_idx, e_idx, distal, dims=3, min_visibility=(LOW_VIS_SHOULDER_MIN_VIS, min_vis, min_vis))
 
     signal: List[Dict[str, Any]] = []
     prev_angle: Optional[float] = None
 
-    for i, item in enumerate(pose_frames or []):
-        frame_idx = int(item.get("frame", i)) if isinstance(item, dict) else i
-        landmarks = item.get("landmarks") if isinstance(item, dict) else None
-        if not isinstance(landmarks, list) or len(landmarks) <= max(s_idx, e_idx, w_idx):
-            signal.append({"frame": frame_idx, "angle_deg": None, "valid": False})
-            continue
-
-        shoulder = landmarks[s_idx]
-        elbow = landmarks[e_idx]
-        if _point_vis(shoulder) < LOW_VIS_SHOULDER_MIN_VIS or _point_vis(elbow) < min_vis:
-            signal.append({"frame": frame_idx, "angle_deg": None, "valid": False})
-            continue
-
-        shoulder_xyz = _point_xyz(shoulder)
-        elbow_xyz = _point_xyz(elbow)
-        if shoulder_xyz is None or elbow_xyz is None:
-            signal.append({"frame": frame_idx, "angle_deg": None, "valid": False})
-            continue
-
-        points: List[Tuple[Tuple[float, float, float], float]] = []
-        wrist = landmarks[w_idx]
-        if _point_vis(wrist) >= min_vis:
-            wrist_xyz = _point_xyz(wrist)
-            if wrist_xyz is not None:
-                points.append((wrist_xyz, 0.55))
-
-        for idx, weight in extras:
-            if idx >= len(landmarks):
-                continue
-            pt = landmarks[idx]
-            if _point_vis(pt) < min_vis:
-                continue
-            pt_xyz = _point_xyz(pt)
-            if pt_xyz is not None:
-                points.append((pt_xyz, weight))
-
-        distal = _weighted_centroid(points)
-        if distal is None:
-            signal.append({"frame": frame_idx, "angle_deg": None, "valid": False})
-            continue
-
-        angle = _angle_3pt(shoulder_xyz, elbow_xyz, distal)
-        if angle is None:
+    for frame_idx, angle in zip(kin.frame_ids.tolist(), angles.tolist()):
+        if not math.isfinite(angle):
             signal.append({"frame": frame_idx, "angle_deg": None, "valid": False})
             continue
 
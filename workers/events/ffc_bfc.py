@@ -11,11 +11,12 @@ PHASE-1 INVARIANTS (UPDATED FOR REAL POSE DATA):
 """
 
 from typing import Dict, List, Optional, Tuple
-import math
 import numpy as np
 
 from app.common.logger import get_logger
 from app.workers.events.event_confidence import build_candidate, chain_quality, compact_candidates
+from app.workers.pose.kinematics import kinematics_for
+from app.workers.pose.pose_sequence import X, Y, PoseSequence, as_pose_sequence
 
 logger = get_logger(__name__)
 
@@ -83,70 +84,14 @@ def _robust_mad(x: np.ndarray) -> float:
     return float(np.median(np.abs(x - med)) + 1e-9)
 
 
-def _vis(lm: list, idx: int) -> float:
-    try:
-        if idx >= len(lm) or lm[idx] is None:
-            return 0.0
-        return float(lm[idx].get("visibility", 0.0))
-    except Exception:
-        return 0.0
-
-
-def _xy(lm: list, idx: int):
-    try:
-        if idx >= len(lm) or lm[idx] is None:
-            return None
-        x = lm[idx].get("x", None)
-        y = lm[idx].get("y", None)
-        if x is None or y is None:
-            return None
-        return float(x), float(y)
-    except Exception:
-        return None
-
-
-def _midpoint(a, b):
-    if a is None or b is None:
-        return None
-    return ((a[0] + b[0]) / 2.0, (a[1] + b[1]) / 2.0)
-
-
-def _angle_of_vec(v):
-    return math.atan2(v[1], v[0])
-
-
-def _safe_angle(lm: list, i1: int, i2: int) -> float:
-    p1 = _xy(lm, i1)
-    p2 = _xy(lm, i2)
-    if p1 is None or p2 is None:
-        return float("nan")
-    return _angle_of_vec((p2[0] - p1[0], p2[1] - p1[1]))
-
-
-def _pelvis_xy(lm: list):
-    return _midpoint(_xy(lm, LH), _xy(lm, RH))
-
-
-def _series_y(pose_frames: List[Dict], idx: int) -> np.ndarray:
-    y = np.full(len(pose_frames), np.nan, dtype=float)
-    for i, fr in enumerate(pose_frames):
-        lm = fr.get("landmarks") or []
-        if not isinstance(lm, list):
-            continue
-        p = _xy(lm, idx)
-        if p is not None and np.isfinite(p[1]):
-            y[i] = p[1]
+def _series_y(pose: PoseSequence, idx: int) -> np.ndarray:
+    y = pose.series(idx, Y)
+    y[~np.isfinite(pose.series(idx, X))] = np.nan
     return _interp_nans(y)
 
 
-def _series_vis(pose_frames: List[Dict], idx: int) -> np.ndarray:
-    vis = np.zeros(len(pose_frames), dtype=float)
-    for i, fr in enumerate(pose_frames):
-        lm = fr.get("landmarks") or []
-        if not isinstance(lm, list):
-            continue
-        vis[i] = _vis(lm, idx)
-    return vis
+def _series_vis(pose: PoseSequence, idx: int) -> np.ndarray:
+    return pose.visibility_series(idx, missing=0.0)
 
 
 # ------------------------------------------------------------
@@ -210,35 +155,122 @@ def _foot_ground_score(
     return score
 
 
-def _is_grounded(
+def _ground_score_table(
     y_ank: np.ndarray,
     y_toe: np.ndarray,
-    t: int,
     hold: int,
     win0: int,
     win1: int,
     dt: float,
-) -> bool:
-    return _foot_ground_score(y_ank, y_toe, t, hold, win0, win1, dt) >= 2
-
-
-def _recently_grounded(
-    y_ank: np.ndarray,
-    y_toe: np.ndarray,
-    t: int,
+) -> np.ndarray:
+    """
+    _foot_ground_score for every frame in [win0, win1], computed in one pass.
+    History percentiles are taken per window length over gathered rows, and the
+    hold-segment medians, MAD and velocity over sliding windows, so each cue
+    matches the per-frame arithmetic exactly. Frames whose history holds
+    non-finite samples go through _foot_ground_score itself.
+    """
+    y_ank = np.asarray(y_ank, dtype=float)
+    y_toe = np.asarray(y_toe, dtype=float)
+    n = len(y_ank)
+    frames = np.arange(win0, win1 + 1)
+    scores = np.zeros(len(frames), dtype=int)
+    if hold < 2 or n <= hold:
+        for k, t in enumerate(frames.tolist()):
+            scores[k] = _foot_ground_score(y_ank, y_toe, t, hold, win0, win1, dt)
+        return scores
+
+    bad = np.concatenate(([0], np.cumsum(~(np.isfinite(y_ank) & np.isfinite(y_toe)))))
+    w0 = np.maximum(win0, frames - max(hold * 3, 6))
+    w1 = np.minimum(np.minimum(win1, frames + max(hold, 3)), n - 1)
+    in_range = (frames >= 0) & (frames + hold < n)
+    t = np.clip(frames, 0, n - hold)
+    seg_ok = in_range & (bad[t + hold] == bad[t])
+    hist_ok = seg_ok & (w1 >= w0) & (bad[np.maximum(w1, w0) + 1] == bad[w0])
+    for k in np.flatnonzero(seg_ok & ~hist_ok).tolist():
+        scores[k] = _foot_ground_score(y_ank, y_toe, int(frames[k]), hold, win0, win1, dt)
+
+    rows = np.flatnonzero(hist_ok)
+    if rows.size == 0:
+        return scores
+    t = t[rows]
+    lo_85 = np.empty((2, rows.size))
+    hi_90 = np.empty((2, rows.size))
+    lo_10 = np.empty((2, rows.size))
+    lengths = (w1 - w0 + 1)[rows]
+    for length in np.unique(lengths).tolist():
+        sel = np.flatnonzero(lengths == length)
+        gather = w0[rows[sel]][:, None] + np.arange(length)
+        for side, y in enumerate((y_ank, y_toe)):
+            hist = y[gather]
+            lo_85[side, sel] = np.percentile(hist, 85, axis=-1)
+            hi_90[side, sel] = np.percentile(hist, 90, axis=-1)
+            lo_10[side, sel] = np.percentile(hist, 10, axis=-1)
+
+    dt_c = max(dt, 1e-6)
+    near_low = np.ones(rows.size, dtype=bool)
+    v_ok = np.ones(rows.size, dtype=bool)
+    jit_ok = np.ones(rows.size, dtype=bool)
+    for side, y in enumerate((y_ank, y_toe)):
+        seg = np.lib.stride_tricks.sliding_window_view(y, hold)[t]
+        dy = np.lib.stride_tricks.sliding_window_view(np.diff(y) / dt_c, hold - 1)[t]
+        med = np.median(seg, axis=-1)
+        rng = np.maximum(hi_90[side] - lo_10[side], 1e-6)
+        mad = np.median(np.abs(seg - med[:, None]), axis=-1) + 1e-9
+        near_low &= med >= lo_85[side] - 0.01
+        v_ok &= np.median(np.abs(dy), axis=-1) <= 0.18 * (rng / dt_c)
+        jit_ok &= mad <= 0.15 * rng
+    scores[rows] = near_low.astype(int) + v_ok.astype(int) + jit_ok.astype(int)
+    return scores
+
+
+class _GroundScores:
+    """Grounded scores for one foot over one detection window, precomputed once."""
+
+    def __init__(self, y_ank, y_toe, hold: int, win0: int, win1: int, dt: float):
+        self.y_ank = y_ank
+        self.y_toe = y_toe
+        self.hold = hold
+        self.win0 = win0
+        self.win1 = win1
+        self.dt = dt
+        self.n = len(y_ank)
+        self.table = _ground_score_table(y_ank, y_toe, hold, win0, win1, dt)
+
+    def __call__(self, t: int) -> int:
+        if self.win0 <= t <= self.win1:
+            return int(self.table[t - self.win0])
+        return _foot_ground_score(self.y_ank, self.y_toe, t, self.hold, self.win0, self.win1, self.dt)
+
+
+def _ground_scores(
+    ground: Optional[Dict[str, _GroundScores]],
+    *,
     hold: int,
-    win0: int,
-    win1: int,
+    win_start: int,
+    win_end: int,
     dt: float,
-    lookback: int,
-) -> bool:
+    y_LA: np.ndarray,
+    y_RA: np.ndarray,
+    y_LFI: np.ndarray,
+    y_RFI: np.ndarray,
+) -> Dict[str, _GroundScores]:
+    if ground is not None:
+        return ground
+    return {
+        "left": _GroundScores(y_LA, y_LFI, hold, win_start, win_end, dt),
+        "right": _GroundScores(y_RA, y_RFI, hold, win_start, win_end, dt),
+    }
+
+
+def _recently_grounded(scores: _GroundScores, t: int, win0: int, lookback: int) -> bool:
     """
     True if foot is grounded in any of the previous `lookback` frames.
     Used to allow natural unloading of back foot during front-foot braking.
     """
     j0 = max(win0, t - lookback)
     for j in range(t - 1, j0 - 1, -1):
-        if _is_grounded(y_ank, y_toe, j, hold, win0, win1, dt):
+        if scores(j) >= 2:
             return True
     return False
 
@@ -265,14 +297,10 @@ def _candidate_case(
 
 
 def _ground_window_strength(
-    y_ank: np.ndarray,
-    y_toe: np.ndarray,
+    scores: _GroundScores,
     *,
     frame: int,
-    hold: int,
     win_start: int,
-    win_end: int,
-    dt: float,
     radius: int,
 ) -> float:
     """
@@ -283,18 +311,10 @@ def _ground_window_strength(
     strength = 0.0
     for offset in range(-radius, radius + 1):
         idx = frame + offset
-        if idx < win_start or idx + hold >= len(y_ank):
+        if idx < win_start or idx + scores.hold >= scores.n:
             continue
         weight = 1.0 / (1.0 + abs(offset))
-        strength += weight * _foot_ground_score(
-            y_ank,
-            y_toe,
-            idx,
-            hold,
-            win_start,
-            win_end,
-            dt,
-        )
+        strength += weight * scores(idx)
     return strength
 
 
@@ -312,6 +332,7 @@ def _pick_ffc_backward_from_release(
     y_RA: np.ndarray,
     y_LFI: np.ndarray,
     y_RFI: np.ndarray,
+    ground: Optional[Dict[str, _GroundScores]] = None,
 ) -> Tuple[Optional[int], Optional[str], List[Dict], float]:
     """
     Search backward from the release-side window for the latest plausible front-foot contact.
@@ -322,31 +343,28 @@ def _pick_ffc_backward_from_release(
     candidates: List[Dict] = []
     ranked: List[Tuple[float, int, str, Dict]] = []
     radius = max(1, hold // 2)
+    ground = _ground_scores(
+        ground, hold=hold, win_start=win_start, win_end=win_end, dt=dt,
+        y_LA=y_LA, y_RA=y_RA, y_LFI=y_LFI, y_RFI=y_RFI,
+    )
+    left, right = ground["left"], ground["right"]
 
     for i in range(win_end - hold, search_start - 1, -1):
-        left_score = _foot_ground_score(y_LA, y_LFI, i, hold, win_start, win_end, dt)
-        right_score = _foot_ground_score(y_RA, y_RFI, i, hold, win_start, win_end, dt)
+        left_score = left(i)
+        right_score = right(i)
         left_grounded = left_score >= 2
         right_grounded = right_score >= 2
-        right_recent = _recently_grounded(
-            y_RA, y_RFI, i, hold, win_start, win_end, dt, back_recent
-        )
-        left_recent = _recently_grounded(
-            y_LA, y_LFI, i, hold, win_start, win_end, dt, back_recent
-        )
+        right_recent = _recently_grounded(right, i, win_start, back_recent)
+        left_recent = _recently_grounded(left, i, win_start, back_recent)
 
         left_front_ok = left_grounded and (right_grounded or right_recent)
         right_front_ok = right_grounded and (left_grounded or left_recent)
 
         if left_front_ok:
             left_stability = _ground_window_strength(
-                y_LA,
-                y_LFI,
+                left,
                 frame=i,
-                hold=hold,
                 win_start=win_start,
-                win_end=win_end,
-                dt=dt,
                 radius=radius,
             )
             chain_anchor = min(max(pelvis_on, search_start), win_end)
@@ -373,13 +391,9 @@ def _pick_ffc_backward_from_release(
 
         if right_front_ok:
             right_stability = _ground_window_strength(
-                y_RA,
-                y_RFI,
+                right,
                 frame=i,
-                hold=hold,
                 win_start=win_start,
-                win_end=win_end,
-                dt=dt,
                 radius=radius,
             )
             chain_anchor = min(max(pelvis_on, search_start), win_end)
@@ -450,24 +464,26 @@ def _pick_bfc_backward_from_ffc(
     vis_LFI: np.ndarray,
     vis_RFI: np.ndarray,
     approach_speed: np.ndarray,
+    ground: Optional[Dict[str, _GroundScores]] = None,
 ) -> Tuple[int, float, str]:
     """
     Simple BFC rule:
     find the latest contiguous grounded back-foot support block closest to FFC,
     then keep the last grounded frame before unloading.
     """
-    if front_side == "left":
-        back_ank, back_toe = y_RA, y_RFI
-    elif front_side == "right":
-        back_ank, back_toe = y_LA, y_LFI
-    else:
+    if front_side not in {"left", "right"}:
         return _clamp(ffc - 1, win_start, ffc), 0.0, "context_pre_ffc"
+    ground = _ground_scores(
+        ground, hold=hold, win_start=win_start, win_end=win_end, dt=dt,
+        y_LA=y_LA, y_RA=y_RA, y_LFI=y_LFI, y_RFI=y_RFI,
+    )
+    back = ground["right" if front_side == "left" else "left"]
 
     earliest = max(win_start, ffc - max(3, hold + 1))
     seed_frame: Optional[int] = None
 
     for idx in range(ffc - 1, earliest - 1, -1):
-        back_score = _foot_ground_score(back_ank, back_toe, idx, hold, win_start, win_end, dt)
+        back_score = back(idx)
         if back_score >= 2:
             seed_frame = idx
             continue
@@ -479,7 +495,7 @@ def _pick_bfc_backward_from_ffc(
 
     chosen_frame = seed_frame
     for idx in range(seed_frame + 1, min(ffc, win_end + 1)):
-        back_score = _foot_ground_score(back_ank, back_toe, idx, hold, win_start, win_end, dt)
+        back_score = back(idx)
         if back_score < 2:
             break
         chosen_frame = idx
@@ -500,6 +516,7 @@ def _sanitize_bfc_frame(
     y_RA: np.ndarray,
     y_LFI: np.ndarray,
     y_RFI: np.ndarray,
+    ground: Optional[Dict[str, _GroundScores]] = None,
 ) -> Tuple[int, bool]:
     """
     BFC must not be a frame that already looks like FFC.
@@ -507,24 +524,24 @@ def _sanitize_bfc_frame(
     at a time until we find the latest earlier frame with grounded back-foot
     support and no clear front-foot contact.
     """
-    if front_side == "left":
-        front_ank, front_toe = y_LA, y_LFI
-        back_ank, back_toe = y_RA, y_RFI
-    elif front_side == "right":
-        front_ank, front_toe = y_RA, y_RFI
-        back_ank, back_toe = y_LA, y_LFI
-    else:
+    if front_side not in {"left", "right"}:
         return int(bfc), False
+    ground = _ground_scores(
+        ground, hold=hold, win_start=win_start, win_end=win_end, dt=dt,
+        y_LA=y_LA, y_RA=y_RA, y_LFI=y_LFI, y_RFI=y_RFI,
+    )
+    front = ground[front_side]
+    back = ground["right" if front_side == "left" else "left"]
 
     bfc = int(_clamp(bfc, win_start, max(win_start, ffc - 1)))
-    front_score = _foot_ground_score(front_ank, front_toe, bfc, hold, win_start, win_end, dt)
+    front_score = front(bfc)
     if front_score < 2:
         return bfc, False
 
     earliest = max(win_start, bfc - max(5, hold + 2))
     for idx in range(bfc - 1, earliest - 1, -1):
-        back_score = _foot_ground_score(back_ank, back_toe, idx, hold, win_start, win_end, dt)
-        candidate_front = _foot_ground_score(front_ank, front_toe, idx, hold, win_start, win_end, dt)
+        back_score = back(idx)
+        candidate_front = front(idx)
         if back_score >= 2 and candidate_front < 2:
             return idx, True
 
@@ -582,23 +599,14 @@ def detect_ffc_bfc(
     # ------------------------------------------------------------
     # Pelvis signals (interp → smooth → diff)
     # ------------------------------------------------------------
-    px = np.full(n, np.nan)
-    py = np.full(n, np.nan)
-    hip_ang = np.full(n, np.nan)
-    vis_ok = np.zeros(n, dtype=bool)
-
-    valid_pelvis_count = 0
-    for i, fr in enumerate(pose_frames):
-        lm = fr.get("landmarks") or []
-        if not isinstance(lm, list) or len(lm) == 0:
-            continue
-        pel = _pelvis_xy(lm)
-        if pel is not None and np.isfinite(pel[0]) and np.isfinite(pel[1]):
-            px[i], py[i] = pel
-            valid_pelvis_count += 1
-        hip_ang[i] = _safe_angle(lm, LH, RH)
-        if _vis(lm, LH) >= MIN_VIS and _vis(lm, RH) >= MIN_VIS:
-            vis_ok[i] = True
+    pose = as_pose_sequence(pose_frames)
+    kin = kinematics_for(pose)
+    pelvis = kin.midpoint(LH, RH)
+    px = pelvis[:, 0]
+    py = pelvis[:, 1]
+    hip_ang = kin.line_angle(LH, RH)
+    vis_ok = (kin.visibility(LH) >= MIN_VIS) & (kin.visibility(RH) >= MIN_VIS)
+    valid_pelvis_count = int(np.count_nonzero(np.isfinite(px) & np.isfinite(py)))
 
     if valid_pelvis_count < max(hold, 6):
         logger.warning("[FFC/BFC] Insufficient valid pelvis landmarks")
@@ -640,14 +648,14 @@ def detect_ffc_bfc(
     # ------------------------------------------------------------
     # Geometry forward lock (RELAXED): front grounded + back grounded OR recently grounded
     # ------------------------------------------------------------
-    y_LA  = _series_y(pose_frames, LA)
-    y_RA  = _series_y(pose_frames, RA)
-    y_LFI = _series_y(pose_frames, LFI)
-    y_RFI = _series_y(pose_frames, RFI)
-    vis_LA = _series_vis(pose_frames, LA)
-    vis_RA = _series_vis(pose_frames, RA)
-    vis_LFI = _series_vis(pose_frames, LFI)
-    vis_RFI = _series_vis(pose_frames, RFI)
+    y_LA  = _series_y(pose, LA)
+    y_RA  = _series_y(pose, RA)
+    y_LFI = _series_y(pose, LFI)
+    y_RFI = _series_y(pose, RFI)
+    vis_LA = _series_vis(pose, LA)
+    vis_RA = _series_vis(pose, RA)
+    vis_LFI = _series_vis(pose, LFI)
+    vis_RFI = _series_vis(pose, RFI)
 
     # If ankle data is missing, fall back conservatively to pelvis_on (low conf)
     if (not np.any(np.isfinite(y_LA)) and not np.any(np.isfinite(y_RA))) or (not np.any(np.isfinite(y_LFI)) and not np.any(np.isfinite(y_RFI))):
@@ -677,6 +685,10 @@ def detect_ffc_bfc(
         )
 
     preferred_front_side = "left" if str(hand or "").upper().startswith("R") else "right"
+    ground = _ground_scores(
+        None, hold=hold, win_start=win_start, win_end=win_end, dt=dt,
+        y_LA=y_LA, y_RA=y_RA, y_LFI=y_LFI, y_RFI=y_RFI,
+    )
     ffc, front_side, ffc_candidates, ffc_confidence = _pick_ffc_backward_from_release(
         search_start=ffc_search_start,
         pelvis_on=pelvis_on,
@@ -690,6 +702,7 @@ def detect_ffc_bfc(
         y_RA=y_RA,
         y_LFI=y_LFI,
         y_RFI=y_RFI,
+        ground=ground,
     )
 
     # ------------------------------------------------------------
@@ -698,7 +711,7 @@ def detect_ffc_bfc(
     if ffc is None:
         # 1) Relax further: any single grounded foot after pelvis_on
         for i in range(win_end - hold, pelvis_on - 1, -1):
-            if _is_grounded(y_LA, y_LFI, i, hold, win_start, win_end, dt) or _is_grounded(y_RA, y_RFI, i, hold, win_start, win_end, dt):
+            if ground["left"](i) >= 2 or ground["right"](i) >= 2:
                 ffc = i
                 candidate = build_candidate(
                     frame=i,
@@ -722,6 +735,7 @@ def detect_ffc_bfc(
                     y_RA=y_RA,
                     y_LFI=y_LFI,
                     y_RFI=y_RFI,
+                    ground=ground,
                 )
                 if corrected:
                     logger.info("[FFC/BFC][BFC_CORRECT] single_foot %s -> %s", bfc, corrected_bfc)
@@ -777,6 +791,7 @@ def detect_ffc_bfc(
             y_RA=y_RA,
             y_LFI=y_LFI,
             y_RFI=y_RFI,
+            ground=ground,
         )
         if corrected:
             logger.info("[FFC/BFC][BFC_CORRECT] ultimate_fallback %s -> %s", bfc, corrected_bfc)
@@ -824,6 +839,7 @@ def detect_ffc_bfc(
         vis_LFI=vis_LFI,
         vis_RFI=vis_RFI,
         approach_speed=v_lin,
+        ground=ground,
     )
     corrected_bfc, corrected = _sanitize_bfc_frame(
         bfc=bfc,
@@ -837,6 +853,7 @@ def detect_ffc_bfc(
         y_RA=y_RA,
         y_LFI=y_LFI,
         y_RFI=y_RFI,
+        ground=ground,
     )
     if corrected:
         logger.info("[FFC/BFC][BFC_CORRECT] %s %s -> %s", bfc_method, bfc, corrected_bfc)
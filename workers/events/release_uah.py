@@ -23,6 +23,7 @@ from scipy.ndimage import gaussian_filter1d
 
 from app.common.logger import get_logger
 from app.workers.events.event_confidence import build_candidate, compact_candidates
+from app.workers.pose.kinematics import kinematics_for
 
 logger = get_logger(__name__)
 
@@ -42,12 +43,6 @@ DEBUG_DIR = os.getenv(
 # Helpers
 # ---------------------------------------------------------------------
 
-def _xyz(pt):
-    try:
-        return (float(pt["x"]), float(pt["y"]), float(pt.get("z", 0.0)))
-    except Exception:
-        return None
-
 def _mag(v):
     return math.sqrt(v[0]*v[0] + v[1]*v[1] + v[2]*v[2])
 
@@ -81,6 +76,23 @@ def _upper_arm_angle(s, e, forward):
     return math.degrees(math.acos(d))
 
 
+def _upper_arm_angles(shoulder, elbow, forward):
+    """_upper_arm_angle for every frame of [n, 3] tracks; NaN where undefined."""
+    v = elbow - shoulder
+    m = np.sqrt(v[:, 0]*v[:, 0] + v[:, 1]*v[:, 1] + v[:, 2]*v[:, 2])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        d = np.clip((v[:, 0]/m)*forward[0] + (v[:, 1]/m)*forward[1] + (v[:, 2]/m)*forward[2], -1.0, 1.0)
+        angles = np.degrees(np.arccos(d))
+    angles[~(m >= 1e-6)] = np.nan
+    return angles
+
+
+def _row(track, i):
+    """(x, y, z) of frame i from a kinematics track, or None where it was gated out."""
+    row = track[i]
+    return tuple(row.tolist()) if math.isfinite(row[0]) else None
+
+
 def _nb_elbow_peak_is_plausible(
     *,
     nb_elbow_peak_i: Optional[int],
@@ -122,38 +134,14 @@ def detect_release_uah(
     # Non-bowling arm indices (opposite of bowling hand)
     nb_s_idx, nb_e_idx = (LS, LE) if h == "R" else (RS, RE)
 
-    frames = []
-    wrist_xyz, shoulder_xyz, elbow_xyz, pelvis_xyz = [], [], [], []
-    nb_elbow_xyz = []  # Non-bowling elbow
-
     # ------------------------------------------------------------
-    # Collect landmarks
+    # Collect landmarks ([n, 3] arrays, NaN rows below MIN_VIS)
     # ------------------------------------------------------------
-    for it in pose_frames:
-        frames.append(int(it.get("frame", len(frames))))
-        lm = it.get("landmarks") or []
-
-        def _vis(i):
-            if i >= len(lm) or lm[i].get("visibility", 0) < MIN_VIS:
-                return None
-            return lm[i]
-
-        w = _vis(w_idx)
-        s = _vis(s_idx)
-        e = _vis(e_idx)
-        hl = _vis(LH)
-        hr = _vis(RH)
-        nb_e = _vis(nb_e_idx)  # Non-bowling elbow
-
-        wrist_xyz.append(_xyz(w) if w else None)
-        shoulder_xyz.append(_xyz(s) if s else None)
-        elbow_xyz.append(_xyz(e) if e else None)
-        nb_elbow_xyz.append(_xyz(nb_e) if nb_e else None)
-
-        if hl and hr:
-            pelvis_xyz.append(((hl["x"]+hr["x"])/2, (hl["y"]+hr["y"])/2, 0))
-        else:
-            pelvis_xyz.append(None)
+    kin = kinematics_for(pose_frames)
+    frames = kin.frame_ids.tolist()
+    wrist = kin.position(w_idx, min_visibility=MIN_VIS, dims=3)
+    shoulder = kin.position(s_idx, min_visibility=MIN_VIS, dims=3)
+    elbow = kin.position(e_idx, min_visibility=MIN_VIS, dims=3)
 
     n = len(frames)
     if n < 10:
@@ -163,30 +151,21 @@ def detect_release_uah(
     # ------------------------------------------------------------
     # Forward direction from pelvis drift
     # ------------------------------------------------------------
-    vels = []
-    for i in range(1, n):
-        if pelvis_xyz[i] and pelvis_xyz[i-1]:
-            vels.append((
-                pelvis_xyz[i][0]-pelvis_xyz[i-1][0],
-                pelvis_xyz[i][1]-pelvis_xyz[i-1][1],
-                0.0
-            ))
-    forward = _unit(tuple(map(sum, zip(*vels)))) if vels else (1, 0, 0)
+    pelvis = kin.midpoint(LH, RH, min_visibility=MIN_VIS)
+    steps = np.diff(pelvis, axis=0)
+    steps = steps[np.isfinite(steps).all(axis=1)]
+    # cumsum adds the steps in frame order, like the running sum it replaces
+    forward = _unit((*np.cumsum(steps, axis=0)[-1].tolist(), 0.0)) if len(steps) else (1, 0, 0)
 
     # ------------------------------------------------------------
     # Wrist forward velocity (smoothed)
     # ------------------------------------------------------------
+    wrist_ok = np.isfinite(wrist[:, 0])
+    step_ok = wrist_ok[1:] & wrist_ok[:-1]
+    dv = np.diff(wrist, axis=0)
     wrist_fwd = np.zeros(n, dtype=float)
-    wrist_visible_count = 0
-    for i in range(1, n):
-        if wrist_xyz[i] and wrist_xyz[i-1]:
-            dv = (
-                wrist_xyz[i][0]-wrist_xyz[i-1][0],
-                wrist_xyz[i][1]-wrist_xyz[i-1][1],
-                wrist_xyz[i][2]-wrist_xyz[i-1][2],
-            )
-            wrist_fwd[i] = _dot(dv, forward) / dt
-            wrist_visible_count += 1
+    wrist_fwd[1:][step_ok] = ((dv[:, 0]*forward[0] + dv[:, 1]*forward[1] + dv[:, 2]*forward[2]) / dt)[step_ok]
+    wrist_visible_count = int(np.count_nonzero(step_ok))
 
     wrist_fwd_s = gaussian_filter1d(wrist_fwd, sigma=max(1.0, 0.03 * fps))
     peak_i = int(np.argmax(wrist_fwd_s))
@@ -201,24 +180,15 @@ def detect_release_uah(
     # ------------------------------------------------------------
     # The non-bowling arm sweeps UP before release, reaches highest point AT release,
     # then pulls DOWN into follow-through. This is very visible from behind.
-    nb_elbow_y = np.full(n, np.nan, dtype=float)
-    nb_elbow_visible_count = 0
-    for i in range(n):
-        if nb_elbow_xyz[i] and nb_elbow_xyz[i][1] is not None:
-            nb_elbow_y[i] = nb_elbow_xyz[i][1]  # Y coordinate (negative = higher)
-            nb_elbow_visible_count += 1
+    nb_elbow_y = kin.position(nb_e_idx, min_visibility=MIN_VIS)[:, 1]  # Y (negative = higher)
+    nb_elbow_visible_count = int(np.count_nonzero(np.isfinite(nb_elbow_y)))
     
     # Smooth and find minimum Y (highest point, since Y increases downward)
     if nb_elbow_visible_count > max(5, int(0.1 * fps)):
-        nb_elbow_y_valid = nb_elbow_y[np.isfinite(nb_elbow_y)]
-        if len(nb_elbow_y_valid) > 0:
-            # Interpolate gaps
-            idx = np.arange(n)
-            good = np.isfinite(nb_elbow_y)
-            if good.sum() >= 2:
-                nb_elbow_y[~good] = np.interp(idx[~good], idx[good], nb_elbow_y[good])
-            
-            nb_elbow_y_s = gaussian_filter1d(nb_elbow_y, sigma=max(1.0, 0.03 * fps))
+        # Interpolate gaps, then smooth
+        nb_elbow_s = kin.smoothed("position", nb_e_idx, min_visibility=MIN_VIS, sigma=max(1.0, 0.03 * fps))
+        if nb_elbow_s is not None:
+            nb_elbow_y_s = nb_elbow_s[:, 1]
             nb_elbow_peak_i = int(np.argmin(nb_elbow_y_s))  # Minimum Y = highest point
             
             nb_elbow_available = True
@@ -251,8 +221,8 @@ def detect_release_uah(
             # Allow small window around peak since it plateaus briefly
             return i <= nb_elbow_peak_i + int(0.02 * fps)  # ~20ms tolerance
         
-        w, s = wrist_xyz[i], shoulder_xyz[i]
-        e = elbow_xyz[i]
+        w, s = _row(wrist, i), _row(shoulder, i)
+        e = _row(elbow, i)
         
         # Strategy 1: Wrist above shoulder (best when wrist visible)
         if w and s:
@@ -343,12 +313,12 @@ def detect_release_uah(
 
     # TIER 1B: Wrist geometry (best for side-camera with good visibility)
     if release_i is None:
-        wrist_visible_in_window = [i for i in range(start, end + 1) if wrist_xyz[i] is not None]
+        wrist_visible_in_window = (start + np.flatnonzero(wrist_ok[start:end + 1])).tolist()
         
         if len(wrist_visible_in_window) >= 3:
             # Sub-strategy 1B.1: Wrist at shoulder height (geometric release indicator)
             for i in wrist_visible_in_window:
-                w, s = wrist_xyz[i], shoulder_xyz[i]
+                w, s = _row(wrist, i), _row(shoulder, i)
                 if w and s:
                     dy = w[1] - s[1]
                     # Wrist within ±2cm of shoulder AND velocity still high
@@ -374,7 +344,7 @@ def detect_release_uah(
                         # Must drop at least 20% from peak
                         if wrist_fwd_s[i] <= 0.80 * vmax and wrist_fwd_s[i-1] > 0.80 * vmax:
                             # Verify still pre-follow-through if possible
-                            w, s = wrist_xyz[i], shoulder_xyz[i]
+                            w, s = _row(wrist, i), _row(shoulder, i)
                             if w and s:
                                 if w[1] <= s[1] + 0.10:  # Wrist not far below shoulder
                                     candidate = build_candidate(
@@ -455,8 +425,8 @@ def detect_release_uah(
     # VALIDATION: Sanity check the selection
     # ============================================================
 
-    if release_i is not None and wrist_xyz[release_i] and shoulder_xyz[release_i]:
-        w, s = wrist_xyz[release_i], shoulder_xyz[release_i]
+    if release_i is not None and wrist_ok[release_i] and _row(shoulder, release_i):
+        w, s = _row(wrist, release_i), _row(shoulder, release_i)
         
         # If wrist is way below shoulder, we're in follow-through!
         if w[1] > s[1] + 0.15:
@@ -464,8 +434,8 @@ def detect_release_uah(
             
             # Try to find earlier frame that's better
             for i in range(max(start, release_i - 5), release_i):
-                if wrist_xyz[i] and shoulder_xyz[i]:
-                    wi, si = wrist_xyz[i], shoulder_xyz[i]
+                wi, si = _row(wrist, i), _row(shoulder, i)
+                if wi and si:
                     if wi[1] <= si[1] + 0.05:
                         release_i = i
                         selection_method = f"{selection_method}_corrected"
@@ -490,10 +460,7 @@ def detect_release_uah(
     # ------------------------------------------------------------
     # UAH (geometric, BEFORE release)
     # ------------------------------------------------------------
-    theta = np.zeros(n, dtype=float)
-    for i in range(n):
-        ang = _upper_arm_angle(shoulder_xyz[i], elbow_xyz[i], forward)
-        theta[i] = float(ang) if ang is not None else 0.0
+    theta = np.nan_to_num(_upper_arm_angles(shoulder, elbow, forward), nan=0.0)
     theta_s = gaussian_filter1d(theta, sigma=max(1.2, 0.03 * fps))
 
     # Search backward from release for best horizontal arm
@@ -541,11 +508,11 @@ def detect_release_uah(
     if DEBUG:
         # Determine which detection strategy was used
         detection_strategy = "unknown"
-        if release_i and release_i < len(wrist_xyz):
+        if release_i and release_i < n:
             if nb_elbow_available:
                 detection_strategy = "nb_elbow_peak"
             else:
-                w, s, e = wrist_xyz[release_i], shoulder_xyz[release_i], elbow_xyz[release_i]
+                w, s, e = _row(wrist, release_i), _row(shoulder, release_i), _row(elbow, release_i)
                 if w and s:
                     detection_strategy = "wrist_above_shoulder"
                 elif e and s:
@@ -0,0 +1,331 @@
+"""
+Shared per-run kinematics (V14).
+
+Workers used to derive the same quantities from pose_frames on their own:
+pelvis midpoints, elbow and knee angles, hip and shoulder line angles. A
+Kinematics object computes each quantity once per run, vectorized over the
+whole clip, and memoizes it by (quantity, arguments, sigma).
+
+- position / visibility: float64 joint series. A position row is NaN where
+  the frame has no pose, the joint is missing or it is below min_visibility.
+  A landmark without a visibility value reads as missing_visibility (0 by
+  default; the elbow signal has always treated it as fully visible)
+- midpoint / position(Centroid(...)): joint midpoints and weighted centroids
+  (the hand as wrist + index + pinky + thumb)
+- line_angle / joint_angle: segment orientation in radians and three-point
+  angles in degrees (2D or 3D)
+- smoothed / velocity / acceleration: any of the above, gap-filled and
+  gaussian-smoothed at a known sigma, differentiated along the clip
+
+kinematics_for(pose_frames) gives every worker of a run the same instance.
+It is keyed on the run's PoseSequence, which the loader shares through
+PoseFramesView. Returned arrays are read-only because they are shared.
+"""
+
+from __future__ import annotations
+
+import threading
+import weakref
+from collections.abc import Sequence
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+from scipy.ndimage import gaussian_filter1d
+
+from app.workers.pose.pose_sequence import (
+    CHANNELS,
+    NUM_LANDMARKS,
+    VIS,
+    X,
+    Y,
+    Z,
+    PoseFramesView,
+    PoseSequence,
+    as_pose_sequence,
+)
+
+# MediaPipe Pose names, for landmarks keyed by name instead of index.
+LANDMARK_NAMES = (
+    "NOSE", "LEFT_EYE_INNER", "LEFT_EYE", "LEFT_EYE_OUTER", "RIGHT_EYE_INNER", "RIGHT_EYE",
+    "RIGHT_EYE_OUTER", "LEFT_EAR", "RIGHT_EAR", "MOUTH_LEFT", "MOUTH_RIGHT",
+    "LEFT_SHOULDER", "RIGHT_SHOULDER", "LEFT_ELBOW", "RIGHT_ELBOW", "LEFT_WRIST", "RIGHT_WRIST",
+    "LEFT_PINKY", "RIGHT_PINKY", "LEFT_INDEX", "RIGHT_INDEX", "LEFT_THUMB", "RIGHT_THUMB",
+    "LEFT_HIP", "RIGHT_HIP", "LEFT_KNEE", "RIGHT_KNEE", "LEFT_ANKLE", "RIGHT_ANKLE",
+    "LEFT_HEEL", "RIGHT_HEEL", "LEFT_FOOT_INDEX", "RIGHT_FOOT_INDEX",
+)
+
+# Segments shorter than this have no defined angle.
+MIN_SEGMENT = 1e-6
+
+
+class Centroid(NamedTuple):
+    """Weighted centroid of several joints, usable wherever a joint index is."""
+
+    joints: Tuple[int, ...]
+    weights: Tuple[float, ...]
+
+
+Point = Union[int, Centroid]
+MinVisibility = Union[None, float, Tuple[Optional[float], ...]]
+
+
+def _read_only(value: Any) -> Any:
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    return value
+
+
+def _fill_gaps(values: np.ndarray) -> Optional[np.ndarray]:
+    """Linear interpolation over NaN rows; None with fewer than two finite rows."""
+    good = np.isfinite(values) if values.ndim == 1 else np.isfinite(values).all(axis=1)
+    if int(good.sum()) < 2:
+        return None
+    out = np.array(values, dtype=float)
+    if good.all():
+        return out
+    idx = np.arange(len(out))
+    columns = out[:, None] if out.ndim == 1 else out
+    for c in range(columns.shape[1]):
+        columns[~good, c] = np.interp(idx[~good], idx[good], columns[good, c])
+    return out
+
+
+def _vector_angle_deg(ba: np.ndarray, bc: np.ndarray) -> np.ndarray:
+    """Angle between [T, D] vectors in degrees; NaN where either is degenerate."""
+    norm_ba = np.sqrt(sum(ba[:, d] * ba[:, d] for d in range(ba.shape[1])))
+    norm_bc = np.sqrt(sum(bc[:, d] * bc[:, d] for d in range(bc.shape[1])))
+    dot = sum(ba[:, d] * bc[:, d] for d in range(ba.shape[1]))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cosv = np.clip(dot / (norm_ba * norm_bc), -1.0, 1.0)
+        angle = np.degrees(np.arccos(cosv))
+    angle[~((norm_ba >= MIN_SEGMENT) & (norm_bc >= MIN_SEGMENT))] = np.nan
+    return angle
+
+
+class Kinematics:
+    """Lazily evaluated, memoized kinematic quantities for one clip.
+
+    Built over a finished pose: mutating the PoseSequence afterwards is not
+    reflected in values that were already computed.
+    """
+
+    def __init__(self, pose: PoseSequence, *, frame_ids: Optional[np.ndarray] = None) -> None:
+        # Only the arrays are kept, never the PoseSequence itself, so the
+        # shared registry does not keep its key alive.
+        self.data = pose.data
+        self.valid = _read_only(pose.valid.copy())
+        ids = np.arange(len(pose)) if frame_ids is None else np.asarray(frame_ids, dtype=int)
+        self.frame_ids = _read_only(ids)
+        self._memo: Dict[Hashable, Any] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return int(self.data.shape[0])
+
+    def _memoized(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key not in self._memo:
+                self._memo[key] = _read_only(compute())
+            return self._memo[key]
+
+    # -----------------------------
+    # Joints
+    # -----------------------------
+    def visibility(self, joint: int, *more: int, missing: float = 0.0) -> np.ndarray:
+        """[T] visibility; with several joints, their per-frame minimum.
+
+        Frames without a pose read as 0, a landmark without a visibility value as ``missing``.
+        """
+        if more:
+            return self._memoized(
+                ("visibility", (joint,) + more, missing),
+                lambda: np.minimum.reduce([self.visibility(j, missing=missing) for j in (joint,) + more]),
+            )
+
+        def compute() -> np.ndarray:
+            out = self.data[:, joint, VIS].astype(float)
+            out[~np.isfinite(out)] = missing
+            out[~self.valid] = 0.0
+            return out
+
+        return self._memoized(("visibility", joint, missing), compute)
+
+    def _joint(self, joint: int, min_visibility: Optional[float], dims: int, missing_visibility: float = 0.0) -> np.ndarray:
+        def compute() -> np.ndarray:
+            out = self.data[:, joint, X:X + dims].astype(float)
+            if dims > Z:
+                # Landmarks without depth read as z = 0.
+                out[~np.isfinite(out[:, Z]), Z] = 0.0
+            missing = ~self.valid | ~np.isfinite(out[:, X]) | ~np.isfinite(out[:, Y])
+            if min_visibility is not None:
+                missing |= self.visibility(joint, missing=missing_visibility) < min_visibility
+            out[missing] = np.nan
+            return out
+
+        return self._memoized(("joint", joint, min_visibility, dims, missing_visibility), compute)
+
+    def _centroid(self, centroid: Centroid, min_visibility: Optional[float], dims: int, missing_visibility: float = 0.0) -> np.ndarray:
+        def compute() -> np.ndarray:
+            total = np.zeros(len(self))
+            weighted = np.zeros((len(self), dims))
+            # Summed joint by joint in order, as the per-frame loops did.
+            for joint, weight in zip(centroid.joints, centroid.weights):
+                point = self._joint(joint, min_visibility, dims, missing_visibility)
+                present = np.isfinite(point[:, X])
+                total = total + np.where(present, weight, 0.0)
+                weighted = weighted + np.where(present[:, None], point * weight, 0.0)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                out = weighted / total[:, None]
+            out[total < 1e-9] = np.nan
+            return out
+
+        return self._memoized(("centroid", centroid, min_visibility, dims, missing_visibility), compute)
+
+    def position(self, point: Point, *, min_visibility: Optional[float] = None, dims: int = 2, missing_visibility: float = 0.0) -> np.ndarray:
+        """[T, dims] normalized coordinates (x, y[, z]) of a joint or Centroid."""
+        if isinstance(point, Centroid):
+            return self._centroid(point, min_visibility, dims, missing_visibility)
+        return self._joint(int(point), min_visibility, dims, missing_visibility)
+
+    def midpoint(self, a: Point, b: Point, *, min_visibility: Optional[float] = None, dims: int = 2) -> np.ndarray:
+        """[T, dims] midpoint of two points, e.g. the pelvis from both hips."""
+        return self._memoized(
+            ("midpoint", a, b, min_visibility, dims),
+            lambda: (self.position(a, min_visibility=min_visibility, dims=dims) + self.position(b, min_visibility=min_visibility, dims=dims)) / 2.0,
+        )
+
+    # -----------------------------
+    # Segment angles
+    # -----------------------------
+    def line_angle(self, a: Point, b: Point, *, min_visibility: Optional[float] = None) -> np.ndarray:
+        """[T] orientation of the a -> b segment in image coordinates, radians."""
+
+        def compute() -> np.ndarray:
+            start = self.position(a, min_visibility=min_visibility)
+            end = self.position(b, min_visibility=min_visibility)
+            return np.arctan2(end[:, Y] - start[:, Y], end[:, X] - start[:, X])
+
+        return self._memoized(("line_angle", a, b, min_visibility), compute)
+
+    def joint_angle(
+        self,
+        a: Point,
+        b: Point,
+        c: Point,
+        *,
+        dims: int = 2,
+        min_visibility: MinVisibility = None,
+        missing_visibility: float = 0.0,
+    ) -> np.ndarray:
+        """[T] angle at ``b`` between b -> a and b -> c in degrees (180 = straight).
+
+        ``min_visibility`` is one threshold for all three points or one per point.
+        """
+        thresholds = tuple(min_visibility) if isinstance(min_visibility, (tuple, list)) else (min_visibility,) * 3
+
+        def compute() -> np.ndarray:
+            pa, pb, pc = (
+                self.position(p, min_visibility=t, dims=dims, missing_visibility=missing_visibility)
+                for p, t in zip((a, b, c), thresholds)
+            )
+            return _vector_angle_deg(pa - pb, pc - pb)
+
+        return self._memoized(("joint_angle", a, b, c, dims, thresholds, missing_visibility), compute)
+
+    # -----------------------------
+    # Smoothing and derivatives
+    # -----------------------------
+    def smoothed(self, quantity: str, *args: Any, sigma: float, **options: Any) -> Optional[np.ndarray]:
+        """``quantity`` gap-filled and gaussian-smoothed along the clip (sigma in frames).
+
+        None when the quantity has fewer than two usable frames.
+        """
+        key = ("smoothed", quantity, args, tuple(sorted(options.items())), float(sigma))
+
+        def compute() -> Optional[np.ndarray]:
+            filled = _fill_gaps(getattr(self, quantity)(*args, **options))
+            if filled is None or sigma <= 0.0:
+                return filled
+            return gaussian_filter1d(filled, sigma=float(sigma), axis=0)
+
+        return self._memoized(key, compute)
+
+    def velocity(self, quantity: str, *args: Any, sigma: float, spacing: float = 1.0, **options: Any) -> Optional[np.ndarray]:
+        """Central-difference derivative of ``smoothed(...)`` per ``spacing`` (1 = per frame)."""
+        key = ("velocity", quantity, args, tuple(sorted(options.items())), float(sigma), float(spacing))
+
+        def compute() -> Optional[np.ndarray]:
+            series = self.smoothed(quantity, *args, sigma=sigma, **options)
+            return None if series is None else np.gradient(series, spacing, axis=0)
+
+        return self._memoized(key, compute)
+
+    def acceleration(self, quantity: str, *args: Any, sigma: float, spacing: float = 1.0, **options: Any) -> Optional[np.ndarray]:
+        key = ("acceleration", quantity, args, tuple(sorted(options.items())), float(sigma), float(spacing))
+
+        def compute() -> Optional[np.ndarray]:
+            series = self.velocity(quantity, *args, sigma=sigma, spacing=spacing, **options)
+            return None if series is None else np.gradient(series, spacing, axis=0)
+
+        return self._memoized(key, compute)
+
+
+def _legacy_sequence(pose_frames: Sequence) -> Tuple[PoseSequence, np.ndarray]:
+    """float64 PoseSequence (plus frame numbers) for dict frames; landmarks as a list or keyed by name."""
+    pose = PoseSequence.empty(len(pose_frames), dtype=np.float64)
+    frame_ids = np.arange(len(pose_frames))
+    for i, frame in enumerate(pose_frames):
+        landmarks = frame  # a bare landmark list
+        if isinstance(frame, dict):
+            landmarks = frame.get("landmarks")
+            try:
+                frame_ids[i] = int(frame.get("frame", i))
+            except (TypeError, ValueError):
+                pass
+        if isinstance(landmarks, dict):
+            points = [landmarks.get(name) for name in LANDMARK_NAMES]
+        elif isinstance(landmarks, list) and landmarks:
+            points = landmarks[:NUM_LANDMARKS]
+        else:
+            continue
+        row = pose.data[i]
+        for j, point in enumerate(points):
+            if not isinstance(point, dict):
+                continue
+            for c, channel in enumerate(CHANNELS):
+                value = point.get(channel)
+                if value is None and c == VIS:
+                    value = point.get("v")
+                if value is None:
+                    continue
+                try:
+                    row[j, c] = float(value)
+                except (TypeError, ValueError):
+                    continue
+        pose.valid[i] = True
+    return pose, frame_ids
+
+
+_shared: "weakref.WeakKeyDictionary[PoseSequence, Kinematics]" = weakref.WeakKeyDictionary()
+_shared_lock = threading.Lock()
+
+
+def kinematics_for(pose_frames: Any) -> Kinematics:
+    """The run's shared Kinematics for a PoseSequence / PoseFramesView.
+
+    Legacy dict frames get a private instance built at float64.
+    """
+    if isinstance(pose_frames, Kinematics):
+        return pose_frames
+    if isinstance(pose_frames, (PoseSequence, PoseFramesView)):
+        pose = as_pose_sequence(pose_frames)
+        with _shared_lock:
+            kinematics = _shared.get(pose)
+            if kinematics is None:
+                kinematics = Kinematics(pose)
+                _shared[pose] = kinematics
+        return kinematics
+    if not isinstance(pose_frames, (list, tuple)):
+        return Kinematics(PoseSequence.empty(0, dtype=np.float64))
+    pose, frame_ids = _legacy_sequence(pose_frames)
+    return Kinematics(pose, frame_ids=frame_ids)
@@ -0,0 +1,222 @@
+"""
+ROI-cropped pose inference (V14).
+
+- Crop each frame to a padded bowler box before MediaPipe
+  (previous frame's landmarks first, coarse motion boxes second,
+  full frame when the subject is lost)
+- Smooth the box over time so the tracker sees a steady image
+- Cap the inference resolution (ACTIONLAB_POSE_MAX_SIDE)
+- Remap landmarks back to full-frame normalized coordinates, so
+  downstream workers see exactly the loader's usual output
+
+ACTIONLAB_POSE_ROI=off sends full frames (resolution cap still applies).
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from app.common.env import env_int
+from app.workers.pose.pose_sequence import NUM_LANDMARKS, VIS, X, Y, Z
+
+# Crop box in full-frame pixels: (x0, y0, x1, y1), x1/y1 exclusive.
+Crop = Tuple[int, int, int, int]
+
+LANDMARK_PAD_FRAC = 0.35
+MOTION_PAD_FRAC = 0.45
+MIN_CROP_FRAC = 0.30           # of the frame's shorter side
+MIN_ASPECT = 0.55              # crop width / height (bowlers are tall, not slivers)
+MAX_CROP_AREA_FRAC = 0.70      # bigger than this: just use the full frame
+SMOOTHING = 0.55               # weight of the new box in the temporal EMA
+LANDMARK_MIN_VIS = 0.20
+MAX_MISSES_BEFORE_FULL_FRAME = 2
+MOTION_TRACK_MAX_GAP_FRAMES = 12
+
+
+def pose_roi_enabled() -> bool:
+    return (os.getenv("ACTIONLAB_POSE_ROI") or "on").strip().lower() not in {"0", "off", "false", "no"}
+
+
+def pose_max_side() -> int:
+    return env_int("ACTIONLAB_POSE_MAX_SIDE", 1280, minimum=256)
+
+
+def landmarks_array(landmarks: Sequence[Any]) -> np.ndarray:
+    out = np.full((NUM_LANDMARKS, 4), np.nan, dtype=np.float32)
+    for j, lm in enumerate(landmarks):
+        if j >= NUM_LANDMARKS:
+            break
+        out[j] = (lm.x, lm.y, lm.z, lm.visibility)
+    return out
+
+
+def remap_landmarks(points: np.ndarray, crop: Crop, frame_w: int, frame_h: int) -> np.ndarray:
+    """Crop-normalized [33, 4] landmarks -> full-frame normalized landmarks."""
+    x0, y0, x1, y1 = crop
+    crop_w = float(x1 - x0)
+    crop_h = float(y1 - y0)
+    out = points.astype(np.float32, copy=True)
+    out[:, X] = (points[:, X] * crop_w + x0) / float(frame_w)
+    out[:, Y] = (points[:, Y] * crop_h + y0) / float(frame_h)
+    # MediaPipe z shares the x scale of the image it was given.
+    out[:, Z] = points[:, Z] * (crop_w / float(frame_w))
+    return out
+
+
+class PoseRoi:
+    """Per-clip crop planner; call prepare() before and observe() after each inference."""
+
+    def __init__(
+        self,
+        *,
+        motion_track: Optional[List[Sequence[float]]] = None,
+        crop_enabled: bool = True,
+        max_side: Optional[int] = None,
+    ) -> None:
+        self.crop_enabled = bool(crop_enabled)
+        self.max_side = int(max_side or pose_max_side())
+        track = sorted((list(item) for item in (motion_track or []) if len(item) >= 5), key=lambda item: item[0])
+        self._track_frames = np.asarray([int(item[0]) for item in track], dtype=np.int64)
+        self._track_boxes = np.asarray([item[1:5] for item in track], dtype=float).reshape(-1, 4)
+        self._box: Optional[np.ndarray] = None        # smoothed, normalized x0, y0, x1, y1
+        self._landmark_box: Optional[np.ndarray] = None
+        self._misses = 0
+        self.stats = {"frames": 0, "cropped": 0, "downscaled": 0, "full_frame": 0}
+
+    @classmethod
+    def for_video(cls, delivery_window: Optional[Dict[str, Any]]) -> "PoseRoi":
+        return cls(
+            motion_track=(delivery_window or {}).get("motion_track"),
+            crop_enabled=pose_roi_enabled(),
+        )
+
+    # -----------------------------
+    # Box sources
+    # -----------------------------
+    def _motion_box(self, frame_idx: int) -> Optional[np.ndarray]:
+        if self._track_frames.size == 0:
+            return None
+        pos = int(np.argmin(np.abs(self._track_frames - int(frame_idx))))
+        if abs(int(self._track_frames[pos]) - int(frame_idx)) > MOTION_TRACK_MAX_GAP_FRAMES:
+            return None
+        return _pad_box(self._track_boxes[pos], MOTION_PAD_FRAC)
+
+    def _target_box(self, frame_idx: int) -> Optional[np.ndarray]:
+        if self._landmark_box is not None and self._misses == 0:
+            return self._landmark_box
+        if self._misses <= MAX_MISSES_BEFORE_FULL_FRAME:
+            motion = self._motion_box(frame_idx)
+            if motion is not None:
+                return motion
+            if self._landmark_box is not None:
+                return self._landmark_box
+        return None
+
+    def _crop_for(self, frame_idx: int, frame_w: int, frame_h: int) -> Optional[Crop]:
+        target = self._target_box(frame_idx) if self.crop_enabled else None
+        if target is None:
+            self._box = None
+            return None
+        if self._box is None:
+            box = target
+        else:
+            # Smooth toward the target but never cut into it.
+            box = SMOOTHING * target + (1.0 - SMOOTHING) * self._box
+            box = np.array(
+                [min(box[0], target[0]), min(box[1], target[1]), max(box[2], target[2]), max(box[3], target[3])]
+            )
+        box = _fit_box(box, frame_w, frame_h)
+        self._box = box
+        x0 = max(0, int(np.floor(box[0] * frame_w)))
+        y0 = max(0, int(np.floor(box[1] * frame_h)))
+        x1 = min(frame_w, int(np.ceil(box[2] * frame_w)))
+        y1 = min(frame_h, int(np.ceil(box[3] * frame_h)))
+        if (x1 - x0) * (y1 - y0) >= MAX_CROP_AREA_FRAC * frame_w * frame_h:
+            return None
+        return x0, y0, x1, y1
+
+    # -----------------------------
+    # Per-frame API
+    # -----------------------------
+    def prepare(self, frame: np.ndarray, frame_idx: int) -> Tuple[np.ndarray, Optional[Crop]]:
+        """Return (image to run pose on, crop used or None for the full frame)."""
+        frame_h, frame_w = frame.shape[:2]
+        crop = self._crop_for(frame_idx, frame_w, frame_h)
+        image = frame if crop is None else frame[crop[1] : crop[3], crop[0] : crop[2]]
+        self.stats["frames"] += 1
+        self.stats["cropped" if crop is not None else "full_frame"] += 1
+        height, width = image.shape[:2]
+        longest = max(width, height)
+        if longest > self.max_side:
+            # Uniform scale keeps normalized landmark coordinates unchanged.
+            scale = self.max_side / float(longest)
+            image = cv2.resize(
+                image,
+                (max(1, int(round(width * scale))), max(1, int(round(height * scale)))),
+                interpolation=cv2.INTER_AREA,
+            )
+            self.stats["downscaled"] += 1
+        # MediaPipe wants a contiguous buffer; crops are strided views.
+        return np.ascontiguousarray(image), crop
+
+    def observe(
+        self,
+        landmarks: Optional[Sequence[Any]],
+        crop: Optional[Crop],
+        frame_w: int,
+        frame_h: int,
+    ) -> Optional[np.ndarray]:
+        """Full-frame [33, 4] landmarks for this frame (None if no pose) and update the ROI."""
+        if landmarks is None:
+            self._misses += 1
+            return None
+        points = landmarks_array(landmarks)
+        if crop is not None:
+            points = remap_landmarks(points, crop, frame_w, frame_h)
+        self._misses = 0
+        self._landmark_box = _landmark_box(points)
+        return points
+
+
+def _pad_box(box: np.ndarray, pad_frac: float) -> np.ndarray:
+    x0, y0, x1, y1 = [float(v) for v in box]
+    pad = max(x1 - x0, y1 - y0) * pad_frac
+    return np.array([x0 - pad, y0 - pad, x1 + pad, y1 + pad], dtype=float)
+
+
+def _landmark_box(points: np.ndarray) -> Optional[np.ndarray]:
+    finite = np.isfinite(points[:, X]) & np.isfinite(points[:, Y])
+    visible = finite & (np.nan_to_num(points[:, VIS], nan=0.0) >= LANDMARK_MIN_VIS)
+    use = visible if int(np.count_nonzero(visible)) >= 4 else finite
+    if not np.any(use):
+        return None
+    xs = points[use, X].astype(float)
+    ys = points[use, Y].astype(float)
+    return _pad_box(np.array([xs.min(), ys.min(), xs.max(), ys.max()]), LANDMARK_PAD_FRAC)
+
+
+def _fit_box(box: np.ndarray, frame_w: int, frame_h: int) -> np.ndarray:
+    """Enforce minimum size/aspect in pixels, then clamp to the frame (normalized)."""
+    x0, y0, x1, y1 = box[0] * frame_w, box[1] * frame_h, box[2] * frame_w, box[3] * frame_h
+    min_side = MIN_CROP_FRAC * min(frame_w, frame_h)
+    width = max(x1 - x0, min_side)
+    height = max(y1 - y0, min_side)
+    width = max(width, height * MIN_ASPECT)
+    height = max(height, width * MIN_ASPECT)
+    width = min(width, float(frame_w))
+    height = min(height, float(frame_h))
+    cx = min(max((x0 + x1) / 2.0, width / 2.0), frame_w - width / 2.0)
+    cy = min(max((y0 + y1) / 2.0, height / 2.0), frame_h - height / 2.0)
+    return np.array(
+        [
+            (cx - width / 2.0) / frame_w,
+            (cy - height / 2.0) / frame_h,
+            (cx + width / 2.0) / frame_w,
+            (cy + height / 2.0) / frame_h,
+        ],
+        dtype=float,
+    )
@@ -0,0 +1,215 @@
+"""
+Columnar pose storage (V14).
+
+- One contiguous float32 tensor [T, 33, 4] with channels (x, y, z, visibility)
+- Boolean validity mask [T] (False = no pose for that frame)
+- Zero-copy joint / axis views for vectorized workers
+- PoseFramesView: read-only list-of-dicts adapter for workers that still
+  index pose_frames[i]["landmarks"][j]["x"]
+
+Workers move over one at a time by calling as_pose_sequence(pose_frames),
+which accepts either representation.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+
+NUM_LANDMARKS = 33
+CHANNELS = ("x", "y", "z", "visibility")
+X, Y, Z, VIS = 0, 1, 2, 3
+
+
+class PoseSequence:
+    """Pose landmarks for a whole clip, one row per video frame."""
+
+    # __weakref__: the shared Kinematics registry is keyed on the sequence.
+    __slots__ = ("data", "valid", "__weakref__")
+
+    def __init__(self, data: np.ndarray, valid: np.ndarray) -> None:
+        if data.ndim != 3 or data.shape[1:] != (NUM_LANDMARKS, len(CHANNELS)):
+            raise ValueError(f"pose tensor must be [T, {NUM_LANDMARKS}, {len(CHANNELS)}], got {data.shape}")
+        if valid.shape != (data.shape[0],):
+            raise ValueError("validity mask must have one entry per frame")
+        self.data = np.ascontiguousarray(data)
+        self.valid = np.ascontiguousarray(valid, dtype=bool)
+
+    # -----------------------------
+    # Construction
+    # -----------------------------
+    @classmethod
+    def empty(cls, total_frames: int, *, dtype: Any = np.float32) -> "PoseSequence":
+        total = max(0, int(total_frames or 0))
+        data = np.full((total, NUM_LANDMARKS, len(CHANNELS)), np.nan, dtype=dtype)
+        return cls(data, np.zeros(total, dtype=bool))
+
+    @classmethod
+    def from_pose_frames(
+        cls,
+        pose_frames: Sequence,
+        *,
+        dtype: Any = np.float32,
+    ) -> "PoseSequence":
+        sequence = cls.empty(len(pose_frames), dtype=dtype)
+        for i, frame in enumerate(pose_frames):
+            landmarks = frame.get("landmarks") if isinstance(frame, dict) else None
+            if not isinstance(landmarks, list) or not landmarks:
+                continue
+            row = sequence.data[i]
+            for j, point in enumerate(landmarks[:NUM_LANDMARKS]):
+                if not isinstance(point, dict):
+                    continue
+                for c, key in enumerate(CHANNELS):
+                    value = point.get(key)
+                    if value is None:
+                        continue
+                    try:
+                        row[j, c] = float(value)
+                    except (TypeError, ValueError):
+                        continue
+            sequence.valid[i] = True
+        return sequence
+
+    def set_frame(self, frame_idx: int, landmarks: Optional[Iterable[Any]]) -> None:
+        """Store MediaPipe landmark objects (attributes x/y/z/visibility) for one frame."""
+        if frame_idx < 0 or frame_idx >= len(self):
+            return
+        if landmarks is None:
+            self.data[frame_idx] = np.nan
+            self.valid[frame_idx] = False
+            return
+        row = self.data[frame_idx]
+        for j, lm in enumerate(landmarks):
+            if j >= NUM_LANDMARKS:
+                break
+            row[j, X] = lm.x
+            row[j, Y] = lm.y
+            row[j, Z] = lm.z
+            row[j, VIS] = lm.visibility
+        self.valid[frame_idx] = True
+
+    def set_frame_array(self, frame_idx: int, points: Optional[np.ndarray]) -> None:
+        """Store one frame from a [33, 4] array (None = no pose)."""
+        if frame_idx < 0 or frame_idx >= len(self):
+            return
+        if points is None:
+            self.data[frame_idx] = np.nan
+            self.valid[frame_idx] = False
+            return
+        self.data[frame_idx] = points
+        self.valid[frame_idx] = True
+
+    # -----------------------------
+    # Views (zero-copy)
+    # -----------------------------
+    def __len__(self) -> int:
+        return int(self.data.shape[0])
+
+    def joint(self, joint_idx: int) -> np.ndarray:
+        """[T, 4] view of one landmark."""
+        return self.data[:, joint_idx, :]
+
+    def axis(self, joint_idx: int, channel: Union[int, str]) -> np.ndarray:
+        """[T] view of one channel of one landmark."""
+        c = CHANNELS.index(channel) if isinstance(channel, str) else int(channel)
+        return self.data[:, joint_idx, c]
+
+    def xy(self, joint_idx: int) -> np.ndarray:
+        """[T, 2] view of normalized image coordinates."""
+        return self.data[:, joint_idx, X:Z]
+
+    def visibility(self, joint_idx: int) -> np.ndarray:
+        return self.data[:, joint_idx, VIS]
+
+    # -----------------------------
+    # Masked float64 series
+    # -----------------------------
+    def series(self, joint_idx: int, channel: Union[int, str]) -> np.ndarray:
+        """float64 copy of one channel with NaN where the frame has no pose."""
+        out = self.axis(joint_idx, channel).astype(float)
+        out[~self.valid] = np.nan
+        return out
+
+    def visibility_series(self, joint_idx: int, missing: float = 0.0) -> np.ndarray:
+        out = self.series(joint_idx, VIS)
+        out[~np.isfinite(out)] = missing
+        return out
+
+    # -----------------------------
+    # Compatibility
+    # -----------------------------
+    def frame_landmarks(self, frame_idx: int) -> Optional[List[Dict[str, float]]]:
+        if not self.valid[frame_idx]:
+            return None
+        return [
+            {"x": x, "y": y, "z": z, "visibility": v}
+            for x, y, z, v in self.data[frame_idx].tolist()
+        ]
+
+    def as_pose_frames(self) -> "PoseFramesView":
+        return PoseFramesView(self)
+
+
+class PoseFramesView(Sequence):
+    """
+    Read-only list-of-dicts view over a PoseSequence.
+
+    Frame dicts are built on first access and memoized, so unmigrated
+    workers see exactly what the loader used to return.
+    """
+
+    __slots__ = ("sequence", "_frames")
+
+    def __init__(self, sequence: PoseSequence) -> None:
+        self.sequence = sequence
+        self._frames: List[Optional[Dict[str, Any]]] = [None] * len(sequence)
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def _frame(self, idx: int) -> Dict[str, Any]:
+        cached = self._frames[idx]
+        if cached is None:
+            cached = {"frame": idx, "landmarks": self.sequence.frame_landmarks(idx)}
+            self._frames[idx] = cached
+        return cached
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self._frame(i) for i in range(*item.indices(len(self)))]
+        idx = int(item)
+        if idx < 0:
+            idx += len(self)
+        if idx < 0 or idx >= len(self):
+            raise IndexError("pose frame index out of range")
+        return self._frame(idx)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for idx in range(len(self)):
+            yield self._frame(idx)
+
+
+PoseFrames = Union[List[Dict[str, Any]], PoseFramesView]
+
+
+def is_pose_frame_list(pose_frames: Any) -> bool:
+    return isinstance(pose_frames, (list, PoseFramesView))
+
+
+def as_pose_sequence(pose_frames: Any) -> PoseSequence:
+    """
+    Columnar view of pose_frames for vectorized workers.
+
+    Legacy dict frames carry Python floats, so they are converted at float64
+    to keep migrated workers bit-identical with their dict-based versions.
+    """
+    if isinstance(pose_frames, PoseSequence):
+        return pose_frames
+    if isinstance(pose_frames, PoseFramesView):
+        return pose_frames.sequence
+    if not isinstance(pose_frames, (list, tuple)):
+        return PoseSequence.empty(0, dtype=np.float64)
+    return PoseSequence.from_pose_frames(pose_frames, dtype=np.float64)
@@ -0,0 +1,152 @@
+"""
+Compact pose artifacts (V14).
+
+Each fresh analysis stores its pose tensor next to the run so the
+downstream workers can be re-run without decoding video or running
+MediaPipe again.
+
+- Format: compressed npz, float16 [T, 33, 4] landmarks + bool validity
+  mask + JSON meta (fps, frame size, pose window, source clip hash)
+- Local dir: ACTIONLAB_POSE_ARTIFACT_DIR (default storage/pose_artifacts)
+- Bucket: the render bucket under ACTIONLAB_POSE_ARTIFACT_PREFIX
+  (default "pose-artifacts"), when configured
+- POSE_ARTIFACT_VERSION is bumped whenever the stored layout or the
+  loader's landmark semantics change; older artifacts are then ignored
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from app.common.logger import get_logger
+from app.workers.pose.pose_sequence import PoseSequence, as_pose_sequence
+from app.workers.render.render_storage import (
+    download_bucket_object,
+    normalize_render_filename,
+    upload_bucket_object,
+)
+
+logger = get_logger(__name__)
+
+POSE_ARTIFACT_VERSION = 1
+POSE_ARTIFACT_SUFFIX = ".pose.npz"
+
+DEFAULT_POSE_ARTIFACT_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "storage", "pose_artifacts")
+)
+FALLBACK_POSE_ARTIFACT_DIR = "/tmp/actionlab_pose_artifacts"
+
+_META_KEYS = ("fps", "total_frames", "width", "height", "pose_window", "content_hash")
+
+
+def pose_artifact_dir() -> str:
+    configured = os.getenv("ACTIONLAB_POSE_ARTIFACT_DIR", DEFAULT_POSE_ARTIFACT_DIR)
+    try:
+        os.makedirs(configured, exist_ok=True)
+        return configured
+    except OSError:
+        os.makedirs(FALLBACK_POSE_ARTIFACT_DIR, exist_ok=True)
+        return FALLBACK_POSE_ARTIFACT_DIR
+
+
+def pose_artifact_object_name(name: str) -> str:
+    safe_name = normalize_render_filename(name)
+    prefix = (os.getenv("ACTIONLAB_POSE_ARTIFACT_PREFIX") or "pose-artifacts").strip().strip("/")
+    return f"{prefix}/{safe_name}" if prefix else safe_name
+
+
+def pose_artifact_name(run_id: str) -> str:
+    return f"{normalize_render_filename(str(run_id))}{POSE_ARTIFACT_SUFFIX}"
+
+
+def _artifact_meta(video: Dict[str, Any], frames: int) -> Dict[str, Any]:
+    meta = {key: video.get(key) for key in _META_KEYS}
+    meta["version"] = POSE_ARTIFACT_VERSION
+    meta["total_frames"] = int(meta.get("total_frames") or frames)
+    return meta
+
+
+def write_pose_npz(path: str, pose_frames: Any, video: Dict[str, Any]) -> int:
+    """Write the compact npz encoding of a pose tensor; returns the frame count."""
+    pose = as_pose_sequence(pose_frames)
+    meta = _artifact_meta(video or {}, len(pose))
+    with open(path, "wb") as handle:
+        np.savez_compressed(
+            handle,
+            data=pose.data.astype(np.float16),
+            valid=pose.valid,
+            meta=np.frombuffer(json.dumps(meta, default=str).encode("utf-8"), dtype=np.uint8),
+        )
+    return len(pose)
+
+
+def read_pose_npz(raw: bytes, *, label: str = "-") -> Optional[Tuple[PoseSequence, Dict[str, Any]]]:
+    """(pose, meta) from write_pose_npz bytes, or None if stale / unreadable."""
+    try:
+        with np.load(io.BytesIO(raw), allow_pickle=False) as archive:
+            meta = json.loads(archive["meta"].tobytes().decode("utf-8"))
+            if int(meta.get("version") or 0) != POSE_ARTIFACT_VERSION:
+                logger.info(
+                    "[pose_store] stale artifact name=%s version=%s expected=%s",
+                    label,
+                    meta.get("version"),
+                    POSE_ARTIFACT_VERSION,
+                )
+                return None
+            data = archive["data"].astype(np.float32)
+            valid = archive["valid"].astype(bool)
+    except Exception as exc:
+        logger.warning("[pose_store] unreadable artifact name=%s error=%s", label, exc)
+        return None
+    return PoseSequence(data, valid), meta
+
+
+def save_pose_artifact(run_id: str, pose_frames: Any, video: Dict[str, Any]) -> Dict[str, Any]:
+    """Write the run's pose tensor; returns the reference stored in result_json."""
+    name = pose_artifact_name(run_id)
+    path = os.path.join(pose_artifact_dir(), name)
+    frames = write_pose_npz(path, pose_frames, video)
+
+    upload = upload_bucket_object(
+        path,
+        pose_artifact_object_name(name),
+        content_type="application/octet-stream",
+    )
+    logger.info(
+        "[pose_store] saved run_id=%s frames=%s bytes=%s storage=%s",
+        run_id,
+        frames,
+        os.path.getsize(path),
+        upload.get("storage_backend"),
+    )
+    return {
+        "available": True,
+        "version": POSE_ARTIFACT_VERSION,
+        "name": name,
+        "storage_backend": "gcs" if upload.get("uploaded") else "local",
+        "frames": frames,
+    }
+
+
+def _read_artifact_bytes(name: str) -> Optional[bytes]:
+    safe_name = normalize_render_filename(name)
+    if not safe_name.endswith(POSE_ARTIFACT_SUFFIX):
+        return None
+    path = os.path.join(pose_artifact_dir(), safe_name)
+    if os.path.isfile(path):
+        with open(path, "rb") as handle:
+            return handle.read()
+    return download_bucket_object(pose_artifact_object_name(safe_name))
+
+
+def load_pose_artifact(name: str) -> Optional[Tuple[PoseSequence, Dict[str, Any]]]:
+    """(pose, meta) for a stored artifact, or None if missing / stale / unreadable."""
+    raw = _read_artifact_bytes(name)
+    if raw is None:
+        return None
+    return read_pose_npz(raw, label=name)
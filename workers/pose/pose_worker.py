@@ -2,22 +2,27 @@
 Pose worker (V14).
 
 - Decoder: OpenCV
-- Pose: MediaPipe
+- Pose: MediaPipe (pooled tracker, reset between clips)
 - Output: per-frame pose landmarks
 - No frame drop
 - No smoothing
 """
 
 import cv2
-import mediapipe as mp
 
-mp_pose = mp.solutions.pose
+from app.workers.pose.tracker_pool import pose_tracker_pool
 
 
 def run_pose(video_path):
     cap = cv2.VideoCapture(video_path)
-    pose = mp_pose.Pose(static_image_mode=False)
+    try:
+        with pose_tracker_pool(static_image_mode=False).lease() as pose:
+            return _run_pose_frames(cap, pose)
+    finally:
+        cap.release()
 
+
+def _run_pose_frames(cap, pose):
     pose_frames = []
     frame_idx = 0
 
@@ -44,7 +49,4 @@ def run_pose(video_path):
 
         frame_idx += 1
 
-    cap.release()
-    pose.close()
-
     return pose_frames
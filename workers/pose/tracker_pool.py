@@ -0,0 +1,230 @@
+"""
+Warm MediaPipe Pose tracker pool (V14).
+
+- One pool per tracker configuration, per process
+- Trackers are built once (graph init + model load) and leased per clip
+- A leased tracker is reset on return, so tracking state never leaks
+  between clips
+- Pool size: ACTIONLAB_POSE_TRACKER_POOL_SIZE (default: analysis workers)
+- stats() exposes size, idle/in-use counts and lease wait time
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import mediapipe as mp
+
+from app.common.env import env_int
+from app.common.logger import get_logger
+from app.common.metrics import REGISTRY
+
+logger = get_logger(__name__)
+
+_mp_pose = mp.solutions.pose
+
+# Canonical loader configuration (see app.io.loader).
+LOADER_TRACKER_OPTIONS: Dict[str, Any] = {
+    "static_image_mode": False,
+    "model_complexity": 2,
+    "smooth_landmarks": False,     # IMPORTANT: no smoothing at loader level
+    "enable_segmentation": False,
+    "min_detection_confidence": 0.5,
+    "min_tracking_confidence": 0.5,
+}
+
+
+def pose_tracker_pool_size() -> int:
+    # One tracker per analysis worker unless sized explicitly.
+    return env_int("ACTIONLAB_POSE_TRACKER_POOL_SIZE", env_int("ACTIONLAB_ANALYSIS_WORKERS", 2, minimum=1), minimum=1)
+
+
+class PoseTrackerPool:
+    """Bounded set of pre-initialised trackers shared by threads of one process."""
+
+    def __init__(self, factory: Callable[[], Any], size: int, *, name: str = "pose") -> None:
+        self.name = name
+        self.size = max(1, int(size))
+        self._factory = factory
+        self._idle: List[Any] = []
+        self._created = 0
+        self._cond = threading.Condition()
+        self._stats = {
+            "leases": 0,
+            "waits": 0,
+            "wait_ms_total": 0.0,
+            "wait_ms_max": 0.0,
+            "create_ms_total": 0.0,
+            "resets": 0,
+            "discarded": 0,
+        }
+
+    def _build(self) -> Any:
+        started = time.perf_counter()
+        tracker = self._factory()
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        with self._cond:
+            self._stats["create_ms_total"] += elapsed_ms
+        logger.info("[pose_pool] created pool=%s create_ms=%.1f", self.name, elapsed_ms)
+        return tracker
+
+    def warm(self, count: Optional[int] = None) -> int:
+        """Build trackers up front so the first clips skip model load."""
+        target = self.size if count is None else max(0, min(int(count), self.size))
+        built = 0
+        while True:
+            with self._cond:
+                if self._created >= target:
+                    break
+                self._created += 1
+            try:
+                tracker = self._build()
+            except Exception:
+                with self._cond:
+                    self._created -= 1
+                raise
+            with self._cond:
+                self._idle.append(tracker)
+                self._cond.notify()
+            built += 1
+        return built
+
+    def _acquire(self) -> Any:
+        started = time.perf_counter()
+        waited = False
+        with self._cond:
+            while not self._idle and self._created >= self.size:
+                waited = True
+                self._cond.wait()
+            tracker = self._idle.pop() if self._idle else None
+            if tracker is None:
+                self._created += 1
+            wait_ms = (time.perf_counter() - started) * 1000.0
+            self._stats["leases"] += 1
+            if waited:
+                self._stats["waits"] += 1
+                self._stats["wait_ms_total"] += wait_ms
+                self._stats["wait_ms_max"] = max(self._stats["wait_ms_max"], wait_ms)
+        if waited:
+            logger.info("[pose_pool] lease_wait pool=%s wait_ms=%.1f", self.name, wait_ms)
+        if tracker is not None:
+            return tracker
+        try:
+            return self._build()
+        except Exception:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            raise
+
+    def _release(self, tracker: Any) -> None:
+        try:
+            reset = getattr(tracker, "reset", None)
+            if callable(reset):
+                reset()
+        except Exception as exc:
+            logger.warning("[pose_pool] reset_failed pool=%s error=%s", self.name, exc)
+            _close_quietly(tracker)
+            with self._cond:
+                self._created -= 1
+                self._stats["discarded"] += 1
+                self._cond.notify()
+            return
+        with self._cond:
+            self._stats["resets"] += 1
+            self._idle.append(tracker)
+            self._cond.notify()
+
+    @contextmanager
+    def lease(self) -> Iterator[Any]:
+        tracker = self._acquire()
+        try:
+            yield tracker
+        finally:
+            self._release(tracker)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "pool": self.name,
+                "size": self.size,
+                "created": self._created,
+                "idle": len(self._idle),
+                "in_use": self._created - len(self._idle),
+                **{key: round(value, 3) if isinstance(value, float) else value for key, value in self._stats.items()},
+            }
+
+    def close(self) -> None:
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+        for tracker in idle:
+            _close_quietly(tracker)
+
+
+def _close_quietly(tracker: Any) -> None:
+    try:
+        tracker.close()
+    except Exception:
+        pass
+
+
+_pools: Dict[Tuple[Tuple[str, Any], ...], PoseTrackerPool] = {}
+_pools_lock = threading.Lock()
+
+
+def pose_tracker_pool(**options: Any) -> PoseTrackerPool:
+    """Process-wide pool for one tracker configuration (loader config by default)."""
+    config = dict(options or LOADER_TRACKER_OPTIONS)
+    key = tuple(sorted(config.items()))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            name = f"pose_c{config.get('model_complexity', 1)}"
+            pool = PoseTrackerPool(lambda: _mp_pose.Pose(**config), pose_tracker_pool_size(), name=name)
+            _pools[key] = pool
+        return pool
+
+
+def warm_pose_tracker_pool(count: Optional[int] = None) -> Dict[str, Any]:
+    pool = pose_tracker_pool()
+    started = time.perf_counter()
+    built = pool.warm(count)
+    stats = pool.stats()
+    logger.info(
+        "[pose_pool] warmed pool=%s built=%s size=%s duration_ms=%.1f",
+        pool.name,
+        built,
+        stats["size"],
+        (time.perf_counter() - started) * 1000.0,
+    )
+    return stats
+
+
+def pose_tracker_pool_stats() -> List[Dict[str, Any]]:
+    with _pools_lock:
+        pools = list(_pools.values())
+    return [pool.stats() for pool in pools]
+
+
+def _pool_metrics():
+    stats = pose_tracker_pool_stats()
+    trackers = []
+    waits = []
+    wait_seconds = []
+    for pool in stats:
+        trackers.append(({"pool": pool["pool"], "state": "idle"}, pool["idle"]))
+        trackers.append(({"pool": pool["pool"], "state": "in_use"}, pool["in_use"]))
+        waits.append(({"pool": pool["pool"]}, pool["waits"]))
+        wait_seconds.append(({"pool": pool["pool"]}, pool["wait_ms_total"] / 1000.0))
+    return [
+        ("actionlab_pose_trackers", "gauge", "Warm pose trackers by state.", trackers),
+        ("actionlab_pose_tracker_lease_waits_total", "counter", "Leases that waited for a free tracker.", waits),
+        ("actionlab_pose_tracker_lease_wait_seconds_total", "counter", "Time spent waiting for a tracker.", wait_seconds),
+    ]
+
+
+REGISTRY.register_collector("pose_tracker_pool", _pool_metrics)
@@ -2,14 +2,14 @@
 
 import shutil
 
-from .coach_video_renderer_parts import render_pause_sequence, render_video
+from .coach_video_renderer_parts import render_pause_sequence, render_segments, render_video
 from .coach_video_renderer_parts.font_utils import _theme_font_dirs, _load_theme_font, _pil_text_size, _wrap_pil_text, _fit_pil_wrapped_text, _pil_text_block_height
 from .coach_video_renderer_parts.analytics import _safe_float, _safe_int, _risk_lookup, _risk_weight, _event_confidence, _event_chain_quality, _supports_ffc_story, _speed_display_text, _risk_supported_for_phase
 from .coach_video_renderer_parts.story_logic import _story_feature_labels, _positive_recap_lines, _story_risk_for_phase, _format_action_label
 from .coach_video_renderer_parts.kinetic_story import _kinetic_pace_translation, _pace_leakage_stage, _phase_leakage_payload
 from .coach_video_renderer_parts.text_layout import _wrap_text_lines, _fit_wrapped_text
 from .coach_video_renderer_parts.joints import _front_leg_joints, _foot_indices
-from .coach_video_renderer_parts.render_output import _make_output_path, _intermediate_render_path, _publish_fallback_render, _finalize_render_video
+from .coach_video_renderer_parts.render_output import X264Settings, default_x264_settings, _make_output_path, _intermediate_render_path, _publish_fallback_render, _open_render_sink
 from .coach_video_renderer_parts.tracks import _point_from_landmarks, _smooth_series, _build_smoothed_tracks, _track_point, _frame_point
 from .coach_video_renderer_parts.drawing_base import _draw_joint, _draw_skeleton, _overlay_panel, _apply_bottom_scrim
 from .coach_video_renderer_parts.timeline_events import _phase_cut_points, _event_method, _tracked_joint_quality, _safe_landmark_value, _should_draw_skeleton_frame, _render_timeline_events
@@ -70,10 +70,12 @@ __all__ = [
     "_fit_wrapped_text",
     "_front_leg_joints",
     "_foot_indices",
+    "X264Settings",
+    "default_x264_settings",
     "_make_output_path",
     "_intermediate_render_path",
     "_publish_fallback_render",
-    "_finalize_render_video",
+    "_open_render_sink",
     "_point_from_landmarks",
     "_smooth_series",
     "_build_smoothed_tracks",
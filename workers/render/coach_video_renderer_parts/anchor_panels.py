@@ -1,6 +1,6 @@
 from __future__ import annotations
 from .shared import *
-from .pil_context import _frame_draw_context, _commit_frame_draw_context
+from .pil_context import _draw_cached_overlay
 from .themed_story import _draw_themed_story_card
 from .bubble_base import _story_card_layout
 
@@ -36,26 +36,28 @@ def _draw_phase_anchor_panel(
         return
     width = frame.shape[1]
     height = frame.shape[0]
-    image, overlay, draw = _frame_draw_context(frame)
-    layout = _story_card_layout(width=width, height=height, bowler_hand=hand)
-    card_x0 = int(layout["x0"])
-    card_y0 = int(layout["y0"])
-    card_x1 = int(layout["x1"])
-    card_y1 = int(layout["y1"])
-    _draw_themed_story_card(
-        draw,
-        x0=card_x0,
-        y0=card_y0,
-        x1=card_x1,
-        y1=card_y1,
-        title=str(config["title"]),
-        headline=str(config["headline"]),
-        body=str(config["body"]),
-        accent=tuple(config["accent"]),
-        width=width,
-        height=height,
-        headline_max_lines=5,
-        body_max_lines=5,
-        vertical_align="top",
-    )
-    _commit_frame_draw_context(frame, image, overlay)
+
+    def paint(draw: Any) -> None:
+        layout = _story_card_layout(width=width, height=height, bowler_hand=hand)
+        card_x0 = int(layout["x0"])
+        card_y0 = int(layout["y0"])
+        card_x1 = int(layout["x1"])
+        card_y1 = int(layout["y1"])
+        _draw_themed_story_card(
+            draw,
+            x0=card_x0,
+            y0=card_y0,
+            x1=card_x1,
+            y1=card_y1,
+            title=str(config["title"]),
+            headline=str(config["headline"]),
+            body=str(config["body"]),
+            accent=tuple(config["accent"]),
+            width=width,
+            height=height,
+            headline_max_lines=5,
+            body_max_lines=5,
+            vertical_align="top",
+        )
+
+    _draw_cached_overlay(frame, ("phase_anchor_panel", str(phase_key).strip().lower(), hand), paint)
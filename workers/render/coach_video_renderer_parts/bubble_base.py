@@ -1,7 +1,7 @@
 from __future__ import annotations
 from .shared import *
 from .font_utils import _fit_pil_wrapped_text, _pil_text_size, _phase_label_font_size
-from .pil_context import _bgr_to_rgb, _frame_draw_context, _commit_frame_draw_context
+from .pil_context import _bgr_to_rgb, _draw_cached_overlay
 from .themed_story import _draw_themed_story_card
 from .themed_card_shell import _draw_themed_card_shell
 
@@ -109,71 +109,73 @@ def _draw_pointer_bubble(
         return
     width = frame.shape[1]
     height = frame.shape[0]
-    image, overlay, draw = _frame_draw_context(frame)
-    layout = _story_card_layout(width=width, height=height, anchor=anchor, bowler_hand=bowler_hand)
-    card_x0 = int(layout["x0"])
-    card_y0 = int(layout["y0"])
-    card_x1 = int(layout["x1"])
-    card_y1 = int(layout["y1"])
-    card_w = max(1, card_x1 - card_x0)
-    scale = min(width, height)
-    headline_base = _phase_label_font_size(scale)
-    rail_probe = max(3, int(round(card_w * 0.020))) + max(3, int(round(scale * 0.006)))
-    inner_pad_x = max(16, int(round(card_w * 0.070))) + rail_probe
-    content_width = max(40, card_x1 - card_x0 - inner_pad_x * 2)
-    headline_font, headline_lines = _fit_pil_wrapped_text(
-        draw,
-        message,
-        font_file=BODY_FONT_FILE,
-        base_size=headline_base,
-        min_size=headline_base,
-        max_width=content_width,
-        max_lines=2,
-    )
-    line_gap = max(5, int(round(headline_base * 0.30)))
-    inner_pad_y = max(12, int(round(headline_base * 0.65)))
-    total_h = 0
-    if headline_font is not None and headline_lines:
-        total_h = sum(_pil_text_size(draw, line, headline_font)[1] for line in headline_lines)
-        total_h += line_gap * max(0, len(headline_lines) - 1)
-    card_y1 = max(card_y1, card_y0 + inner_pad_y * 2 + total_h)
-    rail_offset = _draw_themed_card_shell(
-        draw,
-        x0=card_x0,
-        y0=card_y0,
-        x1=card_x1,
-        y1=card_y1,
-        accent=accent,
-        width=width,
-        height=height,
-    )
-    inner_pad_x = max(16, int(round(card_w * 0.070))) + rail_offset
-    current_y = card_y0 + inner_pad_y
-    for line in headline_lines:
-        if headline_font is None:
-            break
-        draw.text(
-            (card_x0 + inner_pad_x, current_y),
-            line,
-            font=headline_font,
-            fill=_bgr_to_rgb(THEME_TEXT_PRIMARY),
+
+    def paint(draw: Any) -> None:
+        layout = _story_card_layout(width=width, height=height, anchor=anchor, bowler_hand=bowler_hand)
+        card_x0 = int(layout["x0"])
+        card_y0 = int(layout["y0"])
+        card_x1 = int(layout["x1"])
+        card_y1 = int(layout["y1"])
+        card_w = max(1, card_x1 - card_x0)
+        scale = min(width, height)
+        headline_base = _phase_label_font_size(scale)
+        rail_probe = max(3, int(round(card_w * 0.020))) + max(3, int(round(scale * 0.006)))
+        inner_pad_x = max(16, int(round(card_w * 0.070))) + rail_probe
+        content_width = max(40, card_x1 - card_x0 - inner_pad_x * 2)
+        headline_font, headline_lines = _fit_pil_wrapped_text(
+            draw,
+            message,
+            font_file=BODY_FONT_FILE,
+            base_size=headline_base,
+            min_size=headline_base,
+            max_width=content_width,
+            max_lines=2,
         )
-        _, line_h = _pil_text_size(draw, line, headline_font)
-        current_y += line_h + line_gap
-    line_x = int(layout["line_x"])
-    line_y0 = card_y1 + max(8, int(round(scale * 0.012)))
-    line_y1 = line_y0 + max(22, int(round(scale * 0.044)))
-    draw.line(
-        (line_x, line_y0, line_x, line_y1),
-        fill=(255, 255, 255, 168),
-        width=max(2, int(round(scale * 0.004))),
-    )
-    draw.line(
-        (line_x, line_y1, anchor[0], anchor[1]),
-        fill=(255, 255, 255, 150),
-        width=max(2, int(round(scale * 0.004))),
-    )
-    _commit_frame_draw_context(frame, image, overlay)
+        line_gap = max(5, int(round(headline_base * 0.30)))
+        inner_pad_y = max(12, int(round(headline_base * 0.65)))
+        total_h = 0
+        if headline_font is not None and headline_lines:
+            total_h = sum(_pil_text_size(draw, line, headline_font)[1] for line in headline_lines)
+            total_h += line_gap * max(0, len(headline_lines) - 1)
+        card_y1 = max(card_y1, card_y0 + inner_pad_y * 2 + total_h)
+        rail_offset = _draw_themed_card_shell(
+            draw,
+            x0=card_x0,
+            y0=card_y0,
+            x1=card_x1,
+            y1=card_y1,
+            accent=accent,
+            width=width,
+            height=height,
+        )
+        inner_pad_x = max(16, int(round(card_w * 0.070))) + rail_offset
+        current_y = card_y0 + inner_pad_y
+        for line in headline_lines:
+            if headline_font is None:
+                break
+            draw.text(
+                (card_x0 + inner_pad_x, current_y),
+                line,
+                font=headline_font,
+                fill=_bgr_to_rgb(THEME_TEXT_PRIMARY),
+            )
+            _, line_h = _pil_text_size(draw, line, headline_font)
+            current_y += line_h + line_gap
+        line_x = int(layout["line_x"])
+        line_y0 = card_y1 + max(8, int(round(scale * 0.012)))
+        line_y1 = line_y0 + max(22, int(round(scale * 0.044)))
+        draw.line(
+            (line_x, line_y0, line_x, line_y1),
+            fill=(255, 255, 255, 168),
+            width=max(2, int(round(scale * 0.004))),
+        )
+        draw.line(
+            (line_x, line_y1, anchor[0], anchor[1]),
+            fill=(255, 255, 255, 150),
+            width=max(2, int(round(scale * 0.004))),
+        )
+
+    _draw_cached_overlay(frame, ("pointer_bubble", message, tuple(accent), tuple(anchor), bowler_hand), paint)
 def _draw_top_risk_panel(
     frame: np.ndarray,
     *,
@@ -190,44 +192,46 @@ def _draw_top_risk_panel(
         return
     width = frame.shape[1]
     height = frame.shape[0]
-    image, overlay, draw = _frame_draw_context(frame)
-    layout = _story_card_layout(width=width, height=height, anchor=anchor, bowler_hand=bowler_hand)
-    card_x0 = int(layout["x0"])
-    card_y0 = int(layout["y0"])
-    card_x1 = int(layout["x1"])
-    card_y1 = int(layout["y1"])
-    final_y1 = _draw_themed_story_card(
-        draw,
-        x0=card_x0,
-        y0=card_y0,
-        x1=card_x1,
-        y1=card_y1,
-        title=str(title or ""),
-        headline=str(headline or ""),
-        body=str(body or ""),
-        accent=accent,
-        width=width,
-        height=height,
-        title_scale_boost=1.0,
-        headline_scale_boost=1.08,
-        body_scale_boost=1.0,
-        headline_max_lines=6,
-        body_max_lines=5,
-        vertical_align="top",
-    )
-    if anchor is not None:
-        scale = min(width, height)
-        line_x = int(layout["line_x"])
-        line_y0 = int(final_y1) + max(6, int(round(scale * 0.010)))
-        line_y1 = line_y0 + max(30, int(round(scale * 0.070)))
-        draw.line(
-            (line_x, line_y0, line_x, line_y1),
-            fill=(255, 255, 255, 168),
-            width=max(2, int(round(scale * 0.004))),
-        )
-        draw.line(
-            (line_x, line_y1, anchor[0], anchor[1]),
-            fill=(255, 255, 255, 150),
-            width=max(2, int(round(scale * 0.004))),
+
+    def paint(draw: Any) -> None:
+        layout = _story_card_layout(width=width, height=height, anchor=anchor, bowler_hand=bowler_hand)
+        card_x0 = int(layout["x0"])
+        card_y0 = int(layout["y0"])
+        card_x1 = int(layout["x1"])
+        card_y1 = int(layout["y1"])
+        final_y1 = _draw_themed_story_card(
+            draw,
+            x0=card_x0,
+            y0=card_y0,
+            x1=card_x1,
+            y1=card_y1,
+            title=str(title or ""),
+            headline=str(headline or ""),
+            body=str(body or ""),
+            accent=accent,
+            width=width,
+            height=height,
+            title_scale_boost=1.0,
+            headline_scale_boost=1.08,
+            body_scale_boost=1.0,
+            headline_max_lines=6,
+            body_max_lines=5,
+            vertical_align="top",
         )
-    _commit_frame_draw_context(frame, image, overlay)
+        if anchor is not None:
+            scale = min(width, height)
+            line_x = int(layout["line_x"])
+            line_y0 = int(final_y1) + max(6, int(round(scale * 0.010)))
+            line_y1 = line_y0 + max(30, int(round(scale * 0.070)))
+            draw.line(
+                (line_x, line_y0, line_x, line_y1),
+                fill=(255, 255, 255, 168),
+                width=max(2, int(round(scale * 0.004))),
+            )
+            draw.line(
+                (line_x, line_y1, anchor[0], anchor[1]),
+                fill=(255, 255, 255, 150),
+                width=max(2, int(round(scale * 0.004))),
+            )
+
+    _draw_cached_overlay(frame, ("top_risk_panel", str(title or ""), str(headline or ""), str(body or ""), tuple(accent), None if anchor is None else tuple(anchor), bowler_hand), paint)
@@ -1,7 +1,7 @@
 from __future__ import annotations
 from .shared import *
 from .font_utils import _load_theme_font, _pil_text_size
-from .pil_context import _bgr_to_rgb, _frame_draw_context, _commit_frame_draw_context
+from .pil_context import _bgr_to_rgb, _draw_cached_overlay
 from .tracks import *
 
 def _draw_joint(frame: np.ndarray, point: Tuple[int, int], scale: int) -> None:
@@ -10,10 +10,47 @@ def _draw_joint(frame: np.ndarray, point: Tuple[int, int], scale: int) -> None:
     cv2.circle(frame, point, outer + 1, SKELETON_SHADOW, -1, cv2.LINE_AA)
     cv2.circle(frame, point, outer, JOINT_OUTER, -1, cv2.LINE_AA)
     cv2.circle(frame, point, inner, SKELETON_COLOR, -1, cv2.LINE_AA)
-def _draw_skeleton(frame: np.ndarray, tracks: Dict[int, Dict[str, Any]], frame_idx: int) -> None:
+def _draw_skeleton(frame: np.ndarray, tracks: Dict[Any, Dict[str, Any]], frame_idx: int) -> None:
     scale = min(frame.shape[0], frame.shape[1])
     shadow_thickness = max(5, scale // 120)
     line_thickness = max(3, scale // 180)
+    skeleton = tracks.get(SKELETON_TRACK_KEY)
+    if skeleton is None:
+        _draw_skeleton_points(frame, tracks, frame_idx, scale, shadow_thickness, line_thickness)
+        return
+    if not 0 <= frame_idx < len(skeleton["points"]):
+        return
+    points = skeleton["points"][frame_idx]
+    present = skeleton["present"][frame_idx]
+    edges = skeleton["edges"]
+    segments = points[edges[present[edges[:, 0]] & present[edges[:, 1]]]]
+    for layer in _edge_layers(segments, clearance=shadow_thickness // 2 + 2):
+        cv2.polylines(frame, layer, False, SKELETON_SHADOW, shadow_thickness, cv2.LINE_AA)
+        cv2.polylines(frame, layer, False, SKELETON_COLOR, line_thickness, cv2.LINE_AA)
+    for point in points[present].tolist():
+        _draw_joint(frame, tuple(point), scale)
+def _edge_layers(segments: np.ndarray, *, clearance: int) -> List[np.ndarray]:
+    """Split [E, 2, 2] bone segments into layers that match edge-by-edge drawing.
+
+    Edge by edge, a later shadow may cover an earlier bone, so order matters
+    between edges whose strokes can touch (bounding boxes grown by
+    ``clearance`` overlap). Each edge goes one layer after the last earlier
+    edge it touches; edges within a layer touch disjoint pixels, so a layer
+    can draw all its shadows and then all its bones.
+    """
+    if not len(segments):
+        return []
+    low = segments.min(axis=1) - clearance
+    high = segments.max(axis=1) + clearance
+    touches = (low[:, None] <= high[None]).all(axis=2) & (low[None] <= high[:, None]).all(axis=2)
+    layer_of = np.zeros(len(segments), dtype=np.intp)
+    for idx in range(1, len(segments)):
+        earlier = touches[idx, :idx]
+        if earlier.any():
+            layer_of[idx] = layer_of[:idx][earlier].max() + 1
+    return [segments[layer_of == layer] for layer in range(int(layer_of.max()) + 1)]
+def _draw_skeleton_points(frame: np.ndarray, tracks: Dict[Any, Dict[str, Any]], frame_idx: int, scale: int, shadow_thickness: int, line_thickness: int) -> None:
+    # Hand-built tracks without the skeleton arrays (per-edge lookups).
     for start_idx, end_idx in SKELETON_EDGES:
         start = _track_point(tracks, start_idx, frame_idx)
         end = _track_point(tracks, end_idx, frame_idx)
@@ -94,43 +131,46 @@ def _draw_skeleton_legend(
     font = _load_theme_font(LABEL_FONT_FILE, max(18, int(round(scale * 0.038))))
     if font is None:
         return
-    image, overlay, draw = _frame_draw_context(frame)
-    rows = [("Skeleton", SKELETON_COLOR), ("Load / fault point", HOTSPOT_RING)]
-    row_gap = max(8, int(round(scale * 0.014)))
-    dot_r = max(7, int(round(scale * 0.014)))
-    pad_x = max(16, int(round(scale * 0.032)))
-    pad_y = max(12, int(round(scale * 0.024)))
-    text_sizes = [_pil_text_size(draw, label, font) for label, _ in rows]
-    max_text_w = max(size[0] for size in text_sizes)
-    row_h = max(size[1] for size in text_sizes)
-    panel_w = max_text_w + pad_x * 2 + dot_r * 2 + 12
-    panel_h = pad_y * 2 + len(rows) * row_h + (len(rows) - 1) * row_gap
-    x0 = 10
-    y0 = 10
-    x1 = min(width - 10, x0 + panel_w)
-    y1 = min(height - 10, y0 + panel_h)
     fill_alpha = int(round(199 * alpha_scale))
     outline_alpha = int(round(44 * alpha_scale))
     text_alpha = int(round(255 * alpha_scale))
-    draw.rounded_rectangle(
-        (x0, y0, x1, y1),
-        radius=max(8, int(round(scale * 0.016))),
-        fill=(PANEL_BG[2], PANEL_BG[1], PANEL_BG[0], fill_alpha),
-        outline=(255, 255, 255, outline_alpha),
-    )
-    current_y = y0 + pad_y
-    for idx, (label, color) in enumerate(rows):
-        dot_x = x0 + pad_x + dot_r
-        dot_y = current_y + row_h // 2
-        draw.ellipse(
-            (dot_x - dot_r, dot_y - dot_r, dot_x + dot_r, dot_y + dot_r),
-            fill=_bgr_to_rgb(color, text_alpha),
-        )
-        draw.text(
-            (dot_x + dot_r + 8, current_y),
-            label,
-            font=font,
-            fill=(255, 255, 255, text_alpha),
+
+    def paint(draw: Any) -> None:
+        rows = [("Skeleton", SKELETON_COLOR), ("Load / fault point", HOTSPOT_RING)]
+        row_gap = max(8, int(round(scale * 0.014)))
+        dot_r = max(7, int(round(scale * 0.014)))
+        pad_x = max(16, int(round(scale * 0.032)))
+        pad_y = max(12, int(round(scale * 0.024)))
+        text_sizes = [_pil_text_size(draw, label, font) for label, _ in rows]
+        max_text_w = max(size[0] for size in text_sizes)
+        row_h = max(size[1] for size in text_sizes)
+        panel_w = max_text_w + pad_x * 2 + dot_r * 2 + 12
+        panel_h = pad_y * 2 + len(rows) * row_h + (len(rows) - 1) * row_gap
+        x0 = 10
+        y0 = 10
+        x1 = min(width - 10, x0 + panel_w)
+        y1 = min(height - 10, y0 + panel_h)
+        draw.rounded_rectangle(
+            (x0, y0, x1, y1),
+            radius=max(8, int(round(scale * 0.016))),
+            fill=(PANEL_BG[2], PANEL_BG[1], PANEL_BG[0], fill_alpha),
+            outline=(255, 255, 255, outline_alpha),
         )
-        current_y += row_h + (row_gap if idx < len(rows) - 1 else 0)
-    _commit_frame_draw_context(frame, image, overlay)
+        current_y = y0 + pad_y
+        for idx, (label, color) in enumerate(rows):
+            dot_x = x0 + pad_x + dot_r
+            dot_y = current_y + row_h // 2
+            draw.ellipse(
+                (dot_x - dot_r, dot_y - dot_r, dot_x + dot_r, dot_y + dot_r),
+                fill=_bgr_to_rgb(color, text_alpha),
+            )
+            draw.text(
+                (dot_x + dot_r + 8, current_y),
+                label,
+                font=font,
+                fill=(255, 255, 255, text_alpha),
+            )
+            current_y += row_h + (row_gap if idx < len(rows) - 1 else 0)
+
+    # Identical on every frame until the fade; one sprite per alpha step.
+    _draw_cached_overlay(frame, ("skeleton_legend", fill_alpha, outline_alpha, text_alpha), paint)
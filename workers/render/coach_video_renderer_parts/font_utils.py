@@ -1,7 +1,13 @@
 from __future__ import annotations
+import threading
+from collections import OrderedDict
 from .shared import *
 
 _THEME_FONT_CACHE: Dict[Tuple[str, int], Any] = {}
+# (font, text, fontmode) -> (width, height); least recently used dropped first.
+TEXT_METRIC_CACHE_MAX_ENTRIES = 4096
+_TEXT_METRIC_CACHE: "OrderedDict[Tuple[Any, str, str], Tuple[int, int]]" = OrderedDict()
+_TEXT_METRIC_LOCK = threading.Lock()
 
 def _theme_font_dirs() -> List[Path]:
     candidates: List[Path] = []
@@ -74,8 +80,23 @@ def _load_theme_font(font_file: str, size: int) -> Any:
     _THEME_FONT_CACHE[cache_key] = fallback
     return fallback
 def _pil_text_size(draw: Any, text: str, font: Any) -> Tuple[int, int]:
-    bbox = draw.textbbox((0, 0), str(text or ""), font=font)
-    return max(0, int(bbox[2] - bbox[0])), max(0, int(bbox[3] - bbox[1]))
+    # Wrapping and layout measure the same strings on every frame; metrics
+    # only depend on the (cached) font and the draw's glyph mode.
+    return _measured_text_size(font, str(text or ""), getattr(draw, "fontmode", "L"), draw)
+def _measured_text_size(font: Any, text: str, fontmode: str, draw: Any) -> Tuple[int, int]:
+    key = (font, text, fontmode)
+    with _TEXT_METRIC_LOCK:
+        cached = _TEXT_METRIC_CACHE.get(key)
+        if cached is not None:
+            _TEXT_METRIC_CACHE.move_to_end(key)
+            return cached
+    bbox = draw.textbbox((0, 0), text, font=font)
+    size = (max(0, int(bbox[2] - bbox[0])), max(0, int(bbox[3] - bbox[1])))
+    with _TEXT_METRIC_LOCK:
+        _TEXT_METRIC_CACHE[key] = size
+        while len(_TEXT_METRIC_CACHE) > TEXT_METRIC_CACHE_MAX_ENTRIES:
+            _TEXT_METRIC_CACHE.popitem(last=False)
+    return size
 def _phase_label_font_size(scale: int) -> int:
     return max(22, int(round(max(1, int(scale)) * 0.046)))
 def _legend_font_size(scale: int) -> int:
@@ -2,6 +2,7 @@ from __future__ import annotations
 from .shared import *
 from .joints import *
 from .tracks import *
+from .analytics import _safe_int
 from .bubble_base import _draw_top_risk_panel
 
 def _front_leg_support_caption(risk: Optional[Dict[str, Any]]) -> Optional[Dict[str, str]]:
@@ -1,16 +1,123 @@
 from __future__ import annotations
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, NamedTuple
 from .shared import *
+from app.common.env import env_int
+
+# Overlays are blended as premultiplied sprites over their bounding box only:
+# frame = frame * keep + color. Static cards, bubbles, the phase rail and the
+# legend are rasterized once per (key, frame size) and reused across frames.
+# Sprites cost 16 bytes per pixel, so the cache is bounded in bytes
+# (ACTIONLAB_RENDER_SPRITE_CACHE_MB) and cleared when a render finishes: keys
+# carry per-run text, so little would carry over to the next run anyway.
+SPRITE_CACHE_MB_ENV = "ACTIONLAB_RENDER_SPRITE_CACHE_MB"
+DEFAULT_SPRITE_CACHE_MB = 96
+
+
+def sprite_cache_bytes() -> int:
+    return env_int(SPRITE_CACHE_MB_ENV, DEFAULT_SPRITE_CACHE_MB) * 1024 * 1024
+
+
+class _OverlaySprite(NamedTuple):
+    x0: int
+    y0: int
+    color: np.ndarray  # premultiplied BGR, float32 (h, w, 3)
+    keep: np.ndarray  # 1 - alpha, float32 (h, w, 1)
+
+
+_sprite_lock = threading.Lock()
+_sprite_cache: "OrderedDict[Hashable, Tuple[Optional[_OverlaySprite], Any]]" = OrderedDict()
+_sprite_cache_used = 0
+
 
 def _bgr_to_rgb(color: Tuple[int, int, int], alpha: Optional[int] = None) -> Tuple[int, ...]:
     rgb = (int(color[2]), int(color[1]), int(color[0]))
     if alpha is None:
         return rgb
     return rgb + (int(alpha),)
+def _sprite_from_overlay(overlay: Any) -> Optional[_OverlaySprite]:
+    """Crop a transparent PIL RGBA overlay to its drawn pixels."""
+    bbox = overlay.getbbox()
+    if bbox is None:
+        return None
+    x0, y0, x1, y1 = bbox
+    rgba = np.asarray(overlay.crop(bbox), dtype=np.float32)
+    alpha = rgba[..., 3:4] / 255.0
+    return _OverlaySprite(x0=x0, y0=y0, color=np.ascontiguousarray(rgba[..., 2::-1] * alpha), keep=1.0 - alpha)
+def _sprite_from_layer(shape: Tuple[int, ...], paint: Callable[[np.ndarray], Any]) -> Tuple[Optional[_OverlaySprite], Any]:
+    """Rasterize OpenCV "over" drawing (fills, addWeighted panels, scrims) as a sprite.
+
+    ``paint`` runs on a black and a white canvas: black yields the premultiplied
+    colour, the difference yields how much of the frame shows through.
+    """
+    black = np.zeros(shape, dtype=np.uint8)
+    white = np.full(shape, 255, dtype=np.uint8)
+    value = paint(black)
+    paint(white)
+    color = black.astype(np.float32)
+    keep = (white.astype(np.float32) - color) / 255.0
+    drawn = np.argwhere((black != 0).any(axis=2) | (white != 255).any(axis=2))
+    if drawn.size == 0:
+        return None, value
+    (y0, x0), (y1, x1) = drawn.min(axis=0), drawn.max(axis=0) + 1
+    return _OverlaySprite(x0=int(x0), y0=int(y0), color=np.ascontiguousarray(color[y0:y1, x0:x1]), keep=np.ascontiguousarray(keep[y0:y1, x0:x1].mean(axis=2, keepdims=True))), value
+def _blend_sprite(frame: np.ndarray, sprite: Optional[_OverlaySprite]) -> None:
+    if sprite is None:
+        return
+    h, w = sprite.keep.shape[:2]
+    roi = frame[sprite.y0:sprite.y0 + h, sprite.x0:sprite.x0 + w]
+    blended = roi * sprite.keep[: roi.shape[0], : roi.shape[1]] + sprite.color[: roi.shape[0], : roi.shape[1]]
+    roi[:] = np.clip(blended + 0.5, 0, 255).astype(np.uint8)
+def _sprite_nbytes(sprite: Optional[_OverlaySprite]) -> int:
+    return 0 if sprite is None else int(sprite.color.nbytes + sprite.keep.nbytes)
+def _cached_sprite(key: Hashable, build: Callable[[], Tuple[Optional[_OverlaySprite], Any]]) -> Tuple[Optional[_OverlaySprite], Any]:
+    global _sprite_cache_used
+    with _sprite_lock:
+        hit = _sprite_cache.get(key)
+        if hit is not None:
+            _sprite_cache.move_to_end(key)
+            return hit
+    built = build()
+    size = _sprite_nbytes(built[0])
+    budget = sprite_cache_bytes()
+    if size > budget:
+        return built
+    with _sprite_lock:
+        previous = _sprite_cache.pop(key, None)
+        if previous is not None:
+            _sprite_cache_used -= _sprite_nbytes(previous[0])
+        _sprite_cache[key] = built
+        _sprite_cache_used += size
+        while _sprite_cache_used > budget:
+            _, evicted = _sprite_cache.popitem(last=False)
+            _sprite_cache_used -= _sprite_nbytes(evicted[0])
+    return built
+def _draw_cached_overlay(frame: np.ndarray, key: Hashable, paint: Callable[[Any], Any]) -> Any:
+    """Blend the PIL overlay drawn by ``paint(draw)``; rasterized once per key and frame size."""
+    height, width = frame.shape[:2]
+
+    def build() -> Tuple[Optional[_OverlaySprite], Any]:
+        overlay = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+        value = paint(ImageDraw.Draw(overlay))
+        return _sprite_from_overlay(overlay), value
+
+    sprite, value = _cached_sprite(("pil", width, height, key), build)
+    _blend_sprite(frame, sprite)
+    return value
+def _draw_cached_layer(frame: np.ndarray, key: Hashable, paint: Callable[[np.ndarray], Any]) -> Any:
+    """Blend the OpenCV layer drawn by ``paint(canvas)``; rasterized once per key and frame size."""
+    sprite, value = _cached_sprite(("cv", frame.shape, key), lambda: _sprite_from_layer(frame.shape, paint))
+    _blend_sprite(frame, sprite)
+    return value
+def _clear_sprite_cache() -> None:
+    global _sprite_cache_used
+    with _sprite_lock:
+        _sprite_cache.clear()
+        _sprite_cache_used = 0
 def _frame_draw_context(frame: np.ndarray) -> Tuple[Any, Any, Any]:
-    image = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)).convert("RGBA")
-    overlay = Image.new("RGBA", image.size, (0, 0, 0, 0))
+    overlay = Image.new("RGBA", (frame.shape[1], frame.shape[0]), (0, 0, 0, 0))
     draw = ImageDraw.Draw(overlay)
-    return image, overlay, draw
+    return frame, overlay, draw
 def _commit_frame_draw_context(frame: np.ndarray, image: Any, overlay: Any) -> None:
-    composited = Image.alpha_composite(image, overlay).convert("RGB")
-    frame[:, :] = cv2.cvtColor(np.array(composited), cv2.COLOR_RGB2BGR)
+    _blend_sprite(frame, _sprite_from_overlay(overlay))
@@ -1,5 +1,39 @@
 from __future__ import annotations
+import functools
+from fractions import Fraction
+from typing import NamedTuple
 from .shared import *
+from app.common.env import env_int
+
+# Frames go straight from the draw loop into one libx264 process over stdin
+# (no mp4v intermediate, no second decode/encode). Hosts without ffmpeg, or
+# ACTIONLAB_RENDER_ENCODER=mp4v, keep the cv2 mp4v writer.
+#
+# Sinks take write(frame, repeat=n): the frame is shown for n output frames.
+# The ffmpeg sink encodes it once and stretches its timestamps when it
+# remuxes for +faststart (setts bitstream filter), so pauses, slow motion
+# and the end summary are timed stills rather than runs of duplicate frames.
+MAX_TIMED_PIECES = 256  # beyond this, holds are written densely
+
+
+class X264Settings(NamedTuple):
+    preset: str = "slow"
+    crf: int = 17
+    threads: int = 0  # 0 lets x264 pick
+
+
+def render_encoder_mode() -> str:
+    mode = (os.getenv("ACTIONLAB_RENDER_ENCODER") or "auto").strip().lower()
+    return mode if mode in {"auto", "mp4v"} else "auto"
+
+
+def default_x264_settings() -> X264Settings:
+    defaults = X264Settings()
+    preset = (os.getenv("ACTIONLAB_RENDER_X264_PRESET") or defaults.preset).strip() or defaults.preset
+    crf = env_int("ACTIONLAB_RENDER_X264_CRF", defaults.crf, maximum=51)
+    threads = env_int("ACTIONLAB_RENDER_X264_THREADS", defaults.threads)
+    return X264Settings(preset=preset, crf=crf, threads=threads)
+
 
 def _make_output_path(output_path: Optional[str]) -> str:
     if output_path:
@@ -20,53 +54,219 @@ def _publish_fallback_render(intermediate_path: str, final_path: str) -> str:
             "[coach_video_renderer] Could not publish fallback render to final path; keeping intermediate encode",
         )
         return intermediate_path
-def _finalize_render_video(intermediate_path: str, final_path: str) -> Tuple[str, str]:
+def _remove_quietly(path: str) -> None:
+    try:
+        if path and os.path.exists(path):
+            os.remove(path)
+    except OSError:
+        pass
+
+
+@functools.lru_cache(maxsize=4)
+def _ffmpeg_supports_timed_holds(ffmpeg_bin: str) -> bool:
+    try:
+        completed = subprocess.run([ffmpeg_bin, "-hide_banner", "-bsfs"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, timeout=10, check=False)
+    except Exception:
+        return False
+    return "setts" in completed.stdout.split()
+
+
+def _timeline_expr(x: str, pieces: List[List[int]]) -> str:
+    # Output frame index for encoded frame index x; pieces are [first, count, repeat].
+    terms = [f"min({x},0)"] + [f"clip({x}-{first},0,{count})*{repeat}" for first, count, repeat in pieces]
+    return "(" + "+".join(terms) + ")"
+
+
+def _timed_holds_filter(pieces: List[List[int]], tick: int) -> Optional[str]:
+    """setts expression stretching each encoded frame to its repeat count (None when nothing repeats)."""
+    if all(repeat == 1 for _, _, repeat in pieces):
+        return None
+    pts = _timeline_expr(f"(PTS/{tick})", pieces)
+    dts = _timeline_expr(f"(DTS/{tick})", pieces)
+    following = _timeline_expr(f"(PTS/{tick}+1)", pieces)
+    # Quoted: commas would otherwise split the bitstream filter list.
+    return f"setts=pts='{pts}*{tick}':dts='{dts}*{tick}':duration='({following}-{pts})*{tick}'"
+
+
+class _Mp4vRenderSink:
+    """cv2 mp4v writer; may not play on some browsers/iOS clients."""
+
+    encoding = "mp4v"
+
+    def __init__(self, final_path: str, *, fps: float, width: int, height: int) -> None:
+        self.final_path = final_path
+        self.frames_encoded = 0
+        self._path = _intermediate_render_path(final_path)
+        self._writer = cv2.VideoWriter(self._path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+
+    def is_opened(self) -> bool:
+        return bool(self._writer.isOpened())
+
+    def write(self, frame: np.ndarray, repeat: int = 1) -> None:
+        for _ in range(max(1, int(repeat))):
+            self._writer.write(frame)
+            self.frames_encoded += 1
+
+    def close(self) -> Tuple[str, str]:
+        self._writer.release()
+        return _publish_fallback_render(self._path, self.final_path), self.encoding
+
+    def abort(self) -> None:
+        self._writer.release()
+        _remove_quietly(self._path)
+
+
+class _FfmpegPipeRenderSink:
+    """Raw BGR frames over stdin to a single libx264 encode."""
+
+    encoding = "h264"
+
+    def __init__(self, ffmpeg_bin: str, final_path: str, *, fps: float, width: int, height: int, settings: X264Settings) -> None:
+        self.final_path = final_path
+        self.settings = settings
+        self.frames_encoded = 0
+        self._ffmpeg_bin = ffmpeg_bin
+        self._timed_holds = _ffmpeg_supports_timed_holds(ffmpeg_bin)
+        self._pieces: List[List[int]] = []
+        self._last_frame: Optional[np.ndarray] = None
+        self._path = _intermediate_render_path(final_path)
+        self._frame_shape = (height, width, 3)
+        # Exact integer ticks per frame so the remux can map timestamps back to frame indices.
+        rate = Fraction(float(fps)).limit_denominator(1001)
+        scale = max(1, -(-1000 // rate.numerator))
+        self._tick = rate.denominator * scale
+        command = [
+            ffmpeg_bin, "-y", "-hide_banner", "-loglevel", "error", "-nostats",
+            "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{width}x{height}", "-r", f"{rate.numerator}/{rate.denominator}", "-i", "-",
+            *(["-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2"] if width % 2 or height % 2 else []),  # yuv420p needs even sides
+            # No B-frames when holds are timed: decode order must equal display order for the
+            # remapped timestamps to give the right track duration.
+            *(["-bf", "0"] if self._timed_holds else []),
+            "-an", "-c:v", "libx264", "-preset", settings.preset, "-crf", str(int(settings.crf)), "-threads", str(int(settings.threads)),
+            "-pix_fmt", "yuv420p", "-video_track_timescale", str(rate.numerator * scale), "-f", "mp4", self._path,
+        ]
+        # stderr goes to a file: a full pipe would stall ffmpeg while we block on stdin.
+        self._stderr = tempfile.TemporaryFile()
+        try:
+            self._process: Optional[subprocess.Popen] = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=self._stderr)
+        except Exception as exc:
+            logger.warning("[coach_video_renderer] ffmpeg pipe failed to start: %s", exc)
+            self._process = None
+            self._stderr.close()
+
+    def is_opened(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def write(self, frame: np.ndarray, repeat: int = 1) -> None:
+        if frame.shape != self._frame_shape or frame.dtype != np.uint8:
+            raise ValueError(f"render frame shape {frame.shape} does not match encoder {self._frame_shape}")
+        repeat = max(1, int(repeat))
+        if repeat > 1 and not (self._timed_holds and len(self._pieces) < MAX_TIMED_PIECES):
+            for _ in range(repeat):
+                self._write_encoded(frame, 1)
+            return
+        self._write_encoded(frame, repeat)
+
+    def _write_encoded(self, frame: np.ndarray, repeat: int) -> None:
+        self._process.stdin.write(np.ascontiguousarray(frame).data)
+        if self._pieces and self._pieces[-1][2] == repeat:
+            self._pieces[-1][1] += 1
+        else:
+            self._pieces.append([self.frames_encoded, 1, repeat])
+        self.frames_encoded += 1
+        self._last_frame = frame
+
+    def _end_on_single_frame(self) -> None:
+        # Players that stop at the last sample's start would cut a trailing hold short.
+        if not self._pieces or self._pieces[-1][2] == 1 or self._last_frame is None:
+            return
+        first, count, repeat = self._pieces[-1]
+        if count > 1:
+            self._pieces[-1][1] = count - 1
+            self._pieces.append([first + count - 1, 1, repeat - 1])
+        else:
+            self._pieces[-1][2] = repeat - 1
+        self._write_encoded(self._last_frame, 1)
+
+    def _stderr_tail(self) -> str:
+        try:
+            self._stderr.seek(0)
+            return self._stderr.read()[-400:].decode("utf-8", "replace").strip()
+        except Exception:
+            return ""
+        finally:
+            self._stderr.close()
+
+    def close(self) -> Tuple[str, str]:
+        try:
+            self._end_on_single_frame()
+            self._process.stdin.close()
+        except OSError:
+            pass
+        returncode = self._process.wait()
+        detail = self._stderr_tail()
+        if returncode != 0 or not os.path.exists(self._path):
+            _remove_quietly(self._path)
+            raise RuntimeError(f"ffmpeg encode returned {returncode}: {detail or '-'}")
+        try:
+            self._publish()
+        finally:
+            _remove_quietly(self._path)
+        return self.final_path, self.encoding
+
+    def _publish(self) -> None:
+        # Stream copy only: applies hold timing and moves the index up front for streaming.
+        timing = _timed_holds_filter(self._pieces, self._tick)
+        published = _intermediate_render_path(self.final_path)
+        command = [self._ffmpeg_bin, "-y", "-hide_banner", "-loglevel", "error", "-i", self._path, "-c", "copy", *(["-bsf:v", timing] if timing else []), "-movflags", "+faststart", "-f", "mp4", published]
+        completed = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=False)
+        if completed.returncode != 0 or not os.path.exists(published):
+            _remove_quietly(published)
+            raise RuntimeError(f"ffmpeg remux returned {completed.returncode}: {(completed.stderr or '-')[-400:].strip()}")
+        os.replace(published, self.final_path)
+
+    def abort(self) -> None:
+        try:
+            self._process.stdin.close()
+        except OSError:
+            pass
+        self._process.kill()
+        self._process.wait()
+        self._stderr.close()
+        _remove_quietly(self._path)
+
+
+def _concat_render_segments(paths: List[str], final_path: str) -> None:
+    """Join segment encodes (same codec settings) into ``final_path`` without re-encoding."""
     ffmpeg_bin = shutil.which("ffmpeg")
     if not ffmpeg_bin:
-        logger.warning(
-            "[coach_video_renderer] ffmpeg not available; publishing mp4v fallback that may be unsupported on some browsers/iOS clients",
-        )
-        return _publish_fallback_render(intermediate_path, final_path), "mp4v"
-
-    command = [
-        ffmpeg_bin,
-        "-y",
-        "-i",
-        intermediate_path,
-        "-c:v",
-        "libx264",
-        "-preset",
-        "slow",
-        "-crf",
-        "17",
-        "-pix_fmt",
-        "yuv420p",
-        "-movflags",
-        "+faststart",
-        final_path,
-    ]
+        raise RuntimeError("ffmpeg not available for segment concat")
+    list_path = _intermediate_render_path(final_path) + ".txt"
+    published = _intermediate_render_path(final_path)
     try:
-        completed = subprocess.run(
-            command,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            check=False,
-            text=True,
-        )
-    except Exception as exc:
-        logger.warning("[coach_video_renderer] ffmpeg finalize failed: %s", exc)
-        return _publish_fallback_render(intermediate_path, final_path), "mp4v"
+        with open(list_path, "w", encoding="utf-8") as handle:
+            for path in paths:
+                escaped = os.path.abspath(path).replace("'", "'\\''")
+                handle.write(f"file '{escaped}'\n")
+        command = [ffmpeg_bin, "-y", "-hide_banner", "-loglevel", "error", "-f", "concat", "-safe", "0", "-i", list_path, "-c", "copy", "-movflags", "+faststart", "-f", "mp4", published]
+        completed = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=False)
+        if completed.returncode != 0 or not os.path.exists(published):
+            raise RuntimeError(f"ffmpeg concat returned {completed.returncode}: {(completed.stderr or '-')[-400:].strip()}")
+        os.replace(published, final_path)
+    finally:
+        _remove_quietly(list_path)
+        _remove_quietly(published)
 
-    if completed.returncode != 0 or not os.path.exists(final_path):
+
+def _open_render_sink(final_path: str, *, fps: float, width: int, height: int, settings: Optional[X264Settings] = None) -> Any:
+    """Open the best available encoder for ``final_path``; callers check is_opened()."""
+    ffmpeg_bin = shutil.which("ffmpeg") if render_encoder_mode() == "auto" else None
+    if ffmpeg_bin:
+        sink = _FfmpegPipeRenderSink(ffmpeg_bin, final_path, fps=fps, width=width, height=height, settings=settings or default_x264_settings())
+        if sink.is_opened():
+            return sink
+    else:
         logger.warning(
-            "[coach_video_renderer] ffmpeg finalize returned %s; publishing mp4v fallback that may be unsupported on some browsers/iOS clients",
-            completed.returncode,
+            "[coach_video_renderer] ffmpeg not available; publishing mp4v fallback that may be unsupported on some browsers/iOS clients",
         )
-        return _publish_fallback_render(intermediate_path, final_path), "mp4v"
-
-    try:
-        if os.path.exists(intermediate_path):
-            os.remove(intermediate_path)
-    except OSError:
-        pass
-    return final_path, "h264"
+    return _Mp4vRenderSink(final_path, fps=fps, width=width, height=height)
@@ -14,22 +14,26 @@ def _transition_frame_count(*, fps: float, stage_frames: int) -> int:
 def _write_stage_frames(
     *,
     writer: Any,
-    stage_frames: List[np.ndarray],
+    stage_frames: List[Tuple[np.ndarray, int]],
     previous_frame: Optional[np.ndarray],
     fps: float,
 ) -> Tuple[int, Optional[np.ndarray]]:
-    if not stage_frames:
+    """Write (frame, hold) runs; after the crossfade each run is one held frame, not copies."""
+    runs = [(stage_frame, int(count)) for stage_frame, count in stage_frames if int(count) > 0]
+    if not runs:
         return 0, previous_frame
-    transition_frames = _transition_frame_count(fps=fps, stage_frames=len(stage_frames))
+    transition_frames = _transition_frame_count(fps=fps, stage_frames=sum(count for _, count in runs))
     frames_rendered = 0
-    for idx, stage_frame in enumerate(stage_frames):
-        output_frame = stage_frame
-        if previous_frame is not None and idx < transition_frames:
-            alpha = float(idx + 1) / float(transition_frames + 1)
-            output_frame = cv2.addWeighted(previous_frame, 1.0 - alpha, stage_frame, alpha, 0.0)
-        writer.write(output_frame)
-        frames_rendered += 1
-    return frames_rendered, stage_frames[-1]
+    for stage_frame, count in runs:
+        while count > 0 and previous_frame is not None and frames_rendered < transition_frames:
+            alpha = float(frames_rendered + 1) / float(transition_frames + 1)
+            writer.write(cv2.addWeighted(previous_frame, 1.0 - alpha, stage_frame, alpha, 0.0))
+            frames_rendered += 1
+            count -= 1
+        if count > 0:
+            writer.write(stage_frame, repeat=count)
+            frames_rendered += count
+    return frames_rendered, runs[-1][0]
 
 def _render_pause_sequence(*, writer: Any, frame: np.ndarray, tracks: Dict[int, Dict[str, Any]], frame_idx: int, hand: Optional[str], pause_key: str, pause_frames: int, fps: float, risk_by_id: Dict[str, Dict[str, Any]], paused_frame: np.ndarray, hotspot_payload: Optional[Dict[str, Any]], leakage_payload: Optional[Dict[str, Any]], proof_step: Optional[Dict[str, Any]], start: int, stop: int) -> int:
     frames_rendered = 0
@@ -46,20 +50,19 @@ def _render_pause_sequence(*, writer: Any, frame: np.ndarray, tracks: Dict[int,
     if leakage_payload and hotspot_payload:
         body_pay_hold = max(body_pay_hold, _reading_hold_frames(text="Body pays here.", fps=fps, minimum_seconds=2.30, max_seconds=3.40))
     previous_stage_frame: Optional[np.ndarray] = None
-    proof_frames = [paused_frame.copy() for _ in range(proof_hold)]
     added_frames, previous_stage_frame = _write_stage_frames(
         writer=writer,
-        stage_frames=proof_frames,
+        stage_frames=[(paused_frame, proof_hold)],
         previous_frame=previous_stage_frame,
         fps=fps,
     )
     frames_rendered += added_frames
     if leakage_payload and leakage_hold > 0:
-        leakage_frames: List[np.ndarray] = []
+        leakage_frames: List[Tuple[np.ndarray, int]] = []
         for leak_idx in range(leakage_hold):
             leakage_frame = frame.copy()
             _draw_transfer_leak_phase(leakage_frame, tracks=tracks, frame_idx=frame_idx, hand=hand, payload=leakage_payload, progress=float(leak_idx + 1) / float(max(1, leakage_hold)))
-            leakage_frames.append(leakage_frame)
+            leakage_frames.append((leakage_frame, 1))
         added_frames, previous_stage_frame = _write_stage_frames(
             writer=writer,
             stage_frames=leakage_frames,
@@ -80,11 +83,11 @@ def _render_pause_sequence(*, writer: Any, frame: np.ndarray, tracks: Dict[int,
             ),
         )
     if leakage_payload and hotspot_payload and body_pay_hold > 0:
-        pay_frames: List[np.ndarray] = []
+        pay_frames: List[Tuple[np.ndarray, int]] = []
         for pay_idx in range(body_pay_hold):
             pay_frame = frame.copy()
             _draw_body_pay_phase(pay_frame, tracks=tracks, frame_idx=hotspot_frame_idx, hand=hand, risk_id=str((hotspot_payload or {}).get("risk_id") or ""), risk_by_id=risk_by_id, region_priority=list((hotspot_payload or {}).get("region_priority") or []), progress=float(pay_idx + 1) / float(max(1, body_pay_hold)))
-            pay_frames.append(pay_frame)
+            pay_frames.append((pay_frame, 1))
         added_frames, previous_stage_frame = _write_stage_frames(
             writer=writer,
             stage_frames=pay_frames,
@@ -93,14 +96,14 @@ def _render_pause_sequence(*, writer: Any, frame: np.ndarray, tracks: Dict[int,
         )
         frames_rendered += added_frames
     if hotspot_payload and hotspot_hold > 0:
-        hotspot_frames: List[np.ndarray] = []
+        hotspot_frames: List[Tuple[np.ndarray, int]] = []
         for stage, repeat_count in _hotspot_stage_plan(hotspot_hold):
             if repeat_count <= 0:
                 continue
             hotspot_frame = frame.copy()
             pulse_phase = 0.50 if stage == "rings" else (0.85 if stage == "label" else 0.0)
             _draw_load_watch_phase(hotspot_frame, tracks=tracks, frame_idx=hotspot_frame_idx, hand=hand, risk_id=str((hotspot_payload or {}).get("risk_id") or ""), risk_by_id=risk_by_id, load_watch_text=str((hotspot_payload or {}).get("load_watch_text") or ""), region_priority=list((hotspot_payload or {}).get("region_priority") or []), pulse_phase=pulse_phase, stage=stage)
-            hotspot_frames.extend([hotspot_frame.copy() for _ in range(repeat_count)])
+            hotspot_frames.append((hotspot_frame, repeat_count))
         added_frames, previous_stage_frame = _write_stage_frames(
             writer=writer,
             stage_frames=hotspot_frames,
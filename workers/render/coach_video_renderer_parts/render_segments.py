@@ -0,0 +1,232 @@
+from __future__ import annotations
+import math
+import multiprocessing
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from app.common.env import env_int
+from app.io.frame_provider import FrameProvider
+# No ``from .shared import *`` here: it rebinds __name__, and the worker entry
+# points and segment tuples must pickle under this module's real name.
+from .render_output import X264Settings, _concat_render_segments, _intermediate_render_path, _open_render_sink, _remove_quietly, render_encoder_mode
+from .drawing_base import _draw_skeleton, _draw_skeleton_legend
+from .timeline_events import _should_draw_skeleton_frame
+from .phase_rail import _draw_phase_overlay
+from .render_pause_payloads import _prepare_pause_context
+from .render_pause_sequence import _render_pause_sequence
+from .summary_legacy import _draw_end_summary
+
+# The output timeline is fully determined up front (pause anchors, the FFC..release
+# slow-motion window, the summary hold), so it splits into independent segments:
+# live runs, one pause sequence per anchor and the summary. Serially they share one
+# sink; with ACTIONLAB_RENDER_SEGMENT_WORKERS > 1 each segment is drawn and encoded
+# in a worker process and the pieces are joined with a stream-copy concat.
+
+
+class _RenderContext(NamedTuple):
+    video_path: str
+    pose_frames: Any
+    tracks: Dict[int, Dict[str, Any]]
+    render_events: Optional[Dict[str, Any]]
+    hand: Optional[str]
+    action: Optional[Dict[str, Any]]
+    elbow: Optional[Dict[str, Any]]
+    risk_by_id: Dict[str, Dict[str, Any]]
+    estimated_release_speed: Optional[Dict[str, Any]]
+    kinetic_chain: Optional[Dict[str, Any]]
+    report_story: Optional[Dict[str, Any]]
+    root_cause: Optional[Dict[str, Any]]
+    fps: float
+    width: int  # output size; source frames are scaled to it
+    height: int
+    start: int
+    stop: int
+    pause_frames: int
+    slow_motion_extra_frames: int
+    slow_motion_start: Optional[int]
+    slow_motion_end: Optional[int]
+    legend_end_frame: int
+    summary_hold_frames: int
+    encode_settings: Optional[X264Settings]
+
+
+class _RenderSegment(NamedTuple):
+    kind: str  # live | pause | summary
+    first: int
+    stop: int
+    pause_key: str = ""
+
+
+class _SegmentShortRead(RuntimeError):
+    """A worker could not decode every frame its segment was planned for."""
+
+
+def render_segment_workers() -> int:
+    # 1 (serial) unless configured: render nodes already run ACTIONLAB_RENDER_WORKERS jobs side by side.
+    return env_int("ACTIONLAB_RENDER_SEGMENT_WORKERS", 1, minimum=1)
+
+
+def _slow_motion_repeat(ctx: _RenderContext, frame_idx: int) -> int:
+    if ctx.slow_motion_start is not None and ctx.slow_motion_end is not None and ctx.slow_motion_start <= frame_idx <= ctx.slow_motion_end:
+        return 1 + ctx.slow_motion_extra_frames
+    return 1
+
+
+def _plan_render_segments(ctx: _RenderContext, pause_anchors: Dict[int, str], *, max_live_frames: Optional[int] = None) -> List[_RenderSegment]:
+    """Output timeline in order; live runs end on pause anchors and slow-motion edges."""
+    cuts = {ctx.stop}
+    if ctx.pause_frames > 0:
+        cuts.update(anchor + 1 for anchor in pause_anchors)
+    if ctx.slow_motion_start is not None and ctx.slow_motion_end is not None:
+        cuts.update((ctx.slow_motion_start, ctx.slow_motion_end + 1))
+    segments: List[_RenderSegment] = []
+    first = ctx.start
+    for cut in sorted(cut for cut in cuts if ctx.start < cut <= ctx.stop):
+        step = max(1, int(max_live_frames or (cut - first)))
+        for piece in range(first, cut, step):
+            segments.append(_RenderSegment("live", piece, min(cut, piece + step)))
+        anchor = cut - 1
+        if ctx.pause_frames > 0 and anchor in pause_anchors:
+            segments.append(_RenderSegment("pause", anchor, anchor + 1, pause_anchors[anchor]))
+        first = cut
+    if ctx.summary_hold_frames > 0 and ctx.stop > ctx.start:
+        segments.append(_RenderSegment("summary", ctx.stop - 1, ctx.stop))
+    return segments
+
+
+def _scaled_size(width: int, height: int, max_short_side: int) -> Tuple[int, int]:
+    """Output size with the short side capped (even sides, aspect kept); never upscales."""
+    short_side = min(width, height)
+    if max_short_side <= 0 or short_side <= max_short_side:
+        return width, height
+    scale = float(max_short_side) / float(short_side)
+    return max(2, int(round(width * scale / 2.0)) * 2), max(2, int(round(height * scale / 2.0)) * 2)
+
+
+def _fit_frame(ctx: _RenderContext, raw_frame: np.ndarray) -> np.ndarray:
+    if raw_frame.shape[1] == ctx.width and raw_frame.shape[0] == ctx.height:
+        return raw_frame
+    return cv2.resize(raw_frame, (ctx.width, ctx.height), interpolation=cv2.INTER_AREA)
+
+
+def _draw_live_frame(ctx: _RenderContext, frame_idx: int, raw_frame: np.ndarray) -> np.ndarray:
+    frame = raw_frame.copy()
+    if _should_draw_skeleton_frame(pose_frames=ctx.pose_frames, frame_idx=frame_idx, events=ctx.render_events, fps=ctx.fps):
+        _draw_skeleton(frame, ctx.tracks, frame_idx)
+    _draw_phase_overlay(frame, frame_idx=frame_idx, start=ctx.start, stop=ctx.stop, events=ctx.render_events)
+    if frame_idx < ctx.legend_end_frame:
+        _draw_skeleton_legend(frame, fps=ctx.fps, frame_idx=frame_idx, legend_end_frame=ctx.legend_end_frame)
+    return frame
+
+
+def _render_segment(ctx: _RenderContext, segment: _RenderSegment, *, provider: FrameProvider, writer: Any, carry: Dict[str, Any], standalone: bool = False) -> int:
+    """Draw one segment into ``writer``.
+
+    Serially, ``carry`` hands the last live frame to the next segment and a short
+    decode ends the timeline early (as the single loop did). A ``standalone``
+    segment reads what it needs itself and raises on a short decode instead.
+    """
+    if segment.kind == "live":
+        if carry.get("exhausted"):
+            return 0
+        frames_rendered = 0
+        last_idx = segment.first - 1
+        for frame_idx, source_frame in provider.iter_range(segment.first, segment.stop):
+            raw_frame = _fit_frame(ctx, source_frame)
+            frame = _draw_live_frame(ctx, frame_idx, raw_frame)
+            repeat = _slow_motion_repeat(ctx, frame_idx)
+            writer.write(frame, repeat=repeat)
+            frames_rendered += repeat
+            carry.update(frame_idx=frame_idx, frame=frame, raw_frame=raw_frame)
+            last_idx = frame_idx
+        if last_idx < segment.stop - 1:
+            if standalone:
+                raise _SegmentShortRead(f"live segment {segment.first}..{segment.stop} ended at {last_idx}")
+            carry["exhausted"] = True
+        return frames_rendered
+    if segment.kind == "pause":
+        if carry.get("frame_idx") == segment.first:
+            frame = carry["frame"]
+        elif carry.get("exhausted"):
+            return 0
+        else:
+            raw_frame = provider.read(segment.first)
+            if raw_frame is None:
+                raise _SegmentShortRead(f"pause anchor {segment.first} could not be decoded")
+            frame = _draw_live_frame(ctx, segment.first, _fit_frame(ctx, raw_frame))
+        pause_context = _prepare_pause_context(frame=frame, pose_frames=ctx.pose_frames, tracks=ctx.tracks, frame_idx=segment.first, pause_key=segment.pause_key, hand=ctx.hand, risk_by_id=ctx.risk_by_id, render_events=ctx.render_events, report_story=ctx.report_story, root_cause=ctx.root_cause, kinetic_chain=ctx.kinetic_chain)
+        return _render_pause_sequence(writer=writer, frame=frame, tracks=ctx.tracks, frame_idx=segment.first, hand=ctx.hand, pause_key=segment.pause_key, pause_frames=ctx.pause_frames, fps=ctx.fps, risk_by_id=ctx.risk_by_id, paused_frame=pause_context["paused_frame"], hotspot_payload=pause_context["hotspot_payload"], leakage_payload=pause_context["leakage_payload"], proof_step=pause_context["proof_step"], start=ctx.start, stop=ctx.stop)
+    # Summary: drawn over the last decoded frame of the clip.
+    raw_frame = provider.read(segment.first) if standalone else carry.get("raw_frame")
+    if raw_frame is None:
+        if standalone:
+            raise _SegmentShortRead(f"summary frame {segment.first} could not be decoded")
+        return 0
+    summary_frame = _fit_frame(ctx, raw_frame).copy()
+    _draw_end_summary(summary_frame, risk_by_id=ctx.risk_by_id, events=ctx.render_events, action=ctx.action, speed=ctx.estimated_release_speed, elbow=ctx.elbow, report_story=ctx.report_story, root_cause=ctx.root_cause)
+    writer.write(summary_frame, repeat=ctx.summary_hold_frames)
+    return ctx.summary_hold_frames
+
+
+_worker_context: Optional[_RenderContext] = None
+
+
+def _init_segment_worker(ctx: _RenderContext) -> None:
+    global _worker_context
+    _worker_context = ctx
+
+
+def _render_segment_job(segment: _RenderSegment, path: str) -> Tuple[int, int]:
+    ctx = _worker_context
+    provider = FrameProvider(ctx.video_path, cache_bytes=0)
+    writer = _open_render_sink(path, fps=ctx.fps, width=ctx.width, height=ctx.height, settings=ctx.encode_settings)
+    try:
+        if not provider.is_opened() or not writer.is_opened():
+            raise RuntimeError("segment worker could not open video or encoder")
+        frames_rendered = _render_segment(ctx, segment, provider=provider, writer=writer, carry={}, standalone=True)
+    except Exception:
+        writer.abort()
+        raise
+    finally:
+        provider.close()
+    writer.close()
+    return frames_rendered, writer.frames_encoded
+
+
+def _can_render_in_segments(segments: List[_RenderSegment], workers: int) -> bool:
+    return workers > 1 and len(segments) > 1 and render_encoder_mode() == "auto" and shutil.which("ffmpeg") is not None
+
+
+def _render_segments_in_pool(ctx: _RenderContext, segments: List[_RenderSegment], *, workers: int, final_path: str) -> Tuple[int, int]:
+    """Render ``segments`` in worker processes and concat them into ``final_path``."""
+    paths = [_intermediate_render_path(final_path) for _ in segments]
+    results: List[Optional[Tuple[int, int]]] = [None] * len(segments)
+    try:
+        # Not fork: render jobs run on a thread pool, and a child forked while a sibling
+        # thread holds the sprite, text-metric or logging lock would deadlock on it.
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(segments)),
+            mp_context=multiprocessing.get_context("forkserver"),
+            initializer=_init_segment_worker,
+            initargs=(ctx,),
+        ) as pool:
+            # Longest segments (pauses, summary) first so they do not start last.
+            order = sorted(range(len(segments)), key=lambda idx: segments[idx].kind == "live")
+            futures = {idx: pool.submit(_render_segment_job, segments[idx], paths[idx]) for idx in order}
+            for idx, future in futures.items():
+                results[idx] = future.result()
+        _concat_render_segments(paths, final_path)
+    finally:
+        for path in paths:
+            _remove_quietly(path)
+    return sum(result[0] for result in results), sum(result[1] for result in results)
+
+
+def _live_chunk_frames(ctx: _RenderContext, workers: int) -> int:
+    # Enough live chunks to keep every worker busy, but at least a second each
+    # (every segment starts on a fresh keyframe).
+    return max(int(round(ctx.fps)), int(math.ceil((ctx.stop - ctx.start) / float(max(1, workers)))))
@@ -1,6 +1,7 @@
 from __future__ import annotations
 from .shared import *
 from .analytics import _safe_float
+from app.workers.pose.pose_sequence import as_pose_sequence
 
 def _point_from_landmarks(
     landmarks: Optional[List[Dict[str, Any]]],
@@ -32,27 +33,64 @@ def _smooth_series(values: Iterable[Optional[float]], sigma: float) -> Optional[
     arr[valid] = [float(value) for value in value_list if value is not None]
     arr[~valid] = np.interp(idx[~valid], idx[valid], arr[valid])
     return gaussian_filter1d(arr, sigma=max(1.0, sigma))
+# Whole-clip skeleton arrays live next to the per-joint tracks under this key:
+# "points" int32 [T, J, 2] (rounded pixels), "present" bool [T, J] and "edges"
+# [E, 2] column pairs, in TRACKED_JOINTS column order.
+SKELETON_TRACK_KEY = "skeleton"
+def _track_array(pose_frames: Any, *, width: int, height: int) -> Tuple[np.ndarray, np.ndarray]:
+    """[T, J, 2] pixel positions of TRACKED_JOINTS and the [T, J] usable-landmark mask."""
+    pose = as_pose_sequence(pose_frames)
+    joints = pose.data[:, list(TRACKED_JOINTS), :].astype(np.float64)
+    points = joints[..., :2] * np.array([width, height], dtype=np.float64)
+    with np.errstate(invalid="ignore"):
+        valid = pose.valid[:, None] & (joints[..., 3] >= MIN_VISIBILITY) & np.isfinite(points).all(axis=2)
+    return points, valid
+def _interpolate_gaps(values: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """np.interp over time for every column of ``values`` [T, J, C] at once (same arithmetic)."""
+    total = values.shape[0]
+    idx = np.arange(total)[:, None]
+    prev = np.maximum.accumulate(np.where(valid, idx, -1), axis=0)
+    nxt = np.minimum.accumulate(np.where(valid, idx, total)[::-1], axis=0)[::-1]
+    cols = np.arange(values.shape[1])[None, :]
+    # Before the first / after the last sample np.interp holds the edge value.
+    prev_safe = np.where(prev < 0, nxt, prev)
+    nxt_safe = np.where(nxt >= total, prev_safe, nxt)
+    fp0 = values[prev_safe, cols]
+    fp1 = values[nxt_safe, cols]
+    span = (nxt_safe - prev_safe).astype(np.float64)[..., None]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        slope = (fp1 - fp0) / span
+        filled = slope * (idx - prev_safe).astype(np.float64)[..., None] + fp0
+    return np.where(valid[..., None], values, np.where(span == 0, fp0, filled))
 def _build_smoothed_tracks(
-    pose_frames: List[Dict[str, Any]],
+    pose_frames: Any,
     *,
     width: int,
     height: int,
     fps: float,
-) -> Dict[int, Dict[str, Any]]:
+) -> Dict[Any, Dict[str, Any]]:
     sigma = max(1.0, float(fps or 30.0) * 0.03)
-    tracks: Dict[int, Dict[str, Any]] = {}
-    for joint_idx in TRACKED_JOINTS:
-        raw_points = [
-            _point_from_landmarks((frame or {}).get("landmarks"), joint_idx, width=width, height=height)
-            for frame in pose_frames
-        ]
-        xs = _smooth_series([point[0] if point else None for point in raw_points], sigma=sigma)
-        ys = _smooth_series([point[1] if point else None for point in raw_points], sigma=sigma)
+    points, valid = _track_array(pose_frames, width=width, height=height)
+    # Joints with fewer than 3 samples are not smoothed; they fall back to raw points.
+    smoothable = valid.sum(axis=0) >= 3
+    smoothed = np.zeros_like(points)
+    if smoothable.any():
+        filled = _interpolate_gaps(points[:, smoothable], valid[:, smoothable])
+        smoothed[:, smoothable] = gaussian_filter1d(filled, sigma=max(1.0, sigma), axis=0)
+    tracks: Dict[Any, Dict[str, Any]] = {}
+    for column, joint_idx in enumerate(TRACKED_JOINTS):
+        raw_column = points[:, column].tolist()
         tracks[joint_idx] = {
-            "raw": raw_points,
-            "xs": xs,
-            "ys": ys,
+            "raw": [tuple(point) if ok else None for point, ok in zip(raw_column, valid[:, column].tolist())],
+            "xs": smoothed[:, column, 0] if smoothable[column] else None,
+            "ys": smoothed[:, column, 1] if smoothable[column] else None,
         }
+    column_of = {joint_idx: column for column, joint_idx in enumerate(TRACKED_JOINTS)}
+    tracks[SKELETON_TRACK_KEY] = {
+        "points": np.rint(np.where(smoothable[None, :, None], smoothed, np.nan_to_num(points))).astype(np.int32),
+        "present": smoothable[None, :] | valid,
+        "edges": np.array([(column_of[a], column_of[b]) for a, b in SKELETON_EDGES], dtype=np.intp).reshape(-1, 2),
+    }
     return tracks
 def _track_point(
     tracks: Dict[int, Dict[str, Any]],
@@ -0,0 +1,206 @@
+"""
+Content-addressed walkthrough render cache for ActionLab V14.
+
+A walkthrough is fully determined by the clip, its pose tensor, the render
+inputs (events, risks, story context, root cause, ...), the render window
+and timing, WALKTHROUGH_RENDERER_VERSION and the render profile. A stable
+hash of those names the artifact, so a resubmitted clip, or a re-analysis
+whose visual story did not change, reuses the stored MP4 instead of
+rendering it again.
+
+- Artifact: walkthrough-{key}.mp4 plus a walkthrough-{key}.mp4.json sidecar
+  (the walkthrough metadata) in the render dir, mirrored to the render
+  bucket when one is configured
+- Lookup: the local render dir first, then the bucket sidecar
+- Eviction: local entries are touched on every hit, so cleanup_old_renders
+  drops them render_retention_days after their last use; bucket entries
+  older than render_retention_days count as misses and are rewritten by the
+  next render
+- ACTIONLAB_RENDER_CACHE_ENABLED (default true)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from app.common.logger import get_logger
+from app.common.metrics import REGISTRY
+from app.workers.pose.pose_sequence import as_pose_sequence
+from app.workers.render.render_storage import (
+    download_bucket_object,
+    render_bucket_name,
+    render_object_name,
+    render_retention_days,
+    upload_bucket_object,
+)
+
+logger = get_logger(__name__)
+
+RENDER_CACHE_PREFIX = "walkthrough-"
+SIDECAR_SUFFIX = ".json"
+
+# Per-request fields that are rebuilt on every hit rather than stored.
+_UNSTORED_KEYS = ("path", "url", "status", "cache_hit", "cache_source")
+
+
+def render_cache_enabled() -> bool:
+    raw = (os.getenv("ACTIONLAB_RENDER_CACHE_ENABLED") or "true").strip().lower()
+    return raw not in {"0", "false", "no", "off"}
+
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "stores": 0}
+
+
+def _count(name: str) -> None:
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def render_cache_stats() -> Dict[str, int]:
+    with _stats_lock:
+        return dict(_stats)
+
+
+REGISTRY.register_collector(
+    "render_cache",
+    lambda: [
+        (
+            "actionlab_render_cache_events_total",
+            "counter",
+            "Walkthrough render cache lookups and stores by event.",
+            [({"event": name}, value) for name, value in render_cache_stats().items()],
+        )
+    ],
+)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    return str(value)
+
+
+def pose_digest(pose_frames: Any) -> str:
+    """sha256 of the pose at pose-artifact precision (float16).
+
+    Fresh float32 poses and poses reloaded from their artifact hash the same,
+    so inline, queued and re-analysis renders of one clip share a key.
+    """
+    pose = as_pose_sequence(pose_frames)
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(pose.data, dtype=np.float16).tobytes())
+    digest.update(np.ascontiguousarray(pose.valid, dtype=bool).tobytes())
+    return digest.hexdigest()
+
+
+def render_cache_key(
+    *,
+    content_hash: Optional[str],
+    pose_frames: Any,
+    render_inputs: Dict[str, Any],
+    render_settings: Dict[str, Any],
+) -> Optional[str]:
+    """Stable key for one walkthrough, or None when the clip is not content-addressed."""
+    clip = str(content_hash or "").strip().lower()
+    if not render_cache_enabled() or len(clip) != 64 or not all(c in "0123456789abcdef" for c in clip):
+        return None
+    canonical = json.dumps(
+        {
+            "clip": clip,
+            "pose": pose_digest(pose_frames),
+            "inputs": render_inputs,
+            "settings": render_settings,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        default=_json_default,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def render_cache_artifact_name(key: str) -> str:
+    return f"{RENDER_CACHE_PREFIX}{key}.mp4"
+
+
+def _sidecar_name(key: str) -> str:
+    return render_cache_artifact_name(key) + SIDECAR_SUFFIX
+
+
+def _fresh(stored: Dict[str, Any]) -> bool:
+    try:
+        stored_at = float(stored.get("stored_at") or 0.0)
+    except Exception:
+        return False
+    return time.time() - stored_at < render_retention_days() * 86400
+
+
+def load_cached_render(key: Optional[str], render_dir: str) -> Optional[Dict[str, Any]]:
+    """Stored walkthrough metadata for ``key`` plus ``path`` (local copy or None), or None."""
+    if not key:
+        return None
+    artifact_path = os.path.join(render_dir, render_cache_artifact_name(key))
+    sidecar_path = os.path.join(render_dir, _sidecar_name(key))
+    if os.path.isfile(artifact_path) and os.path.isfile(sidecar_path):
+        try:
+            with open(sidecar_path, "r", encoding="utf-8") as handle:
+                stored = json.load(handle)
+            for path in (artifact_path, sidecar_path):
+                os.utime(path, None)  # keeps hot entries inside the retention window
+            _count("hits")
+            return {**stored, "path": artifact_path, "cache_source": "local"}
+        except Exception as exc:
+            logger.warning("[render_cache] unreadable key=%s error=%s", key, exc)
+
+    if render_bucket_name():
+        raw = download_bucket_object(render_object_name(_sidecar_name(key)))
+        if raw is not None:
+            try:
+                stored = json.loads(raw.decode("utf-8"))
+            except Exception as exc:
+                logger.warning("[render_cache] unreadable bucket sidecar key=%s error=%s", key, exc)
+                stored = None
+            if stored is not None and stored.get("storage_uploaded") and _fresh(stored):
+                _count("hits")
+                return {**stored, "path": None, "cache_source": "gcs"}
+
+    _count("misses")
+    return None
+
+
+def store_cached_render(key: Optional[str], walkthrough: Dict[str, Any], render_dir: str) -> bool:
+    """Best-effort sidecar write for a rendered artifact; never raises."""
+    if not key or not walkthrough.get("available"):
+        return False
+    stored = {name: value for name, value in walkthrough.items() if name not in _UNSTORED_KEYS}
+    stored["render_cache_key"] = key
+    stored["stored_at"] = time.time()
+    sidecar_path = os.path.join(render_dir, _sidecar_name(key))
+    staging_path = f"{sidecar_path}.{os.getpid()}.tmp"
+    try:
+        with open(staging_path, "w", encoding="utf-8") as handle:
+            json.dump(stored, handle, default=_json_default)
+        os.replace(staging_path, sidecar_path)
+    except Exception as exc:
+        logger.warning("[render_cache] store_failed key=%s error=%s", key, exc)
+        try:
+            os.remove(staging_path)
+        except OSError:
+            pass
+        return False
+    # Only advertise the bucket copy once the MP4 itself made it there.
+    if stored.get("storage_uploaded"):
+        upload_bucket_object(sidecar_path, render_object_name(_sidecar_name(key)), content_type="application/json")
+    _count("stores")
+    return True
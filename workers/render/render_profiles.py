@@ -0,0 +1,69 @@
+"""
+Walkthrough render profiles for ActionLab V14.
+
+- preview:  540p short side, x264 veryfast / crf 23 (budget phones, mobile data)
+- standard: 720p short side, x264 medium / crf 20 (default for ios / android)
+- full:     1080p short side, ACTIONLAB_RENDER_X264_* settings (slow / crf 17)
+
+Sources are only ever scaled down; overlays are laid out on the scaled frame.
+A request may name a profile; otherwise the client platform picks one. When
+the render queue is backed up the server steps down one profile for every
+ACTIONLAB_RENDER_BACKLOG_STEP queued jobs (default 4, 0 disables).
+"""
+
+from __future__ import annotations
+
+from typing import Dict, NamedTuple, Optional
+
+from app.common.env import env_int
+from app.common.logger import get_logger
+from app.workers.render.coach_video_renderer_parts.render_output import X264Settings, default_x264_settings
+
+logger = get_logger(__name__)
+
+
+class RenderProfile(NamedTuple):
+    name: str
+    max_short_side: int
+    encode_settings: X264Settings
+
+
+# Cheapest first; backlog downgrades walk left.
+RENDER_PROFILE_NAMES = ("preview", "standard", "full")
+_PLATFORM_PROFILES = {"ios": "standard", "android": "standard"}
+DEFAULT_RENDER_PROFILE = "full"
+
+
+def render_profiles() -> Dict[str, RenderProfile]:
+    full = default_x264_settings()
+    return {
+        "preview": RenderProfile("preview", 540, X264Settings(preset="veryfast", crf=23, threads=full.threads)),
+        "standard": RenderProfile("standard", 720, X264Settings(preset="medium", crf=20, threads=full.threads)),
+        "full": RenderProfile("full", 1080, full),
+    }
+
+
+def normalize_render_profile(name: Optional[str]) -> Optional[str]:
+    resolved = str(name or "").strip().lower()
+    return resolved if resolved in RENDER_PROFILE_NAMES else None
+
+
+def requested_render_profile(name: Optional[str], *, platform: Optional[str]) -> str:
+    """Explicit profile when valid, else the platform default."""
+    return normalize_render_profile(name) or _PLATFORM_PROFILES.get(str(platform or "").strip().lower(), DEFAULT_RENDER_PROFILE)
+
+
+def render_backlog_step() -> int:
+    return env_int("ACTIONLAB_RENDER_BACKLOG_STEP", 4)
+
+
+def effective_render_profile(name: Optional[str], *, backlog: int = 0) -> RenderProfile:
+    requested = normalize_render_profile(name) or DEFAULT_RENDER_PROFILE
+    index = RENDER_PROFILE_NAMES.index(requested)
+    step = render_backlog_step()
+    if step > 0 and backlog >= step:
+        index = max(0, index - int(backlog) // step)
+    profile = render_profiles()[RENDER_PROFILE_NAMES[index]]
+    if profile.name != requested:
+        logger.info("[render_profiles] downgraded requested=%s effective=%s backlog=%s", requested, profile.name, backlog)
+    return profile
@@ -1,9 +1,15 @@
 from __future__ import annotations
 
+import hashlib
 import os
+import re
+import shutil
+import threading
 import time
-from typing import Dict, Optional
+from datetime import timedelta
+from typing import Any, Dict, Iterator, NamedTuple, Optional, Tuple
 
+from app.common.env import env_int
 from app.common.logger import get_logger
 
 logger = get_logger(__name__)
@@ -25,11 +31,7 @@ def get_render_dir() -> str:
 
 
 def render_retention_days() -> int:
-    raw = os.getenv("ACTIONLAB_RENDER_RETENTION_DAYS", "15").strip()
-    try:
-        return max(1, int(raw))
-    except Exception:
-        return 15
+    return env_int("ACTIONLAB_RENDER_RETENTION_DAYS", 15, minimum=1)
 
 
 def render_bucket_name() -> str:
@@ -59,6 +61,85 @@ def _google_storage():
         return None
 
 
+# ------------------------------------------------------------
+# Bucket client
+# ------------------------------------------------------------
+# One client per process: building credentials and an HTTP session for every
+# render request costs more than the request itself.
+# ACTIONLAB_RENDER_BUCKET=file:///some/dir swaps in a directory-backed
+# stand-in with the same blob surface, for tests and local development.
+FILESYSTEM_BUCKET_SCHEME = "file://"
+
+_client_lock = threading.Lock()
+_client: Any = None
+
+
+class _FilesystemBlob:
+    def __init__(self, root: str, name: str) -> None:
+        self.name = name
+        self._path = os.path.join(root, name)
+        self.size: Optional[int] = None
+        self.etag: Optional[str] = None
+        self.md5_hash: Optional[str] = None
+        self.generation: Optional[int] = None
+
+    def exists(self) -> bool:
+        return os.path.isfile(self._path)
+
+    def reload(self) -> None:
+        stat = os.stat(self._path)
+        self.size = stat.st_size
+        self.generation = stat.st_mtime_ns
+        self.etag = f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+    def upload_from_filename(self, filename: str, content_type: Optional[str] = None) -> None:
+        os.makedirs(os.path.dirname(self._path), exist_ok=True)
+        staging = f"{self._path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        shutil.copyfile(filename, staging)
+        os.replace(staging, self._path)
+
+    def download_as_bytes(self, start: Optional[int] = None, end: Optional[int] = None) -> bytes:
+        with open(self._path, "rb") as handle:
+            handle.seek(start or 0)
+            if end is None:
+                return handle.read()
+            return handle.read(max(0, end - (start or 0) + 1))
+
+
+class _FilesystemBucket:
+    def __init__(self, root: str) -> None:
+        self._root = root
+
+    def blob(self, name: str, generation: Optional[int] = None) -> _FilesystemBlob:
+        return _FilesystemBlob(self._root, name)
+
+    def get_blob(self, name: str) -> Optional[_FilesystemBlob]:
+        blob = self.blob(name)
+        if not blob.exists():
+            return None
+        blob.reload()
+        return blob
+
+
+class _FilesystemClient:
+    def bucket(self, bucket_name: str) -> _FilesystemBucket:
+        return _FilesystemBucket(bucket_name[len(FILESYSTEM_BUCKET_SCHEME):])
+
+
+def _storage_client() -> Any:
+    """Shared bucket client, or None when google-cloud-storage is unavailable."""
+    global _client
+    if render_bucket_name().startswith(FILESYSTEM_BUCKET_SCHEME):
+        return _FilesystemClient()
+    with _client_lock:
+        if _client is None:
+            storage = _google_storage()
+            if storage is None:
+                return None
+            _client = storage.Client()
+        return _client
+
+
 def upload_render_artifact(local_path: str, *, artifact_name: Optional[str] = None) -> Dict[str, Optional[str]]:
     bucket_name = render_bucket_name()
     safe_name = normalize_render_filename(artifact_name or os.path.basename(local_path))
@@ -82,8 +163,8 @@ def upload_render_artifact(local_path: str, *, artifact_name: Optional[str] = No
             "reason": "local_render_missing",
         }
 
-    storage = _google_storage()
-    if storage is None:
+    client = _storage_client()
+    if client is None:
         logger.warning("[render_storage] google-cloud-storage unavailable; skipping upload path=%s", local_path)
         return {
             "uploaded": False,
@@ -94,9 +175,7 @@ def upload_render_artifact(local_path: str, *, artifact_name: Optional[str] = No
         }
 
     try:
-        client = storage.Client()
-        bucket = client.bucket(bucket_name)
-        blob = bucket.blob(object_name)
+        blob = client.bucket(bucket_name).blob(object_name)
         blob.upload_from_filename(local_path, content_type="video/mp4")
         logger.info(
             "[render_storage] uploaded render path=%s bucket=%s object=%s",
@@ -128,23 +207,38 @@ def upload_render_artifact(local_path: str, *, artifact_name: Optional[str] = No
         }
 
 
-def download_render_artifact(filename: str) -> Optional[bytes]:
+def upload_bucket_object(local_path: str, object_name: str, *, content_type: str) -> Dict[str, Optional[str]]:
+    """Upload a non-render artifact (e.g. pose tensors) to the render bucket."""
     bucket_name = render_bucket_name()
     if not bucket_name:
-        return None
-
-    storage = _google_storage()
-    if storage is None:
-        logger.warning("[render_storage] google-cloud-storage unavailable; cannot download %s", filename)
-        return None
+        return {"uploaded": False, "storage_backend": "local", "bucket": None, "object_name": None, "reason": "render_bucket_not_configured"}
+    client = _storage_client()
+    if client is None:
+        return {"uploaded": False, "storage_backend": "gcs", "bucket": bucket_name, "object_name": object_name, "reason": "google_cloud_storage_unavailable"}
+    try:
+        blob = client.bucket(bucket_name).blob(object_name)
+        blob.upload_from_filename(local_path, content_type=content_type)
+        return {"uploaded": True, "storage_backend": "gcs", "bucket": bucket_name, "object_name": object_name, "reason": None}
+    except Exception as exc:
+        logger.warning(
+            "[render_storage] upload failed path=%s bucket=%s object=%s error=%s",
+            local_path,
+            bucket_name,
+            object_name,
+            exc,
+        )
+        return {"uploaded": False, "storage_backend": "gcs", "bucket": bucket_name, "object_name": object_name, "reason": "upload_failed"}
 
-    safe_name = normalize_render_filename(filename)
-    object_name = render_object_name(safe_name)
 
+def download_bucket_object(object_name: str) -> Optional[bytes]:
+    bucket_name = render_bucket_name()
+    if not bucket_name:
+        return None
+    client = _storage_client()
+    if client is None:
+        return None
     try:
-        client = storage.Client()
-        bucket = client.bucket(bucket_name)
-        blob = bucket.blob(object_name)
+        blob = client.bucket(bucket_name).blob(object_name)
         if not blob.exists():
             return None
         return blob.download_as_bytes()
@@ -158,6 +252,132 @@ def download_render_artifact(filename: str) -> Optional[bytes]:
         return None
 
 
+# ------------------------------------------------------------
+# Streaming delivery
+# ------------------------------------------------------------
+class RenderArtifact(NamedTuple):
+    name: str
+    size: int
+    etag: str  # quoted strong validator
+    source: str  # gcs | local
+    blob: Any = None
+    local_path: Optional[str] = None
+
+
+def render_stream_chunk_bytes() -> int:
+    return env_int("ACTIONLAB_RENDER_STREAM_CHUNK_KB", 1024, minimum=64) * 1024
+
+
+def render_signed_url_ttl_seconds() -> int:
+    """Lifetime of signed render URLs; 0 (default) streams through the API instead."""
+    return env_int("ACTIONLAB_RENDER_SIGNED_URL_TTL_SECONDS", 0)
+
+
+# Render cache artifacts (render_cache.render_cache_artifact_name) are named by
+# the content hash of their inputs, so the name already identifies the bytes.
+_CONTENT_ADDRESSED_NAME = re.compile(r"^walkthrough-([0-9a-f]{64})\.mp4$")
+_DIGEST_MEMO_SIZE = 256
+
+_digest_lock = threading.Lock()
+_digests: Dict[Tuple[str, int, int, int], str] = {}
+
+
+def _file_digest(path: str, stat: os.stat_result) -> str:
+    memo_key = (path, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+    with _digest_lock:
+        digest = _digests.get(memo_key)
+    if digest is not None:
+        return digest
+    hasher = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(render_stream_chunk_bytes()), b""):
+            hasher.update(block)
+    digest = hasher.hexdigest()
+    with _digest_lock:
+        if len(_digests) >= _DIGEST_MEMO_SIZE:
+            _digests.pop(next(iter(_digests)))
+        _digests[memo_key] = digest
+    return digest
+
+
+def _local_etag(path: str, name: str, stat: os.stat_result) -> str:
+    """Size plus content key; unlike mtime it survives the render cache touching hot entries."""
+    match = _CONTENT_ADDRESSED_NAME.match(name)
+    key = match.group(1) if match else _file_digest(path, stat)
+    return f'"{key[:32]}-{stat.st_size:x}"'
+
+
+def open_render_artifact(filename: str, *, local_dir: str) -> Optional[RenderArtifact]:
+    """Size and validator of a render (bucket first, then ``local_dir``) without reading it."""
+    safe_name = normalize_render_filename(filename)
+    bucket_name = render_bucket_name()
+    client = _storage_client() if bucket_name else None
+    if client is not None:
+        object_name = render_object_name(safe_name)
+        try:
+            # get_blob() pins the generation, so every ranged read sees the same object.
+            blob = client.bucket(bucket_name).get_blob(object_name)
+        except Exception as exc:
+            logger.warning(
+                "[render_storage] stat failed bucket=%s object=%s error=%s",
+                bucket_name,
+                object_name,
+                exc,
+            )
+            blob = None
+        if blob is not None:
+            validator = blob.md5_hash or blob.etag or blob.generation
+            return RenderArtifact(safe_name, int(blob.size or 0), f'"{validator}"', "gcs", blob=blob)
+
+    local_path = os.path.join(local_dir, safe_name)
+    try:
+        stat = os.stat(local_path)
+    except OSError:
+        return None
+    if not os.path.isfile(local_path):
+        return None
+    return RenderArtifact(safe_name, stat.st_size, _local_etag(local_path, safe_name, stat), "local", local_path=local_path)
+
+
+def iter_render_artifact(artifact: RenderArtifact, start: int, end: int) -> Iterator[bytes]:
+    """Bytes ``start``..``end`` (inclusive) in render_stream_chunk_bytes() pieces."""
+    chunk = render_stream_chunk_bytes()
+    if artifact.blob is not None:
+        position = start
+        while position <= end:
+            stop = min(end, position + chunk - 1)
+            yield artifact.blob.download_as_bytes(start=position, end=stop)
+            position = stop + 1
+        return
+    with open(artifact.local_path, "rb") as handle:
+        handle.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            data = handle.read(min(chunk, remaining))
+            if not data:
+                return
+            remaining -= len(data)
+            yield data
+
+
+def signed_render_url(artifact: RenderArtifact) -> Optional[str]:
+    """V4 signed GET URL for a bucket render when enabled, else None."""
+    ttl = render_signed_url_ttl_seconds()
+    if ttl <= 0 or artifact.blob is None or not hasattr(artifact.blob, "generate_signed_url"):
+        return None
+    try:
+        return artifact.blob.generate_signed_url(
+            version="v4",
+            expiration=timedelta(seconds=ttl),
+            method="GET",
+            response_type="video/mp4",
+        )
+    except Exception as exc:
+        # e.g. credentials that cannot sign; streaming still works.
+        logger.warning("[render_storage] signed url failed name=%s error=%s", artifact.name, exc)
+        return None
+
+
 def cleanup_old_renders(render_dir: str, *, retention_days: int | None = None) -> Dict[str, int]:
     retention = retention_days or render_retention_days()
     cutoff = time.time() - (retention * 86400)
@@ -173,7 +393,8 @@ def cleanup_old_renders(render_dir: str, *, retention_days: int | None = None) -
         return {"scanned": 0, "removed": 0}
 
     for entry in entries:
-        if not entry.is_file() or not entry.name.endswith(".mp4"):
+        # Render cache sidecars (.mp4.json) age out with their artifact.
+        if not entry.is_file() or not entry.name.endswith((".mp4", ".mp4.json")):
             continue
         scanned += 1
         try:
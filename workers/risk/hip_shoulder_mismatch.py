@@ -1,32 +1,17 @@
 from __future__ import annotations
 
-import math
 from typing import Any, Dict, List, Optional
 
 import numpy as np
 
+from app.workers.pose.kinematics import kinematics_for
+
 LEFT_HIP = 23
 RIGHT_HIP = 24
 LEFT_SHOULDER = 11
 RIGHT_SHOULDER = 12
 
 
-def _landmark(lms: Any, key: str, idx: int) -> Optional[Dict[str, Any]]:
-    if isinstance(lms, dict):
-        val = lms.get(key)
-        return val if isinstance(val, dict) else None
-    if isinstance(lms, list) and 0 <= idx < len(lms):
-        val = lms[idx]
-        return val if isinstance(val, dict) else None
-    return None
-
-
-def _segment_angle_deg(left: Dict[str, Any], right: Dict[str, Any]) -> float:
-    dx = float(right["x"]) - float(left["x"])
-    dy = float(right["y"]) - float(left["y"])
-    return math.degrees(math.atan2(dy, dx))
-
-
 def _unwrap_deg(values: List[float]) -> np.ndarray:
     return np.degrees(np.unwrap(np.radians(np.array(values, dtype=float))))
 
@@ -55,49 +40,20 @@ def compute_hip_shoulder_mismatch(
     else:
         start = 0
 
+    kin = kinematics_for(pose_frames)
     if isinstance(rel_frame, int):
-        end = min(len(pose_frames), int(rel_frame) + 2)
+        end = min(len(kin), int(rel_frame) + 2)
     elif isinstance(ffc_frame, int):
-        end = min(len(pose_frames), int(ffc_frame) + 8)
+        end = min(len(kin), int(ffc_frame) + 8)
     else:
         return {"risk_id": "hip_shoulder_mismatch", "signal_strength": floor, "confidence": 0.0}
 
-    shoulder_angles: List[float] = []
-    hip_angles: List[float] = []
-    vis: List[float] = []
-    frame_ids: List[int] = []
-
-    for i in range(start, end):
-        frame = pose_frames[i]
-        if not isinstance(frame, dict):
-            continue
-        lm = frame.get("landmarks")
-        if not isinstance(lm, (dict, list)):
-            continue
-
-        left_hip = _landmark(lm, "LEFT_HIP", LEFT_HIP)
-        right_hip = _landmark(lm, "RIGHT_HIP", RIGHT_HIP)
-        left_shoulder = _landmark(lm, "LEFT_SHOULDER", LEFT_SHOULDER)
-        right_shoulder = _landmark(lm, "RIGHT_SHOULDER", RIGHT_SHOULDER)
-        if None in (left_hip, right_hip, left_shoulder, right_shoulder):
-            continue
-
-        try:
-            shoulder_angle = _segment_angle_deg(left_shoulder, right_shoulder)
-            hip_angle = _segment_angle_deg(left_hip, right_hip)
-            v = min(
-                float(left_hip.get("visibility", left_hip.get("v", 0.0))),
-                float(right_hip.get("visibility", right_hip.get("v", 0.0))),
-                float(left_shoulder.get("visibility", left_shoulder.get("v", 0.0))),
-                float(right_shoulder.get("visibility", right_shoulder.get("v", 0.0))),
-            )
-        except Exception:
-            continue
-
-        shoulder_angles.append(shoulder_angle)
-        hip_angles.append(hip_angle)
-        vis.append(v)
-        frame_ids.append(i)
+    shoulder_line = kin.line_angle(LEFT_SHOULDER, RIGHT_SHOULDER)
+    hip_line = kin.line_angle(LEFT_HIP, RIGHT_HIP)
+    frame_ids = [i for i in range(start, end) if np.isfinite(shoulder_line[i]) and np.isfinite(hip_line[i])]
+    shoulder_angles = np.degrees(shoulder_line[frame_ids]).tolist()
+    hip_angles = np.degrees(hip_line[frame_ids]).tolist()
+    vis = kin.visibility(LEFT_HIP, RIGHT_HIP, LEFT_SHOULDER, RIGHT_SHOULDER)[frame_ids].tolist()
 
     if len(shoulder_angles) < 4:
         return {"risk_id": "hip_shoulder_mismatch", "signal_strength": floor, "confidence": 0.0}
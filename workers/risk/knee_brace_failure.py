@@ -5,6 +5,7 @@ import numpy as np
 from typing import Any, Dict, List, Optional, Tuple
 
 from app.common.logger import get_logger
+from app.workers.pose.kinematics import Kinematics, kinematics_for
 logger = get_logger(__name__)
 
 LEFT_HIP = 23
@@ -19,30 +20,6 @@ LEFT_FOOT_INDEX = 31
 RIGHT_FOOT_INDEX = 32
 
 
-def _landmark(lms: Any, key: str, idx: int) -> Optional[Dict[str, Any]]:
-    if isinstance(lms, dict):
-        val = lms.get(key)
-        return val if isinstance(val, dict) else None
-    if isinstance(lms, list) and 0 <= idx < len(lms):
-        val = lms[idx]
-        return val if isinstance(val, dict) else None
-    return None
-
-
-def _point(lms: Any, key: str, idx: int) -> Optional[Tuple[float, float, float]]:
-    pt = _landmark(lms, key, idx)
-    if pt is None:
-        return None
-    try:
-        return (
-            float(pt['x']),
-            float(pt['y']),
-            float(pt.get('visibility', pt.get('v', 0.0))),
-        )
-    except Exception:
-        return None
-
-
 def _front_side_from_hand(hand: Optional[str]) -> Optional[str]:
     if not isinstance(hand, str):
         return None
@@ -54,47 +31,20 @@ def _front_side_from_hand(hand: Optional[str]) -> Optional[str]:
     return None
 
 
-def _front_side_from_frame(lms: Any) -> str:
-    left_points = [
-        _point(lms, 'LEFT_ANKLE', LEFT_ANKLE),
-        _point(lms, 'LEFT_HEEL', LEFT_HEEL),
-        _point(lms, 'LEFT_FOOT_INDEX', LEFT_FOOT_INDEX),
-    ]
-    right_points = [
-        _point(lms, 'RIGHT_ANKLE', RIGHT_ANKLE),
-        _point(lms, 'RIGHT_HEEL', RIGHT_HEEL),
-        _point(lms, 'RIGHT_FOOT_INDEX', RIGHT_FOOT_INDEX),
-    ]
-    left_y = [pt[1] for pt in left_points if pt is not None]
-    right_y = [pt[1] for pt in right_points if pt is not None]
+def _front_side_from_frame(kin: Kinematics, frame_idx: int) -> str:
+    left_y = [float(kin.position(idx)[frame_idx, 1]) for idx in (LEFT_ANKLE, LEFT_HEEL, LEFT_FOOT_INDEX)]
+    right_y = [float(kin.position(idx)[frame_idx, 1]) for idx in (RIGHT_ANKLE, RIGHT_HEEL, RIGHT_FOOT_INDEX)]
+    left_y = [y for y in left_y if math.isfinite(y)]
+    right_y = [y for y in right_y if math.isfinite(y)]
     if left_y and right_y:
         return 'LEFT' if float(np.mean(left_y)) >= float(np.mean(right_y)) else 'RIGHT'
     return 'LEFT'
 
 
-def _leg_indices(side: str) -> Tuple[Tuple[str, int], Tuple[str, int], Tuple[str, int]]:
+def _leg_indices(side: str) -> Tuple[int, int, int]:
     if side == 'RIGHT':
-        return (
-            ('RIGHT_HIP', RIGHT_HIP),
-            ('RIGHT_KNEE', RIGHT_KNEE),
-            ('RIGHT_ANKLE', RIGHT_ANKLE),
-        )
-    return (
-        ('LEFT_HIP', LEFT_HIP),
-        ('LEFT_KNEE', LEFT_KNEE),
-        ('LEFT_ANKLE', LEFT_ANKLE),
-    )
-
-
-def _angle(a: Tuple[float, float], b: Tuple[float, float], c: Tuple[float, float]) -> Optional[float]:
-    ba = (a[0] - b[0], a[1] - b[1])
-    bc = (c[0] - b[0], c[1] - b[1])
-    nba = math.hypot(*ba)
-    nbc = math.hypot(*bc)
-    if nba <= 1e-6 or nbc <= 1e-6:
-        return None
-    cosang = max(-1.0, min(1.0, (ba[0] * bc[0] + ba[1] * bc[1]) / (nba * nbc)))
-    return math.degrees(math.acos(cosang))
+        return RIGHT_HIP, RIGHT_KNEE, RIGHT_ANKLE
+    return LEFT_HIP, LEFT_KNEE, LEFT_ANKLE
 
 
 def compute_front_knee_brace_profile(
@@ -104,39 +54,23 @@ def compute_front_knee_brace_profile(
     hand: Optional[str] = None,
     post_window: Optional[int] = None,
 ) -> Optional[Dict[str, Any]]:
-    if ffc_frame is None or not isinstance(ffc_frame, int) or ffc_frame < 0 or ffc_frame >= len(pose_frames):
+    kin = kinematics_for(pose_frames)
+    if ffc_frame is None or not isinstance(ffc_frame, int) or ffc_frame < 0 or ffc_frame >= len(kin):
         return None
-
-    ref_frame = pose_frames[ffc_frame]
-    ref_lms = ref_frame.get('landmarks') if isinstance(ref_frame, dict) else None
-    if not isinstance(ref_lms, (dict, list)):
+    if not kin.valid[ffc_frame]:  # no pose on the contact frame
         return None
 
-    front_side = _front_side_from_hand(hand) or _front_side_from_frame(ref_lms)
+    front_side = _front_side_from_hand(hand) or _front_side_from_frame(kin, ffc_frame)
     hip_idx, knee_idx, ankle_idx = _leg_indices(front_side)
     window = int(post_window or max(6, int(round((fps or 30.0) * 0.16))))
 
-    samples = []
-    for i in range(max(0, ffc_frame - 1), min(len(pose_frames), ffc_frame + window + 1)):
-        frame = pose_frames[i]
-        if not isinstance(frame, dict):
-            continue
-        lms = frame.get('landmarks')
-        if not isinstance(lms, (dict, list)):
-            continue
-        hip = _point(lms, hip_idx[0], hip_idx[1])
-        knee = _point(lms, knee_idx[0], knee_idx[1])
-        ankle = _point(lms, ankle_idx[0], ankle_idx[1])
-        if hip is None or knee is None or ankle is None:
-            continue
-        angle = _angle((hip[0], hip[1]), (knee[0], knee[1]), (ankle[0], ankle[1]))
-        if angle is None:
-            continue
-        samples.append({
-            'frame': i,
-            'angle': angle,
-            'visibility': min(hip[2], knee[2], ankle[2]),
-        })
+    angles = kin.joint_angle(hip_idx, knee_idx, ankle_idx)
+    visibility = kin.visibility(hip_idx, knee_idx, ankle_idx)
+    samples = [
+        {'frame': i, 'angle': float(angles[i]), 'visibility': float(visibility[i])}
+        for i in range(max(0, ffc_frame - 1), min(len(kin), ffc_frame + window + 1))
+        if math.isfinite(angles[i])
+    ]
 
     if len(samples) < 4:
         return None
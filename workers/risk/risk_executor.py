@@ -0,0 +1,177 @@
+"""
+Budgeted execution of the registered risk modules for ActionLab V14.
+
+Each risk module registers a compute function under its risk_id; run_risks()
+runs every registered module for one delivery on a shared thread pool and
+gives each one a time budget. A module that overruns its budget or raises is
+reported with no result, so the risk worker emits its floor and one
+pathological clip cannot hold up the whole risk stage.
+
+- register_risk(risk_id, compute, floor=0.15): compute(RiskInputs) returns
+  the risk dict or None; modules run and are reported in registration order
+- ACTIONLAB_RISK_WORKERS (default 4): size of the process-wide pool; 1 runs
+  the modules inline, one after another, without a budget
+- ACTIONLAB_RISK_BUDGET_SECONDS (default 5): per-module budget, counted from
+  when that module starts running; 0 waits for every module. A module still
+  queued a full budget after its turn comes (the pool is held by overrunning
+  modules) is cancelled and reported as a timeout too
+- An overrunning module keeps its pool thread until it returns, so callers
+  should treat a run with timeouts as degraded (the orchestrator does not
+  cache it)
+- Timing: each module runs inside span("risk.<risk_id>"), so it feeds the
+  stage latency histogram and the run's timing breakdown
+"""
+
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from app.common.env import env_float, env_int
+from app.common.logger import get_logger
+from app.common.metrics import REGISTRY, span
+
+logger = get_logger(__name__)
+
+RISK_FALLBACKS = REGISTRY.counter(
+    "actionlab_risk_fallbacks_total",
+    "Risk modules reported at their floor, by risk and reason (timeout, error).",
+)
+
+
+class RiskInputs(NamedTuple):
+    pose_frames: Any
+    fps: float
+    events: Dict[str, Any]
+    action: Dict[str, Any]
+    bfc: Optional[int]
+    ffc: Optional[int]
+    uah: Optional[int]
+    release: Optional[int]
+    run_id: Optional[str] = None
+
+
+class RiskModule(NamedTuple):
+    risk_id: str
+    compute: Callable[[RiskInputs], Optional[Dict[str, Any]]]
+    floor: float = 0.15
+
+
+class RiskOutcome(NamedTuple):
+    risk_id: str
+    result: Optional[Dict[str, Any]]
+    status: str  # "ok", "timeout" or "error"
+    seconds: float
+
+
+RISK_MODULES: Dict[str, RiskModule] = {}
+
+
+def register_risk(
+    risk_id: str,
+    compute: Callable[[RiskInputs], Optional[Dict[str, Any]]],
+    *,
+    floor: float = 0.15,
+) -> RiskModule:
+    """Add (or replace) the module computing ``risk_id``."""
+    module = RiskModule(str(risk_id), compute, float(floor))
+    RISK_MODULES[module.risk_id] = module
+    return module
+
+
+def risk_worker_count() -> int:
+    return env_int("ACTIONLAB_RISK_WORKERS", 4, minimum=1)
+
+
+def risk_budget_seconds() -> float:
+    return env_float("ACTIONLAB_RISK_BUDGET_SECONDS", 5.0)
+
+
+_POOL: Optional[ThreadPoolExecutor] = None
+_POOL_WORKERS = 0
+_POOL_LOCK = threading.Lock()
+
+
+def _risk_pool(workers: int) -> ThreadPoolExecutor:
+    """The shared pool, rebuilt only when ACTIONLAB_RISK_WORKERS changes."""
+    global _POOL, _POOL_WORKERS
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_WORKERS != workers:
+            if _POOL is not None:
+                _POOL.shutdown(wait=False)
+            _POOL = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="risk")
+            _POOL_WORKERS = workers
+        return _POOL
+
+
+def _run_module(module: RiskModule, inputs: RiskInputs) -> RiskOutcome:
+    started = time.perf_counter()
+    try:
+        with span(f"risk.{module.risk_id}"):
+            result = module.compute(inputs)
+        status = "ok"
+    except Exception as exc:
+        logger.exception("[risk_executor] risk_failed risk=%s run_id=%s error=%s", module.risk_id, inputs.run_id, exc)
+        result, status = None, "error"
+    return RiskOutcome(module.risk_id, result, status, time.perf_counter() - started)
+
+
+def run_risks(inputs: RiskInputs, modules: Optional[List[RiskModule]] = None) -> List[RiskOutcome]:
+    """One outcome per module, in registration order."""
+    modules = list(RISK_MODULES.values()) if modules is None else list(modules)
+    workers = min(risk_worker_count(), len(modules))
+    if workers <= 1:
+        outcomes = [_run_module(module, inputs) for module in modules]
+    else:
+        budget = risk_budget_seconds()
+        pool = _risk_pool(risk_worker_count())
+        began: List[Optional[float]] = [None] * len(modules)
+        running = [threading.Event() for _ in modules]
+
+        def _timed(index: int, module: RiskModule) -> RiskOutcome:
+            began[index] = time.perf_counter()
+            running[index].set()
+            return _run_module(module, inputs)
+
+        # Each task runs in a copy of the caller's context so its span
+        # lands in the active run's timing breakdown.
+        futures = [
+            pool.submit(contextvars.copy_context().run, _timed, index, module)
+            for index, module in enumerate(modules)
+        ]
+        outcomes = []
+        for index, (module, future) in enumerate(zip(modules, futures)):
+            if budget <= 0:
+                outcomes.append(future.result())
+                continue
+            try:
+                if not running[index].wait(timeout=budget):
+                    raise FutureTimeoutError()
+                outcomes.append(future.result(timeout=max(0.0, began[index] + budget - time.perf_counter())))
+            except FutureTimeoutError:
+                # Nobody waits for an overrunning module; it keeps its thread until it returns.
+                future.cancel()
+                seconds = time.perf_counter() - began[index] if began[index] is not None else 0.0
+                outcomes.append(RiskOutcome(module.risk_id, None, "timeout", seconds))
+
+    for outcome in outcomes:
+        if outcome.status != "ok":
+            RISK_FALLBACKS.inc(risk=outcome.risk_id, reason=outcome.status)
+            if outcome.status == "timeout":
+                logger.warning(
+                    "[risk_executor] risk_timeout risk=%s run_id=%s budget_s=%.2f",
+                    outcome.risk_id,
+                    inputs.run_id,
+                    risk_budget_seconds(),
+                )
+    logger.info(
+        "[risk_executor] risk_timing run_id=%s workers=%s %s",
+        inputs.run_id,
+        workers,
+        " ".join(f"{o.risk_id}={o.seconds * 1000.0:.1f}ms/{o.status}" for o in outcomes),
+    )
+    return outcomes
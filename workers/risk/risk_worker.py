@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import os
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from app.common.logger import get_logger
 
@@ -14,6 +14,7 @@ from app.workers.risk.foot_line_deviation import compute_foot_line_deviation
 from app.workers.risk.neck_tilt_left_bfc import compute_neck_tilt_left_bfc
 
 from app.workers.risk.benchmarks import attach_deviation_and_impact
+from app.workers.risk.risk_executor import RISK_MODULES, RiskInputs, RiskOutcome, register_risk, run_risks
 
 logger = get_logger(__name__)
 
@@ -71,7 +72,8 @@ def _emit(obj: Optional[Dict[str, Any]], risk_id: str) -> Dict[str, Any]:
     """
     Normalize output and enforce floor.
     """
-    floor = float(RISK_CONFIG[risk_id]["floor"])
+    module = RISK_MODULES.get(risk_id)
+    floor = float(module.floor if module is not None else RISK_CONFIG[risk_id]["floor"])
 
     if not isinstance(obj, dict):
         return {
@@ -142,6 +144,52 @@ def _benchmark_percentile(signal_strength: float) -> Optional[float]:
     return _percentile_from_signal_strength(signal_strength)
 
 
+# ---------------------------------------------------------------------
+# Registered risk modules (run and reported in this order)
+# ---------------------------------------------------------------------
+def _bowling_hand(action: Dict[str, Any]) -> Optional[str]:
+    return action.get("hand") or action.get("bowling_hand") or action.get("input_hand")
+
+
+# Lambdas resolve the compute functions at call time, so patching this
+# module's names still swaps the implementation.
+register_risk(
+    "front_foot_braking_shock",
+    lambda r: compute_front_foot_braking_shock(r.pose_frames, r.ffc, r.fps, {}, action=r.action),
+    floor=RISK_CONFIG["front_foot_braking_shock"]["floor"],
+)
+register_risk(
+    "knee_brace_failure",
+    lambda r: compute_knee_brace_failure(r.pose_frames, r.ffc, r.fps, {"hand": _bowling_hand(r.action)}),
+    floor=RISK_CONFIG["knee_brace_failure"]["floor"],
+)
+register_risk(
+    "trunk_rotation_snap",
+    lambda r: compute_trunk_rotation_snap(r.pose_frames, r.ffc, r.uah, r.fps, {}),
+    floor=RISK_CONFIG["trunk_rotation_snap"]["floor"],
+)
+register_risk(
+    "hip_shoulder_mismatch",
+    lambda r: compute_hip_shoulder_mismatch(r.pose_frames, r.ffc, r.release, r.fps, {}),
+    floor=RISK_CONFIG["hip_shoulder_mismatch"]["floor"],
+)
+register_risk(
+    "lateral_trunk_lean",
+    lambda r: compute_lateral_trunk_lean(r.pose_frames, r.bfc, r.ffc, r.release, r.fps, {}),
+    floor=RISK_CONFIG["lateral_trunk_lean"]["floor"],
+)
+register_risk(
+    "foot_line_deviation",
+    lambda r: compute_foot_line_deviation(r.pose_frames, r.bfc, r.ffc, r.fps, {}, action=r.action),
+    floor=RISK_CONFIG["foot_line_deviation"]["floor"],
+)
+register_risk(
+    "neck_tilt_left_bfc",
+    lambda r: compute_neck_tilt_left_bfc(r.pose_frames, r.bfc, r.fps, {}),
+    floor=RISK_CONFIG["neck_tilt_left_bfc"]["floor"],
+)
+
+
 # ---------------------------------------------------------------------
 # Main worker
 # ---------------------------------------------------------------------
@@ -152,61 +200,32 @@ def run_risk_worker(
     action: Optional[Dict[str, Any]] = None,
     run_id: Optional[str] = None,
 ) -> List[Dict[str, Any]]:
+    risks, _ = run_risk_worker_outcomes(pose_frames, video, events, action, run_id)
+    return risks
+
+
+def run_risk_worker_outcomes(
+    pose_frames: List[Dict[str, Any]],
+    video: Dict[str, Any],
+    events: Dict[str, Any],
+    action: Optional[Dict[str, Any]] = None,
+    run_id: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], List[RiskOutcome]]:
+    """The emitted risks plus the per-module outcomes (timeouts and errors show up there)."""
     action = action or {}
-    fps = float(video.get("fps") or 25.0)
-
-    ffc = _event_frame(events, "ffc")
-    bfc = _event_frame(events, "bfc")
-    uah = _event_frame(events, "uah")
-    rel = _event_frame(events, "release")
-
-    raw = [
-        _emit(
-            compute_front_foot_braking_shock(
-                pose_frames, ffc, fps, {}, action=action
-            ),
-            "front_foot_braking_shock",
-        ),
-        _emit(
-            compute_knee_brace_failure(
-                pose_frames,
-                ffc,
-                fps,
-                {"hand": ((action or {}).get("hand") or (action or {}).get("bowling_hand") or (action or {}).get("input_hand"))},
-            ),
-            "knee_brace_failure",
-        ),
-        _emit(
-            compute_trunk_rotation_snap(
-                pose_frames, ffc, uah, fps, {}
-            ),
-            "trunk_rotation_snap",
-        ),
-        _emit(
-            compute_hip_shoulder_mismatch(
-                pose_frames, ffc, rel, fps, {}
-            ),
-            "hip_shoulder_mismatch",
-        ),
-        _emit(
-            compute_lateral_trunk_lean(
-                pose_frames, bfc, ffc, rel, fps, {}
-            ),
-            "lateral_trunk_lean",
-        ),
-        _emit(
-            compute_foot_line_deviation(
-                pose_frames, bfc, ffc, fps, {}, action=action
-            ),
-            "foot_line_deviation",
-        ),
-        _emit(
-            compute_neck_tilt_left_bfc(
-                pose_frames, bfc, fps, {}
-            ),
-            "neck_tilt_left_bfc",
-        ),
-    ]
+    inputs = RiskInputs(
+        pose_frames=pose_frames,
+        fps=float(video.get("fps") or 25.0),
+        events=events,
+        action=action,
+        bfc=_event_frame(events, "bfc"),
+        ffc=_event_frame(events, "ffc"),
+        uah=_event_frame(events, "uah"),
+        release=_event_frame(events, "release"),
+        run_id=run_id,
+    )
+    outcomes = run_risks(inputs)
+    raw = [_emit(outcome.result, outcome.risk_id) for outcome in outcomes]
 
     out: List[Dict[str, Any]] = []
     for r in raw:
@@ -224,4 +243,4 @@ def run_risk_worker(
             deviation["acceptance_band"] = r.get("acceptance_band")
         out.append(r)
 
-    return out
+    return out, outcomes
@@ -4,22 +4,13 @@ import numpy as np
 from typing import Any, Dict, List, Optional
 
 from app.common.logger import get_logger
+from app.workers.pose.kinematics import kinematics_for
 logger = get_logger(__name__)
 
 LEFT_SHOULDER = 11
 RIGHT_SHOULDER = 12
 
 
-def _landmark(lms: Any, key: str, idx: int) -> Optional[Dict[str, Any]]:
-    if isinstance(lms, dict):
-        val = lms.get(key)
-        return val if isinstance(val, dict) else None
-    if isinstance(lms, list) and 0 <= idx < len(lms):
-        val = lms[idx]
-        return val if isinstance(val, dict) else None
-    return None
-
-
 def _clip01(value: float) -> float:
     return max(0.0, min(1.0, value))
 
@@ -37,28 +28,11 @@ def compute_trunk_rotation_snap(
     if anchor is None or anchor < 0:
         return {'risk_id': 'trunk_rotation_snap', 'signal_strength': floor, 'confidence': 0.0}
 
-    angles = []
-    vis = []
-    for i in range(max(0, anchor - 7), min(len(pose_frames), anchor + 2)):
-        frame = pose_frames[i]
-        if not isinstance(frame, dict):
-            continue
-        lm = frame.get('landmarks')
-        if not isinstance(lm, (dict, list)):
-            continue
-        left_shoulder = _landmark(lm, 'LEFT_SHOULDER', LEFT_SHOULDER)
-        right_shoulder = _landmark(lm, 'RIGHT_SHOULDER', RIGHT_SHOULDER)
-        if left_shoulder is None or right_shoulder is None:
-            continue
-        try:
-            dx = float(right_shoulder['x']) - float(left_shoulder['x'])
-            dy = float(right_shoulder['y']) - float(left_shoulder['y'])
-            v1 = float(left_shoulder.get('visibility', left_shoulder.get('v', 0.0)))
-            v2 = float(right_shoulder.get('visibility', right_shoulder.get('v', 0.0)))
-        except Exception:
-            continue
-        angles.append(float(np.arctan2(dy, dx)))
-        vis.append(min(v1, v2))
+    kin = kinematics_for(pose_frames)
+    shoulder_line = kin.line_angle(LEFT_SHOULDER, RIGHT_SHOULDER)
+    frames = [i for i in range(max(0, anchor - 7), min(len(kin), anchor + 2)) if np.isfinite(shoulder_line[i])]
+    angles = shoulder_line[frames].tolist()
+    vis = kin.visibility(LEFT_SHOULDER, RIGHT_SHOULDER)[frames].tolist()
 
     if len(angles) < 5:
         return {'risk_id': 'trunk_rotation_snap', 'signal_strength': floor, 'confidence': 0.0}
@@ -6,6 +6,7 @@ from typing import Any, Dict, List, Optional
 import cv2
 import numpy as np
 
+from app.io.frame_provider import FrameProvider, frame_provider_for
 from app.workers.events.delivery_guard import detect_delivery_candidates
 from app.workers.windowing.delivery_window import detect_delivery_window
 
@@ -43,6 +44,10 @@ def _sample_indices(total_frames: int, max_samples: int = MAX_SAMPLES) -> List[i
     )
 
 
+def primary_subject_sample_indices(total_frames: int) -> List[int]:
+    return _sample_indices(total_frames)
+
+
 def _pose_box(
     pose_frame: Optional[Dict[str, Any]],
     frame_w: int,
@@ -223,8 +228,13 @@ def assess_primary_subject(
             "max_prominent_people": 1,
         }
 
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
+    provider = frame_provider_for(video)
+    owns_provider = provider is None
+    if provider is None:
+        provider = FrameProvider(video_path, cache_bytes=0)
+    if not provider.is_opened():
+        if owns_provider:
+            provider.close()
         return {
             "passed": True,
             "status": "warn",
@@ -243,9 +253,8 @@ def assess_primary_subject(
 
     try:
         for frame_idx in sample_indices:
-            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-            ok, frame = cap.read()
-            if not ok or frame is None:
+            frame = provider.read(frame_idx)
+            if frame is None:
                 continue
 
             detector_boxes = _detect_people_boxes(frame)
@@ -279,7 +288,8 @@ def assess_primary_subject(
 
             max_prominent_people = max(max_prominent_people, prominent_people)
     finally:
-        cap.release()
+        if owns_provider:
+            provider.close()
 
     if detector_frames == 0:
         return {
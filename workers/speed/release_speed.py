@@ -7,6 +7,8 @@ from typing import Any, Dict, List, Optional, Tuple
 import numpy as np
 from scipy.ndimage import gaussian_filter1d
 
+from app.workers.pose.kinematics import kinematics_for
+
 BALL_WEIGHT_OZ = 5.25
 MIN_VIS = 0.35
 METHOD = "release_kinematics_research_v2"
@@ -146,35 +148,6 @@ def _arm_length_px(
     return total if total >= 20.0 else None
 
 
-def _elbow_angle_deg(
-    landmarks: Optional[List[Dict[str, Any]]],
-    *,
-    shoulder_idx: int,
-    elbow_idx: int,
-    wrist_idx: int,
-) -> Optional[float]:
-    shoulder = _get_landmark(landmarks, shoulder_idx)
-    elbow = _get_landmark(landmarks, elbow_idx)
-    wrist = _get_landmark(landmarks, wrist_idx)
-    if shoulder is None or elbow is None or wrist is None:
-        return None
-
-    a = np.array(
-        [float(shoulder["x"] - elbow["x"]), float(shoulder["y"] - elbow["y"])],
-        dtype=float,
-    )
-    b = np.array(
-        [float(wrist["x"] - elbow["x"]), float(wrist["y"] - elbow["y"])],
-        dtype=float,
-    )
-    norm_a = float(np.linalg.norm(a))
-    norm_b = float(np.linalg.norm(b))
-    if norm_a <= 1e-6 or norm_b <= 1e-6:
-        return None
-    dot = max(-1.0, min(1.0, float(np.dot(a, b) / (norm_a * norm_b))))
-    return math.degrees(math.acos(dot))
-
-
 def _window_indices(
     release_frame: int,
     total_frames: int,
@@ -218,6 +191,143 @@ def _unavailable_result(ball_weight_oz: float) -> Dict[str, Any]:
     }
 
 
+class _ReleaseTracks:
+    """
+    Per-frame wrist, shoulder, pelvis, arm-length and body-height series for
+    one clip and bowling arm. They are extracted once per estimate and
+    smoothed once per sigma, so the primary, neighbour and salvage passes
+    only slice their windows out of the shared arrays.
+    """
+
+    def __init__(self, pose_frames: List[Dict[str, Any]], *, video: Dict[str, Any], hand: str):
+        self.pose_frames = pose_frames
+        self.fps = float(video.get("fps") or 0.0)
+        self.width = float(video.get("width") or 0.0)
+        self.height = float(video.get("height") or 0.0)
+        h = (hand or "R").upper()
+        self.shoulder_idx, self.elbow_idx, self.wrist_idx = (
+            (RS, RE, RW) if h == "R" else (LS, LE, LW)
+        )
+        self._extracted = False  # passes that stop at geometry or clip-edge checks never extract
+        self._smoothed: Dict[float, Optional[Dict[str, np.ndarray]]] = {}
+
+    def _extract(self) -> None:
+        if self._extracted:
+            return
+        pose_frames = self.pose_frames
+        width, height = self.width, self.height
+        shoulder_idx, elbow_idx, wrist_idx = self.shoulder_idx, self.elbow_idx, self.wrist_idx
+
+        wrist_points: List[Optional[Tuple[float, float]]] = []
+        shoulder_points: List[Optional[Tuple[float, float]]] = []
+        pelvis_points: List[Optional[Tuple[float, float]]] = []
+        wrist_depths: List[Optional[float]] = []
+        arm_lengths: List[Optional[float]] = []
+        body_heights: List[Optional[float]] = []
+
+        for frame in pose_frames:
+            landmarks = (frame or {}).get("landmarks")
+            wrist = _get_landmark(landmarks, wrist_idx)
+            wrist_points.append(_pixel_xy(wrist, width=width, height=height))
+            wrist_depths.append(float(wrist["z"]) if wrist is not None else None)
+            shoulder_points.append(
+                _pixel_xy(_get_landmark(landmarks, shoulder_idx), width=width, height=height)
+            )
+
+            left_hip = _pixel_xy(_get_landmark(landmarks, LH), width=width, height=height)
+            right_hip = _pixel_xy(_get_landmark(landmarks, RH), width=width, height=height)
+            if left_hip and right_hip:
+                pelvis_points.append(
+                    (
+                        (left_hip[0] + right_hip[0]) * 0.5,
+                        (left_hip[1] + right_hip[1]) * 0.5,
+                    )
+                )
+            else:
+                pelvis_points.append(None)
+
+            arm_lengths.append(
+                _arm_length_px(
+                    landmarks,
+                    shoulder_idx=shoulder_idx,
+                    elbow_idx=elbow_idx,
+                    wrist_idx=wrist_idx,
+                    width=width,
+                    height=height,
+                )
+            )
+            body_heights.append(
+                _body_height_px(
+                    pose_frames,
+                    int((frame or {}).get("frame", len(body_heights))),
+                    height=height,
+                )
+            )
+
+        self.wrist_points = wrist_points
+        self.shoulder_points = shoulder_points
+        self.pelvis_points = pelvis_points
+        self.wrist_depths = wrist_depths
+        self.arm_lengths = arm_lengths
+        self.body_heights = body_heights
+        self.elbow_angles = [
+            angle if math.isfinite(angle) else None
+            for angle in kinematics_for(pose_frames)
+            .joint_angle(shoulder_idx, elbow_idx, wrist_idx, min_visibility=MIN_VIS)
+            .tolist()
+        ]
+        self.overall_wrist_visibility = sum(1.0 for point in wrist_points if point is not None) / float(len(wrist_points))
+        self._extracted = True
+
+    def smoothed(self, sigma_scale: float) -> Optional[Dict[str, np.ndarray]]:
+        """Smoothed scale series and speeds for one sigma, or None when landmarks are too sparse."""
+        if sigma_scale not in self._smoothed:
+            self._extract()
+            self._smoothed[sigma_scale] = self._smooth(sigma_scale)
+        return self._smoothed[sigma_scale]
+
+    def _smooth(self, sigma_scale: float) -> Optional[Dict[str, np.ndarray]]:
+        fps = self.fps
+        wrist_track = _smoothed_track(self.wrist_points, fps=fps, sigma_scale=sigma_scale)
+        shoulder_track = _smoothed_track(self.shoulder_points, fps=fps, sigma_scale=sigma_scale)
+        pelvis_track = _smoothed_track(self.pelvis_points, fps=fps, sigma_scale=sigma_scale)
+        wrist_depth_series = _smoothed_series(self.wrist_depths, fps=fps, sigma_scale=sigma_scale)
+        arm_series = _interpolate_series(self.arm_lengths)
+        body_series = _interpolate_series(self.body_heights)
+        elbow_series = _interpolate_series(self.elbow_angles)
+
+        if (
+            wrist_track is None
+            or shoulder_track is None
+            or pelvis_track is None
+            or wrist_depth_series is None
+            or arm_series is None
+            or body_series is None
+            or elbow_series is None
+        ):
+            return None
+
+        sigma = max(1.0, sigma_scale * fps)
+        elbow_series = gaussian_filter1d(elbow_series, sigma=sigma)
+
+        dt = 1.0 / fps
+        return {
+            "arm_series": gaussian_filter1d(arm_series, sigma=sigma),
+            "body_series": gaussian_filter1d(body_series, sigma=sigma),
+            "wrist_speed": np.hypot(np.gradient(wrist_track[0], dt), np.gradient(wrist_track[1], dt)),
+            "shoulder_speed": np.hypot(
+                np.gradient(shoulder_track[0], dt),
+                np.gradient(shoulder_track[1], dt),
+            ),
+            "pelvis_speed": np.hypot(
+                np.gradient(pelvis_track[0], dt),
+                np.gradient(pelvis_track[1], dt),
+            ),
+            "wrist_depth_speed_norm": np.abs(np.gradient(wrist_depth_series, dt)),
+            "elbow_extension_speed": np.abs(np.gradient(elbow_series, dt)),
+        }
+
+
 def _estimate_release_speed_pass(
     *,
     pose_frames: List[Dict[str, Any]],
@@ -234,6 +344,7 @@ def _estimate_release_speed_pass(
     max_wrist_cv: float,
     salvage_mode: bool,
     release_confidence: float,
+    tracks: Optional[_ReleaseTracks] = None,
 ) -> Dict[str, Any]:
     fps = float(video.get("fps") or 0.0)
     width = float(video.get("width") or 0.0)
@@ -248,107 +359,20 @@ def _estimate_release_speed_pass(
     if release_frame + window_after >= len(pose_frames):
         return {**unavailable, "reason": "release_too_close_to_clip_end"}
 
-    h = (hand or "R").upper()
-    shoulder_idx, elbow_idx, wrist_idx = (
-        (RS, RE, RW) if h == "R" else (LS, LE, LW)
-    )
-
-    wrist_points: List[Optional[Tuple[float, float]]] = []
-    shoulder_points: List[Optional[Tuple[float, float]]] = []
-    pelvis_points: List[Optional[Tuple[float, float]]] = []
-    wrist_depths: List[Optional[float]] = []
-    arm_lengths: List[Optional[float]] = []
-    body_heights: List[Optional[float]] = []
-    elbow_angles: List[Optional[float]] = []
-
-    for frame in pose_frames:
-        landmarks = (frame or {}).get("landmarks")
-        wrist_points.append(
-            _pixel_xy(_get_landmark(landmarks, wrist_idx), width=width, height=height)
-        )
-        wrist_depths.append(
-            float(_get_landmark(landmarks, wrist_idx)["z"])
-            if _get_landmark(landmarks, wrist_idx) is not None
-            else None
-        )
-        shoulder_points.append(
-            _pixel_xy(_get_landmark(landmarks, shoulder_idx), width=width, height=height)
-        )
-
-        left_hip = _pixel_xy(_get_landmark(landmarks, LH), width=width, height=height)
-        right_hip = _pixel_xy(_get_landmark(landmarks, RH), width=width, height=height)
-        if left_hip and right_hip:
-            pelvis_points.append(
-                (
-                    (left_hip[0] + right_hip[0]) * 0.5,
-                    (left_hip[1] + right_hip[1]) * 0.5,
-                )
-            )
-        else:
-            pelvis_points.append(None)
-
-        arm_lengths.append(
-            _arm_length_px(
-                landmarks,
-                shoulder_idx=shoulder_idx,
-                elbow_idx=elbow_idx,
-                wrist_idx=wrist_idx,
-                width=width,
-                height=height,
-            )
-        )
-        body_heights.append(
-            _body_height_px(
-                pose_frames,
-                int((frame or {}).get("frame", len(body_heights))),
-                height=height,
-            )
-        )
-        elbow_angles.append(
-            _elbow_angle_deg(
-                landmarks,
-                shoulder_idx=shoulder_idx,
-                elbow_idx=elbow_idx,
-                wrist_idx=wrist_idx,
-            )
-        )
-
-    wrist_track = _smoothed_track(wrist_points, fps=fps, sigma_scale=sigma_scale)
-    shoulder_track = _smoothed_track(shoulder_points, fps=fps, sigma_scale=sigma_scale)
-    pelvis_track = _smoothed_track(pelvis_points, fps=fps, sigma_scale=sigma_scale)
-    wrist_depth_series = _smoothed_series(wrist_depths, fps=fps, sigma_scale=sigma_scale)
-    arm_series = _interpolate_series(arm_lengths)
-    body_series = _interpolate_series(body_heights)
-    elbow_series = _interpolate_series(elbow_angles)
-
-    if (
-        wrist_track is None
-        or shoulder_track is None
-        or pelvis_track is None
-        or wrist_depth_series is None
-        or arm_series is None
-        or body_series is None
-        or elbow_series is None
-    ):
+    if tracks is None:
+        tracks = _ReleaseTracks(pose_frames, video=video, hand=hand)
+    prepared = tracks.smoothed(sigma_scale)
+    if prepared is None:
         return {**unavailable, "reason": "insufficient_release_landmarks"}
-
-    sigma = max(1.0, sigma_scale * fps)
-    arm_series = gaussian_filter1d(arm_series, sigma=sigma)
-    body_series = gaussian_filter1d(body_series, sigma=sigma)
-    elbow_series = gaussian_filter1d(elbow_series, sigma=sigma)
-
-    dt = 1.0 / fps
-    wrist_speed = np.hypot(np.gradient(wrist_track[0], dt), np.gradient(wrist_track[1], dt))
-    shoulder_speed = np.hypot(
-        np.gradient(shoulder_track[0], dt),
-        np.gradient(shoulder_track[1], dt),
-    )
-    pelvis_speed = np.hypot(
-        np.gradient(pelvis_track[0], dt),
-        np.gradient(pelvis_track[1], dt),
-    )
-    wrist_depth_speed_norm = np.abs(np.gradient(wrist_depth_series, dt))
-    elbow_extension_speed = np.abs(np.gradient(elbow_series, dt))
+    wrist_points = tracks.wrist_points
+    shoulder_points = tracks.shoulder_points
+    arm_series = prepared["arm_series"]
+    body_series = prepared["body_series"]
+    wrist_speed = prepared["wrist_speed"]
+    shoulder_speed = prepared["shoulder_speed"]
+    pelvis_speed = prepared["pelvis_speed"]
+    wrist_depth_speed_norm = prepared["wrist_depth_speed_norm"]
+    elbow_extension_speed = prepared["elbow_extension_speed"]
 
     metric_window = _window_indices(
         release_frame,
@@ -422,7 +446,7 @@ def _estimate_release_speed_pass(
     arm_length_cv_broad = _cv(arm_scale_metric)
     arm_length_cv = min(arm_length_cv_local, arm_length_cv_broad) if salvage_mode else arm_length_cv_local
     wrist_window_cv = _cv(wrist_metric)
-    overall_wrist_visibility = sum(1.0 for point in wrist_points if point is not None) / float(len(wrist_points))
+    overall_wrist_visibility = tracks.overall_wrist_visibility
 
     if arm_length_cv > max_arm_cv:
         return {
@@ -662,6 +686,7 @@ def estimate_release_speed(
 ) -> Dict[str, Any]:
     release_frame = int(((events.get("release") or {}).get("frame")) or -1)
     release_confidence = float(((events.get("release") or {}).get("confidence")) or 0.0)
+    tracks = _ReleaseTracks(pose_frames, video=video, hand=hand)
     primary = _estimate_release_speed_pass(
         pose_frames=pose_frames,
         video=video,
@@ -677,6 +702,7 @@ def estimate_release_speed(
         max_wrist_cv=0.60,
         salvage_mode=False,
         release_confidence=release_confidence,
+        tracks=tracks,
     )
     if primary.get("reason") in {
         "release_too_close_to_clip_start",
@@ -711,6 +737,7 @@ def estimate_release_speed(
                         max_wrist_cv=0.60,
                         salvage_mode=False,
                         release_confidence=release_confidence,
+                        tracks=tracks,
                     )
                 )
             primary = _apply_low_confidence_neighbor_recovery(primary, neighbor_results)
@@ -734,6 +761,7 @@ def estimate_release_speed(
         max_wrist_cv=1.10,
         salvage_mode=True,
         release_confidence=release_confidence,
+        tracks=tracks,
     )
     if salvage.get("available"):
         salvage["reason"] = f"recovered_{primary.get('reason')}"
@@ -6,6 +6,8 @@ import cv2
 import numpy as np
 from scipy.signal import find_peaks
 
+from app.io.frame_provider import SMALL_FRAME_SIZE, FrameProvider, frame_provider_for
+
 TARGET_SAMPLE_MS = 66.0
 MIN_SAMPLES = 12
 PAD_BEFORE_SEC = 1.1
@@ -181,6 +183,32 @@ def _filter_reported_peak_indices(
     return filtered or [selected_idx]
 
 
+def _motion_track(
+    *,
+    sample_frames: List[int],
+    motion_boxes: List[Optional[Tuple[int, int, int, int]]],
+    start: int,
+    end: int,
+) -> List[List[float]]:
+    """Normalized [frame, x0, y0, x1, y1] motion boxes inside the analysis window."""
+    width, height = float(SMALL_FRAME_SIZE[0]), float(SMALL_FRAME_SIZE[1])
+    track: List[List[float]] = []
+    for frame_idx, box in zip(sample_frames, motion_boxes):
+        if box is None or frame_idx < start or frame_idx > end:
+            continue
+        x, y, w, h = box
+        track.append(
+            [
+                int(frame_idx),
+                round(x / width, 4),
+                round(y / height, 4),
+                round((x + w) / width, 4),
+                round((y + h) / height, 4),
+            ]
+        )
+    return track
+
+
 def detect_delivery_window(video: Dict[str, Any]) -> Dict[str, Any]:
     video_path = str(video.get("path") or "")
     total_frames = int(video.get("total_frames") or 0)
@@ -189,40 +217,30 @@ def detect_delivery_window(video: Dict[str, Any]) -> Dict[str, Any]:
         return {"available": False, "reason": "missing_video_metadata"}
 
     step = _sample_step_for_fps(fps)
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
+    provider = frame_provider_for(video)
+    owns_provider = provider is None
+    if provider is None:
+        provider = FrameProvider(video_path, cache_bytes=0)
+    if not provider.is_opened():
+        if owns_provider:
+            provider.close()
         return {"available": False, "reason": "video_unavailable"}
 
     sample_frames: List[int] = []
     scores: List[float] = []
     motion_boxes: List[Optional[Tuple[int, int, int, int]]] = []
     prev: Optional[np.ndarray] = None
-    frame_idx = 0
 
     try:
-        while True:
-            ok = cap.grab()
-            if not ok:
-                break
-            if frame_idx % step != 0:
-                frame_idx += 1
-                continue
-
-            ok, frame = cap.retrieve()
-            if not ok or frame is None:
-                frame_idx += 1
-                continue
-
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            small = cv2.resize(gray, (96, 54))
+        for frame_idx, small in provider.scan_small_gray(step):
             score, motion_box = _motion_box_score(small, prev)
             sample_frames.append(frame_idx)
             scores.append(score)
             motion_boxes.append(motion_box)
             prev = small
-            frame_idx += 1
     finally:
-        cap.release()
+        if owns_provider:
+            provider.close()
 
     if len(scores) < MIN_SAMPLES:
         return {"available": False, "reason": "insufficient_samples"}
@@ -269,6 +287,12 @@ def detect_delivery_window(video: Dict[str, Any]) -> Dict[str, Any]:
             "release_hint": release_hint,
             "analysis_start": analysis_start,
             "analysis_end": analysis_end,
+            "motion_track": _motion_track(
+                sample_frames=sample_frames,
+                motion_boxes=motion_boxes,
+                start=analysis_start,
+                end=analysis_end,
+            ),
         }
 
     cutoff = baseline + (peak - baseline) * 0.32
@@ -305,4 +329,10 @@ def detect_delivery_window(video: Dict[str, Any]) -> Dict[str, Any]:
         "coarse_end": coarse_end,
         "analysis_start": analysis_start,
         "analysis_end": analysis_end,
+        "motion_track": _motion_track(
+            sample_frames=sample_frames,
+            motion_boxes=motion_boxes,
+            start=analysis_start,
+            end=analysis_end,
+        ),
     }